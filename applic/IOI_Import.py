@@ -1,11 +1,36 @@
 import argparse
+import atexit
 import configparser
+import csv
 import datetime
+import json
 import logging
+import multiprocessing
 import os
 import sys
+import time
+import zipfile
 import openpyxl
+from applic.buildtargets import BuildTargets
+from applic.compressedio import COMPRESSION_EXTENSIONS, split_ext
+from applic.csvinput import CSVWorkbook, is_csv_input
 from applic.dicttoxml import DictToXML, DXMLGeneratedError
+from applic.exportindex import ExportIndex, ExportIndexGeneratedError
+from applic.idblocks import IDBlockAllocator
+from applic.idledger import IDLedger, LedgerGeneratedError
+from applic.inputcache import InputCache
+from applic.lookupindex import LookupIndex
+from applic.outputcheck import OutputValidator, OutputCheckGeneratedError, cached_rules
+from applic.pagesinks import PageSinkSet
+from applic.pipeline import PipelinedDictToXML
+from applic.progress import ProgressReporter
+from applic.runlog import RunLog
+from applic.streamxml import StreamingDictToXML
+from applic.watch import InputWatcher
+from applic.xlsxdiff import WorkbookDiff
+from applic.xlsxcache import WorkbookCache
+from applic.xmltoxlsx import XMLToXLSX, XLSXExportGeneratedError
+from applic.xmlshards import XMLShardWriter, ShardGeneratedError
 # todo: Need to merge files_folders so git remote transfers files_folders.py
 from files_folders import FilesAndFolders
 
@@ -14,13 +39,37 @@ __author__ = "Robert Gottesman"
 __version_number__ = "1.0.2"
 __version_date__ = "04/27/2018"
 __err_prefix__ = 'IOI'
-__high_err_num__ = 13
+__high_err_num__ = 16
 
 """ Change Log
 04/17/2017 - Groups column can be separated with '_' or ','
 06/14/2017 - Removed DD Wiki Version text (not used)
 10/29/2017 - Program starting from __init()__.py. Changed main folder name to 'files'
 04/21/2018 - Added Spanish columns to config.ini
+10/19/2026 - Added --shard_by, --shard_max_pages and --shard_max_kb for sharded IOI output
+10/19/2026 - Added --compress for output. Compressed -w/-i input files are read by file extension
+10/19/2026 - Added --delta to output only pages new/changed against the DD Wiki exported xml (-w)
+10/19/2026 - spreadsheet_info['Lookups'] is a LookupIndex (was dict of letter: [[field, rows], ...])
+10/19/2026 - Added --low_memory (with --memory_budget_mb): rows streamed through an external sort into the xml
+10/19/2026 - Parsed xlsx cached in files/cache keyed by xlsx content hash and sheet mapping. Added --no_cache
+10/19/2026 - Added --pipelined: xlsx read one sheet at a time (iter_xlsx_sheets) overlapping xml build and write
+10/19/2026 - Added --build_resource, --build_group, --build_lookup_field and --build_letter (partial output)
+10/19/2026 - Added --watch (with --watch_interval): reconvert when an input file changes, reusing loaded inputs
+10/19/2026 - -c accepts several config sub folders (matrix run): xlsx parsed once, one output per config
+10/19/2026 - Added --id_ledger: computed RecordIDs/LookupIDs reserved from a shared SQLite ID ledger
+10/19/2026 - Added --diff (text/json change report between two xlsx) and --build_changed_since
+10/19/2026 - Added --near_dup_threshold: warn about near duplicate field/lookup value names
+10/19/2026 - Log handlers run on a background queue (RunLog). Repeated coded messages aggregated (--log_examples)
+10/19/2026 - Added --progress (text/json) and --progress_interval: rows/pages/values/bytes per stage with rate and ETA
+10/19/2026 - Added --page_output: pages also written as NDJSON/JSON and a CSV page manifest in the same pass
+10/19/2026 - Added --to_xlsx: rebuild an input .xlsx from an IOI import xml or DD Wiki export (reverse export)
+10/19/2026 - -x accepts a folder or .zip of per sheet CSV/TSV files (read like a read only workbook)
+10/19/2026 - Output checked against the DDWikiImportConfig.xml Forms while written (--no_validate). Added --validate
+10/19/2026 - Added --inspect and --inspect_max_ids: lookups in a SQLite index of the DD Wiki export (-w)
+10/19/2026 - Added --reproducible: pinned clock (value or -d date), identical inputs give byte identical output
+10/19/2026 - Added --id_block_size: RecordID/LookupID block size. Full blocks get extension blocks (IDBlockAllocator)
+10/19/2026 - ID ledger closed when the program ends (also after a failed conversion)
+10/19/2026 - --watch: message code summary logged and --log_examples counts restarted after each conversion
 """
 
 
@@ -48,35 +97,65 @@ def valid_date(date_string):
         raise argparse.ArgumentTypeError(msg)
 
 
+def valid_clock(date_string):
+    """ Return date/time object in YYYY-MM-DD or YYYY-MM-DDTHH:MM format
+
+    :param date_string: (str) Date in YYYY-MM-DD or YYYY-MM-DDTHH:MM
+    :return: date object
+    """
+    for date_format in ("%Y-%m-%dT%H:%M", "%Y-%m-%d"):
+        try:
+            return datetime.datetime.strptime(date_string, date_format)
+        except ValueError:
+            pass
+    msg = "Not a valid date/time: '{0}'.".format(date_string)
+    raise argparse.ArgumentTypeError(msg)
+
+
+def pinned_clock(args):
+    """ Clock pinned by --reproducible: its value, or the -d date if none given
+
+    :param args: (obj) parsed command line arguments
+    :return: (datetime) or None if not reproducible
+    """
+    if args.reproducible is None:
+        return None
+    return args.xlsx_date if args.reproducible is True else args.reproducible
+
+
 def print_lookup_fields(spreadsheet_info):
     """ Used for debugging (ignore)
 
     :param spreadsheet_info: Dictionary format of xlsx/csv file
     :return: None
     """
-    top_index = spreadsheet_info['Lookups']
-    for letter in sorted(top_index.keys()):
+    lookup_index = spreadsheet_info['Lookups']
+    for letter in lookup_index.sorted_letters():
         print('{0} - Lookup Fields'.format(letter))
-        # note: lookup_fields['PropertySubType'][0]['Enumeration'] .. get Enumeration
-        for fld_name in top_index[letter]:
+        # note: lookup_index.values('PropertySubType')[0]['Enumeration'] .. get Enumeration
+        for fld_name in lookup_index.fields_for_letter(letter):
             print(fld_name)
 
 
 class ResoXLSXtoDict:
 
-    def __init__(self, config_file_path, xlsx_filepath):
+    def __init__(self, config_file_path, xlsx_filepath, cache_folder=None, progress=None):
         """ Read xlsx files into internal dictionary 'spreadsheet_info'
 
         :param config_file_path: (str) Full path for config.ini
-        :param xlsx_filepath: (str) Full path for input xlsx file
+        :param xlsx_filepath: (str) Full path for input xlsx file, or folder/.zip of CSV/TSV sheet files (CSVWorkbook)
+        :param cache_folder: (str) Folder for parsed xlsx cache (None: no cache)
+        :param progress: (ProgressReporter) Report rows read per sheet (None: no report)
         :return: Void. Raise IOIGeneratedError on error
         """
         self.xlsx_filepath = xlsx_filepath
+        self.progress = progress if progress is not None else ProgressReporter(ProgressReporter.OFF)
+        self.workbook_cache = WorkbookCache(cache_folder) if cache_folder is not None else None
         self.logger = logging.getLogger(__project__ + '.' + self.__class__.__name__)
         self.logger.debug("Initialize {0} with verson:{1}".format(self.__class__.__name__, __version_date__))
         self.resource_sheets = []
         self.lookup_sheet = None
-        self.spreadsheet_info = {'Resources': {}, 'Lookups': {}}  # Container of xlsx data
+        self.spreadsheet_info = {'Resources': {}, 'Lookups': LookupIndex()}  # Container of xlsx data
         self._read_config_ini(config_file_path)
 
     def _read_config_ini(self, config_file_path):
@@ -113,15 +192,95 @@ class ResoXLSXtoDict:
         if not len(self.resource_sheets) == 0 and self.lookup_sheet is None:
             raise IOIGeneratedError("[IOI-13] Missing entries in [ResourceSheets] and [LookupSheets] in config.ini")
 
+    def _sheet_mapping(self):
+        """ config.ini entries that decide which xlsx sheets are read (part of the workbook cache key)
+
+        :return: (list) (section, key, value) tuples
+        """
+        sheet_mapping = [('ResourceSheets', sheet_tab_name, self.config['ResourceSheets'][sheet_tab_name])
+                         for sheet_tab_name in self.resource_sheets]
+        sheet_mapping.append(('LookupSheets', 'LookupSheet', self.lookup_sheet))
+        return sheet_mapping
+
     def read_xlsx_file(self):
-        """ Open .xlsx file and read into self.spreadsheet_info
+        """ Load self.spreadsheet_info from the workbook cache or, on a cache miss, read the .xlsx file and cache it
 
         :return: void. Raise IOIGeneratedError on error
         """
+        if self.load_cached():
+            return
+        self._read_xlsx_workbook()
+        self.save_cached()
+
+    def open_workbook(self):
+        """ Open (parse) .xlsx file
+
+        :return: (obj) workbook. Raise IOIGeneratedError on error
+        """
+        if is_csv_input(self.xlsx_filepath):
+            return self._open_csv_workbook()
         try:
-            wb = openpyxl.load_workbook(self.xlsx_filepath)
+            return openpyxl.load_workbook(self.xlsx_filepath)
         except FileNotFoundError:
             raise IOIGeneratedError('[IOI-07] XLSX input file {0} not found'.format(self.xlsx_filepath))
+
+    def _open_csv_workbook(self):
+        """ Open folder/.zip of CSV/TSV sheet files. Sheets are parsed while their rows are iterated
+
+        :return: (CSVWorkbook) workbook. Raise IOIGeneratedError on error
+        """
+        try:
+            return CSVWorkbook(self.xlsx_filepath)
+        except FileNotFoundError:
+            raise IOIGeneratedError('[IOI-07] CSV input folder/file {0} not found'.format(self.xlsx_filepath))
+        except (OSError, zipfile.BadZipFile) as e:
+            raise IOIGeneratedError('[IOI-16] Cannot read CSV input {0}: {1}'.format(self.xlsx_filepath, e))
+
+    def _cache_key(self):
+        if self.workbook_cache is None:
+            return None
+        try:
+            return self.workbook_cache.make_key(self.xlsx_filepath, self._sheet_mapping())
+        except FileNotFoundError:
+            raise IOIGeneratedError('[IOI-07] XLSX input file {0} not found'.format(self.xlsx_filepath))
+
+    def load_cached(self):
+        """ Load self.spreadsheet_info from the workbook cache. Call from the main thread (unpickling imports modules)
+
+        :return: (bool) True on cache hit. Raise IOIGeneratedError on error
+        """
+        cache_key = self._cache_key()
+        if cache_key is None:
+            return False
+        spreadsheet_info = self.workbook_cache.load(cache_key)
+        if spreadsheet_info is None:
+            return False
+        self.logger.info("Read xlsx from workbook cache: {}".format(cache_key))
+        self.spreadsheet_info = spreadsheet_info
+        return True
+
+    def save_cached(self):
+        """ Save self.spreadsheet_info to the workbook cache. Call from the main thread (pickling imports modules)
+
+        :return: None. Raise IOIGeneratedError on error
+        """
+        cache_key = self._cache_key()
+        if cache_key is not None and self.workbook_cache.save(cache_key, self.spreadsheet_info):
+            self.logger.debug("Saved xlsx to workbook cache: {}".format(cache_key))
+
+    def _read_xlsx_workbook(self, wb=None):
+        """ Open .xlsx file and read into self.spreadsheet_info
+
+        :param wb: (obj) opened workbook (None: open self.xlsx_filepath)
+        :return: void. Raise IOIGeneratedError on error
+        """
+        if wb is None:
+            wb = self.open_workbook()
+        if isinstance(wb, CSVWorkbook):  # No cell access. Filled from the streamed rows (same rules)
+            for sheet in self._fill_sheets(wb):
+                pass
+            self.progress.end_stage()
+            return
         # Read in Resource Sheet rows
         for resource_sheet_name in self.resource_sheets:
             try:
@@ -143,49 +302,182 @@ class ResoXLSXtoDict:
 
             if len(self.spreadsheet_info['Lookups']) == 0:
                 raise IOIGeneratedError('[W202] No Lookup Lookups Processed (tab: {})'.format(self.lookup_sheet))
+        self.progress.end_stage()
+
+    def _open_read_only_workbook(self):
+        """ Open .xlsx file in read only mode. Sheets are parsed while their rows are iterated
+
+        :return: (obj) workbook. Raise IOIGeneratedError on error
+        """
+        if is_csv_input(self.xlsx_filepath):
+            return self._open_csv_workbook()
+        try:
+            return openpyxl.load_workbook(self.xlsx_filepath, read_only=True)
+        except FileNotFoundError:
+            raise IOIGeneratedError('[IOI-07] XLSX input file {0} not found'.format(self.xlsx_filepath))
+
+    def _iter_resource_rows(self, wb, resource_sheet_name):
+        """ Stream rows of a resource sheet. Blank rows are skipped, 'Groups' column is split into a list
+
+        :param wb: (obj) read only workbook
+        :param resource_sheet_name: (str) sheet tab name
+        :return: (generator) of row dict keyed by column header. Raise IOIGeneratedError on error
+        """
+        try:
+            ws = wb[resource_sheet_name]
+        except KeyError:
+            raise IOIGeneratedError("[IOI-11] Resource Sheet name '{0}' does not exist in .xlsx file".
+                                    format(resource_sheet_name))
+        self.logger.info("Streaming Input Resource Worksheet: '{}'".format(ws.title))
+        self.progress.start("Reading '{}'".format(ws.title), total=ws.max_row - 1 if ws.max_row else None)
+        for row_values, my_row in self._iter_sheet_rows(ws):
+            self.progress.advance()
+            if row_values[0] is not None and len(row_values[0]) > 0:
+                self._replace_val_in_groups(my_row)  # Replace string with list
+                yield my_row
+
+    def _iter_lookup_rows(self, wb):
+        """ Stream rows of the lookup sheet. Blank rows are skipped
+
+        :param wb: (obj) read only workbook
+        :return: (generator) of tuples (lookup field name, row dict). Raise IOIGeneratedError on error
+        """
+        try:
+            ws = wb[self.lookup_sheet]
+        except KeyError:
+            raise IOIGeneratedError("[IOI-08] Lookup Sheet name '{0}' does not exist in .xlsx file".
+                                    format(self.lookup_sheet))
+        self.logger.info("Streaming Input Lookup Worksheet: '{}'".format(ws.title))
+        self.progress.start("Reading '{}'".format(ws.title), total=ws.max_row - 1 if ws.max_row else None)
+        for row_values, my_row in self._iter_sheet_rows(ws):
+            self.progress.advance()
+            try:
+                lookup_field_name = my_row['LookupField']
+            except KeyError:
+                raise IOIGeneratedError("[IOI-10] Cannot find field 'LookupField' in spreadsheet")
+            if lookup_field_name is not None:  # Blank rows
+                yield lookup_field_name, my_row
+
+    def iter_xlsx_rows(self):
+        """ Stream rows of the .xlsx file (read only mode) without filling self.spreadsheet_info.
+        .. Rows follow the same rules as read_xlsx_file (blank rows skipped, 'Groups' column split into a list)
+
+        :return: (generator) of tuples ('Resources', sheet tab name, row) or ('Lookups', lookup field name, row).
+        .. Raise IOIGeneratedError on error
+        """
+        wb = self._open_read_only_workbook()
+        for resource_sheet_name in self.resource_sheets:
+            for my_row in self._iter_resource_rows(wb, resource_sheet_name):
+                yield 'Resources', resource_sheet_name, my_row
+        if self.lookup_sheet is not None:
+            for lookup_field_name, my_row in self._iter_lookup_rows(wb):
+                yield 'Lookups', lookup_field_name, my_row
+        wb.close()
+
+    def iter_xlsx_sheets(self):
+        """ Fill self.spreadsheet_info one sheet at a time (read only mode) so each sheet can be used as soon as it
+        .. is read. The workbook cache is not used (see load_cached/save_cached)
+
+        :return: (generator) of tuples ('Resources', sheet tab name) or ('Lookups', lookup sheet tab name), yielded
+        .. after the sheet is in self.spreadsheet_info. Raise IOIGeneratedError on error
+        """
+        wb = self._open_read_only_workbook()
+        for sheet in self._fill_sheets(wb):
+            yield sheet
+        wb.close()
+
+    def _fill_sheets(self, wb):
+        """ Fill self.spreadsheet_info from the streamed rows of an opened read only (or CSV) workbook
+
+        :param wb: (obj) read only workbook or CSVWorkbook
+        :return: (generator) see iter_xlsx_sheets(). Raise IOIGeneratedError on error
+        """
+        for resource_sheet_name in self.resource_sheets:
+            resource_dict = self.spreadsheet_info['Resources'].setdefault(resource_sheet_name, {})
+            for my_row in self._iter_resource_rows(wb, resource_sheet_name):
+                resource_dict.setdefault(','.join(my_row["Groups"]), []).append(my_row)
+            yield 'Resources', resource_sheet_name
+        if self.lookup_sheet is not None:
+            lookup_index = self.spreadsheet_info['Lookups']
+            for lookup_field_name, my_row in self._iter_lookup_rows(wb):
+                lookup_index.add_row(lookup_field_name, my_row)
+            lookup_index.finalize()
+            if len(lookup_index) == 0:
+                raise IOIGeneratedError('[W202] No Lookup Lookups Processed (tab: {})'.format(self.lookup_sheet))
+            yield 'Lookups', self.lookup_sheet
+
+    def cached_sheets(self):
+        """ Sheets in the order iter_xlsx_sheets() yields them. Used when spreadsheet_info came from the cache
+
+        :return: (list) of tuples ('Resources', sheet tab name) or ('Lookups', lookup sheet tab name)
+        """
+        sheets = [('Resources', resource_sheet_name) for resource_sheet_name in self.resource_sheets]
+        if self.lookup_sheet is not None:
+            sheets.append(('Lookups', self.lookup_sheet))
+        return sheets
+
+    @staticmethod
+    def _iter_sheet_rows(ws):
+        """ Read worksheet one row at a time. 1st row holds column headers
+
+        :param ws: (obj) worksheet object (or CSVSheet)
+        :return: (generator) of tuples (list of cell values, row dict keyed by column header).
+        .. Raise IOIGeneratedError on CSV error
+        """
+        try:
+            rows = ws.iter_rows(values_only=True)
+            try:
+                header_row = next(rows)
+            except StopIteration:
+                return
+            header_cols = [value for value in header_row if value is not None]
+            for row in rows:
+                row_values = list(row)
+                row_values += [None] * (len(header_cols) - len(row_values))
+                yield row_values, dict(zip(header_cols, row_values))
+        except (OSError, csv.Error) as e:  # CSVSheet only (xlsx sheets are read by openpyxl)
+            raise IOIGeneratedError("[IOI-16] Cannot read CSV sheet '{}': {}".format(ws.title, e))
 
     def _create_lookup_dict(self, ws):
-        """ Populate xlsx lookup rows into internal dictionary (self.spreadsheet_info['Lookups'])
+        """ Populate xlsx lookup rows into internal lookup index (self.spreadsheet_info['Lookups'])
 
         :param ws: (obj) lookup xlsx worksheet object
         :return: void. Raise IOIGeneratedError on error
         """
-        # Each key in lookup_fiels a field name, the value is a list of lookup values
+        # Each lookup field in the index holds a list of lookup values
         # .. (Example 'PropertySubType Lookups - see: http://ddwiki.reso.org/display/DDW/PropertySubType+Lookups)
-        lookup_fields = {}
+        lookup_index = self.spreadsheet_info['Lookups']
 
         header_cols = [ws.cell(row=1, column=idx).value for idx in range(1, ws.max_column+1)
                        if ws.cell(row=1, column=idx).value is not None]
 
+        self.progress.start("Reading '{}'".format(ws.title), total=ws.max_row - 1)
         for row in range(2, ws.max_row + 1):
-            # Each entry in lookup_field is a lookup field. Value is a list of lookup values
-            lookup_fields = self.fillin_lookupfield_byrow(ws, lookup_fields, header_cols, row)
-
-        # Loop through every lookup field and create entry in top_index {}
-        for fld in lookup_fields:
-            if fld is not None:
-                # Each key in dict self.spreadsheet_info['Lookups'] is a single letter'
-                # .. The value is a list of lookup field names. This mimics DD Wiki
-                # .. (Example 'A' - see: http://ddwiki.reso.org/display/DDW/A+-+Lookup+Fields)
-                self.spreadsheet_info['Lookups'].setdefault(fld[0], []).append([fld, lookup_fields[fld]])
+            self.fillin_lookupfield_byrow(ws, lookup_index, header_cols, row)
+            self.progress.advance()
+        # Compute sort order and alpha letter groups once. Letters mimic DD Wiki
+        # .. (Example 'A' - see: http://ddwiki.reso.org/display/DDW/A+-+Lookup+Fields)
+        lookup_index.finalize()
 
-    def fillin_lookupfield_byrow(self, ws, lookup_fields, header_cols, row):
-        """ Read row from spreadsheet and translate to internal dictionary object
+    def fillin_lookupfield_byrow(self, ws, lookup_index, header_cols, row):
+        """ Read row from spreadsheet and add it to the lookup index
 
         :param ws: (obj) Worksheet object
-        :param lookup_fields: (dict) Partial Container for all lookup fields and values
+        :param lookup_index: (LookupIndex) Partial Container for all lookup fields and values
         :param header_cols: (list) All header columns
         :param row: (int) Row being submitted
-        :return: (dict) Container for all lookup fields and values. Raise IOIGeneratedError on error.
+        :return: (LookupIndex) Container for all lookup fields and values. Raise IOIGeneratedError on error.
         """
         my_row = {}
         for col_num, col_val in enumerate(header_cols):
             my_row[col_val] = ws.cell(row=row, column=col_num+1).value
         try:
-            lookup_fields.setdefault(my_row['LookupField'], []).append(my_row)
+            lookup_field_name = my_row['LookupField']
         except KeyError:
             raise IOIGeneratedError("[IOI-10] Cannot find field 'LookupField' in spreadsheet")
-        return lookup_fields
+        if lookup_field_name is not None:  # Blank rows
+            lookup_index.add_row(lookup_field_name, my_row)
+        return lookup_index
 
     def _create_resource_dict(self, sheet_tab_name, ws):
         """ Populate xlsx resource/collection rows into internal dictionary (self.spreadsheet_info['Resources'])
@@ -198,7 +490,9 @@ class ResoXLSXtoDict:
         header_cols = [ws.cell(row=1, column=idx).value for idx in range(1, ws.max_column+1)
                        if ws.cell(row=1, column=idx).value is not None]
 
+        self.progress.start("Reading '{}'".format(ws.title), total=ws.max_row - 1)
         for row in range(2, ws.max_row + 1):
+            self.progress.advance()
             my_row = {}
             if ws.cell(row=row, column=1).value is not None and len(ws.cell(row=row, column=1).value) > 0:
                 for col_num, col_val in enumerate(header_cols):
@@ -216,16 +510,302 @@ class ResoXLSXtoDict:
         my_row['Groups'] = [y for y in [x.strip() for x in my_row['Groups'].split(',')] if y]
 
 
+def diff_workbooks(faf, old_xlsx_filepath, new_xlsx_filepath):
+    """ Compare rows of two xlsx revisions (sheets as in config.ini). Rows are streamed (read only mode)
+
+    :param faf: (obj) object containing file locations
+    :param old_xlsx_filepath: (str) Full path for old xlsx file
+    :param new_xlsx_filepath: (str) Full path for new xlsx file
+    :return: (WorkbookDiff) changes. Raise IOIGeneratedError on error
+    """
+    old_reader = ResoXLSXtoDict(config_file_path=faf.config_file, xlsx_filepath=old_xlsx_filepath)
+    new_reader = ResoXLSXtoDict(config_file_path=faf.config_file, xlsx_filepath=new_xlsx_filepath)
+    return WorkbookDiff(old_reader.iter_xlsx_rows(), new_reader.iter_xlsx_rows(),
+                        old_name=os.path.basename(old_xlsx_filepath), new_name=os.path.basename(new_xlsx_filepath))
+
+
+def export_xml_to_xlsx(faf, xml_filepath, xlsx_filepath, progress=None):
+    """ Rebuild an input workbook from an IOI import xml or DD Wiki exported xml (reverse export). Sheets and
+    .. columns follow config.ini and DDWikiImportConfig.xml
+
+    :param faf: (obj) object containing file locations
+    :param xml_filepath: (str) Full path for IOI import / DD Wiki exported xml file
+    :param xlsx_filepath: (str) .xlsx file written
+    :param progress: (ProgressReporter) Report pages written (None: no report)
+    :return: (dict) sheet tab name: rows written. Raise IOIGeneratedError, DXMLGeneratedError or
+    .. XLSXExportGeneratedError on error
+    """
+    config_reader = ResoXLSXtoDict(config_file_path=faf.config_file, xlsx_filepath=xlsx_filepath)
+    return XMLToXLSX(faf, config_reader.config, progress=progress).convert(xml_filepath, xlsx_filepath)
+
+
+def validate_xml_file(faf, xml_filepath):
+    """ Check an existing IOI import xml against the Forms of DDWikiImportConfig.xml. The file is streamed
+    .. (iterparse), one page in memory at a time
+
+    :param faf: (obj) object containing file locations
+    :param xml_filepath: (str) Full path for IOI import xml file
+    :return: (int) violations found. Raise DXMLGeneratedError or OutputCheckGeneratedError on error
+    """
+    config_xml_filepath = os.path.join(faf.config_folder, DictToXML.CONFIG_XML_FILENAME)
+    validator = OutputValidator(cached_rules(config_xml_filepath, lambda: DictToXML.output_rules(
+        DictToXML._read_xml_config_file(faf))))
+    validator.check_file(xml_filepath)
+    return validator.report()
+
+
+def open_export_index(faf, index_filepath, ddwiki_exported_filepath):
+    """ Open the export index, (re)indexing the DD Wiki export if it changed since indexed
+
+    :param faf: (obj) object containing file locations
+    :param index_filepath: (str) SQLite index file
+    :param ddwiki_exported_filepath: (str) File name/path for latest dd wiki xml exported file
+    :return: (ExportIndex). Raise IOIGeneratedError, DXMLGeneratedError or ExportIndexGeneratedError on error
+    """
+    config_reader = ResoXLSXtoDict(config_file_path=faf.config_file, xlsx_filepath=None)
+    resource_titles = {title: name for name, title in config_reader.config['PageLinks'].items()} \
+        if 'PageLinks' in config_reader.config else {}
+    xml_config_data = DictToXML._read_xml_config_file(faf)  # Page titles of resources and lookup fields
+    export_index = ExportIndex(index_filepath, resource_titles=resource_titles,
+                               resource_title_template=xml_config_data['Resource']['Attributes']['Page_Title'],
+                               lookup_field_title_template=xml_config_data['LookupIndexField']['Attributes']
+                               ['Page_Title'])
+    try:
+        export_index.update(ddwiki_exported_filepath)
+    except ExportIndexGeneratedError:
+        export_index.close()
+        raise
+    return export_index
+
+
+def format_index_entry(entry):
+    """ Text line of an export index entry
+
+    :param entry: (dict) ExportIndex.query() entry
+    :return: (str)
+    """
+    text = "{:<12} {}".format(entry['kind'], entry['name'])
+    if entry['scope']:
+        text += " ({} '{}')".format('lookup field' if entry['kind'] == ExportIndex.LOOKUP_VALUE else 'resource',
+                                    entry['scope'])
+    if entry['kind'] == ExportIndex.FIELD and entry['id'] is not None:
+        text += " RecordID {}".format(entry['id'])
+    elif entry['kind'] == ExportIndex.LOOKUP_VALUE and entry['id'] is not None:
+        text += " LookupID {}".format(entry['id'])
+    if entry['lookup_field_id'] is not None:
+        text += " LookupFieldID {}".format(entry['lookup_field_id'])
+    if entry['page_title'] is not None and entry['page_title'] != entry['name']:
+        text += " page '{}'".format(entry['page_title'])
+    return text
+
+
+def watch_and_convert(args, faf, input_xlsx_filepath, max_id_filepath, ddwiki_exported_filepath, cache_folder,
+                      build_targets, id_ledger=None, progress=None, run_log=None):
+    """ Convert xlsx to IOI xml, then again every time an input file changes (--watch). Stop with Ctrl-C.
+    .. The parsed xlsx is reused while the xlsx and config.ini are unchanged. Config xml, max ids and DD Wiki export
+    .. are reused while unchanged (InputCache). A failed conversion is logged and the next change is awaited
+
+    :param args: (obj) parsed command line arguments
+    :param faf: (obj) object containing file locations
+    :param input_xlsx_filepath: (str) Full path for input xlsx file
+    :param max_id_filepath: (str) Full path for max id file
+    :param ddwiki_exported_filepath: (str) Full path for DD Wiki exported xml file
+    :param cache_folder: (str) Workbook cache folder (None: no cache)
+    :param build_targets: (BuildTargets) pages to output
+    :param id_ledger: (IDLedger) shared id ledger (None: ids from max id file only)
+    :param progress: (ProgressReporter) Report progress of each conversion (None: no report)
+    :param run_log: (RunLog) message code summary logged and counts restarted after each conversion (None: at exit)
+    :return: None
+    """
+    logger = logging.getLogger(__project__)
+    pinned_datetime = pinned_clock(args)
+    input_filepaths = [input_xlsx_filepath]
+    if os.path.isdir(input_xlsx_filepath):  # CSV sheet files. A changed file leaves the folder time unchanged
+        csv_workbook = CSVWorkbook(input_xlsx_filepath)
+        input_filepaths += csv_workbook.source_files()
+        csv_workbook.close()
+    watcher = InputWatcher(input_filepaths + [faf.config_file,
+                                              os.path.join(faf.config_folder, DictToXML.CONFIG_XML_FILENAME),
+                                              ddwiki_exported_filepath, max_id_filepath],
+                           poll_seconds=args.watch_interval)
+    input_cache = InputCache()
+    xlsx_to_dict = None
+    converted_signatures = None
+    logger.info("Watching input files. Press Ctrl-C to stop")
+    try:
+        while True:
+            signatures = watcher.wait_for_change(converted_signatures)
+            changed_files = watcher.changed_files(converted_signatures, signatures)
+            start_time = time.time()
+            try:
+                if xlsx_to_dict is None or any(filepath in changed_files
+                                               for filepath in input_filepaths + [faf.config_file]):
+                    xlsx_to_dict = None  # Read again below. Stays None if reading fails
+                    new_xlsx_to_dict = ResoXLSXtoDict(config_file_path=faf.config_file,
+                                                      xlsx_filepath=input_xlsx_filepath, cache_folder=cache_folder,
+                                                      progress=progress)
+                    new_xlsx_to_dict.read_xlsx_file()
+                    xlsx_to_dict = new_xlsx_to_dict
+                DictToXML(files_and_folders=faf, result_xml_filepath=faf.xml_filepath,
+                          max_id_filepath=max_id_filepath, ddwiki_exported_filepath=ddwiki_exported_filepath,
+                          spreadsheet_dict=xlsx_to_dict.spreadsheet_info,
+                          xlsx_date=args.xlsx_date if args.xlsx_date is not None else
+                          pinned_datetime if pinned_datetime is not None else datetime.datetime.now(),
+                          program_config_data=xlsx_to_dict.config,
+                          shard_by=args.shard_by, shard_max_pages=args.shard_max_pages,
+                          shard_max_bytes=args.shard_max_kb * 1024 if args.shard_max_kb else None,
+                          delta_only=args.delta, build_targets=build_targets, input_cache=input_cache,
+                          id_ledger=id_ledger, near_dup_threshold=args.near_dup_threshold, progress=progress,
+                          page_formats=args.page_output, validate_output=not args.no_validate,
+                          pinned_datetime=pinned_datetime, id_block_size=args.id_block_size)
+                logger.info("Converted in {:.2f} seconds. Watching for changes".format(time.time() - start_time))
+            except (IOIGeneratedError, DXMLGeneratedError, ShardGeneratedError, LedgerGeneratedError) as e:
+                logger.error("Conversion failed: " + e.value)
+            except Exception as e:  # i.e. xlsx read while being saved. Keep watching
+                logger.error("Conversion failed: {}".format(e))
+            if run_log is not None:
+                run_log.end_conversion()  # Messages of the next conversion are shown again (--log_examples)
+            converted_signatures = signatures
+    except KeyboardInterrupt:
+        logger.info("Watch stopped")
+
+
+# Conversions of a matrix run: (config sub folder, files and folders, ResoXLSXtoDict, result xml filepath).
+# .. Set before worker processes are forked so workers share the parsed xlsx without pickling it
+_matrix_jobs = []
+
+
+def _convert_matrix_job(job_index, dicttoxml_args, id_ledger_filepath=None):
+    """ Convert xlsx to IOI xml for one configuration of a matrix run. Runs in a worker process or in process
+
+    :param job_index: (int) index in _matrix_jobs
+    :param dicttoxml_args: (dict) DictToXML arguments shared by all configurations
+    :param id_ledger_filepath: (str) ID ledger file opened by this job (None: no ledger)
+    :return: (str) error message or None on success
+    """
+    config_sub_folder, faf, xlsx_to_dict, result_xml_filepath = _matrix_jobs[job_index]
+    id_ledger = None
+    try:
+        if id_ledger_filepath is not None:
+            id_ledger = IDLedger(id_ledger_filepath)  # SQLite connections are not shared with forked processes
+        # Each configuration reads the max id file itself. IDs are allocated independently
+        DictToXML(files_and_folders=faf, result_xml_filepath=result_xml_filepath,
+                  spreadsheet_dict=xlsx_to_dict.spreadsheet_info, program_config_data=xlsx_to_dict.config,
+                  id_ledger=id_ledger, **dicttoxml_args)
+    except (DXMLGeneratedError, ShardGeneratedError, LedgerGeneratedError) as e:
+        return e.value
+    finally:
+        if id_ledger is not None:
+            id_ledger.close()
+    return None
+
+
+def _matrix_worker(job_index, dicttoxml_args, id_ledger_filepath, results):
+    """ Forked worker process of a matrix run. Always puts (job_index, error message or None) on results
+
+    :param job_index: (int) index in _matrix_jobs
+    :param dicttoxml_args: (dict) DictToXML arguments shared by all configurations
+    :param id_ledger_filepath: (str) ID ledger file (None: no ledger)
+    :param results: (SimpleQueue) queue read by parent process
+    :return: None
+    """
+    try:
+        error = _convert_matrix_job(job_index, dicttoxml_args, id_ledger_filepath)
+    except Exception as e:
+        error = "{}: {}".format(e.__class__.__name__, e)
+    results.put((job_index, error))
+
+
+def _run_matrix_jobs_forked(dicttoxml_args, id_ledger_filepath, workers):
+    """ Run _matrix_jobs in up to workers forked processes. Process targets are not pickled: workers must not
+    .. import applic modules (the applic package runs main() at import time and holds the import lock)
+
+    :param dicttoxml_args: (dict) DictToXML arguments shared by all configurations
+    :param id_ledger_filepath: (str) ID ledger file (None: no ledger)
+    :param workers: (int) max processes running at once
+    :return: (list) error message or None per job
+    """
+    context = multiprocessing.get_context('fork')
+    results = context.SimpleQueue()
+    errors = [None] * len(_matrix_jobs)
+    pending = list(range(len(_matrix_jobs)))
+    running = {}  # job index: process
+    while len(pending) > 0 or len(running) > 0:
+        while len(pending) > 0 and len(running) < workers:
+            job_index = pending.pop(0)
+            running[job_index] = context.Process(target=_matrix_worker,
+                                                 args=(job_index, dicttoxml_args, id_ledger_filepath, results))
+            running[job_index].start()
+        job_index, errors[job_index] = results.get()
+        running.pop(job_index).join()
+    return errors
+
+
+def convert_config_matrix(args, home_folder, input_xlsx_filepath, result_xml_filepath, cache_folder, dicttoxml_args,
+                          id_ledger_filepath=None):
+    """ Convert xlsx to IOI xml once per config sub folder (-c a b ..). The xlsx is parsed once. Configurations
+    .. with the same [ResourceSheets]/[LookupSheets] share the parsed data. Conversions run in parallel worker
+    .. processes where processes can be forked, otherwise one after the other
+
+    :param args: (obj) parsed command line arguments
+    :param home_folder: (str) home folder (files/config/<sub folder> holds each configuration)
+    :param input_xlsx_filepath: (str) Full path for input xlsx file
+    :param result_xml_filepath: (str) Output file name. '_<config sub folder>' is added before the extension
+    :param cache_folder: (str) Workbook cache folder (None: no cache)
+    :param dicttoxml_args: (dict) DictToXML arguments shared by all configurations
+    :param id_ledger_filepath: (str) ID ledger file opened by each conversion (None: no ledger)
+    :return: (bool) True if every conversion succeeded
+    """
+    logger = logging.getLogger(__project__)
+    parsed_readers = {}  # sheet mapping: ResoXLSXtoDict holding parsed xlsx
+    workbook = None
+    del _matrix_jobs[:]
+    base, ext, comp_ext = split_ext(result_xml_filepath)
+    for config_sub_folder in args.config_sub_folder:
+        faf = FilesAndFolders(home_folder, config_sub_folder)
+        try:
+            xlsx_to_dict = ResoXLSXtoDict(config_file_path=faf.config_file, xlsx_filepath=input_xlsx_filepath,
+                                          cache_folder=cache_folder, progress=dicttoxml_args.get('progress'))
+            sheet_mapping = tuple(xlsx_to_dict._sheet_mapping())
+            if sheet_mapping in parsed_readers:
+                xlsx_to_dict.spreadsheet_info = parsed_readers[sheet_mapping].spreadsheet_info
+            else:
+                if not xlsx_to_dict.load_cached():
+                    if workbook is None:
+                        workbook = xlsx_to_dict.open_workbook()  # Parsed once for all configurations
+                    xlsx_to_dict._read_xlsx_workbook(workbook)
+                    xlsx_to_dict.save_cached()
+                parsed_readers[sheet_mapping] = xlsx_to_dict
+        except IOIGeneratedError as e:
+            logger.error("Error reading .xlsx file for config '{}': {}".format(config_sub_folder, e.value))
+            return False
+        _matrix_jobs.append((config_sub_folder, faf, xlsx_to_dict, base + '_' + config_sub_folder + ext + comp_ext))
+    workers = min(len(_matrix_jobs), args.matrix_workers or os.cpu_count() or 1)
+    if workers > 1 and 'fork' in multiprocessing.get_all_start_methods():
+        logger.info("Converting {} configurations with {} worker processes".format(len(_matrix_jobs), workers))
+        errors = _run_matrix_jobs_forked(dicttoxml_args, id_ledger_filepath, workers)
+    else:
+        errors = [_convert_matrix_job(job_index, dicttoxml_args, id_ledger_filepath)
+                  for job_index in range(len(_matrix_jobs))]
+    for (config_sub_folder, faf, xlsx_to_dict, job_xml_filepath), error in zip(_matrix_jobs, errors):
+        if error is None:
+            logger.info("Config '{}': Resultant Output IOI XML File: {}".format(config_sub_folder, job_xml_filepath))
+        else:
+            logger.error("Config '{}': Error creating XML File: {}".format(config_sub_folder, error))
+    return all(error is None for error in errors)
+
+
 def main(argv):
     # https://docs.python.org/3.3/library/argparse.html
     # https://docs.python.org/3/howto/argparse.html
     parser = argparse.ArgumentParser(description='RESO xlsx to xml Import')
     parser.add_argument('-f', '--home_folder', default=None,
                         help="Default folder for config, ini and error log files <current folder>")
-    parser.add_argument('-c', '--config_sub_folder', default='current',
-                        help="Sub Folder in files/config containg ini files <current>")
+    parser.add_argument('-c', '--config_sub_folder', nargs='+', default=['current'],
+                        help="Sub Folder in files/config containg ini files <current>. Several sub folders create "
+                             "one output per config (<xlsx name>_<sub folder>.xml)")
     parser.add_argument('-x', '--xlsx_filename', default=None,
-                        help="Input .xlsx file containing new fields and lookups")
+                        help="Input .xlsx file (or folder/.zip of CSV/TSV sheet files) with new fields and lookups")
     parser.add_argument('-i', '--max_id_filename', default='stat_warning_log.txt',
                         help="Input file containing DD Wiki max record and lookup ids <stat_warning_log.txt>")
     parser.add_argument('-w', '--ddwiki_exported_xml_filename', default=None,
@@ -235,14 +815,123 @@ def main(argv):
                         help="Noted create date for input spreadsheet (YYYY-MM-DD)")
     parser.add_argument('-e', '--error_logging', type=int, default=20,
                         help="Error Logging Level (0-None, 10-Debug, 20-Info, 30-Warn, 40-Err, 50-Critical <20>")
+    parser.add_argument('-s', '--shard_by', choices=XMLShardWriter.SHARD_MODES, default=None,
+                        help="Split output into IOI import shards per resource, lookup letter or size <none>")
+    parser.add_argument('--shard_max_pages', type=int, default=None,
+                        help="Max pages per output shard (used with --shard_by)")
+    parser.add_argument('--shard_max_kb', type=int, default=None,
+                        help="Max size in KB per output shard (used with --shard_by)")
+    parser.add_argument('-z', '--compress', choices=sorted(COMPRESSION_EXTENSIONS.keys()), default=None,
+                        help="Compress Resultant/Output xml file(s) using gzip, xz or zstd <none>")
+    parser.add_argument('--delta', action='store_true',
+                        help="Output only pages that are new or changed compared to the exported xml (-w)")
+    parser.add_argument('--low_memory', action='store_true',
+                        help="Stream xlsx rows through a disk backed sort and write the xml page by page")
+    parser.add_argument('--memory_budget_mb', type=int, default=256,
+                        help="Max MB of xlsx rows held in memory with --low_memory (default: 256)")
+    parser.add_argument('--no_cache', action='store_true',
+                        help="Always parse the xlsx file. Do not read or write the workbook cache (files/cache)")
+    parser.add_argument('--pipelined', action='store_true',
+                        help="Overlap xlsx reading, xml building and xml writing on separate threads")
+    parser.add_argument('--build_resource', action='append', default=None,
+                        help="Output only this resource/collection (name or xlsx tab). May be repeated")
+    parser.add_argument('--build_group', action='append', default=None,
+                        help="Output only this group, i.e. 'Property,Listing' (as xlsx Groups column). May be repeated")
+    parser.add_argument('--build_lookup_field', action='append', default=None,
+                        help="Output only this lookup field and its values. May be repeated")
+    parser.add_argument('--build_letter', action='append', default=None,
+                        help="Output only lookup fields starting with this letter. May be repeated")
+    parser.add_argument('--watch', action='store_true',
+                        help="Stay running and reconvert when the xlsx, config or exported xml/max id files change")
+    parser.add_argument('--watch_interval', type=float, default=0.5,
+                        help="Seconds between checks for changed files with --watch (default: 0.5)")
+    parser.add_argument('--matrix_workers', type=int, default=None,
+                        help="Max worker processes when several config sub folders are given <cpu count>")
+    parser.add_argument('--diff', default=None, metavar='OLD_XLSX_FILENAME',
+                        help="Report rows added/removed/modified since this older .xlsx (in files/input) instead of "
+                             "converting")
+    parser.add_argument('--diff_format', choices=['text', 'json'], default='text',
+                        help="Report format of --diff <text>")
+    parser.add_argument('--build_changed_since', default=None, metavar='OLD_XLSX_FILENAME',
+                        help="Output only resources and lookup fields with rows changed since this older .xlsx")
+    parser.add_argument('--log_examples', type=int, default=5,
+                        help="Messages logged per message code (i.e. [DXM-41]) before they are only counted. "
+                             "Counts are summarized at the end (default: 5, 0: log all)")
+    parser.add_argument('--to_xlsx', default=None, metavar='XML_FILENAME',
+                        help="Instead of converting, rebuild an input .xlsx (<xml name>.xlsx) from this IOI import or "
+                             "DD Wiki exported xml (in files/input or a path)")
+    parser.add_argument('--no_validate', action='store_true',
+                        help="Do not check the written pages against the Forms of DDWikiImportConfig.xml")
+    parser.add_argument('--validate', default=None, metavar='XML_FILENAME',
+                        help="Instead of converting, check this IOI import xml (in files/input or a path) against the "
+                             "Forms of DDWikiImportConfig.xml")
+    parser.add_argument('--inspect', default=None, metavar='NAME_OR_ID',
+                        help="Instead of converting, list fields, lookup fields, lookup values and pages of the DD "
+                             "Wiki export (-w) with this name or ID")
+    parser.add_argument('--inspect_match', choices=ExportIndex.MATCH_MODES, default=ExportIndex.EXACT,
+                        help="Names matched by --inspect: whole name, name start or part of name <exact>")
+    parser.add_argument('--inspect_max_ids', action='store_true',
+                        help="Instead of converting, list max RecordID per resource and max LookupID per lookup field "
+                             "of the DD Wiki export in the max id file (-i) layout")
+    parser.add_argument('--inspect_format', choices=['text', 'json'], default='text',
+                        help="Output format of --inspect <text>")
+    parser.add_argument('--reproducible', nargs='?', const=True, default=None, type=valid_clock, metavar='CLOCK',
+                        help="Identical inputs give byte identical output: one pinned clock (YYYY-MM-DD or "
+                             "YYYY-MM-DDTHH:MM, default: -d date) for XMLCreateDate, ModificationTimestamp and '*' "
+                             "default dates")
+    parser.add_argument('--page_output', nargs='+', choices=PageSinkSet.FORMATS, default=None,
+                        help="Also write the pages as <xml name>.ndjson (one page per line), <xml name>.json and/or "
+                             "a CSV page manifest <xml name>_pages.csv while the xml is written <none>")
+    parser.add_argument('--progress', choices=ProgressReporter.MODES, default=ProgressReporter.TEXT,
+                        help="Report rows/pages/values/bytes processed with rate and ETA: logged (text), JSON lines "
+                             "on stdout (json) or none (off) <text>")
+    parser.add_argument('--progress_interval', type=float, default=2.0,
+                        help="Min seconds between progress reports (default: 2.0)")
+    parser.add_argument('--near_dup_threshold', type=float, default=None,
+                        help="Warn when a new field/lookup value name is this similar (0-1, i.e. 0.85) to an existing "
+                             "name <no check>")
+    parser.add_argument('--id_ledger', nargs='?', const='', default=None,
+                        help="Reserve computed RecordIDs/LookupIDs from a shared SQLite ID ledger file "
+                             "<files/ledger/id_ledger.sqlite>")
+    parser.add_argument('--id_block_size', type=int, default=IDBlockAllocator.ALIGNMENT,
+                        help="RecordIDs/LookupIDs in a new ID block, a multiple of 1000. A resource or lookup field "
+                             "with a full block continues in an extension block <1000>")
     args = parser.parse_args()
+    if args.near_dup_threshold is not None and not 0 < args.near_dup_threshold <= 1:
+        parser.error("--near_dup_threshold must be greater than 0 and at most 1")
+    if args.shard_by is None and (args.shard_max_pages is not None or args.shard_max_kb is not None):
+        parser.error("--shard_max_pages and --shard_max_kb require --shard_by")
+    if (args.shard_max_pages is not None and args.shard_max_pages <= 0) or \
+            (args.shard_max_kb is not None and args.shard_max_kb <= 0):
+        parser.error("--shard_max_pages and --shard_max_kb must be greater than 0")
+    if args.shard_by == XMLShardWriter.SHARD_BY_SIZE and args.shard_max_pages is None and args.shard_max_kb is None:
+        parser.error("--shard_by size requires --shard_max_pages or --shard_max_kb")
+    if args.id_block_size <= 0 or args.id_block_size % IDBlockAllocator.ALIGNMENT != 0:
+        parser.error("--id_block_size must be a positive multiple of {}".format(IDBlockAllocator.ALIGNMENT))
+    if args.reproducible is True and args.xlsx_date is None:
+        parser.error("--reproducible requires a clock value or -d (--xlsx_date)")
+    if args.low_memory and (args.shard_by is not None or args.delta):
+        parser.error("--low_memory cannot be used with --shard_by or --delta")
+    if args.pipelined and (args.shard_by is not None or args.delta or args.low_memory):
+        parser.error("--pipelined cannot be used with --shard_by, --delta or --low_memory")
+    build_targets = BuildTargets(resources=args.build_resource, groups=args.build_group,
+                                 lookup_fields=args.build_lookup_field, letters=args.build_letter)
+    if args.build_changed_since is not None and not build_targets.is_empty():
+        parser.error("--build_changed_since cannot be used with --build_* options")
+    if (args.build_changed_since is not None or not build_targets.is_empty()) and (args.low_memory or args.pipelined):
+        parser.error("--build_* options and --build_changed_since cannot be used with --low_memory or --pipelined")
+    if args.watch and (args.low_memory or args.pipelined):
+        parser.error("--watch cannot be used with --low_memory or --pipelined")
+    if len(args.config_sub_folder) > 1 and (args.watch or args.low_memory or args.pipelined):
+        parser.error("Several config sub folders (-c) cannot be used with --watch, --low_memory or --pipelined")
 
-    faf = FilesAndFolders(args.home_folder, args.config_sub_folder) if args.home_folder else \
-        FilesAndFolders(os.getcwd(), args.config_sub_folder)
+    home_folder = args.home_folder if args.home_folder else os.getcwd()
+    faf = FilesAndFolders(home_folder, args.config_sub_folder[0])
 
     # xlsx create date (in xml root node) - Enter manually based on DD Spreadsheet
+    pinned_datetime = pinned_clock(args)
     if args.xlsx_date is None:
-        xlsx_date = datetime.datetime.now()
+        xlsx_date = pinned_datetime if pinned_datetime is not None else datetime.datetime.now()
     else:
         xlsx_date = args.xlsx_date
     logger = logging.getLogger(__project__)
@@ -253,47 +942,207 @@ def main(argv):
     stream_file = logging.FileHandler(os.path.join(faf.log_folder, "logging " +
                                                    datetime.datetime.today().strftime('%Y-%m-%d') + '.txt'), mode='w')
     stream_file.setFormatter(formatter)
-    logger.addHandler(stream_display)
-    logger.addHandler(stream_file)
+    # Console/file writes happen on a listener thread. Message code summary is logged when the program exits
+    run_log = RunLog(logger, [stream_display, stream_file], max_examples=args.log_examples)
+    atexit.register(run_log.close)
+    progress = ProgressReporter(args.progress, args.progress_interval)
+    atexit.register(progress.finish)  # atexit runs last registered first: reported before the log is closed
     logger.info("Starting IOI xlsx-to-xml. Program verson:{0}".format(__version_date__))
 
-    input_xlsx_filepath = os.path.join(faf.input_folder, args.xlsx_filename)
+    if args.to_xlsx is not None:
+        xml_filepath = os.path.join(faf.input_folder, args.to_xlsx)
+        if not os.path.exists(xml_filepath) and os.path.exists(args.to_xlsx):
+            xml_filepath = args.to_xlsx
+        xlsx_filepath = split_ext(os.path.basename(xml_filepath))[0] + '.xlsx'
+        logger.info("Reverse export of xml file:'{}' to xlsx file: {}".format(xml_filepath, xlsx_filepath))
+        try:
+            export_xml_to_xlsx(faf, xml_filepath, xlsx_filepath, progress)
+        except (IOIGeneratedError, DXMLGeneratedError, XLSXExportGeneratedError) as e:
+            logger.error("Error in reverse export: " + e.value)
+            sys.exit(-1)
+        logger.info('** Program Ends in Success **')
+        return
+    if args.validate is not None:
+        xml_filepath = os.path.join(faf.input_folder, args.validate)
+        if not os.path.exists(xml_filepath) and os.path.exists(args.validate):
+            xml_filepath = args.validate
+        logger.info("Checking xml file:'{}' against {}".format(xml_filepath, DictToXML.CONFIG_XML_FILENAME))
+        try:
+            violation_count = validate_xml_file(faf, xml_filepath)
+        except (DXMLGeneratedError, OutputCheckGeneratedError) as e:
+            logger.error("Error checking xml file: " + e.value)
+            sys.exit(-1)
+        if violation_count > 0:
+            logger.error("Output check failed: {} violations in {}".format(violation_count, xml_filepath))
+            sys.exit(-1)
+        logger.info('** Program Ends in Success **')
+        return
+    if args.inspect is not None or args.inspect_max_ids:
+        ddwiki_exported_filepath = os.path.join(faf.input_folder, args.ddwiki_exported_xml_filename)
+        index_filepath = ExportIndex.index_filepath(faf.input_folder, args.config_sub_folder[0])
+        try:
+            export_index = open_export_index(faf, index_filepath, ddwiki_exported_filepath)
+            try:
+                if args.inspect_max_ids:
+                    print(export_index.max_id_report(), end='')
+                if args.inspect is not None:
+                    start_time = time.monotonic()
+                    entries = export_index.query(args.inspect, args.inspect_match)
+                    if args.inspect_format == 'json':
+                        print(json.dumps(entries, indent=2, ensure_ascii=False))
+                    else:
+                        for entry in entries:
+                            print(format_index_entry(entry))
+                    logger.info("{} entries match '{}' ({}) in {:.1f} ms".format(
+                        len(entries), args.inspect, args.inspect_match, (time.monotonic() - start_time) * 1000))
+            finally:
+                export_index.close()
+        except (IOIGeneratedError, DXMLGeneratedError, ExportIndexGeneratedError) as e:
+            logger.error("Error inspecting DD Wiki export: " + e.value)
+            sys.exit(-1)
+        logger.info('** Program Ends in Success **')
+        return
+    input_xlsx_filepath = os.path.normpath(os.path.join(faf.input_folder, args.xlsx_filename))  # Folder: no '/'
     # max_id_filename - file created by RESOExporter. Contains max rec/lookup ids (i.e ddwiki_stat_log2017-05-12.txt)
     max_id_filepath = os.path.join(faf.input_folder, args.max_id_filename)
     ddwiki_exported_filepath = os.path.join(faf.input_folder, args.ddwiki_exported_xml_filename)
 
     # Read in csv files and convert to internal python dict {}
     logger.info("Importing file:'{}' with date:{}".format(args.xlsx_filename, xlsx_date.strftime('%m-%d-%Y %H:%M')))
-    logger.info("Base Folder for config files is: " + args.config_sub_folder)
+    logger.info("Base Folder for config files is: " + ', '.join(args.config_sub_folder))
     logger.info("Base Data File Input Folder is: input")
     logger.info("Input RESO Export XML file:{}".format(args.ddwiki_exported_xml_filename))
     logger.info("Input RESO Stat/Max ID File:{}".format(args.max_id_filename))
+    cache_folder = None if args.no_cache else os.path.join(os.path.dirname(faf.input_folder), 'cache')
     try:
         # Create object to convert xlsx into xml
+        # The pipelined xlsx reader runs on its own thread: its rows are not reported (one stage reported at a time)
         xlsx_to_dict = ResoXLSXtoDict(config_file_path=faf.config_file,
-                                      xlsx_filepath=input_xlsx_filepath)
+                                      xlsx_filepath=input_xlsx_filepath,
+                                      cache_folder=cache_folder, progress=None if args.pipelined else progress)
     except IOIGeneratedError as e:
         logger.error("? Error initiating ResoXLSXtoDict: " + e.value)
         sys.exit(-1)
     # result_xml_filename = os.path.basename(input_xlsx_filepath)
     faf.xml_filepath = os.path.splitext(os.path.basename(input_xlsx_filepath))[0] + '.xml'
+    if args.compress is not None:
+        faf.xml_filepath += COMPRESSION_EXTENSIONS[args.compress]
+    if args.diff is not None or args.build_changed_since is not None:
+        old_xlsx_filepath = os.path.join(faf.input_folder, args.diff if args.diff is not None else
+                                         args.build_changed_since)
+        try:
+            workbook_diff = diff_workbooks(faf, old_xlsx_filepath, input_xlsx_filepath)
+        except IOIGeneratedError as e:
+            logger.error("Error comparing .xlsx files: " + e.value)
+            sys.exit(-1)
+        logger.info("Workbook diff {} -> {}: {added} added, {removed} removed, {modified} modified, {unchanged} "
+                    "unchanged rows".format(workbook_diff.old_name, workbook_diff.new_name, **workbook_diff.summary()))
+        if args.diff is not None:
+            diff_filepath = os.path.splitext(os.path.basename(input_xlsx_filepath))[0] + '_diff.' + \
+                ('json' if args.diff_format == 'json' else 'txt')
+            with open(diff_filepath, 'w', encoding='utf-8') as diff_file:
+                diff_file.write(workbook_diff.to_json() if args.diff_format == 'json' else workbook_diff.to_text())
+            logger.info("Workbook Diff Report File: " + diff_filepath)
+            logger.info('** Program Ends in Success **')
+            return
+        build_targets = workbook_diff.changed_build_targets()
+        if build_targets.is_empty():
+            logger.info("No changed rows since {}. Nothing to build".format(workbook_diff.old_name))
+            logger.info('** Program Ends in Success **')
+            return
     logger.info("Resultant Output IOI XML File: " + faf.xml_filepath)
+    id_ledger_filepath = None
+    if args.id_ledger is not None:
+        id_ledger_filepath = args.id_ledger if args.id_ledger else \
+            os.path.join(os.path.dirname(faf.input_folder), 'ledger', 'id_ledger.sqlite')
+        logger.info("ID Ledger File: " + id_ledger_filepath)
 
+    if len(args.config_sub_folder) > 1:
+        if not convert_config_matrix(args, home_folder, input_xlsx_filepath, faf.xml_filepath, cache_folder,
+                                     dict(max_id_filepath=max_id_filepath,
+                                          ddwiki_exported_filepath=ddwiki_exported_filepath, xlsx_date=xlsx_date,
+                                          shard_by=args.shard_by, shard_max_pages=args.shard_max_pages,
+                                          shard_max_bytes=args.shard_max_kb * 1024 if args.shard_max_kb else None,
+                                          delta_only=args.delta, build_targets=build_targets,
+                                          near_dup_threshold=args.near_dup_threshold, progress=progress,
+                                          page_formats=args.page_output, validate_output=not args.no_validate,
+                                          pinned_datetime=pinned_datetime, id_block_size=args.id_block_size),
+                                     id_ledger_filepath):
+            sys.exit(-1)
+        logger.info('** Program Ends in Success **')
+        return
     try:
-        # Read xlsx into internal structure xlsx_to_dict.spreadsheet_info
-        xlsx_to_dict.read_xlsx_file()
-    except IOIGeneratedError as e:
-        logger.error("Error reading .xlsx file: " + e.value)
+        id_ledger = IDLedger(id_ledger_filepath) if id_ledger_filepath is not None else None
+    except LedgerGeneratedError as e:
+        logger.error("Error opening ID ledger: " + e.value)
         sys.exit(-1)
     try:
-        # Convert internal structure into IOI xml file
-        DictToXML(files_and_folders=faf, result_xml_filepath=faf.xml_filepath, max_id_filepath=max_id_filepath,
-                  ddwiki_exported_filepath=ddwiki_exported_filepath, spreadsheet_dict=xlsx_to_dict.spreadsheet_info,
-                  xlsx_date=xlsx_date, program_config_data=xlsx_to_dict.config)
-    except DXMLGeneratedError as e:
-        logger.error("Error creating XML File: " + e.value)
-        sys.exit(-1)
-    logger.info('** Program Ends in Success **')
+        if args.watch:
+            watch_and_convert(args, faf, input_xlsx_filepath, max_id_filepath, ddwiki_exported_filepath, cache_folder,
+                              build_targets, id_ledger, progress, run_log)
+            return
+
+        if args.low_memory:
+            try:
+                # Stream xlsx rows into IOI xml file without reading whole xlsx into memory
+                StreamingDictToXML(files_and_folders=faf, result_xml_filepath=faf.xml_filepath,
+                                   max_id_filepath=max_id_filepath, ddwiki_exported_filepath=ddwiki_exported_filepath,
+                                   xlsx_to_dict=xlsx_to_dict, xlsx_date=xlsx_date,
+                                   program_config_data=xlsx_to_dict.config,
+                                   memory_budget_bytes=args.memory_budget_mb * 1024 * 1024, id_ledger=id_ledger,
+                                   near_dup_threshold=args.near_dup_threshold, progress=progress,
+                                   page_formats=args.page_output, validate_output=not args.no_validate,
+                                   pinned_datetime=pinned_datetime, id_block_size=args.id_block_size)
+            except IOIGeneratedError as e:
+                logger.error("Error reading .xlsx file: " + e.value)
+                sys.exit(-1)
+            except (DXMLGeneratedError, LedgerGeneratedError) as e:
+                logger.error("Error creating XML File: " + e.value)
+                sys.exit(-1)
+            logger.info('** Program Ends in Success **')
+            return
+        if args.pipelined:
+            try:
+                # Read xlsx sheets on a thread while export/max ids are loaded. Each sheet is built once read
+                PipelinedDictToXML(files_and_folders=faf, result_xml_filepath=faf.xml_filepath,
+                                   max_id_filepath=max_id_filepath, ddwiki_exported_filepath=ddwiki_exported_filepath,
+                                   xlsx_to_dict=xlsx_to_dict, xlsx_date=xlsx_date,
+                                   program_config_data=xlsx_to_dict.config,
+                                   id_ledger=id_ledger, near_dup_threshold=args.near_dup_threshold, progress=progress,
+                                   page_formats=args.page_output, validate_output=not args.no_validate,
+                                   pinned_datetime=pinned_datetime, id_block_size=args.id_block_size)
+            except IOIGeneratedError as e:
+                logger.error("Error reading .xlsx file: " + e.value)
+                sys.exit(-1)
+            except (DXMLGeneratedError, LedgerGeneratedError) as e:
+                logger.error("Error creating XML File: " + e.value)
+                sys.exit(-1)
+            logger.info('** Program Ends in Success **')
+            return
+        try:
+            # Read xlsx into internal structure xlsx_to_dict.spreadsheet_info
+            xlsx_to_dict.read_xlsx_file()
+        except IOIGeneratedError as e:
+            logger.error("Error reading .xlsx file: " + e.value)
+            sys.exit(-1)
+        try:
+            # Convert internal structure into IOI xml file
+            DictToXML(files_and_folders=faf, result_xml_filepath=faf.xml_filepath, max_id_filepath=max_id_filepath,
+                      ddwiki_exported_filepath=ddwiki_exported_filepath, spreadsheet_dict=xlsx_to_dict.spreadsheet_info,
+                      xlsx_date=xlsx_date, program_config_data=xlsx_to_dict.config,
+                      shard_by=args.shard_by, shard_max_pages=args.shard_max_pages,
+                      shard_max_bytes=args.shard_max_kb * 1024 if args.shard_max_kb else None,
+                      delta_only=args.delta, build_targets=build_targets, id_ledger=id_ledger,
+                      near_dup_threshold=args.near_dup_threshold, progress=progress, page_formats=args.page_output,
+                      validate_output=not args.no_validate, pinned_datetime=pinned_datetime,
+                      id_block_size=args.id_block_size)
+        except (DXMLGeneratedError, ShardGeneratedError, LedgerGeneratedError) as e:
+            logger.error("Error creating XML File: " + e.value)
+            sys.exit(-1)
+        logger.info('** Program Ends in Success **')
+    finally:
+        if id_ledger is not None:
+            id_ledger.close()  # Also on sys.exit() of a failed conversion
 
 
 if __name__ == "__main__":
@@ -0,0 +1,88 @@
+__project__ = 'IOI_Import'
+__author__ = "Robert Gottesman"
+__version_date__ = "10/19/2026"
+
+""" Change log
+10/19/2026 - Created. Select resources, groups, lookup fields or lookup alpha letters to build
+"""
+
+
+class BuildTargets:
+    """ Pages selected for output in a partial (targeted) build
+
+    A resource selects all its pages. A group path (as in the xlsx 'Groups' column, i.e. 'Property,Listing,Price')
+    selects the group, its items and sub groups. A lookup field selects its page and lookup values. A letter selects
+    every lookup field starting with that letter. Parent pages of selected pages are output so the partial xml can be
+    imported on its own. Pages not selected are still walked (see DictToXML register_only) so IDs and unique page
+    titles are the same as in a full build.
+    """
+    GROUP_SEPARATOR = ','
+
+    def __init__(self, resources=None, groups=None, lookup_fields=None, letters=None):
+        """ Setup build targets
+
+        :param resources: (list) resource names (as in output xml) or xlsx sheet tab names
+        :param groups: (list) group paths separated by ',' starting with the resource name
+        :param lookup_fields: (list) lookup field names
+        :param letters: (list) 1st letters of lookup fields
+        :return: None
+        """
+        self.resources = set(resources or [])
+        self.groups = [tuple(grp.strip() for grp in group_path.split(self.GROUP_SEPARATOR) if grp.strip())
+                       for group_path in groups or []]
+        self.lookup_fields = set(lookup_fields or [])
+        self.letters = set(letters or [])
+
+    def is_empty(self):
+        return len(self.resources) == 0 and len(self.groups) == 0 and len(self.lookup_fields) == 0 and \
+            len(self.letters) == 0
+
+    def has_lookup_targets(self):
+        return len(self.lookup_fields) > 0 or len(self.letters) > 0
+
+    def has_resource_targets(self, sheet_tab_name, resource_name):
+        """ Check if any page of a resource is selected
+
+        :param sheet_tab_name: (str) xlsx sheet tab name of resource
+        :param resource_name: (str) resource name as in output xml
+        :return: (bool)
+        """
+        return sheet_tab_name in self.resources or resource_name in self.resources or \
+            any(group_path[0] == resource_name for group_path in self.groups)
+
+    def path_selected(self, sheet_tab_name, path):
+        """ Check if the group (and items directly under it) at path is selected
+
+        :param sheet_tab_name: (str) xlsx sheet tab name of resource
+        :param path: (tuple) group path. path[0] is the resource name
+        :return: (bool)
+        """
+        if sheet_tab_name in self.resources or path[0] in self.resources:
+            return True
+        return any(path[:len(group_path)] == group_path for group_path in self.groups)
+
+    def path_on_route(self, sheet_tab_name, path):
+        """ Check if the group at path is selected or is a parent of a selected group
+
+        :param sheet_tab_name: (str) xlsx sheet tab name of resource
+        :param path: (tuple) group path. path[0] is the resource name
+        :return: (bool)
+        """
+        return self.path_selected(sheet_tab_name, path) or \
+            any(group_path[:len(path)] == path for group_path in self.groups)
+
+    def lookup_field_selected(self, lookup_field_name):
+        return lookup_field_name in self.lookup_fields or lookup_field_name[0] in self.letters
+
+    def letter_on_route(self, letter):
+        """ Check if the alpha letter page is selected or is parent of a selected lookup field
+
+        :param letter: (str) 1st letter of lookup fields
+        :return: (bool)
+        """
+        return letter in self.letters or any(lookup_field_name[0] == letter for lookup_field_name in self.lookup_fields)
+
+    def __str__(self):
+        targets = sorted(self.resources) + [self.GROUP_SEPARATOR.join(group_path) for group_path in self.groups] + \
+            sorted(self.lookup_fields) + ['{} - Lookup Fields'.format(letter) for letter in sorted(self.letters)]
+        return ', '.join(targets)
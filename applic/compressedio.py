@@ -0,0 +1,79 @@
+import gzip
+import io
+import lzma
+import os
+
+try:
+    import zstandard  # Optional. pip install zstandard
+except ImportError:
+    zstandard = None
+
+__project__ = 'IOI_Import'
+__author__ = "Robert Gottesman"
+__version_date__ = "10/19/2026"
+
+""" Change log
+10/19/2026 - Created. Open gzip/xz/zstd compressed input and output files by file extension
+10/19/2026 - Written gzip files have no timestamp in the header. Same data gives the same bytes
+10/19/2026 - DECOMPRESSION_ERRORS: errors raised while reading a corrupt or truncated compressed file
+"""
+
+# File extension for each supported compression. Files with any other extension are read/written uncompressed
+COMPRESSION_EXTENSIONS = {'gz': '.gz', 'xz': '.xz', 'zst': '.zst'}
+# Raised while reading files opened with open_file(): OSError (missing file, gzip.BadGzipFile), EOFError (truncated
+# .. gzip/xz file) and the decoder errors of xz and zstd
+DECOMPRESSION_ERRORS = (OSError, EOFError, lzma.LZMAError) + ((zstandard.ZstdError,) if zstandard is not None else ())
+
+
+def compression_ext(filepath):
+    """ Return compression file extension of filepath (i.e. '.gz') or '' if file is not compressed
+
+    :param filepath: (str) file name/path
+    :return: (str) compression extension
+    """
+    ext = os.path.splitext(filepath)[1].lower()
+    return ext if ext in COMPRESSION_EXTENSIONS.values() else ''
+
+
+def split_ext(filepath):
+    """ Split filepath into base, file extension and compression extension. ('a/b.xml.gz' -> 'a/b', '.xml', '.gz')
+
+    :param filepath: (str) file name/path
+    :return: (tuple) base, ext, compression ext
+    """
+    comp_ext = compression_ext(filepath)
+    base, ext = os.path.splitext(filepath[:len(filepath) - len(comp_ext)])
+    return base, ext, comp_ext
+
+
+def open_file(filepath, mode='rb'):
+    """ Open plain or compressed file. Compression is chosen by file extension (.gz, .xz, .zst) and data is
+    .. (de)compressed while streaming, no temporary files are used
+
+    :param filepath: (str) file name/path
+    :param mode: (str) 'rb', 'wb', 'r' or 'w' (text modes are utf-8)
+    :return: file object. Raise OSError (FileNotFoundError if missing) on error. Reading a corrupt compressed file
+    .. raises one of DECOMPRESSION_ERRORS
+    """
+    comp_ext = compression_ext(filepath)
+    binary_mode = mode.replace('t', '').replace('b', '') + 'b'
+    text_mode = 'b' not in mode
+    if comp_ext == '.gz' and binary_mode != 'rb':
+        file_obj = gzip.GzipFile(filepath, binary_mode, mtime=0)  # Header time would differ on every write
+    elif comp_ext == '.gz':
+        file_obj = gzip.open(filepath, binary_mode)
+    elif comp_ext == '.xz':
+        file_obj = lzma.open(filepath, binary_mode)
+    elif comp_ext == '.zst':
+        if zstandard is None:
+            raise OSError("Module 'zstandard' is required to read/write file " + filepath)
+        raw_file = open(filepath, binary_mode)
+        if binary_mode == 'rb':
+            file_obj = zstandard.ZstdDecompressor().stream_reader(raw_file, closefd=True)
+        else:
+            file_obj = zstandard.ZstdCompressor().stream_writer(raw_file, closefd=True)
+    else:
+        file_obj = open(filepath, binary_mode)
+    if text_mode:
+        return io.TextIOWrapper(file_obj, encoding='utf-8')
+    return file_obj
@@ -0,0 +1,119 @@
+import csv
+import io
+import os
+import zipfile
+
+from applic.compressedio import open_file, split_ext
+
+__project__ = 'IOI_Import'
+__author__ = "Robert Gottesman"
+__version_date__ = "10/19/2026"
+
+""" Change log
+10/19/2026 - Created. Per sheet CSV/TSV files (folder or .zip bundle) read in place of an .xlsx workbook
+"""
+
+# Sheet file extensions and their delimiter. A folder may also hold compressed files (i.e. 'Lookups.csv.gz')
+SHEET_DELIMITERS = {'.csv': ',', '.tsv': '\t'}
+
+
+def is_csv_input(input_path):
+    """ True if input_path is a CSV/TSV input (folder or .zip bundle) rather than an .xlsx file
+
+    :param input_path: (str) -x input path
+    :return: (bool)
+    """
+    return os.path.isdir(input_path) or os.path.splitext(input_path)[1].lower() == '.zip'
+
+
+class CSVSheet:
+    """ One sheet file. Rows are parsed while they are iterated (like an openpyxl read only worksheet) """
+
+    def __init__(self, title, open_function, delimiter):
+        """ Setup sheet
+
+        :param title: (str) sheet tab name
+        :param open_function: (function) no parameters, returns the sheet file opened in binary mode
+        :param delimiter: (str) field delimiter
+        :return: None
+        """
+        self.title = title
+        self.open_function = open_function
+        self.delimiter = delimiter
+        self.max_row = None  # Unknown until read. Progress is reported without total
+
+    def iter_rows(self, values_only=True):
+        """ Rows as tuples of values. Empty fields are None (an empty xlsx cell)
+
+        :param values_only: (bool) only values are available
+        :return: (generator) of tuples. Raise OSError or csv.Error on error
+        """
+        with self.open_function() as sheet_file:
+            text_file = io.TextIOWrapper(sheet_file, encoding='utf-8-sig', newline='')
+            for row in csv.reader(text_file, delimiter=self.delimiter):
+                yield tuple(value if value != '' else None for value in row)
+
+
+class CSVWorkbook:
+    """ Stand-in for a read only openpyxl workbook over one CSV/TSV file per sheet
+
+    The input is a folder or a .zip file holding '<sheet tab name>.csv' or '<sheet tab name>.tsv' for the sheets of
+    [ResourceSheets] and [LookupSheets] in config.ini (i.e. 'Rules Tab.csv', 'Lookups.tsv'). Files are utf-8 (a BOM is
+    ignored) with the column headers in the 1st row. Files in a folder may be compressed (.gz, .xz, .zst).
+    """
+
+    def __init__(self, input_path):
+        """ List sheet files
+
+        :param input_path: (str) folder or .zip file
+        :return: None. Raise OSError (FileNotFoundError if missing) or zipfile.BadZipFile on error
+        """
+        self.input_path = input_path
+        self.zip_file = None
+        self.sheet_files = {}  # sheet tab name: (file path or zip member name, delimiter)
+        if os.path.isdir(input_path):
+            file_names = sorted(os.listdir(input_path))
+        elif os.path.isfile(input_path):
+            self.zip_file = zipfile.ZipFile(input_path)
+            file_names = sorted(name for name in self.zip_file.namelist() if not name.endswith('/'))
+        else:
+            raise FileNotFoundError("CSV input folder or .zip not found: " + input_path)
+        for file_name in file_names:
+            base, ext, comp_ext = split_ext(file_name)
+            if ext.lower() not in SHEET_DELIMITERS or (self.zip_file is not None and comp_ext):
+                continue
+            sheet_tab_name = os.path.basename(base)
+            if sheet_tab_name not in self.sheet_files:
+                file_path = file_name if self.zip_file is not None else os.path.join(input_path, file_name)
+                self.sheet_files[sheet_tab_name] = (file_path, SHEET_DELIMITERS[ext.lower()])
+
+    @property
+    def sheetnames(self):
+        return list(self.sheet_files)
+
+    def __getitem__(self, sheet_tab_name):
+        """ Sheet by tab name
+
+        :param sheet_tab_name: (str) sheet tab name
+        :return: (CSVSheet). Raise KeyError if no file for the sheet
+        """
+        file_path, delimiter = self.sheet_files[sheet_tab_name]
+        if self.zip_file is not None:
+            return CSVSheet(sheet_tab_name, lambda: self.zip_file.open(file_path), delimiter)
+        return CSVSheet(sheet_tab_name, lambda: open_file(file_path, 'rb'), delimiter)
+
+    def get_sheet_by_name(self, name):
+        return self[name]
+
+    def source_files(self):
+        """ Files read (input change detection)
+
+        :return: (list) sheet file paths, or the .zip file
+        """
+        if self.zip_file is not None:
+            return [self.input_path]
+        return [file_path for file_path, delimiter in self.sheet_files.values()]
+
+    def close(self):
+        if self.zip_file is not None:
+            self.zip_file.close()
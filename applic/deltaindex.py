@@ -0,0 +1,143 @@
+import logging
+
+__project__ = 'IOI_Import'
+__author__ = "Robert Gottesman"
+__version_date__ = "10/19/2026"
+
+""" Change log
+10/19/2026 - Created. Index exported DD Wiki pages to emit only new or changed pages (delta output)
+10/19/2026 - Only values set from the run clock (RUN_CLOCK_ATTRIBUTE) are not compared (was all ModificationTimestamp,
+             Revised_Date values)
+"""
+
+
+class ExportPageIndex:
+    """ Index of pages in the DD Wiki exported xml used to find new or changed pages in the IOI import xml
+
+    Pages are indexed by page title and by key fields (field standard name + resource, lookup value + lookup field)
+    so a page is still found when its generated title was qualified as a duplicate, i.e. 'Name (Property) Field'.
+    Generated field nodes holding a value set from the run clock (AutoCompute ModificationTimestamp, '*' default date
+    of a blank xlsx cell) carry RUN_CLOCK_ATTRIBUTE. They are not compared and the attribute is removed when pruned.
+    """
+    PAGE_ATTRIBUTE = 'Page_Title'
+    RUN_CLOCK_ATTRIBUTE = 'Run_Clock'  # Set by DictToXML on generated field nodes. Never written to the output
+    FIELD_NAME_TAGS = ['Field_Name_Standard_Name', 'StandardName']
+    LOOKUP_VALUE_TAGS = ['Lookup_Value', 'LookupValue']
+    LOOKUP_FIELD_TAGS = ['Lookup_Field', 'LookupField']
+    GROUPINGS_TAG = 'Groupings'
+
+    def __init__(self):
+        self.logger = logging.getLogger(__project__ + '.' + self.__class__.__name__)
+        self.pages_by_title = {}  # page title: fingerprint
+        self.pages_by_key = {}  # key field tuple: fingerprint
+
+    @staticmethod
+    def _text(node):
+        return '' if node.text is None else node.text.strip()
+
+    def _fingerprint(self, page_node):
+        """ Field values of a page (child pages and values set from the run clock excluded) in a comparable form
+
+        :param page_node: (xml node) page node
+        :return: (dict) tag: value. Value is a str or a tuple of (tag, Link, text) for nodes with children
+        """
+        fingerprint = {}
+        for field_node in page_node:
+            if self.PAGE_ATTRIBUTE in field_node.attrib or not isinstance(field_node.tag, str) or \
+                    self.RUN_CLOCK_ATTRIBUTE in field_node.attrib:
+                continue
+            if len(field_node) > 0:
+                fingerprint[field_node.tag] = tuple((sub_node.tag, sub_node.get('Link'), self._text(sub_node))
+                                                    for sub_node in field_node)
+            else:
+                fingerprint[field_node.tag] = (self._text(field_node), field_node.get('Link'))
+        return fingerprint
+
+    def _key(self, fingerprint):
+        """ Key fields identifying a field or lookup value page independent of page title
+
+        :param fingerprint: (dict) page fingerprint
+        :return: (tuple) key or None if page is not a field or lookup value
+        """
+        for tag in self.LOOKUP_VALUE_TAGS:
+            if tag in fingerprint:
+                lookup_field = next((fingerprint[fld_tag][0] for fld_tag in self.LOOKUP_FIELD_TAGS
+                                     if fld_tag in fingerprint), '')
+                return 'LookupValue', fingerprint[tag][0], lookup_field
+        for tag in self.FIELD_NAME_TAGS:
+            if tag in fingerprint:
+                groupings = fingerprint.get(self.GROUPINGS_TAG, ())
+                resource = groupings[0][2] if len(groupings) > 0 and isinstance(groupings[0], tuple) else ''
+                return 'Field', fingerprint[tag][0], resource
+        return None
+
+    def add_export_root(self, root):
+        """ Index every page (node with a Page_Title attribute) in the exported xml
+
+        :param root: (xml node) root of exported xml
+        :return: (int) number of pages indexed
+        """
+        page_count = 0
+        for page_node in root.iter():
+            if not isinstance(page_node.tag, str):
+                continue
+            fingerprint = self._fingerprint(page_node)
+            key = self._key(fingerprint)
+            if self.PAGE_ATTRIBUTE not in page_node.attrib and key is None:
+                continue  # Not a page
+            if self.PAGE_ATTRIBUTE in page_node.attrib:
+                self.pages_by_title[page_node.get(self.PAGE_ATTRIBUTE)] = fingerprint
+            if key is not None:
+                self.pages_by_key[key] = fingerprint
+            page_count += 1
+        return page_count
+
+    def is_changed(self, page_node):
+        """ Check if generated page is new or has a field value different from the exported page
+
+        :param page_node: (xml node) generated page node
+        :return: (bool) True when new or changed
+        """
+        fingerprint = self._fingerprint(page_node)
+        exported = self.pages_by_title.get(page_node.get(self.PAGE_ATTRIBUTE))
+        if exported is None:
+            key = self._key(fingerprint)
+            exported = self.pages_by_key.get(key) if key is not None else None
+        if exported is None:
+            return True
+        for tag, value in fingerprint.items():
+            if exported.get(tag) != value:
+                return True
+        return False
+
+    def prune_unchanged(self, xml_root):
+        """ Remove unchanged pages from generated xml. Unchanged Groups are kept when they hold a changed page.
+        .. RUN_CLOCK_ATTRIBUTE is removed from the pages kept
+
+        :param xml_root: (xml node) root of generated IOI import xml
+        :return: (int, int) pages kept, pages removed
+        """
+        kept = 0
+        removed = 0
+        for page_node in list(xml_root):
+            if self.PAGE_ATTRIBUTE in page_node.attrib:
+                page_kept, page_removed = self._prune_page(page_node)
+                kept += page_kept
+                removed += page_removed
+        return kept, removed
+
+    def _prune_page(self, page_node):
+        kept = 0
+        removed = 0
+        for child_node in list(page_node):
+            if self.PAGE_ATTRIBUTE in child_node.attrib:
+                child_kept, child_removed = self._prune_page(child_node)
+                kept += child_kept
+                removed += child_removed
+        if kept == 0 and not self.is_changed(page_node):
+            page_node.getparent().remove(page_node)
+            return 0, removed + 1
+        for field_node in page_node:
+            if isinstance(field_node.tag, str):
+                field_node.attrib.pop(self.RUN_CLOCK_ATTRIBUTE, None)
+        return kept + 1, removed
@@ -1,3 +1,4 @@
+import copy
 import datetime
 import logging
 import ntpath
@@ -9,10 +10,21 @@ from namedentities import *
 from treelib import Tree
 from treelib.tree import NodeIDAbsentError, MultipleRootError
 
+from applic.compressedio import DECOMPRESSION_ERRORS, open_file
+from applic.deltaindex import ExportPageIndex
+from applic.exportindex import ExportIndex, ExportIndexGeneratedError
+from applic.idblocks import IDBlockAllocator
+from applic.linkcheck import LinkChecker
+from applic.neardup import NearDuplicateIndex
+from applic.outputcheck import OutputValidator, cached_rules
+from applic.pagesinks import PageSinkSet
+from applic.progress import ProgressReporter, ProgressFile
+from applic.xmlshards import XMLShardWriter
+
 __project__ = 'IOI_Import'
 __author__ = "Robert Gottesman"
 __version_date__ = "04/27/2018"
-__high_err_num__ = 47
+__high_err_num__ = 59
 
 """ Change log
 3/30/2017 - See section: elif nodes_from_config[config_node_text]['ParsingCode'] == self.PARSE_LOOKUP_FLDID:
@@ -27,6 +39,33 @@ __high_err_num__ = 47
 4/24/2018 - Fixed bug in finding duplicate names within lookup values
 4/25/2017 - Modified how code differentiates between Property Resource, Other Resources and Collections
 4/27/2018 - Optimized some code
+10/19/2026 - Optional sharded output (shard_by) written through XMLShardWriter with a manifest
+10/19/2026 - Exported xml, max id file and output xml may be gzip/xz/zstd compressed (by file extension)
+10/19/2026 - Optional delta output (delta_only) keeps only pages new/changed against the DD Wiki exported xml
+10/19/2026 - Lookups read from LookupIndex. Warn when a resource field references an unknown lookup field
+10/19/2026 - Report dangling 'Link' attributes after the xml is built (see _check_links)
+10/19/2026 - Labels split once when config is read. Lookup and prop_ labels added while the page is built
+10/19/2026 - Groupings, References and Property_Types sub nodes built once per distinct xlsx value and copied
+10/19/2026 - Pages built by per page helpers called from _generate() (reused by streaming/pipelined subclasses)
+10/19/2026 - Resource sheets built one at a time (_create_resource_sheet). Lookup reference check is overridable
+10/19/2026 - Optional build_targets: pages not selected are walked (register_only) to keep IDs and titles
+10/19/2026 - Build targets: titles of pages after the last target registered (register_titles_only) for the link check
+10/19/2026 - Optional input_cache: config xml, max ids and DD Wiki export reused across conversions (--watch)
+10/19/2026 - Optional id_ledger: computed RecordIDs/LookupIDs reserved from and recorded in a shared IDLedger
+10/19/2026 - Optional near_dup_threshold: warn when a new field/lookup value name nearly matches an existing one
+10/19/2026 - Per page/row messages formatted by the logger (%s args) so aggregated messages are never formatted
+10/19/2026 - Optional progress (ProgressReporter): pages per resource, lookup values per letter, bytes written
+10/19/2026 - Optional page_formats: pages also written as NDJSON/JSON and a CSV page manifest (PageSinkSet)
+10/19/2026 - Optional validate_output: written pages checked against rules compiled from the Forms (output_rules)
+10/19/2026 - Optional pinned_datetime (reproducible output). '*' default dates use the run clock (start_datetime)
+10/19/2026 - Delta output: date nodes set from the run clock marked (ExportPageIndex.RUN_CLOCK_ATTRIBUTE), not compared
+10/19/2026 - IDs handed out from ID blocks (IDBlockAllocator) of id_block_size. Full blocks get extension blocks
+             (no 999 fields/lookup values limit). Max id file may list the blocks ('** ID Blocks' section)
+10/19/2026 - ID blocks not in the max id file taken from the RecordIDs/LookupFieldIDs of the DD Wiki export
+10/19/2026 - Scopes with no ID blocks in max id file or export keep the 1000 block of their max id (DXM-59)
+10/19/2026 - Export ID blocks read from the export index file (files/index). Cached per page title config
+10/19/2026 - Resource Groups ordered by Groups path (same order as low memory mode)
+10/19/2026 - Corrupt or truncated compressed max id file/export reported as [DXM-48]/[DXM-31] (DECOMPRESSION_ERRORS)
 """
 
 
@@ -43,6 +82,7 @@ class DXMLGeneratedError(Exception):
 
 class DictToXML:
     XML_ROOT_TAG = 'wikiimport'
+    CONFIG_XML_FILENAME = 'DDWikiImportConfig.xml'
     DATETIME_FORMAT = '%m/%d/%Y %H%M'
     XLSX_DATETIME_FORMAT = "%Y%m%dT%H%M"
 
@@ -66,6 +106,8 @@ class DictToXML:
     IGNORE_FIELDS = ['OriginalEntryTimestamp']
     INTERNAL_OUTPUT_DATE_FORMAT = '%Y%m%dT%H%M'
     DEFAULT_DATE_FORMAT = '%Y%m%d'
+    OUTPUT_DATE_FORMAT = '%b %d %Y'
+    OUTPUT_DATETIME_FORMAT = '%b %d %Y %I:%M %p'  # Uses AM/PM format
     PROP_NOLOOKUP_TEMPLATE = 'PropNoLookupResourceTemplate'
     OTHER_NOLOOKUP_TEMPLATE = 'OtherNoLookupResourceTemplate'
     REFERENCE_NOLOOKUP_TEMPLATE = 'ReferenceNoLookupResourceTemplate'
@@ -76,7 +118,18 @@ class DictToXML:
                  result_xml_filepath,
                  spreadsheet_dict,
                  xlsx_date,
-                 program_config_data=None):
+                 program_config_data=None,
+                 shard_by=None, shard_max_pages=None, shard_max_bytes=None,
+                 delta_only=False,
+                 build_targets=None,
+                 input_cache=None,
+                 id_ledger=None,
+                 near_dup_threshold=None,
+                 progress=None,
+                 page_formats=None,
+                 validate_output=False,
+                 pinned_datetime=None,
+                 id_block_size=IDBlockAllocator.ALIGNMENT):
         """ Convert internal .xlsx dict to specially formatted XML file to be used for importing into Confluence DD Wiki
 
         :param files_and_folders: (obj) object containing file locations
@@ -86,31 +139,214 @@ class DictToXML:
         :param spreadsheet_dict: (dict) xlsx file data converted into internal dict format
         :param xlsx_date: (datetime) Timestamp for result_xml_filepath
         :param program_config_data: (dict) config.ini file read into dictionary
-        :return: None. Raise DXMLGeneratedError on error.
+        :param shard_by: (str) Write output as shards (see XMLShardWriter.SHARD_MODES). None for a single file
+        :param shard_max_pages: (int) Max pages per shard (optional)
+        :param shard_max_bytes: (int) Max approximate bytes per shard (optional)
+        :param delta_only: (bool) Output only pages that are new or changed compared to ddwiki_exported_filepath
+        :param build_targets: (BuildTargets) Output only selected resources/groups/lookups (None: all pages)
+        :param input_cache: (InputCache) Reuse config xml, max ids and DD Wiki export loaded by an earlier conversion
+        .. while the files are unchanged (None: always read)
+        :param id_ledger: (IDLedger) Reserve computed RecordIDs/LookupIDs from the ledger and record them once the
+        .. xml is written (None: ids from max id file only)
+        :param near_dup_threshold: (float) Warn when a new field/lookup value name has this similarity (0-1) with a
+        .. DD Wiki export or xlsx name (None: no check)
+        :param progress: (ProgressReporter) Report build/write progress (None: no report)
+        :param page_formats: (list) Also write the pages in these formats (see PageSinkSet.FORMATS), file names
+        .. derived from result_xml_filepath (None: IOI import xml only)
+        :param validate_output: (bool) Check each written page against the Forms of DDWikiImportConfig.xml
+        .. (OutputValidator). Violations are logged as warnings
+        :param pinned_datetime: (datetime) Clock of the run: XMLCreateDate, AutoCompute ModificationTimestamp and '*'
+        .. default dates. Identical inputs give identical output (None: time the conversion started)
+        :param id_block_size: (int) ids in a new RecordID/LookupID block (multiple of 1000). A full block is followed
+        .. by an extension block (see IDBlockAllocator)
+        :return: None. Raise DXMLGeneratedError (or ShardGeneratedError, LedgerGeneratedError) on error.
         """
         self.logger = logging.getLogger(__project__ + '.' + self.__class__.__name__)
         self.report_warning = True  # Report certain warning messages only once
-        self.start_datetime = datetime.datetime.today()
-        self.date_format_notime = '%b %d %Y'
-        self.date_format_withtime = '%b %d %Y %I:%M %p'  # Uses AM/PM format
+        # One clock value for the whole run (dates of pages built at different moments are the same)
+        self.start_datetime = pinned_datetime if pinned_datetime is not None else datetime.datetime.today()
+        self.date_format_notime = self.OUTPUT_DATE_FORMAT
+        self.date_format_withtime = self.OUTPUT_DATETIME_FORMAT
         self.start_datetime_str = self.start_datetime.strftime(self.date_format_notime)
         self.spreadsheet_data = spreadsheet_dict    # xlsx converted into a dictionary
-        self.field_and_lookup_names = []   # Used to ensure unique page titles
+        self.lookup_index = spreadsheet_dict['Lookups']  # (LookupIndex) lookup fields and values from xlsx
+        self.field_and_lookup_names = set()   # Used to ensure unique page titles
+        self.exported_page_titles = set()  # Page titles in DD Wiki export. Used to check links
+        self.export_id_blocks = {}  # (kind, lookup field/resource): [(first id, size)] of ids in DD Wiki export
+        self.export_index_filepath = ExportIndex.index_filepath(  # Shared with --inspect
+            files_and_folders.input_folder, os.path.basename(os.path.normpath(files_and_folders.config_folder)))
+        self.unplaced_id_scopes = {}  # (kind, lookup field/resource): max id. No ID blocks found (see DXM-57)
+        self.legacy_id_scopes = {}  # (kind, lookup field/resource): home block taken from max id (see DXM-59)
         self.program_config_data = program_config_data  # setup info from config.ini
         self.resource_descriptions = {}  # retrieved from config.ini
         self.page_links = {}  # Translate xlsx columns into appropriate text for Lookup page links (config.ini)
         self.resource_tree = None  # Create internal tree for Wiki output structure (xml output file)
+        self.sub_node_cache = {}  # (builder, node tag, xlsx cell value): sub nodes built once, copied for each page
+        self.export_page_index = ExportPageIndex() if delta_only else None  # Exported pages for delta output
+        self.build_targets = build_targets if build_targets is not None and not build_targets.is_empty() else None
+        self.register_only = False  # True while walking pages not selected by build_targets
+        self.register_titles_only = False  # register_only walk of pages after the last build target: no IDs computed
+        self.registered_page_titles = set()  # Titles of pages walked but not output (build targets)
+        self.id_ledger = id_ledger  # (IDLedger) shared id reservations. max_lookupids/max_recordids stay as read
+        self.near_dup_threshold = near_dup_threshold
+        self.near_dup_index = None  # (NearDuplicateIndex) names checked for near duplicates. Built on first use
+        self.near_dup_export_count = 0  # Names in near_dup_index taken from DD Wiki export (indexed first)
+        self.near_duplicates = []  # (name, similar name, score) suspected collisions
+        self.progress = progress if progress is not None else ProgressReporter(ProgressReporter.OFF)
+        self.page_formats = page_formats or []
+        self.validate_output = validate_output
+        self.config_xml_filepath = os.path.join(files_and_folders.config_folder, self.CONFIG_XML_FILENAME)
+        if self.build_targets is not None:
+            self.logger.info("Build targets: {}".format(self.build_targets))
         self._read_ini_config_data()  # Convert config.ini info into dict {}
-        self.xml_config_data = self._read_xml_config_file(files_and_folders)  # Read config. defines xlsx->xml rules
-        self._read_max_ids(max_id_filepath)
-        self._load_page_titles_from_ddwiki_export(ddwiki_exported_filepath)  # check for dup confluence page titles
+        if input_cache is None:
+            self.xml_config_data = self._read_xml_config_file(files_and_folders)  # Read config. xlsx->xml rules
+            self._read_max_ids(max_id_filepath)
+            self._load_page_titles_from_ddwiki_export(ddwiki_exported_filepath)  # check for dup confluence titles
+        else:
+            self._load_cached_inputs(input_cache, files_and_folders, max_id_filepath, ddwiki_exported_filepath)
+        self.id_blocks = self._id_block_allocator(id_block_size)
         self.xml_root = xml_tree.Element(self.XML_ROOT_TAG)  # Setup root output XML node
         self.xml_root.set('XMLCreateDate', self.start_datetime.strftime(self.INTERNAL_OUTPUT_DATE_FORMAT))
         self.xml_root.set('XlsxDate', xlsx_date.strftime(self.INTERNAL_OUTPUT_DATE_FORMAT))
         # Populate output xml structure .. the write file out
+        if self.id_ledger is None:
+            self._generate(result_xml_filepath, shard_by, shard_max_pages, shard_max_bytes)
+        else:
+            try:
+                self._generate(result_xml_filepath, shard_by, shard_max_pages, shard_max_bytes)
+            except BaseException:
+                self.id_ledger.discard()
+                raise
+            self.id_ledger.commit()  # Pages own their ids only once the xml is written
+        self.progress.end_stage()
+        if self.near_dup_threshold is not None:
+            self.logger.info("[DXM-54] Near duplicate check: {} suspected name collisions (similarity >= {})".
+                             format(len(self.near_duplicates), self.near_dup_threshold))
+
+    def _generate(self, result_xml_filepath, shard_by=None, shard_max_pages=None, shard_max_bytes=None):
+        """ Build IOI import xml in memory (self.xml_root), check links, then write file(s) to disk
+
+        :param result_xml_filepath: (str) File name/path for resultant IOI import xml file
+        :param shard_by: (str) Write output as shards. None for a single file
+        :param shard_max_pages: (int) Max pages per shard (optional)
+        :param shard_max_bytes: (int) Max approximate bytes per shard (optional)
+        :return: None. Raise DXMLGeneratedError on error
+        """
         self._create_resources()  # Create resource and collection nodes in IOI import xml
         self._create_lookups()  # Create lookup fields/value nodes in IOI import xml
-        self.write_xml_file(result_xml_filepath)
+        self._check_links()
+        if self.export_page_index is not None:
+            pages_kept, pages_removed = self.export_page_index.prune_unchanged(self.xml_root)
+            self.logger.info("[DXM-49] Delta output: {} new/changed pages (incl. parent Groups), {} unchanged "
+                             "pages removed".format(pages_kept, pages_removed))
+        if shard_by is None:
+            self.write_xml_file(result_xml_filepath)
+        else:
+            self.write_xml_shards(result_xml_filepath, shard_by, shard_max_pages, shard_max_bytes)
+        page_sinks = self._open_page_sinks(result_xml_filepath)
+        if page_sinks is not None:
+            try:
+                page_sinks.add_tree(self.xml_root)  # Same pages as written above. The xml file is not parsed
+            except OSError as e:
+                raise DXMLGeneratedError("[DXM-55] Unable to write page output file: {}".format(e))
+            finally:
+                self._close_page_sinks(page_sinks)
+
+    def _load_cached_inputs(self, input_cache, files_and_folders, max_id_filepath, ddwiki_exported_filepath):
+        """ Load config xml, max ids and DD Wiki export through input_cache. Data changed while building pages
+        .. (max ids, registered page titles) is copied so the cached data stays as read from file
+
+        :param input_cache: (InputCache) cache of loaded input files
+        :param files_and_folders: (obj) object containing file locations
+        :param max_id_filepath: (str) File name/path for file containing DD Wiki max lookupids (stat_warning_log.txt)
+        :param ddwiki_exported_filepath: (str) File name/path for latest dd wiki xml exported file
+        :return: None. Raise DXMLGeneratedError on error.
+        """
+        config_filename = os.path.join(files_and_folders.config_folder, self.CONFIG_XML_FILENAME)
+        self.xml_config_data = input_cache.get(('config_xml', config_filename), config_filename,
+                                               lambda: self._read_xml_config_file(files_and_folders))
+        self.max_id, max_recordids, max_lookupids, self.max_id_blocks = input_cache.get(
+            ('max_ids', max_id_filepath), max_id_filepath, lambda: self._loaded_max_ids(max_id_filepath))
+        self.max_recordids = dict(max_recordids)
+        self.max_lookupids = dict(max_lookupids)
+        field_and_lookup_names, self.exported_page_titles, self.export_page_index, self.export_id_blocks = \
+            input_cache.get(('export', ddwiki_exported_filepath, self.export_page_index is not None,
+                             repr(self._export_index_config())),
+                            ddwiki_exported_filepath, lambda: self._loaded_export(ddwiki_exported_filepath))
+        self.field_and_lookup_names = set(field_and_lookup_names)
+
+    def _loaded_max_ids(self, max_id_filepath):
+        self._read_max_ids(max_id_filepath)
+        return self.max_id, self.max_recordids, self.max_lookupids, self.max_id_blocks
+
+    def _id_block_allocator(self, block_size):
+        """ ID blocks of the lookup fields and resources of the max id file: the blocks listed in the max id file
+        .. ('** ID Blocks' section), else the blocks of their ids in the DD Wiki export, else the 1000 block of their
+        .. max id (self.legacy_id_scopes, DXM-59 when used). A max id past the ids of its 1000 block cannot tell the
+        .. home block: the scope is kept in self.unplaced_id_scopes (DXM-57 when used)
+
+        :param block_size: (int) ids in a new block
+        :return: (IDBlockAllocator)
+        """
+        id_blocks = IDBlockAllocator(block_size, self.max_id, self.id_ledger)
+        self.unplaced_id_scopes = {}
+        self.legacy_id_scopes = {}
+        for kind, max_ids in ((IDBlockAllocator.RECORDID, self.max_recordids),
+                              (IDBlockAllocator.LOOKUPID, self.max_lookupids)):
+            for scope, max_id in max_ids.items():
+                blocks = self.max_id_blocks.get((kind, scope)) or self._export_scope_blocks(kind, scope, max_id)
+                if blocks is None:
+                    legacy_block = IDBlockAllocator.legacy_block(kind, max_id)
+                    if legacy_block is None:
+                        self.unplaced_id_scopes[(kind, scope)] = max_id
+                        continue
+                    blocks = [legacy_block]
+                    self.legacy_id_scopes[(kind, scope)] = legacy_block
+                id_blocks.add_scope(kind, scope, max_id, blocks)
+        return id_blocks
+
+    def _export_scope_blocks(self, kind, scope, max_id):
+        """ ID blocks of a scope in the DD Wiki export, home block (LookupFieldID / lowest RecordID block) first.
+        .. The 1000 block of max_id is added if the export has no id in it (ids added after the export)
+
+        :param kind: (str) IDBlockAllocator.LOOKUPID or RECORDID
+        :param scope: (str) lookup field or resource name
+        :param max_id: (int) max id of the scope in the max id file
+        :return: (list) (first id, size), or None if the export has no id of the scope
+        """
+        blocks = self.export_id_blocks.get((kind, scope))
+        if blocks is None:
+            return None
+        if not any(first_id <= max_id < first_id + size for first_id, size in blocks):
+            blocks = blocks + [(max_id - max_id % IDBlockAllocator.ALIGNMENT, IDBlockAllocator.ALIGNMENT)]
+        return blocks
+
+    def _check_id_scope_placed(self, kind, scope):
+        """ Raise DXMLGeneratedError if the ID blocks of a max id file scope are unknown. Ids of the scope would
+        .. otherwise be handed out from a guessed block (another home block / LookupFieldID). Warn (once) when the
+        .. home block is the 1000 block of the max id
+
+        :param kind: (str) IDBlockAllocator.LOOKUPID or RECORDID
+        :param scope: (str) lookup field or resource name
+        :return: None. Raise DXMLGeneratedError on error
+        """
+        if (kind, scope) in self.unplaced_id_scopes:
+            raise DXMLGeneratedError("[DXM-57] Cannot find ID blocks of {} '{}' (max id {} past its 1000 block): no {} "
+                                     "in DD Wiki export and not listed in '** ID Blocks' section of max id file".format(
+                                         'lookup field' if kind == IDBlockAllocator.LOOKUPID else 'resource', scope,
+                                         self.unplaced_id_scopes[(kind, scope)],
+                                         'LookupFieldID/LookupID' if kind == IDBlockAllocator.LOOKUPID else
+                                         'RecordID'))
+        legacy_block = self.legacy_id_scopes.pop((kind, scope), None)
+        if legacy_block is not None:
+            self.logger.warning("[DXM-59] No ID blocks of %s '%s' in DD Wiki export or max id file: using block %s-%s "
+                                "of its max id", 'lookup field' if kind == IDBlockAllocator.LOOKUPID else 'resource',
+                                scope, legacy_block[0], legacy_block[0] + legacy_block[1] - 1)
+
+    def _loaded_export(self, ddwiki_exported_filepath):
+        self._load_page_titles_from_ddwiki_export(ddwiki_exported_filepath)
+        return self.field_and_lookup_names, self.exported_page_titles, self.export_page_index, self.export_id_blocks
 
     def _load_page_titles_from_ddwiki_export(self, ddwiki_exported_filepath):
         """ Load Page Titles from exported xml file. Needed to check for duplicate Confluence page titles.
@@ -125,20 +361,121 @@ class DictToXML:
         # http://lxml.de/api/lxml.etree.XMLParser-class.html
         xml_tree.XMLParser(remove_blank_text=True, resolve_entities=False)
         try:
-            xml_root = xml_tree.parse(ddwiki_exported_filepath)
-        except OSError:
+            with open_file(ddwiki_exported_filepath, 'rb') as exported_file:
+                xml_root = xml_tree.parse(exported_file)
+        except DECOMPRESSION_ERRORS:
             raise DXMLGeneratedError("[DXM-31] Cannot Open DD Wiki Input XML file: " + ddwiki_exported_filepath)
         root = xml_root.getroot()
         resource_nodes = root.findall(".//StandardName")
         for name_node in resource_nodes:
-            if name_node.text not in self.field_and_lookup_names:
-                self.field_and_lookup_names.append(name_node.text)
+            self.field_and_lookup_names.add(name_node.text)
         lookupval_nodes = root.findall(".//LookupValue")
         for name_node in lookupval_nodes:
-            if name_node.text not in self.field_and_lookup_names:
-                self.field_and_lookup_names.append(name_node.text)
+            self.field_and_lookup_names.add(name_node.text)
+        for page_node in root.iterfind(".//*[@Page_Title]"):
+            self.exported_page_titles.add(page_node.get('Page_Title'))
         self.logger.info("[DXM-33] Note on Existing DD Wiki: {} fields found, {} lookup values found".
                          format(len(resource_nodes), len(lookupval_nodes)))
+        if self.export_page_index is not None:
+            self.logger.info("Indexed {} DD Wiki exported pages for delta output".
+                             format(self.export_page_index.add_export_root(root)))
+        self.export_id_blocks = self._read_export_id_blocks(ddwiki_exported_filepath)
+
+    def _export_index_config(self):
+        """ Page title config of the export index (ExportIndex arguments). Entries of the index depend on it
+
+        :return: (dict) resource_titles, resource_title_template, lookup_field_title_template
+        """
+        return {'resource_titles': {title: name for name, title in self.page_links.items()},
+                'resource_title_template': self.xml_config_data['Resource']['Attributes']['Page_Title'],
+                'lookup_field_title_template': self.xml_config_data['LookupIndexField']['Attributes']['Page_Title']}
+
+    def _read_export_id_blocks(self, ddwiki_exported_filepath):
+        """ ID blocks of the resources and lookup fields in the DD Wiki export (as in --inspect_max_ids). The export
+        .. index file (self.export_index_filepath) is indexed again only if the export or page title config changed
+
+        :param ddwiki_exported_filepath: (str) File name/path for latest dd wiki xml exported file
+        :return: (dict) (kind, lookup field/resource): [(first id, size)] home block first. Raise DXMLGeneratedError
+        """
+        try:
+            export_index = ExportIndex(self.export_index_filepath, **self._export_index_config())
+            try:
+                export_index.update(ddwiki_exported_filepath)
+                recordid_blocks, lookupid_blocks = export_index.id_blocks(min_blocks=1)
+            finally:
+                export_index.close()
+        except ExportIndexGeneratedError as e:
+            raise DXMLGeneratedError("[DXM-58] Cannot read ID blocks of DD Wiki export: {}".format(e.value))
+        export_id_blocks = {(IDBlockAllocator.RECORDID, scope): blocks for scope, blocks in recordid_blocks.items()}
+        export_id_blocks.update(((IDBlockAllocator.LOOKUPID, scope), blocks) for scope, blocks in
+                                lookupid_blocks.items())
+        return export_id_blocks
+
+    def _new_link_checker(self):
+        """ Setup link checker knowing pages outside of the output (DD Wiki export, config.ini [PageLinks])
+
+        :return: (LinkChecker)
+        """
+        link_checker = LinkChecker(link_title_templates={
+            'Group': [self.xml_config_data["Group"]['Attributes']['Page_Title']]})
+        link_checker.add_titles(self.exported_page_titles)
+        link_checker.add_titles(self.page_links.values())
+        link_checker.add_titles(self.registered_page_titles)
+        return link_checker
+
+    def _report_dangling_links(self, dangling_links):
+        """ Log dangling links as warnings followed by a summary
+
+        :param dangling_links: (list) dangling links as tuples (source page title, tag, link)
+        :return: None
+        """
+        for page_title, tag, link in dangling_links:
+            self.logger.warning("[DXM-51] Dangling link '%s' in '%s' on page '%s'", link, tag, page_title)
+        self.logger.info("[DXM-52] Link check: {} dangling links found".format(len(dangling_links)))
+
+    def _open_page_sinks(self, result_xml_filepath):
+        """ Open page outputs (page_formats) and output check (validate_output) fed with each page while the xml is
+        .. written
+
+        :param result_xml_filepath: (str) File name/path for resultant IOI import xml file. Output names derived from it
+        :return: (PageSinkSet) or None without page_formats and validate_output. Raise DXMLGeneratedError on error
+        """
+        if len(self.page_formats) == 0 and not self.validate_output:
+            return None
+        label_tags = {node_tag for form in self.xml_config_data.values() for node_tag, node in form.items()
+                      if node_tag != 'Attributes' and node['ParsingCode'] == self.PARSE_LABEL}
+        validator = None
+        if self.validate_output:
+            validator = OutputValidator(cached_rules(self.config_xml_filepath,
+                                                     lambda: self.output_rules(self.xml_config_data)))
+        try:
+            return PageSinkSet(self.page_formats, result_xml_filepath, label_tags, validator)
+        except OSError as e:
+            raise DXMLGeneratedError("[DXM-55] Unable to write page output file: {}".format(e))
+
+    @staticmethod
+    def _close_page_sinks(page_sinks):
+        """ Close page outputs opened by _open_page_sinks()
+
+        :param page_sinks: (PageSinkSet) or None
+        :return: None. Raise DXMLGeneratedError on error
+        """
+        if page_sinks is None:
+            return
+        try:
+            page_sinks.close()
+        except OSError as e:
+            raise DXMLGeneratedError("[DXM-55] Unable to write page output file: {}".format(e))
+
+    def _check_links(self):
+        """ Check every 'Link' in the output resolves to a page in the output, DD Wiki export or config.ini
+        .. [PageLinks]. Dangling links are reported as warnings
+
+        :return: (list) dangling links as tuples (source page title, tag, link)
+        """
+        dangling_links = self._new_link_checker().check(self.xml_root)
+        self._report_dangling_links(dangling_links)
+        return dangling_links
 
     def _read_ini_config_data(self):
         """ Read [Resource-Descriptions] and [PageLinks] sections from config.ini to internal dicts {}
@@ -152,14 +489,16 @@ class DictToXML:
         for desc in self.program_config_data['PageLinks']:
             self.page_links[desc] = self.program_config_data['PageLinks'][desc]
 
-    def _read_xml_config_file(self, files_and_folders):
+    @classmethod
+    def _read_xml_config_file(cls, files_and_folders):
         """ Read config file DDWikiImportConfig.xml which describes xlsx input format and xml output format
-        .. Each xml 'Form' node has children describing the fields it can expect based on Confluence page
+        .. Each xml 'Form' node has children describing the fields it can expect based on Confluence page.
+        .. Also used without a DictToXML instance (XMLToXLSX reverse export)
 
         :param files_and_folders: (obj) object containing file locations
         :return: {dict} representation of config file. Raise DXMLGeneratedError on error.
         """
-        config_filename = os.path.join(files_and_folders.config_folder, "DDWikiImportConfig.xml")
+        config_filename = os.path.join(files_and_folders.config_folder, cls.CONFIG_XML_FILENAME)
         try:
             config_tree = xml_tree.parse(config_filename)
         except (IOError, xml_tree.XMLSyntaxError):
@@ -186,18 +525,74 @@ class DictToXML:
                         config[ele.get("Name")][field.get("XMLName")] = {"Sequence": int(field.get("Sequence")),
                                                                          "Value": field.text,
                                                                          "ParsingCode":
-                                                                             int(field.get("ParsingCode", int(self.PARSE_SIMPLE))),
+                                                                             int(field.get("ParsingCode", int(cls.PARSE_SIMPLE))),
                                                                          "ChildTagName": field.get("ChildTagName"),
                                                                          "AutoCompute": field.get("AutoCompute"),
                                                                          "CollectionTemplate": field.get(
                                                                              "CollectionTemplate"),
                                                                          "DefaultValue": field.get("DefaultValue")}
+                        # Labels (PARSE_LABEL) are split once here rather than for every page
+                        if config[ele.get("Name")][field.get("XMLName")]["ParsingCode"] == cls.PARSE_LABEL:
+                            config[ele.get("Name")][field.get("XMLName")]["ValueList"] = \
+                                field.text.split(',') if field.text else []
             except KeyError:
                 raise DXMLGeneratedError("[DXM-01] Ill formed XML in config file: " +
                                          str(config_filename).split('\\')[-1:][0])
 
         return config
 
+    @classmethod
+    def output_rules(cls, xml_config_data):
+        """ Rules for the pages written from each Form (see OutputValidator). A resource field Form also gives its
+        .. NoLookup template (_adjust_resource_page_template) and the CollectionTemplate of its collection field,
+        .. the only template holding that field
+
+        :param xml_config_data: (dict) config read by _read_xml_config_file()
+        :return: (dict) 'templates': {Page_Template: rules}, 'date_formats': [output date formats]
+        """
+        templates = {}
+        for form in xml_config_data.values():
+            page_template = form['Attributes'].get('Page_Template')
+            if page_template is None:
+                continue
+            rules = {'node_type': form['Attributes'].get('Node_Type'), 'fields': [], 'sequence': {},
+                     'label_tags': {}, 'child_tags': {}, 'link_tags': set(), 'link_child_tags': set(),
+                     'id_tags': set(), 'date_tags': set()}
+            collection_fields = []
+            for sequence, node_tag, node in sorted((node['Sequence'], node_tag, node) for node_tag, node in form.items()
+                                                   if node_tag != 'Attributes'):
+                if node['ParsingCode'] == cls.PARSE_FLD_COLLECTION:
+                    collection_fields.append((sequence, node_tag, node['CollectionTemplate']))
+                    continue
+                rules['fields'].append(node_tag)
+                rules['sequence'][node_tag] = sequence
+                if node['ParsingCode'] == cls.PARSE_LABEL:
+                    rules['label_tags'][node_tag] = node['ChildTagName']
+                elif node['ChildTagName'] is not None:
+                    rules['child_tags'][node_tag] = node['ChildTagName']
+                if node['ParsingCode'] in [cls.PARSE_LOOKUP, cls.PARSE_LOOKUP_FIELD]:
+                    rules['link_tags'].add(node_tag)
+                elif node['ParsingCode'] in [cls.PARSE_GROUPS, cls.PARSE_LKP_PROP_REFERENCES,
+                                             cls.PARSE_FLD_REFERENCES]:
+                    rules['link_child_tags'].add(node_tag)
+                elif node['ParsingCode'] in [cls.PARSE_RECORDID, cls.PARSE_LOOKUPID, cls.PARSE_LOOKUP_FLDID]:
+                    rules['id_tags'].add(node_tag)
+                elif node['ParsingCode'] == cls.PARSE_DATETIME:
+                    rules['date_tags'].add(node_tag)
+            templates.setdefault(page_template, rules)
+            template_idx = page_template.find('Resource')
+            if template_idx >= 0:
+                templates.setdefault(page_template[:template_idx] + 'NoLookup' + page_template[template_idx:], rules)
+            for sequence, node_tag, collection_template in collection_fields:
+                if collection_template is None:
+                    continue
+                collection_sequence = dict(rules['sequence'])
+                collection_sequence[node_tag] = sequence
+                templates.setdefault(collection_template, dict(
+                    rules, fields=sorted(collection_sequence, key=collection_sequence.get),
+                    sequence=collection_sequence, link_tags=rules['link_tags'] | {node_tag}))
+        return {'templates': templates, 'date_formats': [cls.OUTPUT_DATETIME_FORMAT, cls.OUTPUT_DATE_FORMAT]}
+
     def _add_date_node(self, parent_node, nodes_from_config, config_node_text, page_title, xlsx_values):
         """ Convert xlsx date into XML date format
 
@@ -208,10 +603,12 @@ class DictToXML:
         :param xlsx_values: dict # Values from xlsx row to be inserted in XML file
         :return: (str) Date Value added to column - or None if error. Raise DXMLGeneratedError on error
         """
+        run_clock = False  # Value set from the run clock (not compared by delta output)
         if nodes_from_config[config_node_text]['AutoCompute'] == 'Y':
             # AutoCompute in a date field only works for ModificationTimestamp
             if config_node_text == 'ModificationTimestamp':
                 val = self.start_datetime_str
+                run_clock = True
             else:
                 raise DXMLGeneratedError("[DXM-02] Cannot resolve AutoCompute Date '{0}' for page {1}".
                                          format(config_node_text, page_title))
@@ -220,8 +617,8 @@ class DictToXML:
             if nodes_from_config[config_node_text]['DefaultValue'] is not None:
                 # string format of "YYYYMMDDTHHMM"
                 val = nodes_from_config[config_node_text]['DefaultValue']
-                if val == "*":  # Use today's date if entry is blank
-                    default_date_str = datetime.datetime.now().strftime(self.DEFAULT_DATE_FORMAT)
+                if val == "*":  # Use today's (run clock) date if entry is blank
+                    default_date_str = self.start_datetime.strftime(self.DEFAULT_DATE_FORMAT)
                 else:
                     default_date_str = val
             else:
@@ -235,6 +632,7 @@ class DictToXML:
                 if dte_val is None or (isinstance(dte_val, str) and len(dte_val) == 0):
                     if default_date_str is not None:
                         dte_val = default_date_str
+                        run_clock = val == '*'
                     else:
                         # if cell empty and no default xlsx_values, error
                         raise DXMLGeneratedError(dte_err)
@@ -243,6 +641,7 @@ class DictToXML:
                     raise DXMLGeneratedError(dte_err)  # Cell is missing in xlsx and no default value
                 else:
                     dte_val = default_date_str  # Cell is missing in xlsx, but default value stated
+                    run_clock = val == '*'
 
             if not isinstance(dte_val, datetime.date):
                 if not isinstance(dte_val, str):
@@ -262,18 +661,20 @@ class DictToXML:
                 val = dte_val.strftime(self.date_format_withtime)
         dte_node = xml_tree.SubElement(parent_node, config_node_text)
         dte_node.text = val
+        if run_clock and self.export_page_index is not None:
+            dte_node.set(ExportPageIndex.RUN_CLOCK_ATTRIBUTE, 'Y')  # Removed by prune_unchanged
         return val
 
-    def _add_label_sub_nodes(self, node_tag, sub_node_tag, sub_node_value_str):
+    def _add_label_sub_nodes(self, node_tag, sub_node_tag, sub_node_values):
         """ Create xml parent/child tags for Labels
 
         :param node_tag (str):  parent 'Label' Node tag (s.b. 'Labels')
         :param sub_node_tag (str): Child node tag names (s.b. 'Labels')
-        :param sub_node_value_str (str): Child node values separated by commas
+        :param sub_node_values (list): Child node values
         :return parent node:
         """
         parent_node = xml_tree.Element(node_tag)
-        for sub_value_str in sub_node_value_str.split(','):
+        for sub_value_str in sub_node_values:
             sub_node = xml_tree.SubElement(parent_node, sub_node_tag)
             sub_node.text = sub_value_str
         return parent_node
@@ -283,9 +684,12 @@ class DictToXML:
 
         :param node_tag (str):  parent of Resource 'Groups' Node tag (s.b. Groupings)
         :param sub_node_tag (str): child of node_tag (s.b. 'Group')
-        :param sub_node_value_str (str): Child node values separated by commas
+        :param sub_node_value_str (list): Child node values (xlsx 'Groups' column split into a list)
         :return node_tag xml:
         """
+        cache_key = ('group', node_tag, sub_node_tag, tuple(sub_node_value_str))
+        if cache_key in self.sub_node_cache:
+            return copy.deepcopy(self.sub_node_cache[cache_key])
         parent_node = xml_tree.Element(node_tag)
         for sub_value_str in sub_node_value_str:
             if sub_value_str in self.page_links:
@@ -294,7 +698,8 @@ class DictToXML:
                 page_link = sub_value_str
             sub_node = xml_tree.SubElement(parent_node, sub_node_tag, {'Link': page_link})
             sub_node.text = page_link
-        return parent_node
+        self.sub_node_cache[cache_key] = parent_node
+        return copy.deepcopy(parent_node)
 
     def _add_linked_sub_nodes(self, node_tag, sub_node_tag, tag_value, page_title):
         """ Translate xlsx columns into appropriate text for xml Lookup page links
@@ -306,10 +711,14 @@ class DictToXML:
         :param page_title (str): Current ddwiki page being processed (needed for error reporting)
         :return: None. Raise DXMLGeneratedError on error
         """
-        parent_node = xml_tree.Element(node_tag)
         if tag_value is None:
             raise DXMLGeneratedError("[DXM-45] Found Null/Empty Value for Reference within column '{}' on page '{}'".
-                                     format(parent_node.tag, page_title))
+                                     format(node_tag, page_title))
+        # Same xlsx value is validated and resolved once (a bad value stops the run at its first page)
+        cache_key = ('linked', node_tag, sub_node_tag, tag_value)
+        if cache_key in self.sub_node_cache:
+            return copy.deepcopy(self.sub_node_cache[cache_key])
+        parent_node = xml_tree.Element(node_tag)
         for ref_text in tag_value.replace(' ', '').split(','):
             try:
                 new_node = xml_tree.SubElement(parent_node, sub_node_tag, {'Link': self.page_links[ref_text]})
@@ -318,7 +727,8 @@ class DictToXML:
                           "Check section PageLinks in config.ini"
                 raise DXMLGeneratedError(err_msg.format(ref_text, parent_node.tag, page_title))
             new_node.text = ref_text
-        return parent_node
+        self.sub_node_cache[cache_key] = parent_node
+        return copy.deepcopy(parent_node)
 
     def _add_reference_sub_nodes(self, node_tag, sub_node_tag, tag_value):
         """ Translate xlsx columns into appropriate text for xml reference tag page links
@@ -329,15 +739,19 @@ class DictToXML:
         :param xlsx_values (str): Child node values separated by comma
         :return: None. Raise DXMLGeneratedError on error
         """
-        parent_node = xml_tree.Element(node_tag)
         if tag_value is None:
-            raise DXMLGeneratedError("[DXM-37] Found Null/Empty Value for Reference within {}".format(parent_node.tag))
+            raise DXMLGeneratedError("[DXM-37] Found Null/Empty Value for Reference within {}".format(node_tag))
+        cache_key = ('reference', node_tag, sub_node_tag, tag_value)
+        if cache_key in self.sub_node_cache:
+            return copy.deepcopy(self.sub_node_cache[cache_key])
+        parent_node = xml_tree.Element(node_tag)
         for ref_text in tag_value.replace(' ', '').split(','):
             # low: Reference column values that are not unique page names will not work.
             new_node = xml_tree.SubElement(parent_node, sub_node_tag, {'Link': ref_text + ' Field'})
             # Adding ' Field' to visual field for clarity
             new_node.text = ref_text + ' Field'
-        return parent_node
+        self.sub_node_cache[cache_key] = parent_node
+        return copy.deepcopy(parent_node)
 
     def _sort_nodes(self, config_element):
         """ Sort so metadata elements (within a page) appear always in same order
@@ -376,10 +790,33 @@ class DictToXML:
         if item_name in self.field_and_lookup_names:
             page_title = item_name + ' (' + dup_qualifier + ') ' + suffix
         else:
-            self.field_and_lookup_names.append(item_name)
+            if self.near_dup_threshold is not None:
+                self._check_near_duplicate(item_name, full_page_title)
+            self.field_and_lookup_names.add(item_name)
             page_title = full_page_title
         return page_title
 
+    def _check_near_duplicate(self, item_name, page_title):
+        """ Warn when a new field/lookup value name nearly matches (case, spaces, a few characters) a DD Wiki export
+        .. name or an earlier xlsx name. Exact matches are handled by _make_page_title
+
+        :param item_name: (str) field or lookup value name not yet in field_and_lookup_names
+        :param page_title: (str) page title of the new name
+        :return: None
+        """
+        if self.near_dup_index is None:
+            self.near_dup_index = NearDuplicateIndex(threshold=self.near_dup_threshold)
+            for name in sorted(name for name in self.field_and_lookup_names if name):
+                self.near_dup_index.add(name)
+            self.near_dup_export_count = len(self.near_dup_index)
+        for similar_name, score in self.near_dup_index.similar(item_name):
+            origin = 'DD Wiki export' if self.near_dup_index.title_ids[similar_name] < self.near_dup_export_count \
+                else 'xlsx'
+            self.near_duplicates.append((item_name, similar_name, score))
+            self.logger.warning("[DXM-53] Near duplicate name '%s' (page '%s') ~ '%s' in %s (similarity %s)",
+                                item_name, page_title, similar_name, origin, score)
+        self.near_dup_index.add(item_name)
+
     def _adjust_resource_page_template(self, this_node):
         """ Non lookups fields use page template PropNoLookupResourceTemplate or
             OtherNoLookupResourceTemplate
@@ -405,10 +842,14 @@ class DictToXML:
         :param nodes_from_config (dict): config dictionary which describes how to handle all fields
         :param value (str or dict): Value (autocompute - str) or from xlsx (dict)
         :param other_page_title (str): Preferred Page Title
-        :param replace_labels (str): optional labels separated by commas
+        :param replace_labels (list): optional labels used in place of labels in config
         :param resource_name: optional String used to make page title unique
         :return (xml node): Node added to XML structure and children. Raise DXMLGeneratedError on error
+        .. (None in register_only mode)
         """
+        if self.register_only:
+            self._register_page(nodes_from_config, value, other_page_title, resource_name)
+            return None
         if other_page_title is None:
             page_title = nodes_from_config['Attributes']['Page_Title'].strip()
         else:
@@ -418,6 +859,8 @@ class DictToXML:
                  'Page_Title': self._make_page_title(page_title, resource_name,
                                                      nodes_from_config['Attributes']['Page_Template'])}
         prime_node = xml_tree.SubElement(parent_node, nodes_from_config['Attributes']['Node_Type'], attrib=attrs)
+        labels_node = None
+        extra_labels = []  # Labels derived from page values (lookup link, property classes)
         sorted_nodes = self._sort_nodes(nodes_from_config)  # Sort by nodes_from_config Sequence attribute
         # Loop through xml nodes in config file DDWikiImportConfig.xml to create final IOI xml nodes for output
         for config_node_list in sorted_nodes:
@@ -425,15 +868,16 @@ class DictToXML:
             # Nodes attributes from XML are placed into the dict{} (attributes already added above)
             if config_node_text != 'Attributes' and config_node_text not in self.IGNORE_FIELDS:
                 if nodes_from_config[config_node_text]['ParsingCode'] == self.PARSE_LABEL:  # (1) Parse Child Nodes
-                    # labels in a str separated by commas
+                    # labels as a list (split from comma separated config value)
                     if replace_labels is None:
-                        lbls = nodes_from_config[config_node_text]['Value']
+                        lbls = nodes_from_config[config_node_text]['ValueList']
                     else:
                         lbls = replace_labels
-                    prime_node.append(self._add_label_sub_nodes(node_tag=config_node_text,
-                                                                sub_node_tag=nodes_from_config[config_node_text][
-                                                                    'ChildTagName'],
-                                                                sub_node_value_str=lbls))
+                    labels_node = self._add_label_sub_nodes(node_tag=config_node_text,
+                                                            sub_node_tag=nodes_from_config[config_node_text][
+                                                                'ChildTagName'],
+                                                            sub_node_values=lbls)
+                    prime_node.append(labels_node)
                 # (0) Grab value from xlsx dict
                 elif nodes_from_config[config_node_text]['ParsingCode'] == self.PARSE_SIMPLE:
                     # val = page_title.replace(' ', '_').lower()
@@ -488,10 +932,14 @@ class DictToXML:
                         raise DXMLGeneratedError(
                             "[DXM-40] Unable to Find Column '{}' in spreadsheet for page:{}".
                                 format(nodes_from_config[config_node_text]['Value'], page_title))
-                    prime_node.append(self._add_linked_sub_nodes(node_tag=config_node_text,
+                    linked_node = self._add_linked_sub_nodes(node_tag=config_node_text,
                                                     sub_node_tag=nodes_from_config[config_node_text]['ChildTagName'],
                                                     tag_value=value[nodes_from_config[config_node_text]['Value']],
-                                                                 page_title=page_title))
+                                                             page_title=page_title)
+                    prime_node.append(linked_node)
+                    # Create labels for each property class applied to this field
+                    if config_node_text == 'Property_Types':
+                        extra_labels.extend('prop_' + cls.text for cls in linked_node)
                 # (5) Resource field 'Group' with Links
                 elif nodes_from_config[config_node_text]['ParsingCode'] == self.PARSE_GROUPS:
                     prime_node.append(self._add_group_sub_nodes(config_node_text,
@@ -516,6 +964,8 @@ class DictToXML:
                             if val[-8:] != ' Lookups':
                                 val += ' Lookups'       # Lookup field is title + ' Lookups'
                             attrib = {'Link': val}
+                            lookup_field_name = val[:-8]
+                            self._check_lookup_reference(lookup_field_name, page_title)
                         if val[0] == '<':           # Do NOT use lookup template when comment present
                             atr = prime_node.attrib['Page_Template']
                             # Not sure if this logic is used anymore
@@ -530,12 +980,15 @@ class DictToXML:
                         # ... OtherNoLookupResourceTemplate
                         self._adjust_resource_page_template(this_node=prime_node)
                         if val != '<n/a>' and val is not None:
-                            self.logger.warning("[DXM-41] Lookup Value should be n/a for col '{}' on page '{}'" 
-                                                "in resource {} due to SimpleDataType".
-                                                format(config_node_text, page_title, resource_name))
+                            self.logger.warning("[DXM-41] Lookup Value should be n/a for col '%s' on page '%s'"
+                                                "in resource %s due to SimpleDataType",
+                                                config_node_text, page_title, resource_name)
                         val = '<n/a>'  # Force n/a for non lookups w/no comments
                     new_node = xml_tree.SubElement(prime_node, config_node_text, attrib)
                     new_node.text = entities(val, 'hex')
+                    # Need to create a label for a Multi/Single select (lookup) field
+                    if attrib is not None and len(new_node.text) > 0:
+                        extra_labels.append(attrib['Link'].replace(' ', '_'))
                 # (7) Resource 'Lookup_Status' Field
                 elif nodes_from_config[config_node_text]['ParsingCode'] == self.PARSE_LOOKUP_STATUS:
                     try:
@@ -567,45 +1020,15 @@ class DictToXML:
                     new_node = xml_tree.SubElement(prime_node, config_node_text, attrib)
                     new_node.text = val
                 elif nodes_from_config[config_node_text]['ParsingCode'] == self.PARSE_LOOKUPID:
-                    lookup_field_name = value[nodes_from_config['Lookup_Field']['Value']]
-                    # If LookupID is not in xlsx then it will be computed
-                    try:
-                        lookupid_value = value[nodes_from_config[config_node_text]['Value']]
-                    except KeyError:
-                        lookupid_value = None
-                    if lookupid_value is None or len(lookupid_value) == 0:
-                        lookupid_value = self._compute_lookupid(lookup_field_name=lookup_field_name)
-                        if lookupid_value < 0:
-                            raise DXMLGeneratedError("[DXM-15] Program can only accomodate max 999 lookup values {}:{}".
-                                        format(lookup_field_name, value[nodes_from_config['Lookup_Value']['Value']]))
                     new_node = xml_tree.SubElement(prime_node, config_node_text)
-                    new_node.text = str(lookupid_value)
+                    new_node.text = str(self._lookupid_value(nodes_from_config, config_node_text, value))
                 elif nodes_from_config[config_node_text]['ParsingCode'] == self.PARSE_LOOKUP_FLDID:
-                    # (3/30/2017) This can be reached from a lookup field and a lookup value. column names differ
-                    # (3/30/2017) lookup_fieldid_value MUST be computed and not taken from spreadsheet
-                    lookup_fieldid_value = None
-                    if attrs['Page_Template'] == 'LookupFieldTemplate':
-                        lookup_field_name = attrs['Page_Title'].replace(' Lookups', '')
-                    else:
-                        lookup_field_name = value[nodes_from_config['Lookup_Field']['Value']]
-                        # lookup_fieldid_value = value[nodes_from_config[config_node_text]['Value']]
-                    if lookup_fieldid_value is None or len(lookup_fieldid_value) == 0:
-                        lookup_fieldid_value = self._compute_lookup_fieldid(lookup_field_name=lookup_field_name)
                     new_node = xml_tree.SubElement(prime_node, config_node_text)
-                    new_node.text = str(lookup_fieldid_value)
+                    new_node.text = str(self._lookup_fieldid_value(nodes_from_config, value, attrs))
                 elif nodes_from_config[config_node_text]['ParsingCode'] == self.PARSE_RECORDID:
-                    # If field_name is not in xlsx then it will be computed
-                    try:
-                        recordid_value = value[nodes_from_config[config_node_text]['Value']]
-                    except KeyError:
-                        recordid_value = None
-                    if recordid_value is None or len(recordid_value) == 0:
-                        recordid_value = self._compute_recordid(resource_name=resource_name)
-                        if recordid_value < 0:
-                            raise DXMLGeneratedError("[DXM-18] Program has max 999 recordid values for resource {}".
-                                                     format(resource_name))
                     new_node = xml_tree.SubElement(prime_node, config_node_text)
-                    new_node.text = str(recordid_value)
+                    new_node.text = str(self._recordid_value(nodes_from_config, config_node_text, value,
+                                                             resource_name))
                 # (13) Parse Reference columns in Resource (collections)
                 elif nodes_from_config[config_node_text]['ParsingCode'] == self.PARSE_FLD_REFERENCES:
                     prime_node.append(self._add_reference_sub_nodes(node_tag=config_node_text,
@@ -644,81 +1067,171 @@ class DictToXML:
                         self.logger.warning("[DXM-06] No Program Code for {0} in page {1}".
                                         format(config_node_text, page_title))
                         self.report_warning = False
+        # Add additional labels derived while building this page
+        if labels_node is not None:
+            for lbl in extra_labels:
+                label_node = xml_tree.SubElement(labels_node, 'Label')
+                label_node.text = lbl.lower()
         return prime_node
 
-    def _compute_lookupid(self, lookup_field_name):
-        """ Compute max lookupid for the lookup value.  Each lookupfield id is incremented by 1000.
-        .. Hence (in this program) the max # of lookup values in a lookup field is 1000
+    def _lookupid_value(self, nodes_from_config, config_node_text, value):
+        """ LookupID of a lookup value page. Taken from xlsx or computed
+
+        :param nodes_from_config: (dict) config of page
+        :param config_node_text: (str) LookupID node name
+        :param value: (dict) xlsx row
+        :return: (int or str) LookupID. Raise DXMLGeneratedError on error
+        """
+        lookup_field_name = value[nodes_from_config['Lookup_Field']['Value']]
+        # If LookupID is not in xlsx then it will be computed
+        try:
+            lookupid_value = value[nodes_from_config[config_node_text]['Value']]
+        except KeyError:
+            lookupid_value = None
+        if lookupid_value is None or len(lookupid_value) == 0:
+            lookupid_value = self._compute_lookupid(lookup_field_name=lookup_field_name,
+                                                    lookup_value=value[nodes_from_config['Lookup_Value']['Value']])
+        return lookupid_value
+
+    def _lookup_fieldid_value(self, nodes_from_config, value, attrs):
+        """ LookupFieldID of a lookup field or lookup value page. Always computed
+
+        :param nodes_from_config: (dict) config of page
+        :param value: (dict) xlsx row (lookup value page)
+        :param attrs: (dict) page attributes (Page_Template, Page_Title)
+        :return: (int) LookupFieldID. Raise DXMLGeneratedError on error
+        """
+        # (3/30/2017) This can be reached from a lookup field and a lookup value. column names differ
+        # (3/30/2017) lookup_fieldid_value MUST be computed and not taken from spreadsheet
+        if attrs['Page_Template'] == 'LookupFieldTemplate':
+            lookup_field_name = attrs['Page_Title'].replace(' Lookups', '')
+        else:
+            lookup_field_name = value[nodes_from_config['Lookup_Field']['Value']]
+        return self._compute_lookup_fieldid(lookup_field_name=lookup_field_name)
+
+    def _recordid_value(self, nodes_from_config, config_node_text, value, resource_name):
+        """ RecordID of a resource field page. Taken from xlsx or computed
+
+        :param nodes_from_config: (dict) config of page
+        :param config_node_text: (str) RecordID node name
+        :param value: (dict) xlsx row
+        :param resource_name: (str) resource name
+        :return: (int or str) RecordID. Raise DXMLGeneratedError on error
+        """
+        # If field_name is not in xlsx then it will be computed
+        try:
+            recordid_value = value[nodes_from_config[config_node_text]['Value']]
+        except KeyError:
+            recordid_value = None
+        if recordid_value is None or len(recordid_value) == 0:
+            recordid_value = self._compute_recordid(resource_name=resource_name,
+                                                    field_name=value.get(self.STANDARD_NAME_COLUMN))
+        return recordid_value
+
+    def _register_page(self, nodes_from_config, value='', other_page_title=None, resource_name=''):
+        """ Walk a page that is not output (build targets) with the same side effects as _add_xml_nodes:
+        .. the unique page title is registered and IDs are computed, so later pages get the IDs and titles of a
+        .. full build
+
+        :param nodes_from_config: (dict) config dictionary which describes how to handle all fields
+        :param value: (str or dict): Value (autocompute - str) or from xlsx (dict)
+        :param other_page_title: (str) Preferred Page Title
+        :param resource_name: optional String used to make page title unique
+        :return: None. Raise DXMLGeneratedError on error
+        """
+        if other_page_title is None:
+            page_title = nodes_from_config['Attributes']['Page_Title'].strip()
+        else:
+            page_title = other_page_title.strip()
+        attrs = {'Page_Template': nodes_from_config['Attributes']['Page_Template'],
+                 'Page_Title': self._make_page_title(page_title, resource_name,
+                                                     nodes_from_config['Attributes']['Page_Template'])}
+        self.registered_page_titles.add(attrs['Page_Title'])
+        if self.register_titles_only:
+            return  # IDs of pages after the last build target are not needed (no ledger reservations)
+        for config_node_list in self._sort_nodes(nodes_from_config):
+            config_node_text = config_node_list[1]
+            if config_node_text == 'Attributes' or config_node_text in self.IGNORE_FIELDS:
+                continue
+            if nodes_from_config[config_node_text]['ParsingCode'] == self.PARSE_LOOKUPID:
+                self._lookupid_value(nodes_from_config, config_node_text, value)
+            elif nodes_from_config[config_node_text]['ParsingCode'] == self.PARSE_LOOKUP_FLDID:
+                self._lookup_fieldid_value(nodes_from_config, value, attrs)
+            elif nodes_from_config[config_node_text]['ParsingCode'] == self.PARSE_RECORDID:
+                self._recordid_value(nodes_from_config, config_node_text, value, resource_name)
+
+    def _compute_lookupid(self, lookup_field_name, lookup_value=None):
+        """ Compute next lookupid for the lookup value in the ID blocks of the lookup field (IDBlockAllocator).
+        .. A full block is followed by an extension block, so a lookup field is not limited to 998 values
 
         :param lookup_field_name: (str) Lookup Field name to determine max lookup id for that field
-        :return: (int) Highest lookupid for tht field.
+        :param lookup_value: (str) Lookup value (page key in id ledger)
+        :return: (int) lookupid. Raise LedgerGeneratedError on id ledger error
         """
         # If the lookup field doesn't already exist create new lookup field id#
         self._add_lookup_fieldid(lookup_field_name)
-
-        if (self.max_lookupids[lookup_field_name] + 1) % 1000 > 998:
-            return -1  # Program can only accomodate max 999 lookup values
-        self.max_lookupids[lookup_field_name] += 1
-        return self.max_lookupids[lookup_field_name]
+        lookupid = self.id_blocks.next_id(IDBlockAllocator.LOOKUPID, lookup_field_name,
+                                          self.max_lookupids[lookup_field_name], lookup_value)
+        if self.id_ledger is None:  # With a ledger max_lookupids stay as read (ids are reserved from the ledger)
+            self.max_lookupids[lookup_field_name] = lookupid
+        self.max_id = max(self.max_id, lookupid)
+        return lookupid
 
     def _compute_lookup_fieldid(self, lookup_field_name):
-        """ Compute the lookup field id for given lookup field
+        """ Compute the lookup field id for given lookup field: 1st id of its home ID block
 
         :param lookup_field_name:
         :return: (int) LookupFieldID. Raise DXMLGeneratedError on error
         """
         # If the lookup field doesn't already exist create new lookup field id#
         self._add_lookup_fieldid(lookup_field_name)
-        try:
-            return self.max_lookupids[lookup_field_name] - (self.max_lookupids[lookup_field_name] % 1000)
-        except TypeError:
-            print("? Issue with " + lookup_field_name)
-            raise DXMLGeneratedError("[DXM-25] Computing max field lookupid issue witn {}.".format(lookup_field_name))
+        return self.id_blocks.base(IDBlockAllocator.LOOKUPID, lookup_field_name)
 
-    def _compute_recordid(self, resource_name):
-        """ Compute max recordid for the lookup value.  Each lookupfield id is incremented by 1000.
-        .. Hence (in this program) the max # of lookup values in a lookup field is 1000
+    def _compute_recordid(self, resource_name, field_name=None):
+        """ Compute next recordid for the field in the ID blocks of the resource (IDBlockAllocator).
+        .. A full block is followed by an extension block, so a resource is not limited to 999 fields
 
-        :param resource_name: (str) Field name to determine max lookup id for that field
-        :return: (int) Highest lookupid for tht field. Raise DXMLGeneratedError on error
+        :param resource_name: (str) Resource name to determine max record id for that resource
+        :param field_name: (str) StandardName of field (page key in id ledger)
+        :return: (int) recordid. Raise LedgerGeneratedError on id ledger error
         """
-        # If the lookup field doesn't already exist create new lookup field id#
+        # If the resource doesn't already exist create new record id base
         self._add_recordid(resource_name)
-
-        if (self.max_recordids[resource_name] + 1) % 1000 > 999:
-            raise DXMLGeneratedError("[DXM-29] This program only allows a max of 999 fields in resouce {}.".
-                                     format(resource_name))
-
-        self.max_recordids[resource_name] += 1
-        return self.max_recordids[resource_name]
+        recordid = self.id_blocks.next_id(IDBlockAllocator.RECORDID, resource_name, self.max_recordids[resource_name],
+                                          field_name)
+        if self.id_ledger is None:  # With a ledger max_recordids stay as read (ids are reserved from the ledger)
+            self.max_recordids[resource_name] = recordid
+        self.max_id = max(self.max_id, recordid)
+        return recordid
 
     def _add_lookup_fieldid(self, lookup_field_name):
-        """ If the lookup field doesn't already exist create new lookup field id#
+        """ If the lookup field doesn't already exist create new lookup field id# (home ID block)
 
         :param lookup_field_name: (str) lookup field name
-        :return: (int) LookupFieldID
+        :return: None. Raise DXMLGeneratedError if the ID blocks of the lookup field are unknown
         """
+        self._check_id_scope_placed(IDBlockAllocator.LOOKUPID, lookup_field_name)
         if lookup_field_name not in self.max_lookupids:
-            # If the lookup field doesn't already exist create new lookup field id#
-            self.max_id = self.max_id - (self.max_id % 1000) + 1000
-            self.max_lookupids[lookup_field_name] = self.max_id
-            self.logger.info(
-                "[DXM-43] Creating Base Max Lookup Field ID for '{}' with value {}".
-                    format(lookup_field_name, self.max_id))
+            # Same base in every conversion sharing the ledger
+            self.max_lookupids[lookup_field_name] = self.id_blocks.new_scope(IDBlockAllocator.LOOKUPID,
+                                                                             lookup_field_name)
+            self.max_id = max(self.max_id, self.max_lookupids[lookup_field_name])
+            self.logger.info("[DXM-43] Creating Base Max Lookup Field ID for '%s' with value %s",
+                             lookup_field_name, self.max_lookupids[lookup_field_name])
 
     def _add_recordid(self, resource_name):
-        """ If the resource name doesn't already exist create new field id#
+        """ If the resource name doesn't already exist create new field id# (home ID block)
 
-        :param resource_name: (str) lookup field name
-        :return: (int) RecordID
+        :param resource_name: (str) resource name
+        :return: None. Raise DXMLGeneratedError if the ID blocks of the resource are unknown
         """
+        self._check_id_scope_placed(IDBlockAllocator.RECORDID, resource_name)
         if resource_name not in self.max_recordids:
-            # If the lookup field doesn't already exist create new lookup field id#
-            self.max_id = self.max_id - (self.max_id % 1000) + 1000
-            self.max_recordids[resource_name] = self.max_id
-            self.logger.info(
-                "[DXM-42] Creating Base Max RecordID for resource '{}' with value {}".
-                    format(resource_name, self.max_id))
+            # Same base in every conversion sharing the ledger
+            self.max_recordids[resource_name] = self.id_blocks.new_scope(IDBlockAllocator.RECORDID, resource_name)
+            self.max_id = max(self.max_id, self.max_recordids[resource_name])
+            self.logger.info("[DXM-42] Creating Base Max RecordID for resource '%s' with value %s",
+                             resource_name, self.max_recordids[resource_name])
 
     def _create_resource_nodes(self, parent_xml_node, sheet_tab_name, resource_name,
                                group_name, level_key, config_form_name):
@@ -734,53 +1247,30 @@ class DictToXML:
         """
         # Get info on Node. This is a treelib variable
         this_node = self.resource_tree.get_node(level_key)
-        # Top level is Resource lower levels are Group
-        if self.resource_tree.depth(this_node) == 0:
-            node_type = 'Resource'
-            if group_name in self.page_links:
-                page_title = self.page_links[group_name]
-            else:
-                page_title = \
-                    self.xml_config_data["Resource"]['Attributes']['Page_Title'].replace('[[Name]]', group_name)
-        else:
-            node_type = 'Group'
-            page_title = \
-                self.xml_config_data["Group"]['Attributes']['Page_Title'].replace('[[Name]]', group_name)
+        # Build targets: pages not selected are only walked (register_only). The group page is output when
+        # .. selected or parent of a selected group. Its items are output when selected
+        caller_register_only = self.register_only
+        group_register_only = item_register_only = caller_register_only
+        if self.build_targets is not None and not caller_register_only:
+            group_path = tuple(level_key.split(','))
+            group_register_only = not self.build_targets.path_on_route(sheet_tab_name, group_path)
+            item_register_only = not self.build_targets.path_selected(sheet_tab_name, group_path)
+        self.register_only = group_register_only
         # Add Group or Resource Node (Items are underneath)
-        this_level_xml_node = self._add_xml_nodes(parent_node=parent_xml_node,
-                                                  nodes_from_config=self.xml_config_data[node_type],
-                                                  other_page_title=page_title,
-                                                  resource_name=resource_name)
+        this_level_xml_node = self._add_group_node(parent_xml_node=parent_xml_node,
+                                                   depth=self.resource_tree.depth(this_node),
+                                                   group_name=group_name,
+                                                   resource_name=resource_name)
         # Add item nodes underneath Group or Resource node as added above
         if level_key in self.spreadsheet_data['Resources'][sheet_tab_name]:
             # self.spreadsheet_data['Resources'][resource_name][level_key] returns a list [] of dict items
             # itemgetter() := Return a callable object that fetches item from its operand using  __getitem__()
             sorted_item_nodes = sorted(self.spreadsheet_data['Resources'][sheet_tab_name][level_key],
                              key=itemgetter(self.STANDARD_NAME_COLUMN))
+            self.register_only = item_register_only
             for item_node in sorted_item_nodes:
-                item_name = item_node[self.STANDARD_NAME_COLUMN]
-                page_title = \
-                    self.xml_config_data[config_form_name]['Attributes']['Page_Title'].replace('[[Name]]', item_name)
-                new_node = self._add_xml_nodes(this_level_xml_node,
-                                               nodes_from_config=self.xml_config_data[config_form_name],
-                                               other_page_title=page_title,
-                                               value=item_node,
-                                               resource_name=resource_name)
-                # Add additional labels
-                labels_node = new_node.find('Labels')
-                extra_labels = []
-                # Need to create a label for a Multi/Single select (lookup) field
-                lkup_node = new_node.find('Lookup')
-                if lkup_node is not None and len(lkup_node.text) > 0 and 'Link' in lkup_node.attrib:
-                    extra_labels.append(lkup_node.attrib['Link'].replace(' ', '_').lower())
-                prop_node = new_node.find('Property_Types')
-                # Create labels for each property class applied to this field
-                if prop_node is not None:
-                    for cls in prop_node.findall('Class'):
-                        extra_labels.append('prop_' + cls.text)
-                for lbl in extra_labels:
-                    label_node = xml_tree.SubElement(labels_node, 'Label')
-                    label_node.text = lbl.lower()
+                self._add_item_node(this_level_xml_node, config_form_name, item_node, resource_name)
+            self.register_only = group_register_only
         # Add Children Items and Groups (recursion)
         try:
             child_nodes = self.resource_tree.children(level_key)
@@ -795,6 +1285,51 @@ class DictToXML:
                                         group_name=child_node.tag,
                                         level_key=level_key + ',' + child_node.tag,
                                         config_form_name= config_form_name)
+        self.register_only = caller_register_only
+
+    def _add_group_node(self, parent_xml_node, depth, group_name, resource_name):
+        """ Add Resource (top level) or Group page node. Items are added underneath
+
+        :param parent_xml_node: Parent node for new node created
+        :param depth: (int) Level in resource tree (0 is resource)
+        :param group_name: (str) Name of group node
+        :param resource_name: (str) Name of top resource as it appears in output xml
+        :return: (xml node) Node added. Raise DXMLGeneratedError on error
+        """
+        # Top level is Resource lower levels are Group
+        if depth == 0:
+            node_type = 'Resource'
+            if group_name in self.page_links:
+                page_title = self.page_links[group_name]
+            else:
+                page_title = \
+                    self.xml_config_data["Resource"]['Attributes']['Page_Title'].replace('[[Name]]', group_name)
+        else:
+            node_type = 'Group'
+            page_title = \
+                self.xml_config_data["Group"]['Attributes']['Page_Title'].replace('[[Name]]', group_name)
+        return self._add_xml_nodes(parent_node=parent_xml_node,
+                                   nodes_from_config=self.xml_config_data[node_type],
+                                   other_page_title=page_title,
+                                   resource_name=resource_name)
+
+    def _add_item_node(self, parent_xml_node, config_form_name, item_row, resource_name):
+        """ Add resource field (Item) page node
+
+        :param parent_xml_node: Group or Resource node the item belongs to
+        :param config_form_name: (str) Name attribute value in DDWikiImportConfig.xml which defines fields that apply
+        :param item_row: (dict) xlsx row
+        :param resource_name: (str) Name of top resource as it appears in output xml
+        :return: (xml node) Node added. Raise DXMLGeneratedError on error
+        """
+        page_title = self.xml_config_data[config_form_name]['Attributes']['Page_Title'].replace(
+            '[[Name]]', item_row[self.STANDARD_NAME_COLUMN])
+        self.progress.advance()
+        return self._add_xml_nodes(parent_xml_node,
+                                   nodes_from_config=self.xml_config_data[config_form_name],
+                                   other_page_title=page_title,
+                                   value=item_row,
+                                   resource_name=resource_name)
 
     def _build_resource_tree(self, sheet_tab_name):
         """ Create a tree structure (using treelib) for resource to mimic final output DD Wiki xml structure
@@ -804,7 +1339,9 @@ class DictToXML:
         """
         self.resource_tree = Tree()  # Tree() from treelib
         try:
-            resource_levels = sorted(self.spreadsheet_data['Resources'][sheet_tab_name].keys())
+            # Groups path order (not joined string order) so a Group is followed by its own sub Groups
+            resource_levels = sorted(self.spreadsheet_data['Resources'][sheet_tab_name].keys(),
+                                     key=lambda level_key: level_key.split(','))
         except (TypeError, KeyError):
             raise DXMLGeneratedError("[DXM-27] Spreadsheet tab '{}' has blank lines or is unstructured".
                                      format(sheet_tab_name))
@@ -829,6 +1366,17 @@ class DictToXML:
                 parent_id = node_id
         # self.resource_tree.show() - debug
 
+    def _check_lookup_reference(self, lookup_field_name, page_title):
+        """ Warn when a field refers to a lookup field that is neither in the lookup sheet nor in the DD Wiki export
+
+        :param lookup_field_name: (str) lookup field name from xlsx 'Lookup' column
+        :param page_title: (str) page title of field referring to lookup
+        :return: None
+        """
+        if lookup_field_name not in self.lookup_index and lookup_field_name not in self.field_and_lookup_names:
+            self.logger.warning("[DXM-50] Lookup '%s' on page '%s' not found in lookup sheet or DD Wiki export",
+                                lookup_field_name, page_title)
+
     def _get_item_form_name(self, resource_name):
         """ Determine correct 'Form Name' in DDWikiImportConfig.xml to understand which fields are required in xlsx
 
@@ -855,73 +1403,149 @@ class DictToXML:
         :return (boolean): True/False on successful execution
         """
         # Resource sheets to grab from xlsx defined in config.ini
-        for sheet_tab_name in self.program_config_data['ResourceSheets']:
-            resource_name = self.program_config_data['ResourceSheets'][sheet_tab_name]
-            self.logger.info("Processing Input Lookup Worksheet: '{}' for resource: '{}'".
-                             format(sheet_tab_name, resource_name))
-            # Build a tree structure for each resource which dups how the XML will be shaped
-            self._build_resource_tree(sheet_tab_name=sheet_tab_name)
-
-            self._create_resource_nodes(parent_xml_node=self.xml_root,
-                                        sheet_tab_name=sheet_tab_name,
-                                        resource_name=resource_name,
-                                        group_name=resource_name,
-                                        level_key=resource_name,
-                                        config_form_name=self._get_item_form_name(resource_name))
+        sheet_tab_names = list(self.program_config_data['ResourceSheets'])
+        titles_only_from = len(sheet_tab_names)
+        if self.build_targets is not None and not self.build_targets.has_lookup_targets():
+            # Pages after the last selected resource do not change IDs or titles of selected pages. Only their
+            # .. titles are registered (links of selected pages are checked against them)
+            targeted_sheets = [idx for idx, sheet_tab_name in enumerate(sheet_tab_names) if self.build_targets.
+                               has_resource_targets(sheet_tab_name, self.program_config_data['ResourceSheets'][
+                                   sheet_tab_name])]
+            titles_only_from = targeted_sheets[-1] + 1 if len(targeted_sheets) > 0 else 0
+        for sheet_index, sheet_tab_name in enumerate(sheet_tab_names):
+            self.register_only = self.register_titles_only = sheet_index >= titles_only_from
+            self._create_resource_sheet(self.xml_root, sheet_tab_name)
+        self.register_only = self.register_titles_only = False
         return True
 
-    def _create_lookups(self):
+    def _create_resource_sheet(self, parent_xml_node, sheet_tab_name):
+        """ Build XML nodes of one resource/collection sheet
+
+        :param parent_xml_node: Parent node for resource node (xml root)
+        :param sheet_tab_name: (str) tab name in xlsx that represents resource
+        :return: None. Raise DXMLGeneratedError on error
+        """
+        resource_name = self.program_config_data['ResourceSheets'][sheet_tab_name]
+        self.logger.info("Processing Input Lookup Worksheet: '{}' for resource: '{}'".
+                         format(sheet_tab_name, resource_name))
+        self.progress.start("Resource '{}'".format(resource_name), unit='pages',
+                            total=sum(len(rows) for rows in
+                                      self.spreadsheet_data['Resources'].get(sheet_tab_name, {}).values()))
+        # Build a tree structure for each resource which dups how the XML will be shaped
+        self._build_resource_tree(sheet_tab_name=sheet_tab_name)
+
+        self._create_resource_nodes(parent_xml_node=parent_xml_node,
+                                    sheet_tab_name=sheet_tab_name,
+                                    resource_name=resource_name,
+                                    group_name=resource_name,
+                                    level_key=resource_name,
+                                    config_form_name=self._get_item_form_name(resource_name))
+
+    def _create_lookups(self, parent_xml_node=None):
         """ Build all Lookup XML nodes. Called when class is initialized
 
+        :param parent_xml_node: Parent node for top Lookup node (default: xml root)
         :return: None
         """
-        self.logger.info("Processing Input Lookup Values")
+        no_lookup_targets = self.build_targets is not None and not self.build_targets.has_lookup_targets()
+        if no_lookup_targets:
+            self.logger.info("No lookup build targets. Only lookup page titles registered")
+        else:
+            self.logger.info("Processing Input Lookup Values")
+        self.progress.start('Lookups', unit='values',
+                            total=sum(self.lookup_index.value_count(lookup_field_name)
+                                      for lookup_field_name in self.lookup_index.sorted_fields))
         # Create top node for Lookups
-        top_lookup_node = self._add_xml_nodes(self.xml_root,
-                                              nodes_from_config=self.xml_config_data["LookupTopIndex"],
-                                              resource_name='Lookup')
+        self.register_only = self.register_titles_only = no_lookup_targets
+        top_lookup_node = self._add_lookup_top_node(self.xml_root if parent_xml_node is None else parent_xml_node)
+        letter_keys = self.lookup_index.sorted_letters()
+        titles_only_from = len(letter_keys)
+        if self.build_targets is not None:
+            # Pages after the last selected letter do not change IDs or titles of selected pages. Only their titles
+            # .. are registered (links of selected pages are checked against them)
+            targeted_letters = [idx for idx, letter_key in enumerate(letter_keys)
+                                if self.build_targets.letter_on_route(letter_key)]
+            titles_only_from = targeted_letters[-1] + 1 if len(targeted_letters) > 0 else 0
         # Lookups grouped by 1st letter of lookup field
-        for letter_key in sorted(self.spreadsheet_data['Lookups'].keys()):
-            # Create Letter Group
-            # Create alphabetic Lookup Indices
-            page_title = self.xml_config_data["LookupIndexAlpha"]['Attributes']['Page_Title'].replace('[[Char]]',
-                                                                                                      letter_key)
-            top_group_index_node = self._add_xml_nodes(top_lookup_node,
-                                                       nodes_from_config=self.xml_config_data["LookupIndexAlpha"],
-                                                       other_page_title=page_title,
-                                                       resource_name='Lookup Index')
-            top_lookup_node.append(top_group_index_node)
+        for letter_index, letter_key in enumerate(letter_keys):
+            self.register_titles_only = letter_index >= titles_only_from
+            self.progress.set_detail(letter_key)
+            # Build targets: pages not selected are only walked (register_only)
+            letter_register_only = self.build_targets is not None and not self.build_targets.letter_on_route(letter_key)
+            self.register_only = letter_register_only
+            top_group_index_node, labels = self._add_lookup_letter_node(top_lookup_node, letter_key)
             # Create a group node for each lookup field
-            for lookup_field in sorted(self.spreadsheet_data['Lookups'][letter_key]):
-                page_title = self.xml_config_data["LookupIndexField"]['Attributes']['Page_Title'].replace('[[Name]]',
-                                                                                                lookup_field[0])
-                labels=self.xml_config_data["LookupIndexField"]['Labels']['Value'].replace('[[alpha]]',
-                                                                                           page_title[0].lower())
-                # Add fields Translate <EnumerationID>> to LookupFieldID, <<lookupfield_ref>>
-                # value picks up 1st lookup value item and picks off EnumerationID .. all have same value
-                try:
-                    val = lookup_field[1][0]['LookupFieldID']
-                except KeyError:
-                    val = None  # No NoLookupFieldID in .xlsx
-                    # raise DXMLGeneratedError("[DXM-13] Error in accessing 'LookupFieldID' in Lookup tab")
-
-                lookup_field_node = self._add_xml_nodes(top_lookup_node,
-                                                        nodes_from_config=self.xml_config_data["LookupIndexField"],
-                                                        value=val,
-                                                        other_page_title=page_title,
-                                                        replace_labels=labels,
-                                                        resource_name='Lookup Field')
-                top_group_index_node.append(lookup_field_node)
+            for lookup_field_name in self.lookup_index.fields_for_letter(letter_key):
+                self.register_only = letter_register_only or (self.build_targets is not None and not
+                                                              self.build_targets.lookup_field_selected(lookup_field_name))
+                lookup_field_node = self._add_lookup_field_node(top_group_index_node, lookup_field_name,
+                                                                self.lookup_index.field_id(lookup_field_name), labels)
                 # Add lookup Values
-                for lookup_value in lookup_field[1]:
-                    page_title = lookup_value['LookupValue']
-                    lookup_value_node = self._add_xml_nodes(lookup_field_node,
-                                                            nodes_from_config=self.xml_config_data["LookupValue"],
-                                                            value=lookup_value,
-                                                            other_page_title=page_title,
-                                                            resource_name=lookup_field[0])
+                for lookup_value in self.lookup_index.values(lookup_field_name):
+                    self._add_lookup_value_node(lookup_field_node, lookup_field_name, lookup_value)
+        self.register_only = self.register_titles_only = False
+
+    def _add_lookup_top_node(self, parent_xml_node):
+        """ Add top page for all Lookups ('Lookup Fields and Values')
+
+        :param parent_xml_node: Parent node (xml root)
+        :return: (xml node) Node added
+        """
+        return self._add_xml_nodes(parent_xml_node,
+                                   nodes_from_config=self.xml_config_data["LookupTopIndex"],
+                                   resource_name='Lookup')
+
+    def _add_lookup_letter_node(self, parent_xml_node, letter_key):
+        """ Add alphabetic Lookup Index page (i.e. 'A - Lookup Fields')
 
-                    lookup_field_node.append(lookup_value_node)
+        :param parent_xml_node: Lookup top node
+        :param letter_key: (str) 1st letter of lookup fields in group
+        :return: (xml node) Node added, (list) labels for lookup field pages in this letter
+        """
+        page_title = self.xml_config_data["LookupIndexAlpha"]['Attributes']['Page_Title'].replace('[[Char]]',
+                                                                                                  letter_key)
+        letter_node = self._add_xml_nodes(parent_xml_node,
+                                          nodes_from_config=self.xml_config_data["LookupIndexAlpha"],
+                                          other_page_title=page_title,
+                                          resource_name='Lookup Index')
+        # Lookup field pages in this letter share the same 'alpha_' label
+        labels = [lbl.replace('[[alpha]]', letter_key.lower()) for lbl in
+                  self.xml_config_data["LookupIndexField"]['Labels']['ValueList']]
+        return letter_node, labels
+
+    def _add_lookup_field_node(self, parent_xml_node, lookup_field_name, lookup_field_id, labels):
+        """ Add lookup field page (i.e. 'Appliances Lookups')
+
+        :param parent_xml_node: Letter group node
+        :param lookup_field_name: (str) Lookup field name
+        :param lookup_field_id: (str) LookupFieldID from xlsx (None if not entered)
+        :param labels: (list) page labels
+        :return: (xml node) Node added
+        """
+        page_title = self.xml_config_data["LookupIndexField"]['Attributes']['Page_Title'].replace('[[Name]]',
+                                                                                                  lookup_field_name)
+        # Add fields Translate <EnumerationID>> to LookupFieldID, <<lookupfield_ref>>
+        return self._add_xml_nodes(parent_xml_node,
+                                   nodes_from_config=self.xml_config_data["LookupIndexField"],
+                                   value=lookup_field_id,
+                                   other_page_title=page_title,
+                                   replace_labels=labels,
+                                   resource_name='Lookup Field')
+
+    def _add_lookup_value_node(self, parent_xml_node, lookup_field_name, lookup_value):
+        """ Add lookup value page
+
+        :param parent_xml_node: Lookup field node
+        :param lookup_field_name: (str) Lookup field name
+        :param lookup_value: (dict) xlsx lookup row
+        :return: (xml node) Node added
+        """
+        self.progress.advance()
+        return self._add_xml_nodes(parent_xml_node,
+                                   nodes_from_config=self.xml_config_data["LookupValue"],
+                                   value=lookup_value,
+                                   other_page_title=lookup_value['LookupValue'],
+                                   resource_name=lookup_field_name)
 
     def write_xml_file(self, result_xml_filepath):
         """ Write IOI Import File to disk
@@ -930,12 +1554,28 @@ class DictToXML:
         :return: None. Raise DXMLGeneratedError on error
         """
         tree = xml_tree.ElementTree(self.xml_root)
+        self.progress.start('Writing xml', unit='bytes')
         try:
-            tree.write(result_xml_filepath, pretty_print=True)
+            with open_file(result_xml_filepath, 'wb') as result_file:
+                tree.write(ProgressFile(result_file, self.progress), pretty_print=True)
         except (FileNotFoundError, IOError):
             raise DXMLGeneratedError("[DXM-11] Unable to write xml file: {}".format(result_xml_filepath))
         self.logger.debug("XML written to File:" + result_xml_filepath)
 
+    def write_xml_shards(self, result_xml_filepath, shard_by, max_pages=None, max_bytes=None):
+        """ Write IOI Import File to disk as several smaller import files plus a manifest listing import order
+
+        :param result_xml_filepath: (str) IOI Import filename/path. Shard file names are derived from it
+        :param shard_by: (str) Shard mode (resource, letter, size)
+        :param max_pages: (int) Max pages per shard (optional)
+        :param max_bytes: (int) Max approximate bytes per shard (optional)
+        :return: (list) shard file names. Raise ShardGeneratedError on error
+        """
+        shard_writer = XMLShardWriter(shard_by=shard_by, max_pages=max_pages, max_bytes=max_bytes,
+                                      split_templates=[self.xml_config_data['LookupTopIndex']['Attributes']
+                                                       ['Page_Template']])
+        return shard_writer.write(self.xml_root, result_xml_filepath)
+
     def _read_max_ids(self, max_id_filepath):
         """ Parse through max id text file (stat_warning_log) and parse out max lookup id's
 
@@ -945,22 +1585,47 @@ class DictToXML:
         self.max_lookupids = {}
         self.max_recordids = {}
         self.max_id = -1        # Look for a max record or lookup id
+        self.max_id_blocks = {}  # (kind, lookup field/resource): [(first id, size)] ('** ID Blocks' section)
         max_id_file = ntpath.basename(max_id_filepath)
         try:
-            gml_file = open(max_id_filepath, 'r')
+            with open_file(max_id_filepath, 'r') as gml_file:
+                self._parse_max_id_lines(gml_file, max_id_file)
         except FileNotFoundError:
             raise DXMLGeneratedError("[DXM-19] WikiStat File (Max Id's) not Found: " + max_id_filepath)
-        gml_data = gml_file.readlines()
-        gml_file.close()
+        except DECOMPRESSION_ERRORS + (UnicodeDecodeError,):
+            # Also raised while reading: corrupt or truncated compressed file
+            raise DXMLGeneratedError("[DXM-48] Cannot Open WikiStat File (Max Id's): " + max_id_filepath)
+
+        if len(self.max_recordids) == 0:
+            raise DXMLGeneratedError("[DXM-26] No recordid entries found in file " + max_id_file)
+        if len(self.max_lookupids) == 0:
+            raise DXMLGeneratedError("[DXM-09] No lookupid entries found in file " + max_id_file)
+
+    def _parse_max_id_lines(self, gml_lines, max_id_file):
+        """ Parse lines of max id text file (stat_warning_log) into self.max_lookupids and self.max_recordids.
+        .. An optional '** ID Blocks' section lists the blocks of a lookup field/resource, home block first:
+        .. 'Appliances Lookup blocks: 446000+1000 460000+10000' or 'Property Fields blocks: 101000+1000 ...'
+
+        :param gml_lines: (iterable) lines of max id text file. Read one line at a time
+        :param max_id_file: (str) File name of max id text file (used for error reporting)
+        :return: None. Raise DXMLGeneratedError on error
+        """
         lookupid_section_found = False
         recordid_section_found = False
-        for line in gml_data:
+        blocks_section_found = False
+        for line in gml_lines:
             if 'Max RecordID per Resource Report' in line:
                 recordid_section_found = True
-                lookupid_section_found = False
+                lookupid_section_found = blocks_section_found = False
             elif 'Max LookupID per Lookup Field' in line:
                 lookupid_section_found = True
-                recordid_section_found = False
+                recordid_section_found = blocks_section_found = False
+            elif line[0:2] == '**' and 'ID Blocks' in line:
+                blocks_section_found = True
+                lookupid_section_found = recordid_section_found = False
+            elif blocks_section_found:
+                if line[0:2] != '**' and len(line.split()) > 0:
+                    self._parse_id_block_line(line, max_id_file)
             else:
                 if lookupid_section_found:
                     if line[0:2] != '**':
@@ -999,7 +1664,27 @@ class DictToXML:
                             if val > self.max_id:
                                 self.max_id = val
 
-        if len(self.max_recordids) == 0:
-            raise DXMLGeneratedError("[DXM-26] No recordid entries found in file " + max_id_file)
-        if len(self.max_lookupids) == 0:
-            raise DXMLGeneratedError("[DXM-09] No lookupid entries found in file " + max_id_file)
+    def _parse_id_block_line(self, line, max_id_file):
+        """ Parse an ID Blocks line of max id text file into self.max_id_blocks
+
+        :param line: (str) '<name> Lookup blocks: <first id>+<size> ...' or '<name> Fields blocks: ...'
+        :param max_id_file: (str) File name of max id text file (used for error reporting)
+        :return: None. Raise DXMLGeneratedError on error
+        """
+        sline = line.split()
+        kinds = {'Lookup': IDBlockAllocator.LOOKUPID, 'Fields': IDBlockAllocator.RECORDID}
+        if len(sline) < 4 or sline[1] not in kinds or sline[2] != 'blocks:':
+            raise DXMLGeneratedError("[DXM-56] Max ID File has ID block text not recognized: {} in:{}".
+                                     format(line.strip(), max_id_file))
+        blocks = []
+        for block_text in sline[3:]:
+            try:
+                first_id, size = (int(num) for num in block_text.split('+'))
+            except ValueError:
+                raise DXMLGeneratedError("[DXM-56] Max ID File has illegal ID block {} for {} in:{}".
+                                         format(block_text, sline[0], max_id_file))
+            if first_id % IDBlockAllocator.ALIGNMENT != 0 or size <= 0 or size % IDBlockAllocator.ALIGNMENT != 0:
+                raise DXMLGeneratedError("[DXM-56] Max ID File ID block {} for {} not aligned to {} in:{}".
+                                         format(block_text, sline[0], IDBlockAllocator.ALIGNMENT, max_id_file))
+            blocks.append((first_id, size))
+        self.max_id_blocks[(kinds[sline[1]], sline[0])] = blocks
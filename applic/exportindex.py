@@ -0,0 +1,401 @@
+import logging
+import os
+import sqlite3
+import time
+
+from lxml import etree as xml_tree
+
+from applic.compressedio import DECOMPRESSION_ERRORS, open_file
+from applic.deltaindex import ExportPageIndex
+from applic.idblocks import IDBlockAllocator
+from applic.inputcache import file_signature
+
+__project__ = 'IOI_Import'
+__author__ = "Robert Gottesman"
+__version_date__ = "10/19/2026"
+__high_err_num__ = 3
+
+""" Change log
+10/19/2026 - Created. SQLite index of DD Wiki export fields, lookup fields, lookup values and IDs (--inspect)
+10/19/2026 - Max id report lists the ID blocks of resources/lookup fields using more than one block
+10/19/2026 - id_blocks of every scope (min_blocks). Index file per config sub folder (index_filepath), indexed
+             again when the page title config changes. Reindexing is serialized between processes
+10/19/2026 - Corrupt or truncated compressed export reported as [EXI-02] (DECOMPRESSION_ERRORS)
+"""
+
+
+class ExportIndexGeneratedError(Exception):
+    """
+    Handle known problems in this module passing detail information
+    """
+    def __init__(self, value):
+        self.value = value
+
+    def __str__(self):
+        return repr(self.value)
+
+
+class ExportIndex:
+    """ Local index (SQLite file) of a DD Wiki exported xml, answering name and ID lookups without reading the export
+
+    The export is read once with iterparse (one page in memory at a time) and indexed again only when its file
+    signature (size, modification time) changes. Entries:
+    * Field: StandardName, resource (scope) and RecordID
+    * LookupValue: lookup value, lookup field (scope), LookupID and LookupFieldID
+    * LookupField: lookup field name and LookupFieldID
+    * Resource: resource name (page titled as in resource_titles or by the resource title template)
+    * Page: title of any other page (Group, ...)
+    Names are matched without case: exact and prefix lookups use the name index, substring lookups scan the names.
+    A number also matches the RecordID, LookupID or LookupFieldID.
+    """
+    FIELD = 'Field'
+    LOOKUP_VALUE = 'LookupValue'
+    LOOKUP_FIELD = 'LookupField'
+    RESOURCE = 'Resource'
+    PAGE = 'Page'
+    EXACT = 'exact'
+    PREFIX = 'prefix'
+    SUBSTRING = 'substring'
+    MATCH_MODES = [EXACT, PREFIX, SUBSTRING]
+    PAGE_ATTRIBUTE = 'Page_Title'
+    NAME_PLACEHOLDER = '[[Name]]'
+    RECORDID_TAGS = ['Record_Identifier', 'RecordID']
+    LOOKUPID_TAGS = ['LookupID']
+    LOOKUP_FIELDID_TAGS = ['Lookup_FieldID', 'LookupFieldID']
+    INSERT_BATCH_SIZE = 5000
+    INDEX_FILENAME = 'export_index.sqlite'
+    LOCK_TIMEOUT_SECONDS = 60
+    BLOCK = IDBlockAllocator.ALIGNMENT  # ID blocks of the max id report
+    COLUMNS = ['kind', 'name', 'scope', 'id', 'lookup_field_id', 'page_title']
+
+    def __init__(self, index_filepath, resource_titles=None, resource_title_template=None,
+                 lookup_field_title_template=None):
+        """ Open (create) index file
+
+        :param index_filepath: (str) SQLite index file name/path
+        :param resource_titles: (dict) page title: resource name (config.ini [PageLinks], i.e. 'SocialMedia Collection')
+        :param resource_title_template: (str) Page_Title of other resource pages (i.e. '[[Name]] Resource'). Resource
+        .. names are taken from Groupings or the enclosing resource page
+        :param lookup_field_title_template: (str) Page_Title of a lookup field page (i.e. '[[Name]] Lookups')
+        :return: None. Raise ExportIndexGeneratedError on error
+        """
+        self.logger = logging.getLogger(__project__ + '.' + self.__class__.__name__)
+        self.index_filepath = index_filepath
+        self.resource_titles = resource_titles if resource_titles is not None else {}
+        self.resource_title_template = resource_title_template
+        self.lookup_field_title_template = lookup_field_title_template
+        # Entries depend on the page title config as well as on the export file
+        self.config_signature = repr((sorted(self.resource_titles.items()), resource_title_template,
+                                      lookup_field_title_template))
+        try:
+            index_folder = os.path.dirname(index_filepath)
+            if index_folder:
+                os.makedirs(index_folder, exist_ok=True)
+            self.connection = sqlite3.connect(index_filepath, timeout=self.LOCK_TIMEOUT_SECONDS)
+            self.connection.execute("CREATE TABLE IF NOT EXISTS source "
+                                    "(export_filepath TEXT, signature TEXT, entry_count INTEGER)")
+            self.connection.execute("CREATE TABLE IF NOT EXISTS entries "
+                                    "(kind TEXT, name TEXT, name_key TEXT, scope TEXT, id INTEGER, "
+                                    "lookup_field_id INTEGER, page_title TEXT)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS entries_name ON entries (name_key)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS entries_id ON entries (id)")
+            self.connection.commit()
+        except (OSError, sqlite3.Error) as e:
+            raise ExportIndexGeneratedError("[EXI-01] Cannot open export index {}: {}".format(index_filepath, e))
+
+    @classmethod
+    def index_filepath(cls, input_folder, config_sub_folder):
+        """ Index file of the exports read with a configuration: files/index/<config sub folder>/export_index.sqlite
+
+        :param input_folder: (str) files/input folder
+        :param config_sub_folder: (str) config sub folder name (i.e. 'current')
+        :return: (str) index file path
+        """
+        return os.path.join(os.path.dirname(input_folder), 'index', config_sub_folder, cls.INDEX_FILENAME)
+
+    @classmethod
+    def _name_from_title(cls, title, title_template):
+        """ Name in a page title built from title_template ('Property Resource' -> 'Property')
+
+        :param title: (str) page title or link text
+        :param title_template: (str) Page_Title with [[Name]] (None: title is the name)
+        :return: (str) name, or None if title does not follow title_template
+        """
+        if title is None or title_template is None or cls.NAME_PLACEHOLDER not in title_template:
+            return title
+        prefix, suffix = title_template.split(cls.NAME_PLACEHOLDER, 1)
+        if len(title) > len(prefix) + len(suffix) and title.startswith(prefix) and title.endswith(suffix):
+            return title[len(prefix):len(title) - len(suffix)]
+        return None
+
+    @staticmethod
+    def _int(text):
+        try:
+            return int(text.strip())
+        except (AttributeError, ValueError):
+            return None
+
+    def _resource_from_title(self, title):
+        """ Resource name of a resource page title
+
+        :param title: (str) page title or link text (may be None)
+        :return: (str) resource name, or None if title is not a resource page title
+        """
+        if title in self.resource_titles:
+            return self.resource_titles[title]
+        if self.resource_title_template is None:
+            return None
+        return self._name_from_title(title, self.resource_title_template)
+
+    def _resource_name(self, page_node, fields):
+        """ Resource of a field page: 1st Groupings entry, else the enclosing resource page
+
+        :param page_node: (xml node) field page node
+        :param fields: (dict) tag: field node of the page
+        :return: (str) resource name or ''
+        """
+        groupings_node = fields.get(ExportPageIndex.GROUPINGS_TAG)
+        if groupings_node is not None and len(groupings_node) > 0:
+            resource_name = self._resource_from_title(groupings_node[0].text)
+            if resource_name:
+                return resource_name
+        parent_node = page_node.getparent()
+        while parent_node is not None:
+            resource_name = self._resource_from_title(parent_node.get(self.PAGE_ATTRIBUTE))
+            if resource_name:
+                return resource_name
+            parent_node = parent_node.getparent()
+        return ''
+
+    def _entry(self, page_node):
+        """ Index entry of a page (a node with Page_Title or holding a StandardName/LookupValue)
+
+        :param page_node: (xml node)
+        :return: (tuple) entry values (COLUMNS) or None if the node is not a page
+        """
+        fields = {}
+        for field_node in page_node:
+            if isinstance(field_node.tag, str) and self.PAGE_ATTRIBUTE not in field_node.attrib:
+                fields.setdefault(field_node.tag, field_node)
+
+        def first_text(tags):
+            return next(((fields[tag].text or '').strip() for tag in tags if tag in fields), None)
+
+        page_title = page_node.get(self.PAGE_ATTRIBUTE)
+        lookup_field_id = self._int(first_text(self.LOOKUP_FIELDID_TAGS))
+        lookup_value = first_text(ExportPageIndex.LOOKUP_VALUE_TAGS)
+        if lookup_value:
+            lookup_field = first_text(ExportPageIndex.LOOKUP_FIELD_TAGS) or ''
+            lookup_field = self._name_from_title(lookup_field, self.lookup_field_title_template) or lookup_field
+            return (self.LOOKUP_VALUE, lookup_value, lookup_field, self._int(first_text(self.LOOKUPID_TAGS)),
+                    lookup_field_id, page_title)
+        field_name = first_text(ExportPageIndex.FIELD_NAME_TAGS)
+        if field_name:
+            return (self.FIELD, field_name, self._resource_name(page_node, fields),
+                    self._int(first_text(self.RECORDID_TAGS)), None, page_title)
+        if page_title is None:
+            return None
+        if lookup_field_id is not None:
+            lookup_field = self._name_from_title(page_title, self.lookup_field_title_template)
+            return self.LOOKUP_FIELD, lookup_field or page_title, '', lookup_field_id, lookup_field_id, page_title
+        resource_name = self._resource_from_title(page_title)
+        if resource_name:
+            return self.RESOURCE, resource_name, '', None, None, page_title
+        return self.PAGE, page_title, '', None, None, page_title
+
+    def _read_export(self, export_filepath):
+        """ Index entries of the export. Each page is read at its end tag, then released
+
+        :param export_filepath: (str) DD Wiki exported xml (may be gzip/xz/zstd compressed)
+        :return: (generator) of entries. Raise ExportIndexGeneratedError on error
+        """
+        name_tags = set(ExportPageIndex.FIELD_NAME_TAGS + ExportPageIndex.LOOKUP_VALUE_TAGS)
+        try:
+            with open_file(export_filepath, 'rb') as export_file:
+                for event, node in xml_tree.iterparse(export_file, events=('end',)):
+                    if self.PAGE_ATTRIBUTE not in node.attrib and \
+                            not any(isinstance(sub_node.tag, str) and sub_node.tag in name_tags for sub_node in node):
+                        continue
+                    entry = self._entry(node)
+                    if entry is not None:
+                        yield entry
+                    # Child pages are indexed before their parent. Fields of the parent are kept. Ancestors are kept
+                    # (with their fields until they end) to find the resource of a field page
+                    node.clear(keep_tail=True)
+                    if node.getparent() is not None:
+                        node.getparent().remove(node)
+        except DECOMPRESSION_ERRORS as e:
+            raise ExportIndexGeneratedError("[EXI-02] Cannot read DD Wiki export {}: {}".format(export_filepath, e))
+        except xml_tree.XMLSyntaxError as e:
+            raise ExportIndexGeneratedError("[EXI-02] Cannot parse DD Wiki export {}: {}".format(export_filepath, e))
+
+    def update(self, export_filepath):
+        """ Index the export if not indexed yet or changed since indexed (export file or page title config).
+        .. A conversion indexing the export locks out the others, which then find it indexed
+
+        :param export_filepath: (str) DD Wiki exported xml
+        :return: (bool) True if the export was (re)indexed. Raise ExportIndexGeneratedError on error
+        """
+        if not os.path.exists(export_filepath):
+            raise ExportIndexGeneratedError("[EXI-02] Cannot find DD Wiki export " + export_filepath)
+        signature = repr(file_signature(export_filepath)) + self.config_signature
+        try:
+            self.connection.execute("BEGIN IMMEDIATE")
+            source = self.connection.execute("SELECT export_filepath, signature FROM source").fetchone()
+            if source == (os.path.abspath(export_filepath), signature):
+                self.connection.rollback()
+                return False
+            start_time = time.monotonic()
+            self.connection.execute("DELETE FROM entries")
+            self.connection.execute("DELETE FROM source")
+            entry_count = 0
+            batch = []
+            for entry in self._read_export(export_filepath):
+                batch.append(entry[:2] + (entry[1].casefold(),) + entry[2:])
+                if len(batch) >= self.INSERT_BATCH_SIZE:
+                    entry_count += self._insert(batch)
+            entry_count += self._insert(batch)
+            self.connection.execute("INSERT INTO source VALUES (?, ?, ?)",
+                                    (os.path.abspath(export_filepath), signature, entry_count))
+            self.connection.commit()
+        except sqlite3.Error as e:
+            self.connection.rollback()
+            raise ExportIndexGeneratedError("[EXI-03] Export index {} update failed: {}".format(self.index_filepath, e))
+        except ExportIndexGeneratedError:
+            self.connection.rollback()
+            raise
+        self.logger.info("Indexed {} entries of DD Wiki export {} in {:.2f}s".format(
+            entry_count, export_filepath, time.monotonic() - start_time))
+        return True
+
+    def _insert(self, batch):
+        self.connection.executemany("INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)", batch)
+        count = len(batch)
+        del batch[:]
+        return count
+
+    def query(self, text, match=EXACT):
+        """ Entries whose name matches text (case ignored), or whose RecordID/LookupID/LookupFieldID is text if it is
+        .. a number (LookupFieldID of lookup field entries only)
+
+        :param text: (str) name, name prefix or part of a name, or an ID
+        :param match: (str) one of MATCH_MODES
+        :return: (list) of dict (COLUMNS) ordered by kind, name and scope. Raise ExportIndexGeneratedError on error
+        """
+        name_key = text.strip().casefold()
+        if match == self.PREFIX:
+            condition, values = "name_key >= ? AND name_key < ?", [name_key, name_key + '\U0010ffff']
+        elif match == self.SUBSTRING:
+            condition, values = "instr(name_key, ?) > 0", [name_key]
+        else:
+            condition, values = "name_key = ?", [name_key]
+        number = self._int(text)
+        if number is not None:
+            condition += " OR id = ?"
+            values.append(number)
+        try:
+            rows = self.connection.execute("SELECT DISTINCT kind, name, scope, id, lookup_field_id, page_title "
+                                           "FROM entries WHERE " + condition + " ORDER BY kind, name, scope",
+                                           values).fetchall()
+        except sqlite3.Error as e:
+            raise ExportIndexGeneratedError("[EXI-03] Export index {} query failed: {}".format(self.index_filepath, e))
+        return [dict(zip(self.COLUMNS, row)) for row in rows]
+
+    def max_ids(self):
+        """ Max RecordID per resource and max LookupID per lookup field (LookupFieldID if no value has a LookupID)
+
+        :return: (tuple) (dict) resource: max RecordID, (dict) lookup field: max LookupID
+        """
+        try:
+            max_recordids = dict(self.connection.execute(
+                "SELECT scope, MAX(id) FROM entries WHERE kind = ? AND id IS NOT NULL AND scope != '' GROUP BY scope",
+                (self.FIELD,)).fetchall())
+            max_lookupids = dict(self.connection.execute(
+                "SELECT name, lookup_field_id FROM entries WHERE kind = ? AND id IS NOT NULL",
+                (self.LOOKUP_FIELD,)).fetchall())
+            max_lookupids.update(self.connection.execute(
+                "SELECT scope, MAX(COALESCE(id, lookup_field_id)) FROM entries WHERE kind = ? AND scope != '' "
+                "GROUP BY scope HAVING MAX(COALESCE(id, lookup_field_id)) IS NOT NULL",
+                (self.LOOKUP_VALUE,)).fetchall())
+        except sqlite3.Error as e:
+            raise ExportIndexGeneratedError("[EXI-03] Export index {} query failed: {}".format(self.index_filepath, e))
+        return max_recordids, max_lookupids
+
+    def id_blocks(self, min_blocks=2):
+        """ ID blocks of resources and lookup fields holding ids in more than one 1000 block (extension blocks of
+        .. IDBlockAllocator). Adjacent 1000 blocks are merged. The home block (lowest RecordID block, LookupFieldID
+        .. block) is listed first
+
+        :param min_blocks: (int) leave out scopes holding ids in fewer 1000 blocks (1: every scope with an id)
+        :return: (tuple) (dict) resource: [(first id, size)], (dict) lookup field: [(first id, size)]
+        """
+        try:
+            recordid_blocks = self._blocks_by_scope(self.connection.execute(
+                "SELECT DISTINCT scope, id - id % ? FROM entries WHERE kind = ? AND id IS NOT NULL AND scope != ''",
+                (self.BLOCK, self.FIELD)).fetchall(), {}, min_blocks)
+            # LookupFieldID of the lookup field page, else of its values
+            home_blocks = {name: lookup_field_id - lookup_field_id % self.BLOCK for name, lookup_field_id in
+                           self.connection.execute("SELECT scope, MIN(lookup_field_id) FROM entries WHERE kind = ? "
+                                                   "AND scope != '' AND lookup_field_id IS NOT NULL GROUP BY scope",
+                                                   (self.LOOKUP_VALUE,)).fetchall()}
+            home_blocks.update((name, lookup_field_id - lookup_field_id % self.BLOCK) for name, lookup_field_id in
+                               self.connection.execute("SELECT name, lookup_field_id FROM entries WHERE kind = ? AND "
+                                                       "lookup_field_id IS NOT NULL", (self.LOOKUP_FIELD,)).fetchall())
+            lookupid_blocks = self._blocks_by_scope(self.connection.execute(
+                "SELECT DISTINCT scope, COALESCE(id, lookup_field_id) - COALESCE(id, lookup_field_id) % ? FROM entries "
+                "WHERE kind = ? AND scope != '' AND COALESCE(id, lookup_field_id) IS NOT NULL",
+                (self.BLOCK, self.LOOKUP_VALUE)).fetchall(), home_blocks, min_blocks)
+        except sqlite3.Error as e:
+            raise ExportIndexGeneratedError("[EXI-03] Export index {} query failed: {}".format(self.index_filepath, e))
+        return recordid_blocks, lookupid_blocks
+
+    def _blocks_by_scope(self, scope_block_rows, home_blocks, min_blocks=2):
+        """ Merge the 1000 blocks of each scope into (first id, size) blocks
+
+        :param scope_block_rows: (list) (scope, first id of a 1000 block holding an id)
+        :param home_blocks: (dict) scope: first id of its home 1000 block (default: lowest block)
+        :param min_blocks: (int) scopes with fewer 1000 blocks are left out
+        :return: (dict) scope: [(first id, size)] home block first
+        """
+        block_ids = {}
+        for scope, block_id in scope_block_rows:
+            block_ids.setdefault(scope, set()).add(block_id)
+        for scope, home_block in home_blocks.items():
+            if scope in block_ids:
+                block_ids[scope].add(home_block)
+        blocks = {}
+        for scope, scope_block_ids in block_ids.items():
+            if len(scope_block_ids) < min_blocks:
+                continue
+            merged = []
+            for block_id in sorted(scope_block_ids):
+                if merged and merged[-1][0] + merged[-1][1] == block_id and block_id != home_blocks.get(scope):
+                    merged[-1] = (merged[-1][0], merged[-1][1] + self.BLOCK)
+                else:
+                    merged.append((block_id, self.BLOCK))
+            home_block = home_blocks.get(scope, merged[0][0])
+            blocks[scope] = sorted(merged, key=lambda block: (block[0] != home_block, block[0]))
+        return blocks
+
+    def max_id_report(self):
+        """ max_ids() in the layout of the max id file (stat_warning_log.txt), so it can be given as max id file (-i).
+        .. Resources/lookup fields using more than one ID block are listed in an '** ID Blocks' section
+
+        :return: (str) report text
+        """
+        max_recordids, max_lookupids = self.max_ids()
+        lines = ['** Max RecordID per Resource Report']
+        lines.extend('{} Fields max id: {}'.format(name, max_recordids[name]) for name in sorted(max_recordids))
+        lines.append('** Max LookupID per Lookup Field')
+        lines.extend('{} Lookup max id: {}'.format(name, max_lookupids[name]) for name in sorted(max_lookupids))
+        recordid_blocks, lookupid_blocks = self.id_blocks()
+        if recordid_blocks or lookupid_blocks:
+            lines.append('** ID Blocks')
+            for kind_text, blocks in (('Fields', recordid_blocks), ('Lookup', lookupid_blocks)):
+                lines.extend('{} {} blocks: {}'.format(name, kind_text, ' '.join('{}+{}'.format(first_id, size) for
+                                                                                 first_id, size in blocks[name]))
+                             for name in sorted(blocks))
+        return '\n'.join(lines) + '\n'
+
+    def close(self):
+        self.connection.close()
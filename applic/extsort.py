@@ -0,0 +1,85 @@
+import heapq
+import pickle
+import tempfile
+from operator import itemgetter
+
+__project__ = 'IOI_Import'
+__author__ = "Robert Gottesman"
+__version_date__ = "10/19/2026"
+
+""" Change log
+10/19/2026 - Created. External (disk backed) sort of xlsx rows bounded by a memory budget
+"""
+
+
+class ExternalSorter:
+    """ Sort (key, record) pairs that may not fit in memory
+
+    Records are pickled as they are added. When the pickled size of the buffered records exceeds the memory budget
+    the buffer is sorted and spilled to a temporary file (a 'run'). Iterating merges all runs in key order.
+    Records with equal keys are returned in the order they were added.
+    """
+
+    def __init__(self, memory_budget_bytes, temp_folder=None):
+        """ Setup sorter
+
+        :param memory_budget_bytes: (int) Max bytes of pickled records held in memory before spilling to disk
+        :param temp_folder: (str) Folder for temporary run files (None for system temp folder)
+        :return: None
+        """
+        self.memory_budget_bytes = memory_budget_bytes
+        self.temp_folder = temp_folder
+        self.buffer = []  # [key, sequence, pickled record]
+        self.buffer_bytes = 0
+        self.runs = []  # temporary files, each holding a sorted run
+        self.record_count = 0
+
+    def add(self, key, record):
+        """ Add record to be sorted by key
+
+        :param key: (tuple) sort key. Must be comparable with keys of all other records
+        :param record: (obj) picklable record
+        :return: None
+        """
+        pickled_record = pickle.dumps(record, pickle.HIGHEST_PROTOCOL)
+        self.buffer.append((key, self.record_count, pickled_record))
+        self.record_count += 1
+        self.buffer_bytes += len(pickled_record)
+        if self.buffer_bytes > self.memory_budget_bytes:
+            self._spill()
+
+    def _spill(self):
+        """ Sort buffered records and write them to a temporary run file
+
+        :return: None
+        """
+        self.buffer.sort(key=itemgetter(0, 1))
+        run_file = tempfile.TemporaryFile(dir=self.temp_folder)
+        for entry in self.buffer:
+            pickle.dump(entry, run_file, pickle.HIGHEST_PROTOCOL)
+        run_file.seek(0)
+        self.runs.append(run_file)
+        self.buffer = []
+        self.buffer_bytes = 0
+
+    @staticmethod
+    def _read_run(run_file):
+        while True:
+            try:
+                yield pickle.load(run_file)
+            except EOFError:
+                run_file.close()
+                return
+
+    def __iter__(self):
+        """ Return (key, record) pairs in key order. The sorter is emptied as records are returned
+
+        :return: (generator) of (key, record)
+        """
+        self.buffer.sort(key=itemgetter(0, 1))
+        sources = [self._read_run(run_file) for run_file in self.runs] + [iter(self.buffer)]
+        self.runs = []
+        self.buffer = []
+        self.buffer_bytes = 0
+        for key, sequence, pickled_record in heapq.merge(*sources, key=itemgetter(0, 1)):
+            yield key, pickle.loads(pickled_record)
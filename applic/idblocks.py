@@ -0,0 +1,170 @@
+import logging
+
+from applic.idledger import IDLedger
+
+__project__ = 'IOI_Import'
+__author__ = "Robert Gottesman"
+__version_date__ = "10/19/2026"
+__high_err_num__ = 1
+
+""" Change log
+10/19/2026 - Created. RecordID/LookupID blocks of configurable size with overflow extension blocks
+10/19/2026 - Blocks of a max id file scope are given by the caller (no longer the 1000 block of its max id)
+10/19/2026 - legacy_block: 1000 block of a max id, for scopes with no blocks in the max id file or export
+"""
+
+
+class IDBlockAllocator:
+    """ ID blocks of lookup fields (LookupIDs) and resources (RecordIDs)
+
+    A lookup field or resource (scope) owns a home block: its first id is the LookupFieldID / RecordID base. Ids are
+    handed out in order inside a block: base+1 .. base+size-2 for LookupIDs, base+1 .. base+size-1 for RecordIDs (as
+    in the original 1000 blocks). A full scope gets an extension block, so a scope is not limited to 999 ids.
+    * Blocks start at a multiple of ALIGNMENT (1000) and hold block_size ids (a multiple of ALIGNMENT). New home and
+      extension blocks start above every known block and id, so existing ids stay valid and are never handed again
+    * Scopes of the max id file keep their blocks: listed in the max id file ('** ID Blocks' section, see
+      DictToXML._parse_max_id_lines) or found in the DD Wiki export (see DictToXML._export_scope_blocks)
+    * With an ID ledger, home and extension blocks are created in the ledger (the same for every conversion) and ids
+      are reserved from it
+    """
+    ALIGNMENT = 1000
+    LOOKUPID = IDLedger.LOOKUPID
+    RECORDID = IDLedger.RECORDID
+    UNUSED_BLOCK_END = {LOOKUPID: 1, RECORDID: 0}  # Ids at the end of a block not handed out
+
+    def __init__(self, block_size=ALIGNMENT, top_id=-1, id_ledger=None):
+        """ Setup allocator
+
+        :param block_size: (int) ids per new block (multiple of ALIGNMENT)
+        :param top_id: (int) highest id in the max id file
+        :param id_ledger: (IDLedger) shared blocks and id reservations (None: blocks from the max id file only)
+        :return: None
+        """
+        self.logger = logging.getLogger(__project__ + '.' + self.__class__.__name__)
+        self.block_size = block_size
+        self.top_id = top_id  # Highest id or block end known. New blocks start above
+        self.id_ledger = id_ledger
+        self.blocks = {}  # (kind, scope): [(first id, size)] home block first
+        self.current_block = {}  # (kind, scope): index of the block ids are handed out from
+
+    @classmethod
+    def legacy_block(cls, kind, max_id):
+        """ 1000 block holding max_id: home block of a scope whose blocks are not known (ids before ID blocks)
+
+        :param kind: (str) LOOKUPID or RECORDID
+        :param max_id: (int) max id of the scope in the max id file
+        :return: (tuple) (first id, size), or None if max_id is past the ids handed out in the block (the scope
+        .. overflowed into another block: its home block cannot be told from max_id)
+        """
+        first_id = max_id - max_id % cls.ALIGNMENT
+        if max_id > first_id + cls.ALIGNMENT - 1 - cls.UNUSED_BLOCK_END[kind]:
+            return None
+        return first_id, cls.ALIGNMENT
+
+    def _new_block_first_id(self):
+        return self.top_id - (self.top_id % self.ALIGNMENT) + self.ALIGNMENT
+
+    def _add_block(self, key, first_id, size):
+        self.blocks.setdefault(key, []).append((first_id, size))
+        self.top_id = max(self.top_id, first_id + size - 1)
+
+    def add_scope(self, kind, scope, max_id, blocks):
+        """ Scope of the max id file
+
+        :param kind: (str) LOOKUPID or RECORDID
+        :param scope: (str) lookup field or resource name
+        :param max_id: (int) max id of the scope in the max id file
+        :param blocks: (list) (first id, size) of the scope blocks, home block first
+        :return: None
+        """
+        key = (kind, scope)
+        self.blocks[key] = []
+        for first_id, size in blocks:
+            self._add_block(key, first_id, size)
+        self.top_id = max(self.top_id, max_id)
+        self.current_block[key] = self._block_index(key, max_id)
+
+    def _block_index(self, key, id_value):
+        """ Index of the block holding id_value (last block if none)
+
+        :return: (int)
+        """
+        for index, (first_id, size) in enumerate(self.blocks[key]):
+            if first_id <= id_value < first_id + size:
+                return index
+        return len(self.blocks[key]) - 1
+
+    def __contains__(self, key):
+        return key in self.blocks
+
+    def new_scope(self, kind, scope):
+        """ Home block of a lookup field or resource missing from the max id file
+
+        :param kind: (str) LOOKUPID or RECORDID
+        :param scope: (str) lookup field or resource name
+        :return: (int) base id (LookupFieldID / RecordID base). Raise LedgerGeneratedError on ledger error
+        """
+        key = (kind, scope)
+        if self.id_ledger is not None:  # Same base in every conversion sharing the ledger
+            first_id, size = self.id_ledger.scope_block(kind, scope, 0, self.top_id, self.block_size)
+        else:
+            first_id, size = self._new_block_first_id(), self.block_size
+        self.blocks[key] = []
+        self._add_block(key, first_id, size)
+        self.current_block[key] = 0
+        return first_id
+
+    def base(self, kind, scope):
+        """ First id of the home block (LookupFieldID / RecordID base)
+
+        :return: (int)
+        """
+        return self.blocks[(kind, scope)][0][0]
+
+    def block_list(self, kind, scope):
+        return list(self.blocks[(kind, scope)])
+
+    def _last_id(self, kind, block):
+        return block[0] + block[1] - 1 - self.UNUSED_BLOCK_END[kind]
+
+    def _next_block(self, kind, scope):
+        """ Move to the next block of the scope, adding an extension block if the scope has no further block
+
+        :return: (tuple) (first id, size). Raise LedgerGeneratedError on ledger error
+        """
+        key = (kind, scope)
+        index = self.current_block[key] + 1
+        if index >= len(self.blocks[key]):
+            if self.id_ledger is not None:  # Other conversions extending the scope get the same block
+                first_id, size = self.id_ledger.scope_block(kind, scope, index, self.top_id, self.block_size)
+            else:
+                first_id, size = self._new_block_first_id(), self.block_size
+            self._add_block(key, first_id, size)
+            self.logger.info("[IDB-01] Extension ID block %s-%s for %s of '%s'", first_id, first_id + size - 1,
+                             kind, scope)
+        self.current_block[key] = index
+        return self.blocks[key][index]
+
+    def next_id(self, kind, scope, max_id, page_key=None):
+        """ Id after max_id in the scope blocks, or the id the page owns in the ID ledger
+
+        :param kind: (str) LOOKUPID or RECORDID
+        :param scope: (str) lookup field or resource name
+        :param max_id: (int) highest id of the scope handed out (or in the max id file with a ledger)
+        :param page_key: (str) lookup value / field StandardName (page key in id ledger)
+        :return: (int) id. Raise LedgerGeneratedError on ledger error
+        """
+        key = (kind, scope)
+        block = self.blocks[key][self.current_block[key]]
+        while True:
+            if self.id_ledger is not None:
+                new_id = self.id_ledger.allocate(kind, scope, page_key, max(max_id, block[0]),
+                                                 self._last_id(kind, block))
+            else:
+                new_id = max(max_id, block[0]) + 1
+                if new_id > self._last_id(kind, block):
+                    new_id = -1
+            if new_id >= 0:
+                self.top_id = max(self.top_id, new_id)
+                return new_id
+            block = self._next_block(kind, scope)
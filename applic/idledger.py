@@ -0,0 +1,227 @@
+import logging
+import os
+import sqlite3
+
+__project__ = 'IOI_Import'
+__author__ = "Robert Gottesman"
+__version_date__ = "10/19/2026"
+__high_err_num__ = 4
+
+""" Change log
+10/19/2026 - Created. Persistent SQLite ledger of RecordIDs/LookupIDs shared by concurrent conversions
+10/19/2026 - Scope blocks of any size, home (scope base) and extension blocks (scope_block replaces scope_base)
+10/19/2026 - Page recorded first with another id by a conversion running at the same time is reported [IDL-04]
+"""
+
+
+class LedgerGeneratedError(Exception):
+    """
+    Handle known problems in this module passing detail information
+    """
+    def __init__(self, value):
+        self.value = value
+
+    def __str__(self):
+        return repr(self.value)
+
+
+class IDLedger:
+    """ Persistent ledger of IDs handed out by conversions (SQLite file)
+
+    * Scope blocks: the home block (LookupFieldID / RecordID base) of a lookup field or resource not in the max id
+      file, and extension blocks of full lookup fields and resources (IDBlockAllocator). Every conversion gets the
+      same blocks for the same lookup field or resource.
+    * Reservation: IDs inside a scope are reserved in blocks with a BEGIN IMMEDIATE transaction, so conversions
+      running at the same time (other processes or machines sharing the file) never hand out the same ID.
+    * Assignment: which page (lookup value of a lookup field / StandardName of a resource) got which ID. A rerun reuses
+      the IDs its pages already own. Assignments are written by commit() once the conversion succeeded.
+
+    IDs at or below the max id file (stat_warning_log.txt) values are never reserved.
+    """
+    LOOKUPID = 'LookupID'
+    RECORDID = 'RecordID'
+    BLOCK = 1000  # Block alignment. Scope bases written before scope_blocks hold BLOCK ids
+    LOCK_TIMEOUT_SECONDS = 60
+
+    def __init__(self, ledger_filepath, reserve_block_size=16):
+        """ Open (create) ledger file
+
+        :param ledger_filepath: (str) SQLite ledger file name/path
+        :param reserve_block_size: (int) IDs reserved per transaction
+        :return: None. Raise LedgerGeneratedError on error
+        """
+        self.logger = logging.getLogger(__project__ + '.' + self.__class__.__name__)
+        self.ledger_filepath = ledger_filepath
+        self.reserve_block_size = max(1, reserve_block_size)
+        self.reserved = {}  # (kind, scope): [next free id, last reserved id]
+        self.assigned = {}  # (kind, scope): {page key: id} loaded from ledger
+        self.used_keys = set()  # (kind, scope, page key) given an id in this conversion
+        self.new_assignments = []  # (kind, scope, page key, id) written by commit()
+        try:
+            ledger_folder = os.path.dirname(ledger_filepath)
+            if ledger_folder:
+                os.makedirs(ledger_folder, exist_ok=True)
+            self.connection = sqlite3.connect(ledger_filepath, timeout=self.LOCK_TIMEOUT_SECONDS,
+                                              isolation_level=None)
+            self.connection.execute("CREATE TABLE IF NOT EXISTS scope_base "
+                                    "(kind TEXT, scope TEXT, base_id INTEGER, PRIMARY KEY (kind, scope))")
+            self.connection.execute("CREATE TABLE IF NOT EXISTS scope_blocks "
+                                    "(kind TEXT, scope TEXT, block_number INTEGER, first_id INTEGER, last_id INTEGER, "
+                                    "PRIMARY KEY (kind, scope, block_number))")
+            self.connection.execute("CREATE TABLE IF NOT EXISTS scope_reserved "
+                                    "(kind TEXT, scope TEXT, max_id INTEGER, PRIMARY KEY (kind, scope))")
+            self.connection.execute("CREATE TABLE IF NOT EXISTS assigned "
+                                    "(kind TEXT, scope TEXT, page_key TEXT, id INTEGER, "
+                                    "PRIMARY KEY (kind, scope, page_key))")
+        except (OSError, sqlite3.Error) as e:
+            raise LedgerGeneratedError("[IDL-01] Cannot open ID ledger {}: {}".format(ledger_filepath, e))
+
+    def _transaction(self, function, *args):
+        """ Run function(*args) in a write transaction (BEGIN IMMEDIATE locks out other writers)
+
+        :return: function result. Raise LedgerGeneratedError on error
+        """
+        try:
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                result = function(*args)
+            except BaseException:
+                self.connection.execute("ROLLBACK")
+                raise
+            self.connection.execute("COMMIT")
+            return result
+        except sqlite3.Error as e:
+            raise LedgerGeneratedError("[IDL-02] ID ledger {} update failed: {}".format(self.ledger_filepath, e))
+
+    def scope_block(self, kind, scope, block_number, top_id, block_size=BLOCK):
+        """ Block of a lookup field or resource: home block (0, its first id is the scope base) or extension block
+        .. (1, 2, ..). Created once above every block of the ledger and top_id, shared by conversions
+
+        :param kind: (str) LOOKUPID or RECORDID
+        :param scope: (str) lookup field or resource name
+        :param block_number: (int) 0 for the home block
+        :param top_id: (int) highest id or block end known to the conversion (max id file, blocks, ids handed out)
+        :param block_size: (int) ids of a new block (multiple of BLOCK)
+        :return: (tuple) (first id, size). First id is a multiple of BLOCK. Raise LedgerGeneratedError on error
+        """
+        return self._transaction(self._scope_block, kind, scope, block_number, top_id, block_size)
+
+    def _scope_block(self, kind, scope, block_number, top_id, block_size):
+        row = self.connection.execute("SELECT first_id, last_id FROM scope_blocks WHERE kind = ? AND scope = ? AND "
+                                      "block_number = ?", (kind, scope, block_number)).fetchone()
+        if row is not None:
+            return row[0], row[1] - row[0] + 1
+        if block_number == 0:  # Scope base written before scope_blocks
+            row = self.connection.execute("SELECT base_id FROM scope_base WHERE kind = ? AND scope = ?",
+                                          (kind, scope)).fetchone()
+            if row is not None:
+                return row[0], self.BLOCK
+        base_top = self.connection.execute("SELECT MAX(base_id) FROM scope_base").fetchone()[0]
+        block_top = self.connection.execute("SELECT MAX(last_id) FROM scope_blocks").fetchone()[0]
+        top_id = max(top_id, base_top + self.BLOCK - 1 if base_top is not None else -1,
+                     block_top if block_top is not None else -1)
+        first_id = top_id - (top_id % self.BLOCK) + self.BLOCK
+        if block_number == 0:
+            self.connection.execute("INSERT INTO scope_base VALUES (?, ?, ?)", (kind, scope, first_id))
+        self.connection.execute("INSERT INTO scope_blocks VALUES (?, ?, ?, ?, ?)",
+                                (kind, scope, block_number, first_id, first_id + block_size - 1))
+        return first_id, block_size
+
+    def allocate(self, kind, scope, page_key, floor_id, limit_id):
+        """ Id for a page: the id it owns in the ledger, else the next reserved id of the scope
+
+        :param kind: (str) LOOKUPID or RECORDID
+        :param scope: (str) lookup field or resource name
+        :param page_key: (str) lookup value / field StandardName (None: not recorded)
+        :param floor_id: (int) highest id of the scope in the max id file (or the scope base)
+        :param limit_id: (int) highest id allowed in the scope
+        :return: (int) id or -1 when the scope is full. Raise LedgerGeneratedError on error
+        """
+        key = (kind, scope, page_key)
+        if page_key is not None and key not in self.used_keys:
+            if (kind, scope) not in self.assigned:
+                try:
+                    self.assigned[(kind, scope)] = dict(self.connection.execute(
+                        "SELECT page_key, id FROM assigned WHERE kind = ? AND scope = ?", (kind, scope)).fetchall())
+                except sqlite3.Error as e:
+                    raise LedgerGeneratedError("[IDL-02] ID ledger {} read failed: {}".format(self.ledger_filepath, e))
+            owned_id = self.assigned[(kind, scope)].get(page_key)
+            if owned_id is not None:
+                self.used_keys.add(key)
+                return owned_id
+        reservation = self.reserved.get((kind, scope))
+        if reservation is None or reservation[0] > reservation[1]:
+            reservation = self._transaction(self._reserve, kind, scope, floor_id, limit_id)
+            if reservation is None:
+                return -1
+            self.reserved[(kind, scope)] = reservation
+        new_id = reservation[0]
+        reservation[0] += 1
+        if page_key is not None and key not in self.used_keys:  # Duplicate page keys get ids of their own
+            self.used_keys.add(key)
+            self.new_assignments.append((kind, scope, page_key, new_id))
+        return new_id
+
+    def _reserve(self, kind, scope, floor_id, limit_id):
+        row = self.connection.execute("SELECT max_id FROM scope_reserved WHERE kind = ? AND scope = ?",
+                                      (kind, scope)).fetchone()
+        first_id = max(floor_id, row[0] if row is not None else floor_id) + 1
+        if first_id > limit_id:
+            return None
+        last_id = min(first_id + self.reserve_block_size - 1, limit_id)
+        self.connection.execute("INSERT OR REPLACE INTO scope_reserved VALUES (?, ?, ?)", (kind, scope, last_id))
+        self.logger.debug("Reserved {} {} to {} for '{}'".format(kind, first_id, last_id, scope))
+        return [first_id, last_id]
+
+    def commit(self):
+        """ Conversion succeeded. Record ids given to pages and hand back unused reserved ids (unless another
+        .. conversion reserved after). The ledger can be used for the next conversion
+
+        :return: None. Raise LedgerGeneratedError on error
+        """
+        recorded = self._transaction(self._end_conversion, self.new_assignments)
+        self.logger.info("ID ledger: {} new page ids recorded in {}".format(recorded, self.ledger_filepath))
+        self.assigned = {}  # Reloaded: pages may have been recorded first by a conversion running at the same time
+        self._reset()
+
+    def discard(self):
+        """ Conversion failed. Hand back unused reserved ids without recording ids given to pages
+
+        :return: None. Raise LedgerGeneratedError on error
+        """
+        self._transaction(self._end_conversion, [])
+        self._reset()
+
+    def _reset(self):
+        self.new_assignments = []
+        self.used_keys = set()
+        self.reserved = {}
+
+    def _end_conversion(self, new_assignments):
+        recorded = 0
+        for kind, scope, page_key, page_id in new_assignments:
+            changes_before = self.connection.total_changes
+            self.connection.execute("INSERT OR IGNORE INTO assigned VALUES (?, ?, ?, ?)",
+                                    (kind, scope, page_key, page_id))
+            if self.connection.total_changes > changes_before:
+                recorded += 1
+                continue
+            # Page recorded by a conversion running at the same time. The ledger keeps its id for later runs
+            ledger_id = self.connection.execute("SELECT id FROM assigned WHERE kind = ? AND scope = ? AND page_key = ?",
+                                                (kind, scope, page_key)).fetchone()[0]
+            if ledger_id != page_id:
+                self.logger.warning("[IDL-04] %s '%s' of '%s' written with %s %s, but another conversion recorded it "
+                                    "in the ID ledger with %s. Later runs use %s",
+                                    'Lookup value' if kind == self.LOOKUPID else 'Field', page_key, scope, kind,
+                                    page_id, ledger_id, ledger_id)
+        for (kind, scope), (next_id, last_id) in self.reserved.items():
+            if next_id <= last_id:
+                self.connection.execute("UPDATE scope_reserved SET max_id = ? WHERE kind = ? AND scope = ? AND "
+                                        "max_id = ?", (next_id - 1, kind, scope, last_id))
+        return recorded
+
+    def close(self):
+        try:
+            self.connection.close()
+        except sqlite3.Error as e:
+            raise LedgerGeneratedError("[IDL-03] Cannot close ID ledger {}: {}".format(self.ledger_filepath, e))
@@ -0,0 +1,51 @@
+import logging
+import os
+
+__project__ = 'IOI_Import'
+__author__ = "Robert Gottesman"
+__version_date__ = "10/19/2026"
+
+""" Change log
+10/19/2026 - Created. Keep loaded input files (config xml, max ids, DD Wiki export) in memory while unchanged
+"""
+
+
+def file_signature(filepath):
+    """ Signature used to detect a changed file
+
+    :param filepath: (str) file name/path
+    :return: (tuple) modification time (ns) and size, or None if the file does not exist
+    """
+    try:
+        file_stat = os.stat(filepath)
+    except OSError:
+        return None
+    return file_stat.st_mtime_ns, file_stat.st_size
+
+
+class InputCache:
+    """ In memory cache of data loaded from input files, reused while the file signature is unchanged
+
+    Used when several conversions run in one process (--watch). Callers must copy anything they modify.
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(__project__ + '.' + self.__class__.__name__)
+        self.entries = {}  # key: (file signature, loaded data)
+
+    def get(self, key, filepath, load_function):
+        """ Return data loaded from filepath. load_function is called when not cached or when the file changed
+
+        :param key: (hashable) cache key (i.e. kind of data and filepath)
+        :param filepath: (str) file the data is loaded from
+        :param load_function: (function) no parameters, returns loaded data. May raise
+        :return: loaded data
+        """
+        signature = file_signature(filepath)
+        entry = self.entries.get(key)
+        if entry is not None and signature is not None and entry[0] == signature:
+            self.logger.debug("Reusing loaded file {}".format(filepath))
+            return entry[1]
+        data = load_function()
+        self.entries[key] = (signature, data)
+        return data
@@ -0,0 +1,122 @@
+import logging
+
+__project__ = 'IOI_Import'
+__author__ = "Robert Gottesman"
+__version_date__ = "10/19/2026"
+
+""" Change log
+10/19/2026 - Created. Check every 'Link' attribute in IOI import xml resolves to a known page title
+10/19/2026 - Links resolved as they are added. Only unresolved links are kept (until a page with their title is added)
+"""
+
+
+class LinkChecker:
+    """ Resolve 'Link' attributes (Groupings/Group, Lookup, Lookup_Field, References/Reference, Property_Types/Class,
+    Collection_Name) against a hash index of page titles
+
+    Known titles are the pages generated in the IOI import xml plus titles added with add_titles() (pages in the
+    DD Wiki export, page names from config.ini [PageLinks]). A link is resolved when it is added; an unresolved link
+    (i.e. to a lookup page written later) is kept until a page with one of its titles is added, so memory holds the
+    known titles and the links still pending, not every link of the output.
+    """
+    PAGE_ATTRIBUTE = 'Page_Title'
+    LINK_ATTRIBUTE = 'Link'
+
+    def __init__(self, link_title_templates=None):
+        """ Setup link checker
+
+        :param link_title_templates: (dict) tag: [page title templates]. '[[Name]]' is replaced with the Link value
+        .. to find the page (i.e. Groupings 'Group' link 'Structure' refers to page 'Structure Group')
+        :return: None
+        """
+        self.logger = logging.getLogger(__project__ + '.' + self.__class__.__name__)
+        self.known_titles = set()
+        self.link_count = 0  # Links added. Sequence of a pending link (document order)
+        self.pending_links = {}  # (tag, link): [(sequence, source page title)] links not resolved yet
+        self.pending_by_title = {}  # page title resolving a pending link: {(tag, link)}
+        self.page_title = None  # Last page started in document order
+        self.link_title_templates = link_title_templates or {}
+
+    def add_titles(self, titles):
+        """ Add page titles that exist outside of the IOI import xml
+
+        :param titles: (iterable) page titles
+        :return: None
+        """
+        for title in titles:
+            if title is not None:
+                self._add_title(title)
+
+    def _add_title(self, title):
+        """ Add a known page title and drop the pending links it resolves
+
+        :param title: (str) page title
+        :return: None
+        """
+        self.known_titles.add(title)
+        for link_key in self.pending_by_title.pop(title, ()):
+            self.pending_links.pop(link_key, None)
+
+    def _link_titles(self, tag, link):
+        """ Page titles a link refers to: the link itself and its tag templates
+
+        :return: (list) page titles
+        """
+        return [link] + [template.replace('[[Name]]', link) for template in self.link_title_templates.get(tag, [])]
+
+    def _add_link(self, page_title, tag, link):
+        """ Resolve a link against the known titles, or keep it pending
+
+        :param page_title: (str) source page title
+        :param tag: (str) tag of the node holding the link
+        :param link: (str) 'Link' attribute value
+        :return: None
+        """
+        self.link_count += 1
+        link_key = (tag, link)
+        if link_key in self.pending_links:
+            self.pending_links[link_key].append((self.link_count, page_title))
+            return
+        link_titles = self._link_titles(tag, link)
+        if any(title in self.known_titles for title in link_titles):
+            return
+        self.pending_links[link_key] = [(self.link_count, page_title)]
+        for title in link_titles:
+            self.pending_by_title.setdefault(title, set()).add(link_key)
+
+    def add_nodes(self, xml_node):
+        """ Index page titles and resolve links of xml_node and its children. May be called for consecutive parts
+        .. of a document (i.e. page by page while streaming output) in document order
+
+        :param xml_node: (xml node) root of IOI import xml or a page node
+        :return: None
+        """
+        for node in xml_node.iter():
+            if not isinstance(node.tag, str):
+                continue
+            if self.PAGE_ATTRIBUTE in node.attrib:
+                self.page_title = node.get(self.PAGE_ATTRIBUTE)
+                self._add_title(self.page_title)
+            link = node.get(self.LINK_ATTRIBUTE)
+            if link is not None:
+                # Link nodes are fields (or children of fields) of the last page started in document order
+                self._add_link(self.page_title, node.tag, link)
+
+    def dangling_links(self):
+        """ Links still unresolved once every page is added, in document order
+
+        :return: (list) dangling links as tuples (source page title, tag, link)
+        """
+        dangling = [(sequence, page_title, tag, link) for (tag, link), sources in self.pending_links.items()
+                    for sequence, page_title in sources]
+        dangling.sort()
+        return [(page_title, tag, link) for sequence, page_title, tag, link in dangling]
+
+    def check(self, xml_root):
+        """ Index generated page titles and resolve links in one pass, then list the links left unresolved
+
+        :param xml_root: (xml node) root of IOI import xml
+        :return: (list) dangling links as tuples (source page title, tag, link)
+        """
+        self.add_nodes(xml_root)
+        return self.dangling_links()
@@ -0,0 +1,64 @@
+__project__ = 'IOI_Import'
+__author__ = "Robert Gottesman"
+__version_date__ = "10/19/2026"
+
+""" Change log
+10/19/2026 - Created. Lookup fields/values from the xlsx lookup sheet indexed by lookup field name
+"""
+
+
+class LookupIndex:
+    """ Lookup fields and their values as read from the xlsx lookup sheet
+
+    Values keep spreadsheet row order. Sort order, alpha letter grouping, LookupFieldID and value counts are computed
+    once by finalize() after all rows are added (done by ResoXLSXtoDict while reading the lookup sheet).
+    """
+
+    def __init__(self):
+        self.lookup_values = {}  # lookup field name: [row dict, ...] in spreadsheet order
+        self.sorted_fields = []  # lookup field names in output order
+        self.letters = {}  # alpha letter: [lookup field names in output order]. Mimics DD Wiki 'A - Lookup Fields'
+        self.field_ids = {}  # lookup field name: LookupFieldID from xlsx (None if not entered)
+
+    def add_row(self, lookup_field_name, row):
+        """ Add a lookup value row to its lookup field
+
+        :param lookup_field_name: (str) value of 'LookupField' column
+        :param row: (dict) xlsx row, key is column header
+        :return: None
+        """
+        self.lookup_values.setdefault(lookup_field_name, []).append(row)
+
+    def finalize(self):
+        """ Compute output order, letter grouping and LookupFieldID for each lookup field
+
+        :return: None
+        """
+        self.sorted_fields = sorted(self.lookup_values.keys())
+        self.letters = {}
+        self.field_ids = {}
+        for lookup_field_name in self.sorted_fields:
+            self.letters.setdefault(lookup_field_name[0], []).append(lookup_field_name)
+            # All values in a lookup field have the same LookupFieldID .. pick up 1st lookup value item
+            self.field_ids[lookup_field_name] = self.lookup_values[lookup_field_name][0].get('LookupFieldID')
+
+    def sorted_letters(self):
+        return sorted(self.letters.keys())
+
+    def fields_for_letter(self, letter):
+        return self.letters.get(letter, [])
+
+    def values(self, lookup_field_name):
+        return self.lookup_values.get(lookup_field_name, [])
+
+    def value_count(self, lookup_field_name):
+        return len(self.lookup_values.get(lookup_field_name, []))
+
+    def field_id(self, lookup_field_name):
+        return self.field_ids.get(lookup_field_name)
+
+    def __contains__(self, lookup_field_name):
+        return lookup_field_name in self.lookup_values
+
+    def __len__(self):
+        return len(self.lookup_values)
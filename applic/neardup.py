@@ -0,0 +1,100 @@
+import math
+import re
+
+__project__ = 'IOI_Import'
+__author__ = "Robert Gottesman"
+__version_date__ = "10/19/2026"
+
+""" Change log
+10/19/2026 - Created. Near duplicate page titles (case/space variants, near identical names) via an n-gram index
+"""
+
+
+def normalize_title(title):
+    """ Key that ignores case, spaces and punctuation (i.e. 'PropertySubtype' and 'Property SubType' are the same)
+
+    :param title: (str) page title
+    :return: (str) normalized key
+    """
+    return re.sub(r'[\W_]+', '', title).lower()
+
+
+class NearDuplicateIndex:
+    """ Page titles indexed by normalized key and by character n-grams of the normalized key
+
+    similar() finds titles whose normalized key is the same (score 1.0) or whose n-gram sets have a Jaccard similarity
+    of at least the threshold. Only the rarest n-grams of a title are looked up (prefix filtering): a title sharing none
+    of them cannot reach the threshold. Candidates found are then scored, so a title is not compared with every
+    indexed title.
+    """
+
+    def __init__(self, threshold=0.85, ngram_size=3):
+        """ Setup empty index
+
+        :param threshold: (float) min similarity (0-1) reported by similar()
+        :param ngram_size: (int) characters per n-gram
+        :return: None
+        """
+        self.threshold = threshold
+        self.ngram_size = ngram_size
+        self.titles = []  # title id: title
+        self.title_ngrams = []  # title id: set of n-grams
+        self.title_ids = {}  # title: title id
+        self.keys = {}  # normalized key: [title id, ...]
+        self.postings = {}  # n-gram: [title id, ...]
+
+    def _ngrams(self, key):
+        padded = '^' + key + '$'
+        if len(padded) <= self.ngram_size:
+            return {padded}
+        return {padded[idx:idx + self.ngram_size] for idx in range(len(padded) - self.ngram_size + 1)}
+
+    def add(self, title):
+        """ Index a title (once)
+
+        :param title: (str) page title
+        :return: None
+        """
+        if title in self.title_ids:
+            return
+        title_id = len(self.titles)
+        key = normalize_title(title)
+        ngrams = self._ngrams(key)
+        self.titles.append(title)
+        self.title_ngrams.append(ngrams)
+        self.title_ids[title] = title_id
+        self.keys.setdefault(key, []).append(title_id)
+        for ngram in ngrams:
+            self.postings.setdefault(ngram, []).append(title_id)
+
+    def similar(self, title):
+        """ Indexed titles that are near duplicates of title (identical titles are not reported)
+
+        :param title: (str) page title
+        :return: (list) of tuples (indexed title, similarity score), highest score first
+        """
+        key = normalize_title(title)
+        matches = {title_id: 1.0 for title_id in self.keys.get(key, [])}
+        ngrams = self._ngrams(key)
+        # Jaccard >= threshold needs at least ceil(threshold * len(ngrams)) shared n-grams, so a match shares one of the
+        # .. len(ngrams) - ceil(threshold * len(ngrams)) + 1 rarest n-grams
+        prefix_length = len(ngrams) - int(math.ceil(self.threshold * len(ngrams))) + 1
+        rarest_ngrams = sorted(ngrams, key=lambda ngram: (len(self.postings.get(ngram, [])), ngram))[:prefix_length]
+        min_size = self.threshold * len(ngrams)
+        max_size = len(ngrams) / self.threshold if self.threshold > 0 else float('inf')
+        for ngram in rarest_ngrams:
+            for title_id in self.postings.get(ngram, []):
+                if title_id in matches:
+                    continue
+                other_ngrams = self.title_ngrams[title_id]
+                if not min_size <= len(other_ngrams) <= max_size:
+                    matches[title_id] = 0.0
+                    continue
+                shared = len(ngrams & other_ngrams)
+                matches[title_id] = shared / float(len(ngrams) + len(other_ngrams) - shared)
+        return sorted(((self.titles[title_id], round(score, 3)) for title_id, score in matches.items()
+                       if score >= self.threshold and self.titles[title_id] != title),
+                      key=lambda match: (-match[1], match[0]))
+
+    def __len__(self):
+        return len(self.titles)
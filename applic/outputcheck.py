@@ -0,0 +1,245 @@
+import datetime
+import logging
+import re
+
+from lxml import etree as xml_tree
+
+from applic.compressedio import DECOMPRESSION_ERRORS, open_file
+from applic.inputcache import file_signature
+
+__project__ = 'IOI_Import'
+__author__ = "Robert Gottesman"
+__version_date__ = "10/19/2026"
+__high_err_num__ = 13
+
+""" Change log
+10/19/2026 - Created. IOI import xml checked page by page against rules compiled from DDWikiImportConfig.xml Forms
+10/19/2026 - Corrupt or truncated compressed xml file reported as [VAL-13] (DECOMPRESSION_ERRORS)
+"""
+
+_compiled_rules = {}  # (config xml filepath, file signature): rules. Compiled once per process and config revision
+
+
+def cached_rules(config_filepath, compile_function):
+    """ Output rules of a DDWikiImportConfig.xml, compiled on first use and reused while the file is unchanged
+
+    :param config_filepath: (str) DDWikiImportConfig.xml file path
+    :param compile_function: (function) no parameters, returns rules (see DictToXML.output_rules)
+    :return: (dict) rules
+    """
+    key = (config_filepath, file_signature(config_filepath))
+    if key not in _compiled_rules:
+        _compiled_rules[key] = compile_function()
+    return _compiled_rules[key]
+
+
+class OutputCheckGeneratedError(Exception):
+    """
+    Handle known problems in this module passing detail information
+    """
+    def __init__(self, value):
+        self.value = value
+
+    def __str__(self):
+        return repr(self.value)
+
+
+class OutputValidator:
+    """ Check IOI import xml pages against the Forms of DDWikiImportConfig.xml (rules from DictToXML.output_rules)
+
+    Each page is checked on its own (fields only, child pages excluded), so pages can be checked while the xml is
+    written (check_page, check_tree) or while an existing file is read (check_file). Time is linear in output size;
+    only the Item page titles are kept. A page:
+    * has a Page_Title (unique for Item pages) and a known Page_Template. Its node type (Group/Item) is the Form
+      Node_Type and only Group pages hold child pages
+    * holds every field of its Form once, in Form Sequence order, and no other field
+    * Labels hold only label sub nodes. A label is one word without ':;,.?&[]()#^*@!'
+    * Sub nodes of Groupings, Property_Types, References, ... have the Form ChildTagName
+    * A value (not empty, not a '<comment>') in a link field has a non empty 'Link' attribute. Other nodes have none
+    * IDs (Record_Identifier, LookupID, Lookup_FieldID) are whole numbers, dates are empty or in an output date format
+    Violations are logged as warnings with the page title ([VAL-01] .. [VAL-11]).
+    """
+    PAGE_ATTRIBUTE = 'Page_Title'
+    TEMPLATE_ATTRIBUTE = 'Page_Template'
+    LINK_ATTRIBUTE = 'Link'
+    ITEM_NODE_TYPE = 'Item'
+    ID_PATTERN = re.compile(r'^[1-9][0-9]*$')
+    LABEL_PATTERN = re.compile(r'^[^\s:;,.?&\[\]()#^*@!]+$')
+
+    def __init__(self, rules):
+        """ Setup validator
+
+        :param rules: (dict) 'templates': {Page_Template: template rules}, 'date_formats': [strptime formats]
+        :return: None
+        """
+        self.logger = logging.getLogger(__project__ + '.' + self.__class__.__name__)
+        self.templates = rules['templates']
+        self.date_formats = rules['date_formats']
+        self.page_titles = set()
+        self.valid_dates = set()  # Date texts already parsed. Pages share few distinct dates
+        self.page_count = 0
+        self.violation_count = 0
+
+    def _violation(self, code, message, *args):
+        self.violation_count += 1
+        self.logger.warning('[' + code + '] ' + message, *args)
+
+    def _check_link(self, node, page_title, field_tag):
+        text = node.text.strip() if node.text is not None else ''
+        link = node.get(self.LINK_ATTRIBUTE)
+        if len(text) > 0 and text[0] != '<':
+            if not link:
+                self._violation('VAL-08', "No 'Link' on value '%s' of '%s' on page '%s'", text, field_tag, page_title)
+        elif link is not None:
+            self._violation('VAL-08', "'Link' on empty or comment value of '%s' on page '%s'", field_tag, page_title)
+
+    def _check_field(self, field_node, rules, page_title):
+        """ Check one field node of a page
+
+        :param field_node: (xml node) field node
+        :param rules: (dict) rules of the page template
+        :param page_title: (str) page title (messages)
+        :return: None
+        """
+        tag = field_node.tag
+        if tag in rules['label_tags']:
+            if field_node.text is not None and field_node.text.strip():
+                self._violation('VAL-07', "Text in '%s' on page '%s'", tag, page_title)
+            for label_node in field_node:
+                if label_node.tag != rules['label_tags'][tag]:
+                    self._violation('VAL-07', "'%s' node in '%s' on page '%s'", label_node.tag, tag, page_title)
+                elif label_node.text is None or not self.LABEL_PATTERN.match(label_node.text):
+                    self._violation('VAL-07', "Bad label '%s' on page '%s'", label_node.text, page_title)
+            return
+        if field_node.get(self.LINK_ATTRIBUTE) is not None and tag not in rules['link_tags']:
+            self._violation('VAL-08', "Unexpected 'Link' on '%s' on page '%s'", tag, page_title)
+        elif tag in rules['link_tags']:
+            self._check_link(field_node, page_title, tag)
+        if tag in rules['child_tags']:
+            for sub_node in field_node:
+                if sub_node.tag != rules['child_tags'][tag]:
+                    self._violation('VAL-09', "'%s' node in '%s' on page '%s' (expected '%s')", sub_node.tag, tag,
+                                    page_title, rules['child_tags'][tag])
+                elif tag in rules['link_child_tags']:
+                    self._check_link(sub_node, page_title, tag)
+                elif sub_node.get(self.LINK_ATTRIBUTE) is not None:
+                    self._violation('VAL-08', "Unexpected 'Link' in '%s' on page '%s'", tag, page_title)
+        elif len(field_node) > 0:
+            self._violation('VAL-09', "Unexpected sub nodes in '%s' on page '%s'", tag, page_title)
+        text = field_node.text.strip() if field_node.text is not None else ''
+        if tag in rules['id_tags'] and not self.ID_PATTERN.match(text):
+            self._violation('VAL-10', "ID '%s' in '%s' on page '%s' is not a number", text, tag, page_title)
+        if tag in rules['date_tags'] and len(text) > 0 and not self._is_date(text):
+            self._violation('VAL-11', "Date '%s' in '%s' on page '%s' not in output date format", text, tag,
+                            page_title)
+
+    def _is_date(self, text):
+        if text in self.valid_dates:
+            return True
+        for date_format in self.date_formats:
+            try:
+                datetime.datetime.strptime(text, date_format)
+                self.valid_dates.add(text)
+                return True
+            except ValueError:
+                pass
+        return False
+
+    def check_page(self, page_node):
+        """ Check a page (its child pages are not checked)
+
+        :param page_node: (xml node) page node
+        :return: None
+        """
+        self.page_count += 1
+        page_title = page_node.get(self.PAGE_ATTRIBUTE)
+        rules = self.templates.get(page_node.get(self.TEMPLATE_ATTRIBUTE))
+        if not page_title:
+            self._violation('VAL-01', "Page without title (template '%s')", page_node.get(self.TEMPLATE_ATTRIBUTE))
+        elif page_node.tag == self.ITEM_NODE_TYPE:
+            # Group pages (i.e. 'Listing Group') repeat under each resource holding the group
+            if page_title in self.page_titles:
+                self._violation('VAL-02', "Duplicate page title '%s'", page_title)
+            else:
+                self.page_titles.add(page_title)
+        if rules is None:
+            self._violation('VAL-01', "Unknown Page_Template '%s' on page '%s'", page_node.get(self.TEMPLATE_ATTRIBUTE),
+                            page_title)
+            return
+        if page_node.tag != rules['node_type']:
+            self._violation('VAL-03', "Page '%s' is a %s (Form node type %s)", page_title, page_node.tag,
+                            rules['node_type'])
+        last_sequence = -1
+        seen_tags = set()
+        for field_node in page_node:
+            if not isinstance(field_node.tag, str):
+                continue
+            if self.PAGE_ATTRIBUTE in field_node.attrib:
+                if rules['node_type'] == self.ITEM_NODE_TYPE:
+                    self._violation('VAL-03', "Item page '%s' holds page '%s'", page_title,
+                                    field_node.get(self.PAGE_ATTRIBUTE))
+                continue
+            sequence = rules['sequence'].get(field_node.tag)
+            if sequence is None:
+                self._violation('VAL-05', "Unexpected field '%s' on page '%s'", field_node.tag, page_title)
+                continue
+            if field_node.tag in seen_tags:
+                self._violation('VAL-05', "Repeated field '%s' on page '%s'", field_node.tag, page_title)
+            elif sequence < last_sequence:
+                self._violation('VAL-06', "Field '%s' out of Form order on page '%s'", field_node.tag, page_title)
+            seen_tags.add(field_node.tag)
+            last_sequence = max(last_sequence, sequence)
+            self._check_field(field_node, rules, page_title)
+        if len(seen_tags) < len(rules['fields']):
+            for tag in rules['fields']:
+                if tag not in seen_tags:
+                    self._violation('VAL-04', "Missing field '%s' on page '%s'", tag, page_title)
+
+    def check_tree(self, xml_node):
+        """ Check every page of a tree (root node or page node) in document order
+
+        :param xml_node: (xml node)
+        :return: None
+        """
+        for node in xml_node.iter():
+            if isinstance(node.tag, str) and self.PAGE_ATTRIBUTE in node.attrib:
+                self.check_page(node)
+
+    def check_file(self, xml_filepath):
+        """ Check an IOI import xml file read with iterparse. A page is checked at its end tag, then released
+
+        :param xml_filepath: (str) xml file (may be gzip/xz/zstd compressed)
+        :return: (int) violations found. Raise OutputCheckGeneratedError on error
+        """
+        open_page_types = []  # Node tag of open pages
+        try:
+            with open_file(xml_filepath, 'rb') as xml_file:
+                for event, node in xml_tree.iterparse(xml_file, events=('start', 'end')):
+                    if self.PAGE_ATTRIBUTE not in node.attrib:
+                        continue
+                    if event == 'start':
+                        if open_page_types and self.templates.get(open_page_types[-1], {}).get(
+                                'node_type') == self.ITEM_NODE_TYPE:
+                            self._violation('VAL-03', "Item page holds page '%s'", node.get(self.PAGE_ATTRIBUTE))
+                        open_page_types.append(node.get(self.TEMPLATE_ATTRIBUTE))
+                        continue
+                    open_page_types.pop()
+                    self.check_page(node)
+                    # Child pages are checked and released before their parent. The parent keeps its fields only
+                    node.clear()
+                    if node.getparent() is not None:
+                        node.getparent().remove(node)
+        except DECOMPRESSION_ERRORS as e:
+            raise OutputCheckGeneratedError("[VAL-13] Cannot read xml file {}: {}".format(xml_filepath, e))
+        except xml_tree.XMLSyntaxError as e:
+            raise OutputCheckGeneratedError("[VAL-13] Cannot parse xml file {}: {}".format(xml_filepath, e))
+        return self.violation_count
+
+    def report(self):
+        """ Log summary
+
+        :return: (int) violations found
+        """
+        self.logger.info("[VAL-12] Output check: {} pages checked, {} violations found".
+                         format(self.page_count, self.violation_count))
+        return self.violation_count
@@ -0,0 +1,194 @@
+import csv
+import json
+import logging
+
+from applic.compressedio import open_file, split_ext
+
+__project__ = 'IOI_Import'
+__author__ = "Robert Gottesman"
+__version_date__ = "10/19/2026"
+
+""" Change log
+10/19/2026 - Created. Pages fed to NDJSON/JSON page files and a CSV page manifest while the IOI xml is written
+10/19/2026 - Optional validator (OutputValidator) checks each page fed
+"""
+
+
+def page_record(page_node, parent_title=None, label_tags=('Labels',)):
+    """ Page data of an IOI page node (child pages excluded)
+
+    :param page_node: (xml node) page node (has a Page_Title attribute)
+    :param parent_title: (str) Page_Title of the parent page (None: top page)
+    :param label_tags: (iterable) field tags holding labels (not listed in fields)
+    :return: (dict) title, template, type, parent, fields, links, labels. A field with sub nodes is a list of the
+    .. sub node texts, otherwise the field text. Links list the field and target of every 'Link' attribute
+    """
+    fields = {}
+    links = []
+    labels = []
+    for field_node in page_node:
+        if not isinstance(field_node.tag, str) or PageSinkSet.PAGE_ATTRIBUTE in field_node.attrib:
+            continue
+        if field_node.tag in label_tags:
+            labels.extend(label_node.text or '' for label_node in field_node)
+            continue
+        if field_node.get('Link') is not None:
+            links.append({'field': field_node.tag, 'target': field_node.get('Link')})
+        if len(field_node) > 0:
+            fields[field_node.tag] = [sub_node.text or '' for sub_node in field_node]
+            links.extend({'field': field_node.tag, 'target': sub_node.get('Link')} for sub_node in field_node
+                         if sub_node.get('Link') is not None)
+        else:
+            fields[field_node.tag] = field_node.text or ''
+    return {'title': page_node.get(PageSinkSet.PAGE_ATTRIBUTE), 'template': page_node.get('Page_Template'),
+            'type': page_node.tag, 'parent': parent_title, 'fields': fields, 'links': links, 'labels': labels}
+
+
+class NDJSONPageSink:
+    """ One JSON object per page and line """
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self.file_obj = open_file(filepath, 'w')
+
+    def add(self, record, depth):
+        self.file_obj.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def close(self):
+        self.file_obj.close()
+
+
+class JSONPageSink(NDJSONPageSink):
+    """ JSON array of pages. Written one page at a time like NDJSONPageSink """
+
+    def __init__(self, filepath):
+        NDJSONPageSink.__init__(self, filepath)
+        self.page_count = 0
+        self.file_obj.write('[')
+
+    def add(self, record, depth):
+        self.file_obj.write((',\n' if self.page_count > 0 else '\n') + json.dumps(record, ensure_ascii=False))
+        self.page_count += 1
+
+    def close(self):
+        self.file_obj.write('\n]\n')
+        NDJSONPageSink.close(self)
+
+
+class CSVManifestSink:
+    """ One CSV row per page: output sequence, title, template, parent, depth and field/link/label counts """
+    COLUMNS = ['Sequence', 'Page_Title', 'Page_Template', 'Node_Type', 'Parent_Title', 'Depth', 'Fields', 'Links',
+               'Labels']
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self.file_obj = open_file(filepath, 'w')
+        self.csv_writer = csv.writer(self.file_obj, lineterminator='\n')
+        self.csv_writer.writerow(self.COLUMNS)
+        self.page_count = 0
+
+    def add(self, record, depth):
+        self.page_count += 1
+        self.csv_writer.writerow([self.page_count, record['title'], record['template'], record['type'],
+                                  record['parent'] or '', depth, len(record['fields']), len(record['links']),
+                                  len(record['labels'])])
+
+    def close(self):
+        self.file_obj.close()
+
+
+class PageSinkSet:
+    """ Output formats fed with each page while the IOI import xml is written, so every format comes from the same
+    .. pass over the pages (the xml file is not parsed again)
+
+    Pages are added in xml document order: a page before its child pages. File names are derived from the IOI xml
+    file name: 'name.xml' gives 'name.ndjson', 'name.json' and 'name_pages.csv'. NDJSON/JSON files keep the
+    compression extension of the xml file (.gz, .xz, .zst). A validator (OutputValidator) is fed the same pages.
+    """
+    PAGE_ATTRIBUTE = 'Page_Title'
+    NDJSON = 'ndjson'
+    JSON = 'json'
+    MANIFEST = 'manifest'
+    FORMATS = [NDJSON, JSON, MANIFEST]
+    SINK_CLASSES = {NDJSON: NDJSONPageSink, JSON: JSONPageSink, MANIFEST: CSVManifestSink}
+
+    def __init__(self, formats, result_xml_filepath, label_tags=('Labels',), validator=None):
+        """ Open one output file per format
+
+        :param formats: (list) of FORMATS (may be empty)
+        :param result_xml_filepath: (str) IOI import xml filename/path. Output names are derived from it
+        :param label_tags: (iterable) page field tags holding labels
+        :param validator: (OutputValidator) check each page added (None: no check)
+        :return: None. Raise OSError on error
+        """
+        self.logger = logging.getLogger(__project__ + '.' + self.__class__.__name__)
+        self.label_tags = frozenset(label_tags)
+        self.validator = validator
+        self.page_count = 0
+        self.sinks = []
+        try:
+            for output_format in formats:
+                self.sinks.append(self.SINK_CLASSES[output_format](self.output_filepath(result_xml_filepath,
+                                                                                        output_format)))
+        except OSError:
+            self.close()
+            raise
+
+    @classmethod
+    def output_filepath(cls, result_xml_filepath, output_format):
+        """ Output file name of a format: 'name.xml.gz' gives 'name.ndjson.gz', 'name.json.gz', 'name_pages.csv'
+
+        :param result_xml_filepath: (str) IOI import xml filename/path
+        :param output_format: (str) one of FORMATS
+        :return: (str) filename/path
+        """
+        base, ext, comp_ext = split_ext(result_xml_filepath)
+        if output_format == cls.MANIFEST:
+            return base + '_pages.csv'
+        return base + '.' + output_format + comp_ext
+
+    def add_page(self, page_node, parent_title=None, depth=0):
+        """ Feed one page (its child pages are not added)
+
+        :param page_node: (xml node) page node
+        :param parent_title: (str) Page_Title of the parent page (None: top page)
+        :param depth: (int) 0 for a top page
+        :return: None. Raise OSError on error
+        """
+        self.page_count += 1
+        if self.validator is not None:
+            self.validator.check_page(page_node)
+        if len(self.sinks) == 0:
+            return
+        record = page_record(page_node, parent_title, self.label_tags)
+        for sink in self.sinks:
+            sink.add(record, depth)
+
+    def add_tree(self, xml_node, parent_title=None, depth=0):
+        """ Feed the pages of a tree in document order
+
+        :param xml_node: (xml node) page node or root node (not a page)
+        :param parent_title: (str) Page_Title of the page holding xml_node (None: top page or root)
+        :param depth: (int) depth of xml_node if it is a page
+        :return: None. Raise OSError on error
+        """
+        if self.PAGE_ATTRIBUTE in xml_node.attrib:
+            self.add_page(xml_node, parent_title, depth)
+            parent_title = xml_node.get(self.PAGE_ATTRIBUTE)
+            depth += 1
+        for child_node in xml_node:
+            if isinstance(child_node.tag, str) and self.PAGE_ATTRIBUTE in child_node.attrib:
+                self.add_tree(child_node, parent_title, depth)
+
+    def close(self):
+        """ Close output files. Log the output check summary
+
+        :return: None. Raise OSError on error
+        """
+        for sink in self.sinks:
+            sink.close()
+        if self.validator is not None:
+            self.validator.report()
+        if self.page_count > 0 and len(self.sinks) > 0:
+            self.logger.info("Wrote {} pages to: {}".format(self.page_count,
+                                                            ', '.join(sink.filepath for sink in self.sinks)))
@@ -0,0 +1,200 @@
+import queue
+import threading
+
+from lxml import etree as xml_tree
+
+from applic.compressedio import open_file
+from applic.dicttoxml import DictToXML, DXMLGeneratedError
+from applic.idblocks import IDBlockAllocator
+from applic.progress import ProgressFile
+from applic.streamxml import PageStreamWriter
+
+__project__ = 'IOI_Import'
+__author__ = "Robert Gottesman"
+__version_date__ = "10/19/2026"
+
+""" Change log
+10/19/2026 - Created. Pipelined mode: xlsx read, xml build and xml write overlap on reader/writer threads
+10/19/2026 - Writer thread also feeds the pages to the page outputs (page_formats)
+10/19/2026 - Writer thread also checks the written pages (validate_output, OutputValidator)
+10/19/2026 - Optional pinned_datetime passed to DictToXML (reproducible output)
+10/19/2026 - Optional id_block_size passed to DictToXML (IDBlockAllocator)
+"""
+
+
+class PipelinedDictToXML(DictToXML):
+    """ Convert xlsx to IOI import xml with the stages overlapped
+
+    * Reader thread: ResoXLSXtoDict.iter_xlsx_sheets() reads the xlsx one sheet at a time
+    * Main thread: loads config, max id file and DD Wiki export while the xlsx is read, then builds each resource
+      sheet as soon as it is read and the lookups once the lookup sheet is read
+    * Writer thread: serializes each finished resource/lookup tree to the output file
+
+    Pages are built in the same order as DictToXML so IDs, page titles and output are the same. Lookup references of
+    fields ([DXM-50]) are checked once the lookup sheet is read.
+    """
+    STOP = None  # Queue sentinel
+
+    def __init__(self, files_and_folders, max_id_filepath, ddwiki_exported_filepath,
+                 result_xml_filepath,
+                 xlsx_to_dict,
+                 xlsx_date,
+                 program_config_data=None,
+                 id_ledger=None,
+                 near_dup_threshold=None,
+                 progress=None,
+                 page_formats=None,
+                 validate_output=False,
+                 pinned_datetime=None,
+                 id_block_size=IDBlockAllocator.ALIGNMENT):
+        """ Convert xlsx file to IOI import xml file in pipelined mode
+
+        :param files_and_folders: (obj) object containing file locations
+        :param max_id_filepath: (str) File name/path for file containing DD Wiki max lookupids (stat_warning_log.txt)
+        :param ddwiki_exported_filepath: (str) File name/path for latest dd wiki xml exported file
+        :param result_xml_filepath: (str) File name/path for resultant IOI import xml file
+        :param xlsx_to_dict: (ResoXLSXtoDict) xlsx reader. Sheets are read with iter_xlsx_sheets() on a thread
+        :param xlsx_date: (datetime) Timestamp for result_xml_filepath
+        :param program_config_data: (dict) config.ini file read into dictionary
+        :param id_ledger: (IDLedger) Reserve computed ids from the ledger (None: ids from max id file only)
+        :param near_dup_threshold: (float) Warn about near duplicate field/lookup value names (None: no check)
+        :param progress: (ProgressReporter) Report build progress (None: no report). The xlsx reader reports none
+        :param page_formats: (list) Also write pages as NDJSON/JSON/manifest on the writer thread (None: xml only)
+        :param validate_output: (bool) Check each written page against the Forms of DDWikiImportConfig.xml
+        :param pinned_datetime: (datetime) Clock of the run (None: time the conversion started)
+        :param id_block_size: (int) ids in a new RecordID/LookupID block (multiple of 1000)
+        :return: None. Raise DXMLGeneratedError (or IOIGeneratedError from xlsx reader) on error.
+        """
+        self.xlsx_to_dict = xlsx_to_dict
+        self.lookups_read = False
+        self.pending_lookup_references = []  # (lookup field name, page title) checked once lookups are read
+        self.sheet_queue = queue.Queue()
+        self.stop_reading = threading.Event()
+        # Workbook cache is read/written on the main thread. Unpickling on another thread deadlocks on the import
+        # .. lock while the applic package runs main() at import time
+        self.cache_hit = xlsx_to_dict.load_cached()
+        sheets = xlsx_to_dict.cached_sheets() if self.cache_hit else xlsx_to_dict.iter_xlsx_sheets()
+        reader_thread = threading.Thread(target=self._read_sheets, args=(sheets,), name='xlsx-reader', daemon=True)
+        reader_thread.start()
+        try:
+            DictToXML.__init__(self, files_and_folders=files_and_folders, max_id_filepath=max_id_filepath,
+                               ddwiki_exported_filepath=ddwiki_exported_filepath,
+                               result_xml_filepath=result_xml_filepath,
+                               spreadsheet_dict=xlsx_to_dict.spreadsheet_info,
+                               xlsx_date=xlsx_date, program_config_data=program_config_data,
+                               id_ledger=id_ledger, near_dup_threshold=near_dup_threshold, progress=progress,
+                               page_formats=page_formats, validate_output=validate_output,
+                               pinned_datetime=pinned_datetime, id_block_size=id_block_size)
+        finally:
+            self.stop_reading.set()
+
+    def _read_sheets(self, sheets):
+        """ Reader thread. Queue each sheet as soon as it is read, then STOP. A reader error is queued and
+        .. raised on the main thread
+
+        :param sheets: (iterable) ('Resources'|'Lookups', sheet tab name) yielded once the sheet is read
+        :return: None
+        """
+        try:
+            for sheet_type, sheet_tab_name in sheets:
+                self.sheet_queue.put((sheet_type, sheet_tab_name))
+                if self.stop_reading.is_set():
+                    break
+        except Exception as e:
+            self.sheet_queue.put(e)
+        self.sheet_queue.put(self.STOP)
+
+    def _write_pages(self, write_queue, result_xml_filepath, errors):
+        """ Writer thread. Write each queued tree under the root node until STOP
+
+        :param write_queue: (Queue) xml nodes (children of root) in output order
+        :param result_xml_filepath: (str) File name/path for resultant IOI import xml file
+        :param errors: (list) exception raised while writing is appended
+        :return: None
+        """
+        try:
+            page_sinks = self._open_page_sinks(result_xml_filepath)
+            try:
+                with open_file(result_xml_filepath, 'wb') as result_file:
+                    with xml_tree.xmlfile(ProgressFile(result_file, self.progress)) as xml_file:
+                        writer = PageStreamWriter(xml_file, self.xml_root.tag, dict(self.xml_root.attrib),
+                                                  page_sinks)
+                        for xml_node in iter(write_queue.get, self.STOP):
+                            writer.write_page(xml_node)
+                        writer.close()
+                    result_file.write(b'\n')
+            finally:
+                self._close_page_sinks(page_sinks)
+        except Exception as e:
+            errors.append(e)
+
+    def _check_lookup_reference(self, lookup_field_name, page_title):
+        if self.lookups_read:
+            DictToXML._check_lookup_reference(self, lookup_field_name, page_title)
+        else:
+            self.pending_lookup_references.append((lookup_field_name, page_title))
+
+    def _lookups_ready(self):
+        """ Lookup sheet is read (or there is none). Check lookup references of fields built so far
+
+        :return: None
+        """
+        self.lookup_index = self.spreadsheet_data['Lookups']
+        self.lookups_read = True
+        for lookup_field_name, page_title in self.pending_lookup_references:
+            self._check_lookup_reference(lookup_field_name, page_title)
+        self.pending_lookup_references = []
+
+    def _generate(self, result_xml_filepath, shard_by=None, shard_max_pages=None, shard_max_bytes=None):
+        """ Build each sheet as the reader thread delivers it and hand finished trees to the writer thread
+
+        :param result_xml_filepath: (str) File name/path for resultant IOI import xml file
+        :return: None. Raise DXMLGeneratedError on error
+        """
+        link_checker = self._new_link_checker()
+        write_queue = queue.Queue()
+        write_errors = []
+        writer_thread = threading.Thread(target=self._write_pages, name='xml-writer',
+                                         args=(write_queue, result_xml_filepath, write_errors))
+        writer_thread.start()
+        try:
+            for sheet in iter(self.sheet_queue.get, self.STOP):
+                if isinstance(sheet, Exception):
+                    raise sheet
+                sheet_type, sheet_tab_name = sheet
+                scratch_root = xml_tree.Element(self.XML_ROOT_TAG)
+                if sheet_type == 'Resources':
+                    self._create_resource_sheet(scratch_root, sheet_tab_name)
+                else:
+                    self._lookups_ready()
+                    self._create_lookups(scratch_root)
+                self._hand_to_writer(scratch_root, write_queue, link_checker)
+            if not self.lookups_read:  # No lookup sheet. Lookup top page is always written
+                self._lookups_ready()
+                scratch_root = xml_tree.Element(self.XML_ROOT_TAG)
+                self._create_lookups(scratch_root)
+                self._hand_to_writer(scratch_root, write_queue, link_checker)
+            if not self.cache_hit:
+                self.xlsx_to_dict.save_cached()
+        finally:
+            write_queue.put(self.STOP)
+            writer_thread.join()
+        if len(write_errors) > 0:
+            if isinstance(write_errors[0], (FileNotFoundError, IOError)):
+                raise DXMLGeneratedError("[DXM-11] Unable to write xml file: {}".format(result_xml_filepath))
+            raise write_errors[0]
+        self._report_dangling_links(link_checker.dangling_links())
+        self.logger.debug("XML written to File:" + result_xml_filepath)
+
+    def _hand_to_writer(self, scratch_root, write_queue, link_checker):
+        """ Check links of finished trees and queue them for writing. Trees are detached from scratch_root
+
+        :param scratch_root: (xml node) parent of finished trees
+        :param write_queue: (Queue) writer thread queue
+        :param link_checker: (LinkChecker) collects page titles and links in document order
+        :return: None
+        """
+        for xml_node in list(scratch_root):
+            link_checker.add_nodes(xml_node)
+            scratch_root.remove(xml_node)
+            write_queue.put(xml_node)
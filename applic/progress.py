@@ -0,0 +1,172 @@
+import json
+import logging
+import sys
+import time
+
+__project__ = 'IOI_Import'
+__author__ = "Robert Gottesman"
+__version_date__ = "10/19/2026"
+
+""" Change log
+10/19/2026 - Created. Throttled progress (count, rate, ETA) of xlsx reading, page building and xml writing
+"""
+
+
+class ProgressReporter:
+    """ Progress of the running stage (i.e. rows of a sheet, pages of a resource, lookup values, bytes written)
+
+    advance() only counts. A progress report is written when at least min_interval_seconds passed since the last one:
+    * text: logged as info ('Progress: ...'). Only long stages are reported
+    * json: one JSON object per line on stdout. Stage start/end and end of run are always written
+    * off: nothing
+    """
+    OFF = 'off'
+    TEXT = 'text'
+    JSON = 'json'
+    MODES = [OFF, TEXT, JSON]
+
+    def __init__(self, mode=TEXT, min_interval_seconds=2.0, stream=None):
+        """ Setup reporter
+
+        :param mode: (str) one of MODES
+        :param min_interval_seconds: (float) min seconds between progress reports
+        :param stream: (file) json output (default: stdout)
+        :return: None
+        """
+        self.logger = logging.getLogger(__project__ + '.' + self.__class__.__name__)
+        self.mode = mode
+        self.enabled = mode != self.OFF
+        self.min_interval_seconds = min_interval_seconds
+        self.stream = stream
+        self.run_start = time.monotonic()
+        self.stage = None
+        self.unit = None
+        self.total = None
+        self.done = 0
+        self.detail = None
+        self.stage_start = self.run_start
+        self.next_report = self.run_start + min_interval_seconds
+        self.bytes_written = 0
+
+    def start(self, stage, total=None, unit='rows'):
+        """ End the running stage and start a new one
+
+        :param stage: (str) stage name (i.e. "Resource 'Property'")
+        :param total: (int) expected count (None: unknown, no ETA)
+        :param unit: (str) what is counted (rows, pages, values, bytes)
+        :return: None
+        """
+        if not self.enabled:
+            return
+        self.end_stage()
+        self.stage = stage
+        self.unit = unit
+        self.total = total
+        self.done = 0
+        self.detail = None
+        self.stage_start = time.monotonic()
+        self.next_report = self.stage_start + self.min_interval_seconds
+        if self.mode == self.JSON:
+            self._report('stage_start', self.stage_start)
+
+    def set_detail(self, detail):
+        """ Part of the stage being processed (i.e. lookup letter)
+
+        :param detail: (str)
+        :return: None
+        """
+        self.detail = detail
+
+    def advance(self, count=1):
+        """ Count processed items of the running stage. Reports when min_interval_seconds passed
+
+        :param count: (int) items processed
+        :return: None
+        """
+        if not self.enabled:
+            return
+        self.done += count
+        now = time.monotonic()
+        if now >= self.next_report:
+            self._report('progress', now)
+
+    def written(self, byte_count):
+        """ Count bytes written to the output. Advances the running stage if it counts bytes
+
+        :param byte_count: (int)
+        :return: None
+        """
+        self.bytes_written += byte_count
+        if self.unit == 'bytes':
+            self.advance(byte_count)
+
+    def end_stage(self):
+        """ End the running stage. Reported in json mode, and in text mode if the stage was reported before
+
+        :return: None
+        """
+        if not self.enabled or self.stage is None:
+            return
+        now = time.monotonic()
+        if self.mode == self.JSON or now - self.stage_start >= self.min_interval_seconds:
+            self._report('stage_end', now)
+        self.stage = None
+        self.unit = None
+
+    def finish(self):
+        """ End of run
+
+        :return: None
+        """
+        if not self.enabled:
+            return
+        self.end_stage()
+        if self.mode == self.JSON:
+            self._write_json({'event': 'end', 'elapsed_seconds': round(time.monotonic() - self.run_start, 3),
+                              'bytes_written': self.bytes_written})
+
+    def _report(self, event, now):
+        self.next_report = now + self.min_interval_seconds
+        elapsed = now - self.stage_start
+        rate = self.done / elapsed if elapsed > 0 else None
+        eta = (self.total - self.done) / rate if self.total is not None and rate else None
+        if self.mode == self.JSON:
+            self._write_json({'event': event, 'stage': self.stage, 'detail': self.detail, 'unit': self.unit,
+                              'done': self.done, 'total': self.total,
+                              'rate': round(rate, 1) if rate is not None else None,
+                              'eta_seconds': round(eta, 1) if eta is not None else None,
+                              'elapsed_seconds': round(elapsed, 3), 'bytes_written': self.bytes_written})
+            return
+        text = "Progress: {}{} {}{} {}".format(self.stage, " [{}]".format(self.detail) if self.detail else '',
+                                               self.done, '/{}'.format(self.total) if self.total else '', self.unit)
+        if self.total:
+            text += " ({:.0%})".format(min(1.0, self.done / float(self.total)))
+        if rate is not None:
+            text += ", {:.0f} {}/s".format(rate, self.unit)
+        if event == 'stage_end':
+            text += ", done in {:.1f}s".format(elapsed)
+        elif eta is not None:
+            text += ", ETA {:.0f}s".format(max(0.0, eta))
+        if self.bytes_written > 0 and self.unit != 'bytes':
+            text += ", {:.1f} MB written".format(self.bytes_written / 1048576.0)
+        self.logger.info(text)
+
+    def _write_json(self, report):
+        stream = self.stream if self.stream is not None else sys.stdout
+        stream.write(json.dumps(report) + '\n')
+        stream.flush()
+
+
+class ProgressFile:
+    """ Output file wrapper counting bytes written (ProgressReporter.written) """
+
+    def __init__(self, file_obj, progress):
+        self.file_obj = file_obj
+        self.progress = progress
+
+    def write(self, data):
+        self.progress.written(len(data))
+        return self.file_obj.write(data)
+
+    def flush(self):
+        return self.file_obj.flush()
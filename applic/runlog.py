@@ -0,0 +1,145 @@
+import logging
+import logging.handlers
+import os
+import queue
+import re
+
+__project__ = 'IOI_Import'
+__author__ = "Robert Gottesman"
+__version_date__ = "10/19/2026"
+
+""" Change log
+10/19/2026 - Created. Log handlers on a background queue, repeated coded messages aggregated, summary at end of run
+10/19/2026 - end_conversion(): summary logged and counts restarted after each conversion of a run (--watch)
+"""
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """ Queue records without formatting them. The message is formatted by the handlers on the listener thread """
+
+    def prepare(self, record):
+        return record
+
+
+class MessageCodeAggregator(logging.Filter):
+    """ Count log records by message code ('[DXM-41] ...') and let only the first max_examples of each code through
+
+    Records without a code and ERROR/CRITICAL records are never held back.
+    """
+    CODE_PATTERN = re.compile(r'^\[([A-Z]+-?\d+)\]')
+
+    def __init__(self, max_examples=5):
+        """ Setup counters
+
+        :param max_examples: (int) records passed per code (0: all)
+        :return: None
+        """
+        super().__init__()
+        self.max_examples = max_examples
+        self.counts = {}  # code: [level name, count, first record]
+        self.last_record = None  # Same filter on several handlers (forked child) counts a record once
+        self.last_result = True
+
+    def filter(self, record):
+        if record is not self.last_record:
+            self.last_record = record
+            self.last_result = self._count(record)
+        return self.last_result
+
+    def _count(self, record):
+        code_match = self.CODE_PATTERN.match(str(record.msg))
+        if code_match is None:
+            return True
+        entry = self.counts.get(code_match.group(1))
+        if entry is None:
+            self.counts[code_match.group(1)] = [record.levelname, 1, record]
+            return True
+        entry[1] += 1
+        return self.max_examples == 0 or entry[1] <= self.max_examples or record.levelno >= logging.ERROR
+
+    def reset(self):
+        """ Start counting again (next conversion of the run)
+
+        :return: None
+        """
+        self.counts = {}
+        self.last_record = None
+        self.last_result = True
+
+    def summary_lines(self):
+        """ One line per code seen more than once or logged as warning or above
+
+        :return: (list) of str
+        """
+        lines = []
+        for code in sorted(self.counts):
+            level_name, count, first_record = self.counts[code]
+            if count == 1 and logging.getLevelName(level_name) < logging.WARNING:
+                continue
+            not_shown = 0 if self.max_examples == 0 else max(0, count - self.max_examples)
+            lines.append("  {:<8} {:<8} {:>7} {:>9}  {}".format(code, level_name, count, not_shown,
+                                                                    first_record.getMessage()))
+        return lines
+
+
+class RunLog:
+    """ Logging for a program run. The project logger queues records (DeferredQueueHandler) and a QueueListener thread
+    .. writes them to the console/file handlers, so rows are not slowed by handler I/O. Repeated coded messages are
+    .. aggregated (MessageCodeAggregator) and a summary table is logged by close(), or by end_conversion() after
+    .. each conversion of a run converting several times (--watch)
+
+    A forked child process has no listener thread. Handlers are attached directly to the logger in the child.
+    """
+
+    def __init__(self, logger, handlers, max_examples=5):
+        """ Move handlers behind a queue
+
+        :param logger: (Logger) project logger
+        :param handlers: (list) console/file handlers (formatter set)
+        :param max_examples: (int) records shown per message code (0: all)
+        :return: None
+        """
+        self.logger = logger
+        self.handlers = handlers
+        self.aggregator = MessageCodeAggregator(max_examples)
+        self.queue_handler = DeferredQueueHandler(queue.Queue())
+        self.queue_handler.addFilter(self.aggregator)
+        self.listener = logging.handlers.QueueListener(self.queue_handler.queue, *handlers,
+                                                       respect_handler_level=True)
+        logger.addHandler(self.queue_handler)
+        self.listener.start()
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork_in_child)
+
+    def _after_fork_in_child(self):
+        if self.queue_handler in self.logger.handlers:
+            self.logger.removeHandler(self.queue_handler)
+            for handler in self.handlers:
+                handler.addFilter(self.aggregator)
+                self.logger.addHandler(handler)
+
+    def _log_summary(self):
+        summary_lines = self.aggregator.summary_lines()
+        if len(summary_lines) > 0:
+            self.logger.info("Message summary:\n  {:<8} {:<8} {:>7} {:>9}  {}\n".format(
+                'Code', 'Level', 'Count', 'Not shown', 'First message') + '\n'.join(summary_lines))
+
+    def end_conversion(self):
+        """ Log summary table of message codes of the conversion just ended, then count again, so messages of the
+        .. next conversion are shown up to max_examples
+
+        :return: None
+        """
+        self._log_summary()
+        self.aggregator.reset()
+
+    def close(self):
+        """ Log summary table of message codes, then write queued records and stop the listener thread
+
+        :return: None
+        """
+        if self.queue_handler not in self.logger.handlers:
+            return
+        self._log_summary()
+        self.logger.removeHandler(self.queue_handler)
+        self.listener.stop()
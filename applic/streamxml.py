@@ -0,0 +1,321 @@
+from lxml import etree as xml_tree
+
+from applic.compressedio import open_file
+from applic.dicttoxml import DictToXML, DXMLGeneratedError
+from applic.extsort import ExternalSorter
+from applic.idblocks import IDBlockAllocator
+from applic.lookupindex import LookupIndex
+from applic.progress import ProgressFile
+
+__project__ = 'IOI_Import'
+__author__ = "Robert Gottesman"
+__version_date__ = "10/19/2026"
+
+""" Change log
+10/19/2026 - Created. Low memory mode: xlsx rows external sorted in output order and written page by page
+10/19/2026 - PageStreamWriter feeds written pages to optional page outputs (PageSinkSet)
+10/19/2026 - Written pages checked while streaming (validate_output, OutputValidator)
+10/19/2026 - Optional pinned_datetime passed to DictToXML (reproducible output)
+10/19/2026 - Optional id_block_size passed to DictToXML (IDBlockAllocator)
+10/19/2026 - Link check keeps only unresolved links (LinkChecker), not every link of the output
+"""
+
+
+class PageStreamWriter:
+    """ Write IOI import xml one page at a time with the same layout as lxml pretty_print
+
+    Group pages stay open (start tag written) until all their child pages are written. Only the page being written
+    is held in memory. Written pages are also added to page_sinks (NDJSON/JSON/manifest outputs) if given.
+    """
+    INDENT = '  '
+
+    def __init__(self, xml_file, root_tag, root_attributes, page_sinks=None):
+        """ Start xml document
+
+        :param xml_file: (obj) lxml xmlfile context (entered)
+        :param root_tag: (str) root node tag
+        :param root_attributes: (dict) root node attributes
+        :param page_sinks: (PageSinkSet) also add each written page to these outputs (None: xml only)
+        :return: None
+        """
+        self.xml_file = xml_file
+        self.page_sinks = page_sinks
+        self.open_elements = []  # lxml element contexts of open Group pages, root first
+        self.open_titles = []  # Page_Title of open Group pages
+        self._open(root_tag, root_attributes)
+
+    def _indent(self, node, level):
+        """ Set whitespace of node children like lxml pretty_print would for a node at given level
+
+        :param node: (xml node)
+        :param level: (int) nesting level of node
+        :return: None
+        """
+        if len(node) > 0 and (node.text is None or not node.text.strip()):
+            node.text = '\n' + self.INDENT * (level + 1)
+        for child in node:
+            self._indent(child, level + 1)
+            child.tail = '\n' + self.INDENT * (level + 1)
+        if len(node) > 0:
+            node[-1].tail = '\n' + self.INDENT * level
+
+    def _write_node(self, node):
+        level = len(self.open_elements)
+        self._indent(node, level)
+        self.xml_file.write(self.INDENT * level)
+        self.xml_file.write(node)
+        self.xml_file.write('\n')
+
+    def _open(self, tag, attributes):
+        self.xml_file.write(self.INDENT * len(self.open_elements))
+        element_context = self.xml_file.element(tag, attributes)
+        element_context.__enter__()
+        self.xml_file.write('\n')
+        self.open_elements.append(element_context)
+
+    def open_page(self, page_node):
+        """ Write start tag and fields of a Group page. Child pages are written until close_page()
+
+        :param page_node: (xml node) page node without child pages
+        :return: None
+        """
+        if self.page_sinks is not None:
+            self.page_sinks.add_page(page_node, self.open_titles[-1] if self.open_titles else None,
+                                     len(self.open_titles))
+        self._open(page_node.tag, dict(page_node.attrib))
+        self.open_titles.append(page_node.get('Page_Title'))
+        for field_node in page_node:
+            self._write_node(field_node)
+
+    def write_page(self, page_node):
+        """ Write a complete page (Item)
+
+        :param page_node: (xml node) page node
+        :return: None
+        """
+        if self.page_sinks is not None:
+            self.page_sinks.add_tree(page_node, self.open_titles[-1] if self.open_titles else None,
+                                     len(self.open_titles))
+        self._write_node(page_node)
+
+    def close_page(self):
+        """ Write end tag of the innermost open Group page (or root)
+
+        :return: None
+        """
+        element_context = self.open_elements.pop()
+        del self.open_titles[max(0, len(self.open_elements) - 1):]  # Root has no title
+        self.xml_file.write(self.INDENT * len(self.open_elements))
+        element_context.__exit__(None, None, None)
+        if len(self.open_elements) > 0:
+            self.xml_file.write('\n')  # No text allowed after the root end tag
+
+    def close(self):
+        """ Write end tags of all open pages and the root
+
+        :return: None
+        """
+        while len(self.open_elements) > 0:
+            self.close_page()
+
+
+class StreamingDictToXML(DictToXML):
+    """ Convert xlsx rows to IOI import xml without holding the workbook or the output xml in memory
+
+    Rows are streamed from ResoXLSXtoDict.iter_xlsx_rows() into an ExternalSorter keyed by output order:
+    resources in [ResourceSheets] order then by Groups path and StandardName, lookups by lookup field.
+    The sorted rows are then rendered and written page by page. Memory is bounded by memory_budget_bytes
+    (plus the unique page title registry, a stack of open Groups and the links not resolved yet by the link check).
+    """
+    RESOURCE_SORT = 0
+    LOOKUP_SORT = 1
+
+    def __init__(self, files_and_folders, max_id_filepath, ddwiki_exported_filepath,
+                 result_xml_filepath,
+                 xlsx_to_dict,
+                 xlsx_date,
+                 program_config_data=None,
+                 memory_budget_bytes=256 * 1024 * 1024,
+                 id_ledger=None,
+                 near_dup_threshold=None,
+                 progress=None,
+                 page_formats=None,
+                 validate_output=False,
+                 pinned_datetime=None,
+                 id_block_size=IDBlockAllocator.ALIGNMENT):
+        """ Convert xlsx file to IOI import xml file in low memory (streaming) mode
+
+        :param files_and_folders: (obj) object containing file locations
+        :param max_id_filepath: (str) File name/path for file containing DD Wiki max lookupids (stat_warning_log.txt)
+        :param ddwiki_exported_filepath: (str) File name/path for latest dd wiki xml exported file
+        :param result_xml_filepath: (str) File name/path for resultant IOI import xml file
+        :param xlsx_to_dict: (ResoXLSXtoDict) xlsx reader. Rows are read with iter_xlsx_rows()
+        :param xlsx_date: (datetime) Timestamp for result_xml_filepath
+        :param program_config_data: (dict) config.ini file read into dictionary
+        :param memory_budget_bytes: (int) Max bytes of xlsx rows held in memory while sorting
+        :param id_ledger: (IDLedger) Reserve computed ids from the ledger (None: ids from max id file only)
+        :param near_dup_threshold: (float) Warn about near duplicate field/lookup value names (None: no check)
+        :param progress: (ProgressReporter) Report progress (None: no report)
+        :param page_formats: (list) Also write pages as NDJSON/JSON/manifest (None: xml only)
+        :param validate_output: (bool) Check each written page against the Forms of DDWikiImportConfig.xml
+        :param pinned_datetime: (datetime) Clock of the run (None: time the conversion started)
+        :param id_block_size: (int) ids in a new RecordID/LookupID block (multiple of 1000)
+        :return: None. Raise DXMLGeneratedError on error.
+        """
+        self.xlsx_to_dict = xlsx_to_dict
+        self.memory_budget_bytes = memory_budget_bytes
+        self.sheet_row_counts = {}  # sheet tab name (or 'Lookups'): sorted rows (progress totals)
+        DictToXML.__init__(self, files_and_folders=files_and_folders, max_id_filepath=max_id_filepath,
+                           ddwiki_exported_filepath=ddwiki_exported_filepath,
+                           result_xml_filepath=result_xml_filepath,
+                           spreadsheet_dict={'Resources': {}, 'Lookups': LookupIndex()},
+                           xlsx_date=xlsx_date, program_config_data=program_config_data,
+                           id_ledger=id_ledger, near_dup_threshold=near_dup_threshold, progress=progress,
+                           page_formats=page_formats, validate_output=validate_output,
+                           pinned_datetime=pinned_datetime, id_block_size=id_block_size)
+
+    def _sort_rows(self):
+        """ Stream xlsx rows into external sorter keyed by output order
+
+        :return: (ExternalSorter) sorted rows. Raise IOIGeneratedError on xlsx error
+        """
+        sorter = ExternalSorter(self.memory_budget_bytes)
+        sheet_sequence = {sheet_tab_name: idx for idx, sheet_tab_name in
+                          enumerate(self.program_config_data['ResourceSheets'])}
+        lookup_field_names = set()
+        for sheet_type, name, row in self.xlsx_to_dict.iter_xlsx_rows():
+            count_key = name if sheet_type == 'Resources' else 'Lookups'
+            self.sheet_row_counts[count_key] = self.sheet_row_counts.get(count_key, 0) + 1
+            if sheet_type == 'Resources':
+                sorter.add((self.RESOURCE_SORT, sheet_sequence[name], tuple(row['Groups']),
+                            row[self.STANDARD_NAME_COLUMN]), (name, row))
+            else:
+                lookup_field_names.add(name)
+                sorter.add((self.LOOKUP_SORT, name), (name, row))
+        # Lookup fields are known before any resource field is rendered (used to check Lookup column)
+        self.lookup_index = lookup_field_names
+        self.logger.info("Sorted {} xlsx rows using {} temporary run files".format(sorter.record_count,
+                                                                                  len(sorter.runs)))
+        return sorter
+
+    def _generate(self, result_xml_filepath, shard_by=None, shard_max_pages=None, shard_max_bytes=None):
+        """ Sort xlsx rows, then render and write pages in one streaming pass
+
+        :param result_xml_filepath: (str) File name/path for resultant IOI import xml file
+        :return: None. Raise DXMLGeneratedError on error
+        """
+        sorter = self._sort_rows()
+        link_checker = self._new_link_checker()
+        page_sinks = self._open_page_sinks(result_xml_filepath)
+        try:
+            with open_file(result_xml_filepath, 'wb') as result_file:
+                with xml_tree.xmlfile(ProgressFile(result_file, self.progress)) as xml_file:
+                    writer = PageStreamWriter(xml_file, self.xml_root.tag, dict(self.xml_root.attrib), page_sinks)
+                    self._stream_pages(sorter, writer, link_checker)
+                    writer.close()
+                result_file.write(b'\n')
+        except (FileNotFoundError, IOError):
+            raise DXMLGeneratedError("[DXM-11] Unable to write xml file: {}".format(result_xml_filepath))
+        finally:
+            self._close_page_sinks(page_sinks)
+        self._report_dangling_links(link_checker.dangling_links())
+        self.logger.debug("XML written to File:" + result_xml_filepath)
+
+    def _render_page(self, add_node_function, *args):
+        """ Render a page into a scratch parent so it can be written and released
+
+        :param add_node_function: (function) DictToXML _add_*_node method. 1st parameter is the parent node
+        :return: (xml node) page node
+        """
+        scratch_parent = xml_tree.Element(self.XML_ROOT_TAG)
+        return add_node_function(scratch_parent, *args)
+
+    def _stream_pages(self, sorter, writer, link_checker):
+        """ Render sorted rows, opening and closing Group pages as the Groups path changes
+
+        :param sorter: (ExternalSorter) rows sorted in output order
+        :param writer: (PageStreamWriter) output writer
+        :param link_checker: (LinkChecker) collects page titles and links
+        :return: None. Raise DXMLGeneratedError on error
+        """
+        open_path = []  # Groups path of open Group pages
+        current_sheet = None
+        resource_name = None
+        config_form_name = None
+        lookups_open = False
+        letter_key = None
+        letter_labels = None
+        lookup_field_name = None
+        for key, (name, row) in sorter:
+            if key[0] == self.RESOURCE_SORT:
+                if name != current_sheet:
+                    # New resource sheet. Close all Groups of the previous resource
+                    for _ in open_path:
+                        writer.close_page()
+                    open_path = []
+                    current_sheet = name
+                    resource_name = self.program_config_data['ResourceSheets'][name]
+                    config_form_name = self._get_item_form_name(resource_name)
+                    self.logger.info("Processing Input Worksheet: '{}' for resource: '{}'".
+                                     format(name, resource_name))
+                    self.progress.start("Resource '{}'".format(resource_name), total=self.sheet_row_counts.get(name),
+                                        unit='pages')
+                path = row['Groups']
+                if len(path) == 0 or path[0] != resource_name:
+                    raise DXMLGeneratedError("[DXM-07] Unable to find value '{0}' in xlsx 'Group' column for "
+                                             "resource '{1}'".format(','.join(path), resource_name))
+                common = 0
+                while common < len(open_path) and common < len(path) and open_path[common] == path[common]:
+                    common += 1
+                for _ in range(len(open_path) - common):
+                    writer.close_page()
+                del open_path[common:]
+                for depth in range(common, len(path)):
+                    group_node = self._render_page(self._add_group_node, depth, path[depth], resource_name)
+                    link_checker.add_nodes(group_node)
+                    writer.open_page(group_node)
+                    open_path.append(path[depth])
+                item_node = self._render_page(self._add_item_node, config_form_name, row, resource_name)
+                link_checker.add_nodes(item_node)
+                writer.write_page(item_node)
+            else:
+                if not lookups_open:
+                    lookups_open = self._open_lookup_top(writer, open_path, link_checker)
+                    open_path = []
+                if name[0] != letter_key:
+                    if lookup_field_name is not None:
+                        writer.close_page()  # lookup field
+                        writer.close_page()  # letter
+                    letter_key = name[0]
+                    self.progress.set_detail(letter_key)
+                    letter_node, letter_labels = self._render_page(self._add_lookup_letter_node, letter_key)
+                    link_checker.add_nodes(letter_node)
+                    writer.open_page(letter_node)
+                    lookup_field_name = None
+                if name != lookup_field_name:
+                    if lookup_field_name is not None:
+                        writer.close_page()
+                    lookup_field_name = name
+                    field_node = self._render_page(self._add_lookup_field_node, name, row.get('LookupFieldID'),
+                                                   letter_labels)
+                    link_checker.add_nodes(field_node)
+                    writer.open_page(field_node)
+                value_node = self._render_page(self._add_lookup_value_node, name, row)
+                link_checker.add_nodes(value_node)
+                writer.write_page(value_node)
+        if not lookups_open:
+            self._open_lookup_top(writer, open_path, link_checker)
+
+    def _open_lookup_top(self, writer, open_path, link_checker):
+        """ Close open resource Groups and open the top Lookup page
+
+        :return: (bool) True
+        """
+        for _ in open_path:
+            writer.close_page()
+        self.logger.info("Processing Input Lookup Values")
+        self.progress.start('Lookups', total=self.sheet_row_counts.get('Lookups'), unit='values')
+        top_lookup_node = self._render_page(self._add_lookup_top_node)
+        link_checker.add_nodes(top_lookup_node)
+        writer.open_page(top_lookup_node)
+        return True
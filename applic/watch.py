@@ -0,0 +1,69 @@
+import logging
+import os
+import time
+
+from applic.inputcache import file_signature
+
+__project__ = 'IOI_Import'
+__author__ = "Robert Gottesman"
+__version_date__ = "10/19/2026"
+
+""" Change log
+10/19/2026 - Created. Poll input files for changes (--watch)
+"""
+
+
+class InputWatcher:
+    """ Poll input files (xlsx, config.ini, DDWikiImportConfig.xml, exported xml, max id file) for changes
+
+    A change is reported once the files are unchanged for one poll interval, so a file still being saved is not read.
+    """
+
+    def __init__(self, filepaths, poll_seconds=0.5):
+        """ Setup watcher
+
+        :param filepaths: (list) files to watch
+        :param poll_seconds: (float) seconds between polls
+        :return: None
+        """
+        self.logger = logging.getLogger(__project__ + '.' + self.__class__.__name__)
+        self.filepaths = list(filepaths)
+        self.poll_seconds = poll_seconds
+
+    def signatures(self):
+        """ Current signature of each watched file
+
+        :return: (dict) filepath: (mtime ns, size) or None if missing
+        """
+        return {filepath: file_signature(filepath) for filepath in self.filepaths}
+
+    @staticmethod
+    def changed_files(old_signatures, new_signatures):
+        """ Files with a different signature
+
+        :param old_signatures: (dict) signatures of last conversion (None: every file changed)
+        :param new_signatures: (dict) current signatures
+        :return: (list) changed filepaths
+        """
+        if old_signatures is None:
+            return list(new_signatures.keys())
+        return [filepath for filepath, signature in new_signatures.items()
+                if old_signatures.get(filepath) != signature]
+
+    def wait_for_change(self, converted_signatures):
+        """ Block until a watched file differs from converted_signatures and is settled (unchanged for one poll)
+
+        :param converted_signatures: (dict) signatures used by the last conversion (None: return right away)
+        :return: (dict) settled signatures. Raise KeyboardInterrupt when stopped with Ctrl-C
+        """
+        signatures = self.signatures()
+        if converted_signatures is None:
+            return signatures
+        while True:
+            time.sleep(self.poll_seconds)
+            new_signatures = self.signatures()
+            if new_signatures == signatures and new_signatures != converted_signatures:
+                for filepath in self.changed_files(converted_signatures, new_signatures):
+                    self.logger.info("Input changed: {}".format(os.path.basename(filepath)))
+                return new_signatures
+            signatures = new_signatures
@@ -0,0 +1,99 @@
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+
+__project__ = 'IOI_Import'
+__author__ = "Robert Gottesman"
+__version_date__ = "10/19/2026"
+
+""" Change log
+10/19/2026 - Created. Cache of parsed xlsx (spreadsheet_info) keyed by xlsx content hash and config.ini sheet mapping
+10/19/2026 - A folder input (CSV sheet files) is keyed by the name and content of each file in it
+"""
+
+
+class WorkbookCache:
+    """ Store parsed xlsx data (ResoXLSXtoDict.spreadsheet_info) in pickle files so an unchanged workbook is not
+    parsed again
+
+    The cache key is a sha256 of the xlsx file content, the [ResourceSheets]/[LookupSheets] mapping in config.ini
+    and CACHE_VERSION. Any change to one of them is a cache miss. Bump CACHE_VERSION when the layout of
+    spreadsheet_info changes.
+    """
+    CACHE_VERSION = 1
+    CACHE_EXT = '.pickle'
+    READ_CHUNK_BYTES = 1024 * 1024
+
+    def __init__(self, cache_folder):
+        """ Setup cache
+
+        :param cache_folder: (str) Folder holding cache files. Created when first entry is saved
+        :return: None
+        """
+        self.logger = logging.getLogger(__project__ + '.' + self.__class__.__name__)
+        self.cache_folder = cache_folder
+
+    def make_key(self, xlsx_filepath, sheet_mapping):
+        """ Compute cache key
+
+        :param xlsx_filepath: (str) Full path for input xlsx file (or .zip/folder of CSV sheet files)
+        :param sheet_mapping: (list) (section, key, value) tuples from config.ini that select xlsx sheets
+        :return: (str) hex key. Raise OSError if xlsx file cannot be read
+        """
+        key_hash = hashlib.sha256()
+        if os.path.isdir(xlsx_filepath):
+            input_filepaths = [os.path.join(xlsx_filepath, file_name) for file_name in sorted(os.listdir(xlsx_filepath))
+                               if os.path.isfile(os.path.join(xlsx_filepath, file_name))]
+        else:
+            input_filepaths = [xlsx_filepath]
+        for input_filepath in input_filepaths:
+            if input_filepath != xlsx_filepath:
+                key_hash.update(os.path.basename(input_filepath).encode('utf-8') + b'\0')
+            with open(input_filepath, 'rb') as xlsx_file:
+                for chunk in iter(lambda: xlsx_file.read(self.READ_CHUNK_BYTES), b''):
+                    key_hash.update(chunk)
+        key_hash.update(repr((self.CACHE_VERSION, list(sheet_mapping))).encode('utf-8'))
+        return key_hash.hexdigest()
+
+    def _cache_filepath(self, key):
+        return os.path.join(self.cache_folder, key + self.CACHE_EXT)
+
+    def load(self, key):
+        """ Load cached spreadsheet_info
+
+        :param key: (str) cache key from make_key()
+        :return: (dict) spreadsheet_info or None on cache miss. An unreadable cache file is a miss
+        """
+        cache_filepath = self._cache_filepath(key)
+        if not os.path.isfile(cache_filepath):
+            return None
+        try:
+            with open(cache_filepath, 'rb') as cache_file:
+                return pickle.load(cache_file)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError) as e:
+            self.logger.warning("[IOI-14] Ignoring unreadable workbook cache file {}: {}".format(cache_filepath, e))
+            return None
+
+    def save(self, key, spreadsheet_info):
+        """ Save spreadsheet_info. Written to a temporary file then renamed so readers never see a partial file
+
+        :param key: (str) cache key from make_key()
+        :param spreadsheet_info: (dict) parsed xlsx data
+        :return: (bool) True if saved. A failed save is logged and otherwise ignored
+        """
+        try:
+            os.makedirs(self.cache_folder, exist_ok=True)
+            temp_fd, temp_filepath = tempfile.mkstemp(dir=self.cache_folder, suffix='.tmp')
+            try:
+                with os.fdopen(temp_fd, 'wb') as cache_file:
+                    pickle.dump(spreadsheet_info, cache_file, pickle.HIGHEST_PROTOCOL)
+                os.replace(temp_filepath, self._cache_filepath(key))
+            except BaseException:
+                os.remove(temp_filepath)
+                raise
+        except (OSError, pickle.PicklingError) as e:
+            self.logger.warning("[IOI-15] Unable to write workbook cache in {}: {}".format(self.cache_folder, e))
+            return False
+        return True
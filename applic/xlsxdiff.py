@@ -0,0 +1,152 @@
+import hashlib
+import json
+
+from applic.buildtargets import BuildTargets
+
+__project__ = 'IOI_Import'
+__author__ = "Robert Gottesman"
+__version_date__ = "10/19/2026"
+
+""" Change log
+10/19/2026 - Created. Column level diff of two xlsx revisions (rows hash joined by key), text/json report
+"""
+
+
+def row_fingerprint(row):
+    """ Fingerprint of an xlsx row. Same columns and values give the same fingerprint
+
+    :param row: (dict) xlsx row, key is column header
+    :return: (str) hex digest
+    """
+    row_items = sorted((str(column), repr(value)) for column, value in row.items())
+    return hashlib.blake2b(repr(row_items).encode('utf-8'), digest_size=8).hexdigest()
+
+
+class WorkbookDiff:
+    """ Added, removed and modified rows between two xlsx revisions
+
+    Rows come from ResoXLSXtoDict.iter_xlsx_rows(). A resource row is keyed by (sheet tab name, StandardName), a lookup
+    row by (LookupField, LookupValue). Old rows are held in a dict (hash join), new rows are streamed against it, so
+    time and memory grow linearly with the rows. Repeated keys are told apart by occurrence (key, key #2, ..).
+    """
+    ADDED = 'added'
+    REMOVED = 'removed'
+    MODIFIED = 'modified'
+    CHANGE_MARKS = {ADDED: '+', REMOVED: '-', MODIFIED: '~'}
+    RESOURCE_KEY_COLUMN = 'StandardName'
+    LOOKUP_KEY_COLUMN = 'LookupValue'
+
+    def __init__(self, old_rows, new_rows, old_name='old', new_name='new'):
+        """ Compare rows of two xlsx revisions
+
+        :param old_rows: (iterable) ('Resources', sheet tab name, row) or ('Lookups', lookup field name, row)
+        :param new_rows: (iterable) same as old_rows for the new revision
+        :param old_name: (str) old revision name (report)
+        :param new_name: (str) new revision name (report)
+        :return: None
+        """
+        self.old_name = old_name
+        self.new_name = new_name
+        self.changes = []  # dict per added/removed/modified row, new revision order then removed rows
+        self.fingerprints = {}  # (sheet type, sheet, key): fingerprint of new row
+        self.unchanged_count = 0
+        old_index = {}  # (sheet type, sheet, key): (fingerprint, row)
+        for row_key, row in self._keyed_rows(old_rows):
+            old_index[row_key] = (row_fingerprint(row), row)
+        for row_key, row in self._keyed_rows(new_rows):
+            fingerprint = row_fingerprint(row)
+            self.fingerprints[row_key] = fingerprint
+            old_entry = old_index.pop(row_key, None)
+            if old_entry is None:
+                self._add_change(row_key, self.ADDED, fingerprint)
+            elif old_entry[0] != fingerprint:
+                self._add_change(row_key, self.MODIFIED, fingerprint, self._changed_columns(old_entry[1], row))
+            else:
+                self.unchanged_count += 1
+        for row_key, (fingerprint, row) in old_index.items():
+            self._add_change(row_key, self.REMOVED, fingerprint)
+
+    def _keyed_rows(self, rows):
+        """ Key each row. Repeated keys get an occurrence suffix
+
+        :param rows: (iterable) ('Resources', sheet tab name, row) or ('Lookups', lookup field name, row)
+        :return: (generator) of tuples ((sheet type, sheet, key), row)
+        """
+        occurrences = {}
+        for sheet_type, sheet_name, row in rows:
+            key_column = self.RESOURCE_KEY_COLUMN if sheet_type == 'Resources' else self.LOOKUP_KEY_COLUMN
+            row_key = (sheet_type, sheet_name, str(row.get(key_column)))
+            occurrences[row_key] = occurrences.get(row_key, 0) + 1
+            if occurrences[row_key] > 1:
+                row_key = (sheet_type, sheet_name, '{} #{}'.format(row_key[2], occurrences[row_key]))
+            yield row_key, row
+
+    @staticmethod
+    def _changed_columns(old_row, new_row):
+        """ Columns with a different value (a column missing in one row has value None)
+
+        :param old_row: (dict) xlsx row
+        :param new_row: (dict) xlsx row
+        :return: (dict) column: (old value, new value)
+        """
+        columns = list(old_row.keys()) + [column for column in new_row.keys() if column not in old_row]
+        return {column: (old_row.get(column), new_row.get(column)) for column in columns
+                if old_row.get(column) != new_row.get(column)}
+
+    def _add_change(self, row_key, change, fingerprint, columns=None):
+        self.changes.append({'sheet_type': row_key[0], 'sheet': row_key[1], 'key': row_key[2], 'change': change,
+                             'fingerprint': fingerprint, 'columns': columns or {}})
+
+    def summary(self):
+        """ Change counts
+
+        :return: (dict) added, removed, modified, unchanged row counts
+        """
+        counts = {self.ADDED: 0, self.REMOVED: 0, self.MODIFIED: 0}
+        for change in self.changes:
+            counts[change['change']] += 1
+        counts['unchanged'] = self.unchanged_count
+        return counts
+
+    def changed_build_targets(self):
+        """ Build targets covering changed rows: resource sheets with a changed field and changed lookup fields.
+        .. Used for a partial rebuild (removed rows have no page to build)
+
+        :return: (BuildTargets)
+        """
+        resources = set()
+        lookup_fields = set()
+        for change in self.changes:
+            if change['change'] == self.REMOVED:
+                continue
+            if change['sheet_type'] == 'Resources':
+                resources.add(change['sheet'])
+            else:
+                lookup_fields.add(change['sheet'])
+        return BuildTargets(resources=sorted(resources), lookup_fields=sorted(lookup_fields))
+
+    def to_text(self):
+        """ Text report. One line per changed row, modified rows followed by one line per changed column
+
+        :return: (str)
+        """
+        summary = self.summary()
+        lines = ["Workbook diff: {} -> {}".format(self.old_name, self.new_name),
+                 "{added} added, {removed} removed, {modified} modified, {unchanged} unchanged rows".format(**summary)]
+        for change in self.changes:
+            lines.append("{} {} '{}': {}".format(self.CHANGE_MARKS[change['change']], change['sheet_type'],
+                                                 change['sheet'], change['key']))
+            for column, (old_value, new_value) in change['columns'].items():
+                lines.append("    {}: {!r} -> {!r}".format(column, old_value, new_value))
+        return '\n'.join(lines) + '\n'
+
+    def to_json(self):
+        """ JSON report. Values that are not JSON types (i.e. dates) are written as strings
+
+        :return: (str)
+        """
+        changes = [dict(change, columns={column: {'old': old_value, 'new': new_value}
+                                         for column, (old_value, new_value) in change['columns'].items()})
+                   for change in self.changes]
+        return json.dumps({'old': self.old_name, 'new': self.new_name, 'summary': self.summary(),
+                           'changes': changes}, indent=2, default=str) + '\n'
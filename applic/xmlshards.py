@@ -0,0 +1,367 @@
+import copy
+import logging
+import os
+
+from lxml import etree as xml_tree
+
+from applic.compressedio import open_file, split_ext
+
+__project__ = 'IOI_Import'
+__author__ = "Robert Gottesman"
+__version_date__ = "10/19/2026"
+__high_err_num__ = 4
+
+""" Change log
+10/19/2026 - Created. Split IOI import xml into size bounded shards at Group boundaries plus a manifest
+10/19/2026 - Shards and manifest keep the compression extension (.gz, .xz, .zst) of the output file
+10/19/2026 - Pages and bytes of each page subtree computed once bottom-up (_measure), not per size check
+10/19/2026 - Size limits count the ancestor shells of a shard. Pages split into child units written once per shard
+"""
+
+
+class ShardGeneratedError(Exception):
+    """
+    Handle known problems in this module passing detail information
+    """
+    def __init__(self, value):
+        self.value = value
+
+    def __str__(self):
+        return repr(self.value)
+
+
+class XMLShardWriter:
+    """ Write an IOI import xml tree as several smaller 'wikiimport' files (shards)
+
+    A unit is a page subtree plus the chain of ancestor Group pages needed to place it. Ancestors are copied into a
+    shard as 'shells' (the page with its fields but without child pages). Each shard is a complete 'wikiimport'
+    document carrying the root attributes of the original tree.
+    """
+    SHARD_BY_RESOURCE = 'resource'  # One shard per resource/collection, lookup tree as one shard
+    SHARD_BY_LETTER = 'letter'      # One shard per resource/collection and one per lookup alpha letter
+    SHARD_BY_SIZE = 'size'          # Pack units into shards up to max pages/bytes
+    SHARD_MODES = [SHARD_BY_RESOURCE, SHARD_BY_LETTER, SHARD_BY_SIZE]
+    PAGE_ATTRIBUTE = 'Page_Title'
+    MANIFEST_ROOT_TAG = 'wikiimport_manifest'
+
+    def __init__(self, shard_by, max_pages=None, max_bytes=None, split_templates=None):
+        """ Setup shard writer
+
+        :param shard_by: (str) One of SHARD_MODES
+        :param max_pages: (int) Max pages in a shard (None for no limit)
+        :param max_bytes: (int) Max approximate size in bytes of a shard (None for no limit)
+        :param split_templates: (list) Page_Template values of top pages split per child Group (lookup top page)
+        :return: None. Raise ShardGeneratedError on error.
+        """
+        self.logger = logging.getLogger(__project__ + '.' + self.__class__.__name__)
+        if shard_by not in self.SHARD_MODES:
+            raise ShardGeneratedError("[SHD-01] Unknown shard mode '{}'. Use one of: {}".
+                                      format(shard_by, ', '.join(self.SHARD_MODES)))
+        if shard_by == self.SHARD_BY_SIZE and max_pages is None and max_bytes is None:
+            raise ShardGeneratedError("[SHD-02] Shard mode '{}' requires a max page count or max size".
+                                      format(shard_by))
+        self.shard_by = shard_by
+        self.max_pages = max_pages
+        self.max_bytes = max_bytes
+        self.split_templates = split_templates or []
+        self.node_sizes = {}  # xml node: (pages, bytes, lines, shell bytes, shell lines) written alone (_measure)
+        self.root_bytes = 0  # root start and end tags
+
+    def _is_page(self, node):
+        return self.PAGE_ATTRIBUTE in node.attrib
+
+    def _page_count(self, node):
+        return sum(1 for ele in node.iter() if self._is_page(ele))
+
+    def _measure(self, xml_root):
+        """ Size of every node of the tree as written alone (pretty_print), children before their parent so each
+        .. node is serialized once: a parent adds its tags to the sizes of its children indented one level
+
+        :param xml_root: (xml node) root 'wikiimport' node
+        :return: None
+        """
+        self.node_sizes = {}
+        for node in reversed(list(xml_root.iter(tag=xml_tree.Element))):
+            tags = xml_tree.Element(node.tag, attrib=dict(node.attrib))
+            children = [child for child in node if child in self.node_sizes]
+            if len(children) == 0:
+                tags.text = node.text
+                tag_bytes = len(xml_tree.tostring(tags)) + 1
+                self.node_sizes[node] = (int(self._is_page(node)), tag_bytes, 1, tag_bytes, 1)
+                continue
+            tags.text = ''  # '<tag></tag>': start and end tag on their own lines
+            tag_bytes = len(xml_tree.tostring(tags)) + 2
+            pages = int(self._is_page(node))
+            size = shell_size = tag_bytes
+            lines = shell_lines = 2
+            for child in children:
+                child_pages, child_bytes, child_lines = self.node_sizes[child][:3]
+                pages += child_pages
+                size += child_bytes + 2 * child_lines
+                lines += child_lines
+                if not self._is_page(child):
+                    shell_size += child_bytes + 2 * child_lines
+                    shell_lines += child_lines
+            self.node_sizes[node] = (pages, size, lines, shell_size, shell_lines)
+        self.root_bytes = self.node_sizes[xml_root][1] - sum(self.node_sizes[child][1] + 2 * self.node_sizes[child][2]
+                                                             for child in xml_root if child in self.node_sizes)
+
+    def _placed_size(self, node, depth, is_shell=False):
+        """ Pages and bytes a measured node (see _measure) adds to a shard
+
+        :param node: (xml node) node of the measured tree
+        :param depth: (int) depth in the shard (children of the root: 1)
+        :param is_shell: (bool) node written as a shell (fields only, see _shell)
+        :return: (int) pages, (int) bytes
+        """
+        pages, size, lines, shell_size, shell_lines = self.node_sizes[node]
+        if is_shell:
+            return int(self._is_page(node)), shell_size + 2 * depth * shell_lines
+        return pages, size + 2 * depth * lines
+
+    def _within_limits(self, pages, size):
+        if self.max_pages is not None and pages > self.max_pages:
+            return False
+        return self.max_bytes is None or size <= self.max_bytes
+
+    def _shell(self, node):
+        """ Copy of page node holding its fields but none of its child pages
+
+        :param node: (xml node) Group page
+        :return: (xml node) detached copy
+        """
+        shell = xml_tree.Element(node.tag, attrib=dict(node.attrib))
+        for child in node:
+            if not self._is_page(child):
+                shell.append(copy.deepcopy(child))
+        return shell
+
+    def _over_limit(self, ancestors, node):
+        pages, size = self._unit_size([ancestors, node, False])
+        return not self._within_limits(pages, self.root_bytes + size)
+
+    def _split_unit(self, ancestors, node):
+        """ Break an oversized unit at its child Group boundaries
+
+        :param ancestors: (list) ancestor page nodes (from source tree)
+        :param node: (xml node) page node heading this unit
+        :return: (list) of units [ancestors, node, is_shell]
+        """
+        child_pages = [child for child in node if self._is_page(child)]
+        if len(child_pages) == 0 or not self._over_limit(ancestors, node):
+            return [[ancestors, node, False]]
+        units = [[ancestors, node, True]]
+        leaves = []  # Items (pages without child pages) cannot be split, they are chunked under the same parent
+        for child in child_pages:
+            if any(self._is_page(grand_child) for grand_child in child):
+                units.extend(self._chunk_leaves(ancestors + [node], leaves))
+                leaves = []
+                units.extend(self._split_unit(ancestors + [node], child))
+            else:
+                leaves.append(child)
+        units.extend(self._chunk_leaves(ancestors + [node], leaves))
+        return units
+
+    def _chunk_leaves(self, ancestors, leaves):
+        """ Chunk sibling pages that have no child pages so each chunk stays within the limits
+
+        :param ancestors: (list) ancestor page nodes (from source tree)
+        :param leaves: (list) sibling page nodes
+        :return: (list) of units [ancestors, [nodes], is_shell]
+        """
+        units = []
+        chunk = []
+        base_pages, base_bytes = self._unit_size([ancestors, [], False])
+        pages, size = base_pages, self.root_bytes + base_bytes
+        for leaf in leaves:
+            leaf_pages, leaf_bytes = self._placed_size(leaf, len(ancestors) + 1)
+            if len(chunk) > 0 and not self._within_limits(pages + leaf_pages, size + leaf_bytes):
+                units.append([ancestors, chunk, False])
+                chunk = []
+                pages, size = base_pages, self.root_bytes + base_bytes
+            chunk.append(leaf)
+            pages += leaf_pages
+            size += leaf_bytes
+        if len(chunk) > 0:
+            units.append([ancestors, chunk, False])
+        return units
+
+    def _natural_units(self, xml_root):
+        """ Units formed by shard mode before any size limits apply
+
+        :param xml_root: (xml node) root 'wikiimport' node
+        :return: (list) of units [ancestors, node, is_shell]
+        """
+        units = []
+        for top_node in xml_root:
+            if not self._is_page(top_node):
+                continue
+            if self.shard_by != self.SHARD_BY_RESOURCE and top_node.get('Page_Template') in self.split_templates:
+                units.append([[], top_node, True])
+                for child in top_node:
+                    if self._is_page(child):
+                        units.append([[top_node], child, False])
+            else:
+                units.append([[], top_node, False])
+        return units
+
+    def _units(self, xml_root):
+        units = []
+        for ancestors, node, is_shell in self._natural_units(xml_root):
+            if is_shell or (self.max_pages is None and self.max_bytes is None):
+                units.append([ancestors, node, is_shell])
+            else:
+                units.extend(self._split_unit(ancestors, node))
+        return units
+
+    @staticmethod
+    def _open_path(open_path, unit):
+        """ Pages open in a shard after unit is placed: its ancestors, and its page when placed as a shell
+
+        :param open_path: (list) source page nodes open before unit is placed (shared ancestors)
+        :param unit: (list) [ancestors, node, is_shell]
+        :return: (int) number of ancestors shared with open_path, (list) source page nodes open after unit
+        """
+        ancestors, node, is_shell = unit
+        common = 0
+        while common < len(open_path) and common < len(ancestors) and open_path[common] is ancestors[common]:
+            common += 1
+        return common, list(ancestors) + ([node] if is_shell else [])
+
+    def _unit_size(self, unit, open_path=()):
+        """ Pages and bytes a unit adds to a shard, including the shells of its ancestors not open yet
+
+        :param unit: (list) [ancestors, node(s), is_shell]
+        :param open_path: (list) source page nodes already open in the shard
+        :return: (int) pages, (int) bytes
+        """
+        ancestors, node, is_shell = unit
+        common = self._open_path(open_path, unit)[0]
+        sizes = [self._placed_size(ancestor, depth, True)
+                 for depth, ancestor in enumerate(ancestors[common:], start=common + 1)]
+        depth = len(ancestors) + 1
+        sizes.extend([self._placed_size(ele, depth) for ele in node] if isinstance(node, list) else
+                     [self._placed_size(node, depth, is_shell)])
+        return sum(pages for pages, size in sizes), sum(size for pages, size in sizes)
+
+    def _pack(self, units):
+        """ Group units into shards. Size mode packs consecutive units up to the limits.
+
+        :param units: (list) of units
+        :return: (list) of shards, each shard a list of units
+        """
+        if self.shard_by != self.SHARD_BY_SIZE:
+            return [[unit] for unit in units]
+        shards = []
+        this_shard = []
+        open_path = []
+        pages = 0
+        size = self.root_bytes
+        for unit in units:
+            unit_pages, unit_bytes = self._unit_size(unit, open_path)
+            if len(this_shard) > 0 and not self._within_limits(pages + unit_pages, size + unit_bytes):
+                shards.append(this_shard)
+                this_shard = []
+                open_path = []
+                pages = 0
+                size = self.root_bytes
+                unit_pages, unit_bytes = self._unit_size(unit)
+            this_shard.append(unit)
+            pages += unit_pages
+            size += unit_bytes
+            open_path = self._open_path(open_path, unit)[1]
+        if len(this_shard) > 0:
+            shards.append(this_shard)
+        return shards
+
+    def _build_shard(self, root_tag, root_attributes, shard_units):
+        """ Build 'wikiimport' document from units. Ancestor shells are shared between units of the same shard.
+
+        :param root_tag: (str) tag of the original root node
+        :param root_attributes: (dict) attributes of the original root node
+        :param shard_units: (list) units to place in shard
+        :return: (xml node) shard root, (int) depth of deepest unit
+        """
+        shard_root = xml_tree.Element(root_tag, attrib=root_attributes)
+        open_path = []  # list of [source ancestor node, shell node in shard]
+        depth = 0
+        for ancestors, node, is_shell in shard_units:
+            common = 0
+            while common < len(open_path) and common < len(ancestors) and \
+                    open_path[common][0] is ancestors[common]:
+                common += 1
+            del open_path[common:]
+            for ancestor in ancestors[common:]:
+                parent = open_path[-1][1] if len(open_path) > 0 else shard_root
+                ancestor_shell = self._shell(ancestor)
+                parent.append(ancestor_shell)
+                open_path.append([ancestor, ancestor_shell])
+            parent = open_path[-1][1] if len(open_path) > 0 else shard_root
+            for page_node in (node if isinstance(node, list) else [node]):
+                parent.append(self._shell(page_node) if is_shell else copy.deepcopy(page_node))
+            if is_shell:  # Child pages of a split page are placed under this shell
+                open_path.append([node, parent[-1]])
+            depth = max(depth, len(ancestors))
+        return shard_root, depth
+
+    @staticmethod
+    def shard_filepath(result_xml_filepath, sequence):
+        """ Shard file name: 'name.xml' becomes 'name_001.xml' ('name.xml.gz' becomes 'name_001.xml.gz')
+
+        :param result_xml_filepath: (str) unsharded output filename/path
+        :param sequence: (int) shard number starting at 1
+        :return: (str) shard filename/path
+        """
+        base, ext, comp_ext = split_ext(result_xml_filepath)
+        return '{}_{:03d}{}{}'.format(base, sequence, ext, comp_ext)
+
+    @staticmethod
+    def manifest_filepath(result_xml_filepath):
+        """ Manifest file name: 'name.xml' becomes 'name_manifest.xml' ('name.xml.gz': 'name_manifest.xml.gz')
+
+        :param result_xml_filepath: (str) unsharded output filename/path
+        :return: (str) manifest filename/path
+        """
+        base, ext, comp_ext = split_ext(result_xml_filepath)
+        return base + '_manifest' + ext + comp_ext
+
+    def write(self, xml_root, result_xml_filepath):
+        """ Write shards and manifest to disk
+
+        :param xml_root: (xml node) complete IOI import xml root
+        :param result_xml_filepath: (str) unsharded output filename/path. Shard/manifest names derived from it
+        :return: (list) shard file names/paths in import order. Raise ShardGeneratedError on error
+        """
+        self._measure(xml_root)
+        shards = self._pack(self._units(xml_root))
+        manifest_root = xml_tree.Element(self.MANIFEST_ROOT_TAG, attrib=dict(xml_root.attrib))
+        manifest_root.set('Shard_By', self.shard_by)
+        shard_filepaths = []
+        for sequence, shard_units in enumerate(shards, start=1):
+            shard_root, depth = self._build_shard(xml_root.tag, dict(xml_root.attrib), shard_units)
+            shard_filepath = self.shard_filepath(result_xml_filepath, sequence)
+            try:
+                with open_file(shard_filepath, 'wb') as shard_file:
+                    xml_tree.ElementTree(shard_root).write(shard_file, pretty_print=True)
+            except (FileNotFoundError, IOError):
+                raise ShardGeneratedError("[SHD-03] Unable to write xml shard file: {}".format(shard_filepath))
+            first_unit_node = shard_units[0][1]
+            first_page = first_unit_node[0] if isinstance(first_unit_node, list) else first_unit_node
+            # Stage: shards in same stage do not depend on each other and may be imported in parallel
+            xml_tree.SubElement(manifest_root, 'Shard', {'Sequence': str(sequence),
+                                                         'Stage': str(depth + 1),
+                                                         'File': os.path.basename(shard_filepath),
+                                                         'Pages': str(self._page_count(shard_root)),
+                                                         'Bytes': str(os.path.getsize(shard_filepath)),
+                                                         'First_Page': first_page.get(self.PAGE_ATTRIBUTE)})
+            shard_filepaths.append(shard_filepath)
+        manifest_filepath = self.manifest_filepath(result_xml_filepath)
+        try:
+            with open_file(manifest_filepath, 'wb') as manifest_file:
+                xml_tree.ElementTree(manifest_root).write(manifest_file, pretty_print=True)
+        except (FileNotFoundError, IOError):
+            raise ShardGeneratedError("[SHD-04] Unable to write shard manifest file: {}".format(manifest_filepath))
+        self.logger.info("Wrote {} IOI xml shards listed in manifest: {}".format(len(shard_filepaths),
+                                                                               manifest_filepath))
+        self.node_sizes = {}
+        return shard_filepaths
@@ -0,0 +1,295 @@
+import datetime
+import logging
+
+import openpyxl
+from lxml import etree as xml_tree
+
+from applic.compressedio import DECOMPRESSION_ERRORS, open_file
+from applic.dicttoxml import DictToXML
+from applic.progress import ProgressReporter
+
+__project__ = 'IOI_Import'
+__author__ = "Robert Gottesman"
+__version_date__ = "10/19/2026"
+__high_err_num__ = 4
+
+""" Change log
+10/19/2026 - Created. Reverse export: IOI import xml / DD Wiki export streamed back into an input .xlsx workbook
+10/19/2026 - Corrupt or truncated compressed xml file reported as [XLX-01] (DECOMPRESSION_ERRORS)
+10/19/2026 - Sheets of a workbook not saved (XLX-01/XLX-04) are closed
+"""
+
+
+class XLSXExportGeneratedError(Exception):
+    """
+    Handle known problems in this module passing detail information
+    """
+    def __init__(self, value):
+        self.value = value
+
+    def __str__(self):
+        return repr(self.value)
+
+
+class XMLToXLSX:
+    """ Rebuild an input workbook (.xlsx) from an IOI import xml ('wikiimport') or a DD Wiki exported xml
+
+    The xml is read with iterparse: a page is mapped back to xlsx columns when its end tag is read, appended to its
+    sheet and released. The workbook is written in write only mode, so neither document is held in memory.
+    * Item pages are matched to a Form of DDWikiImportConfig.xml by Page_Template (including the NoLookup and
+      Collection templates DictToXML switches to). Each field node goes back to the column of its Form field
+    * Pages of the LookupValue Form go to the lookup sheet, other Item pages to the sheet of their resource
+      (first 'Groups' entry, sheet tab name from config.ini [ResourceSheets], else the resource name)
+    * Pages without a known Page_Template (DD Wiki export 'Page' nodes) are mapped by node tag (column name or
+      Form XMLName)
+    Group pages, labels and computed (AutoCompute) fields are not written. Dates are written in the xlsx text format
+    read by DictToXML (YYYYMMDD or YYYYMMDDTHHMM).
+    """
+    PAGE_ATTRIBUTE = 'Page_Title'
+    EXPORT_PAGE_TAG = 'Page'
+    LOOKUP_VALUE_FORM = 'LookupValue'
+    LOOKUP_VALUE_COLUMN = 'LookupValue'
+    GROUPS_COLUMN = 'Groups'
+    FILLED_LOOKUP_VALUES = ['<n/a>', '<Not Defined>']
+    DATE_FORMATS = [DictToXML.OUTPUT_DATETIME_FORMAT, DictToXML.OUTPUT_DATE_FORMAT]
+    LIST_PARSING_CODES = [DictToXML.PARSE_LKP_PROP_REFERENCES, DictToXML.PARSE_GROUPS, DictToXML.PARSE_FLD_REFERENCES]
+
+    def __init__(self, files_and_folders, program_config_data, progress=None):
+        """ Read Forms (DDWikiImportConfig.xml) and sheet names/page links (config.ini)
+
+        :param files_and_folders: (obj) object containing file locations
+        :param program_config_data: (dict) config.ini file read into dictionary
+        :param progress: (ProgressReporter) Report pages written (None: no report)
+        :return: None. Raise DXMLGeneratedError on config error
+        """
+        self.logger = logging.getLogger(__project__ + '.' + self.__class__.__name__)
+        self.progress = progress if progress is not None else ProgressReporter(ProgressReporter.OFF)
+        self.xml_config_data = DictToXML._read_xml_config_file(files_and_folders)
+        page_links = program_config_data['PageLinks'] if 'PageLinks' in program_config_data else {}
+        self.link_names = {page_link: name for name, page_link in page_links.items()}  # Page title: config name
+        self.resource_sheets = list(program_config_data['ResourceSheets']) \
+            if 'ResourceSheets' in program_config_data else []
+        self.sheet_tab_names = {program_config_data['ResourceSheets'][sheet_tab_name]: sheet_tab_name
+                                for sheet_tab_name in self.resource_sheets}  # Resource name: sheet tab name
+        self.lookup_sheet = program_config_data['LookupSheets'].get('LookupSheet', 'Lookups') \
+            if 'LookupSheets' in program_config_data else 'Lookups'
+        self.template_forms = {}  # Page_Template: Form name of Item pages
+        self.form_fields = {}  # Form name: {XMLName: (column, parsing code)}
+        for form_name, form in self.xml_config_data.items():
+            if form['Attributes'].get('Node_Type') != 'Item':
+                continue
+            self.form_fields[form_name] = self._form_fields(form)
+            page_template = form['Attributes']['Page_Template']
+            self.template_forms.setdefault(page_template, form_name)
+            template_idx = page_template.find('Resource')  # Same rename as DictToXML for lookup fields with comments
+            if template_idx >= 0:
+                self.template_forms.setdefault(page_template[:template_idx] + 'NoLookup' +
+                                               page_template[template_idx:], form_name)
+            for field in form.values():
+                if field.get('CollectionTemplate') is not None:
+                    self.template_forms.setdefault(field['CollectionTemplate'], form_name)
+        for page_template in [DictToXML.PROP_NOLOOKUP_TEMPLATE, DictToXML.OTHER_NOLOOKUP_TEMPLATE,
+                              DictToXML.REFERENCE_NOLOOKUP_TEMPLATE]:
+            if page_template not in self.template_forms:
+                self.logger.warning("[XLX-03] No Form in {} for Page_Template '{}'".
+                                    format(DictToXML.CONFIG_XML_FILENAME, page_template))
+        resource_forms = [form_name for form_name in self.form_fields if form_name != self.LOOKUP_VALUE_FORM]
+        self.resource_fields = {}  # XMLName or column: (column, parsing code) of all resource Forms
+        for form_name in resource_forms:
+            for xml_name, (column, parsing_code) in self.form_fields[form_name].items():
+                self.resource_fields.setdefault(xml_name, (column, parsing_code))
+        self.lookup_fields = dict(self.form_fields.get(self.LOOKUP_VALUE_FORM, {}))
+        self.resource_columns = self._columns(self.resource_fields, DictToXML.STANDARD_NAME_COLUMN)
+        self.lookup_columns = self._columns(self.lookup_fields, self.LOOKUP_VALUE_COLUMN)
+        for fields in [self.resource_fields, self.lookup_fields]:  # Export pages use column names as tags
+            for column, parsing_code in list(fields.values()):
+                fields.setdefault(column, (column, parsing_code))
+        self.workbook = None
+        self.sheets = {}  # sheet tab name: write only worksheet
+        self.row_counts = {}  # sheet tab name: rows written
+        self.skipped_tags = set()  # Field tags of exported pages without a column
+
+    @staticmethod
+    def _form_fields(form):
+        """ Fields of a Form that come from an xlsx column, in Sequence order
+
+        :param form: (dict) Form of DDWikiImportConfig.xml as read by DictToXML._read_xml_config_file()
+        :return: (dict) XMLName: (column, parsing code)
+        """
+        fields = sorted((field['Sequence'], xml_name, field) for xml_name, field in form.items()
+                        if xml_name != 'Attributes')
+        return {xml_name: (field['Value'], field['ParsingCode']) for sequence, xml_name, field in fields
+                if field['Value'] is not None and field['AutoCompute'] != 'Y' and
+                field['ParsingCode'] != DictToXML.PARSE_LABEL}
+
+    @staticmethod
+    def _columns(fields, first_column):
+        """ Sheet header: first_column then the columns of fields in order (once each)
+
+        :param fields: (dict) XMLName: (column, parsing code)
+        :param first_column: (str) column read first by ResoXLSXtoDict (blank row check)
+        :return: (list) of column names
+        """
+        columns = [first_column]
+        for column, parsing_code in fields.values():
+            if column not in columns:
+                columns.append(column)
+        return columns
+
+    def _sheet(self, sheet_tab_name, columns):
+        """ Write only worksheet, created with its header row on first use
+
+        :param sheet_tab_name: (str) sheet tab name
+        :param columns: (list) header
+        :return: (obj) worksheet
+        """
+        if sheet_tab_name not in self.sheets:
+            self.sheets[sheet_tab_name] = self.workbook.create_sheet(title=sheet_tab_name)
+            self.sheets[sheet_tab_name].append(columns)
+            self.row_counts[sheet_tab_name] = 0
+        return self.sheets[sheet_tab_name]
+
+    def _field_value(self, field_node, parsing_code):
+        """ xlsx cell value of a page field node (inverse of DictToXML._add_xml_nodes)
+
+        :param field_node: (xml node) field node of a page
+        :param parsing_code: (int) DictToXML.PARSE_* code of the field
+        :return: (str) cell value or None
+        """
+        if len(field_node) > 0 or parsing_code in self.LIST_PARSING_CODES:
+            values = [sub_node.text or '' for sub_node in field_node]
+            if parsing_code == DictToXML.PARSE_GROUPS:
+                values = [self.link_names.get(value, value) for value in values]
+            elif parsing_code == DictToXML.PARSE_FLD_REFERENCES:
+                values = [value[:-6] if value.endswith(' Field') else value for value in values]
+            return ','.join(values) if len(values) > 0 else None
+        text = field_node.text
+        if text is None or len(text) == 0:
+            return None
+        if parsing_code == DictToXML.PARSE_LOOKUP and text in self.FILLED_LOOKUP_VALUES:
+            return None     # Filled in by the import. Lookup_Values (same column) holds the xlsx text
+        if parsing_code in [DictToXML.PARSE_LOOKUP, DictToXML.PARSE_LOOKUP_FIELD] and text.endswith(' Lookups'):
+            return text[:-8]
+        if parsing_code == DictToXML.PARSE_FLD_COLLECTION:
+            return self.link_names.get(text, text)
+        if parsing_code == DictToXML.PARSE_DATETIME:
+            for date_format in self.DATE_FORMATS:
+                try:
+                    date_value = datetime.datetime.strptime(text.strip(), date_format)
+                except ValueError:
+                    continue
+                if date_value.hour == 0 and date_value.minute == 0:
+                    return date_value.strftime(DictToXML.DEFAULT_DATE_FORMAT)
+                return date_value.strftime(DictToXML.XLSX_DATETIME_FORMAT)
+        return text
+
+    def _page_row(self, page_node, fields, note_skipped=False):
+        """ xlsx row of a page. A column filled by an earlier field is kept (Lookup and Lookup_Values share one)
+
+        :param page_node: (xml node) page node
+        :param fields: (dict) tag: (column, parsing code)
+        :param note_skipped: (bool) Remember tags without a column (exported pages. Form pages skip computed fields)
+        :return: (dict) column: cell value
+        """
+        row = {}
+        for field_node in page_node:
+            if not isinstance(field_node.tag, str):
+                continue
+            if field_node.tag not in fields:
+                if note_skipped:
+                    self.skipped_tags.add(field_node.tag)
+                continue
+            column, parsing_code = fields[field_node.tag]
+            if row.get(column) is None:
+                row[column] = self._field_value(field_node, parsing_code)
+        return row
+
+    def _write_page(self, page_node, ancestor_titles):
+        """ Append an Item (or exported) page to its sheet
+
+        :param page_node: (xml node) page node (child pages already released)
+        :param ancestor_titles: (list) Page_Title of enclosing pages, top page first
+        :return: (bool) True if a row was written
+        """
+        form_name = self.template_forms.get(page_node.get('Page_Template'))
+        if form_name is None and page_node.tag != self.EXPORT_PAGE_TAG:
+            return False  # Group page
+        if form_name == self.LOOKUP_VALUE_FORM or (form_name is None and any(
+                self.lookup_fields.get(field_node.tag, (None,))[0] == self.LOOKUP_VALUE_COLUMN
+                for field_node in page_node)):
+            row = self._page_row(page_node, self.lookup_fields, form_name is None)
+            if row.get('LookupField') is None and len(ancestor_titles) > 0 and ancestor_titles[-1]:
+                row['LookupField'] = ancestor_titles[-1].replace(' Lookups', '')
+            sheet_tab_name, columns = self.lookup_sheet, self.lookup_columns
+        else:
+            row = self._page_row(page_node, self.form_fields[form_name] if form_name else self.resource_fields,
+                                 form_name is None)
+            if row.get(self.GROUPS_COLUMN) is None and len(ancestor_titles) > 0 and ancestor_titles[0]:
+                row[self.GROUPS_COLUMN] = self.link_names.get(ancestor_titles[0], ancestor_titles[0])
+            if row.get(DictToXML.STANDARD_NAME_COLUMN) is None or row.get(self.GROUPS_COLUMN) is None:
+                self.logger.warning("[XLX-02] Page '%s' has no field name or Groups. Not written",
+                                    page_node.get(self.PAGE_ATTRIBUTE))
+                return False
+            resource_name = row[self.GROUPS_COLUMN].split(',')[0].strip()
+            sheet_tab_name, columns = self.sheet_tab_names.get(resource_name, resource_name), self.resource_columns
+        self._sheet(sheet_tab_name, columns).append([row.get(column) for column in columns])
+        self.row_counts[sheet_tab_name] += 1
+        self.progress.advance()
+        return True
+
+    def _close_sheets(self):
+        """ Close the sheets of a workbook that is not saved. Their temporary files are removed by openpyxl at exit
+
+        :return: None
+        """
+        for ws in self.sheets.values():
+            if not ws.closed:
+                ws.close()
+
+    def convert(self, xml_filepath, xlsx_filepath):
+        """ Stream xml pages into a new .xlsx file
+
+        :param xml_filepath: (str) IOI import xml or DD Wiki exported xml (may be gzip/xz/zstd compressed)
+        :param xlsx_filepath: (str) .xlsx file written
+        :return: (dict) sheet tab name: rows written. Raise XLSXExportGeneratedError on error
+        """
+        self.workbook = openpyxl.Workbook(write_only=True)
+        self.sheets = {}
+        self.row_counts = {}
+        for sheet_tab_name in self.resource_sheets:  # Sheets in config.ini order, even if empty
+            self._sheet(sheet_tab_name, self.resource_columns)
+        self._sheet(self.lookup_sheet, self.lookup_columns)
+        self.progress.start('Reverse export', unit='pages')
+        ancestor_titles = []  # Page_Title of open pages
+        try:
+            with open_file(xml_filepath, 'rb') as xml_file:
+                for event, node in xml_tree.iterparse(xml_file, events=('start', 'end')):
+                    if self.PAGE_ATTRIBUTE not in node.attrib and node.tag != self.EXPORT_PAGE_TAG:
+                        continue
+                    if event == 'start':
+                        ancestor_titles.append(node.get(self.PAGE_ATTRIBUTE))
+                        continue
+                    ancestor_titles.pop()
+                    self._write_page(node, ancestor_titles)
+                    # Release the page and everything before it. Open (ancestor) pages keep their start tag only
+                    node.clear()
+                    while node.getprevious() is not None:
+                        del node.getparent()[0]
+        except DECOMPRESSION_ERRORS as e:
+            self._close_sheets()
+            raise XLSXExportGeneratedError("[XLX-01] Cannot read xml file {}: {}".format(xml_filepath, e))
+        except xml_tree.XMLSyntaxError as e:
+            self._close_sheets()
+            raise XLSXExportGeneratedError("[XLX-01] Cannot parse xml file {}: {}".format(xml_filepath, e))
+        self.progress.end_stage()
+        if len(self.skipped_tags) > 0:
+            self.logger.info("Reverse export: exported page tags without an xlsx column not written: {}".
+                             format(', '.join(sorted(self.skipped_tags))))
+        try:
+            self.workbook.save(xlsx_filepath)
+        except OSError as e:
+            self._close_sheets()
+            raise XLSXExportGeneratedError("[XLX-04] Cannot write xlsx file {}: {}".format(xlsx_filepath, e))
+        self.logger.info("Reverse export rows written: {}".format(
+            ', '.join("'{}': {}".format(sheet_tab_name, count) for sheet_tab_name, count in self.row_counts.items())))
+        return self.row_counts
@@ -1,4 +1,4 @@
-from distutils.core import setup
+from setuptools import setup
 
 __project__ = 'IOI_Import'
 __author__ = "Robert Gottesman"
@@ -10,4 +10,5 @@ setup(
     packages=['applic',],
     license='Creative Commons Attribution-Noncommercial-Share Alike license',
     long_description=open('readme.md').read(),
+    extras_require={'zstd': ['zstandard>=0.15']},  # -z zst and .zst input files (applic.compressedio)
 )
\ No newline at end of file
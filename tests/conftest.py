@@ -0,0 +1,9 @@
+import os
+import sys
+import types
+
+# applic/__init__.py runs the command line program when imported. Register the package without running it
+if 'applic' not in sys.modules:
+    applic_package = types.ModuleType('applic')
+    applic_package.__path__ = [os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'applic')]
+    sys.modules['applic'] = applic_package
@@ -0,0 +1,17 @@
+import os
+
+
+class FilesAndFolders:
+    """ Home folder layout used by the tests (files_folders.py is kept outside the repo, see IOI_Import todo)
+
+    home/files/input holds the xlsx, max id file and DD Wiki export, home/files/config/<sub folder> the config.ini and
+    DDWikiImportConfig.xml of each configuration
+    """
+
+    def __init__(self, home_folder, config_sub_folder):
+        self.home_folder = home_folder
+        self.input_folder = os.path.join(home_folder, 'files', 'input')
+        self.log_folder = os.path.join(home_folder, 'files', 'log')
+        self.config_folder = os.path.join(home_folder, 'files', 'config', config_sub_folder)
+        self.config_file = os.path.join(self.config_folder, 'config.ini')
+        self.xml_filepath = None
@@ -0,0 +1,222 @@
+""" Sample home folder (config, xlsx, max id file, DD Wiki export) and conversions for the tests """
+import datetime
+import os
+import shutil
+
+import openpyxl
+
+from files_folders import FilesAndFolders
+
+REPO_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONFIG_FOLDER = os.path.join(REPO_FOLDER, 'files', 'config', 'current')
+XLSX_FILENAME = 'book.xlsx'
+MAX_ID_FILENAME = 'stat_warning_log.txt'
+EXPORT_FILENAME = 'export.xml'
+RUN_CLOCK = datetime.datetime(2018, 4, 20, 10, 15)
+
+RESOURCE_COLUMNS = ['StandardName', 'Definition', 'Groups', 'SimpleDataType', 'SugMaxLength', 'Synonym',
+                    'ElementStatus', 'BEDES', 'CertificationLevel', 'RecordID', 'LookupStatus', 'Lookup', 'Collection',
+                    'SugMaxPrecision', 'RepeatingElement', 'Property Types', 'Payloads', 'StatusChangeDate',
+                    'RevisedDate', 'AddedInVersion', 'ModificationTimestamp', 'References', 'Notes']
+LOOKUP_COLUMNS = ['LookupValue', 'LookupField', 'Definition', 'Synonym', 'BEDES', 'References', 'LookupStatus',
+                  'LookupFieldID', 'LookupID', 'SpanishLookupField', 'SpanishLookupValue', 'StatusChangeDate',
+                  'RevisedDate', 'AddedInVersion', 'ModificationTimestamp', 'Comments']
+RESOURCE_SHEETS = ['PropertyCol', 'Rules Tab', 'SocialMedia']
+
+MAX_ID_TEXT = """** Max RecordID per Resource Report
+Property Fields max id: 101500
+Rules Fields max id: 301010
+** Max LookupID per Lookup Field
+Appliances Lookup max id: 446010
+Basement Lookup max id: 447003
+"""
+
+EXPORT_XML = """<export>
+<Group Page_Title="Property Resource"><Item Page_Title="ListPrice Field">\
+<Field_Name_Standard_Name>ListPrice</Field_Name_Standard_Name>\
+<Groupings><Group Link="Property Resource">Property Resource</Group></Groupings>\
+<Record_Identifier>101500</Record_Identifier></Item></Group>
+<Group Page_Title="Appliances Lookups"><Lookup_FieldID>446000</Lookup_FieldID>\
+<Item Page_Title="Bar Fridge"><Lookup_Value>Bar Fridge</Lookup_Value>\
+<Lookup_Field Link="Appliances Lookups">Appliances Lookups</Lookup_Field>\
+<Lookup_FieldID>446000</Lookup_FieldID><LookupID>446010</LookupID></Item></Group>
+</export>
+"""
+
+
+def resource_row(standard_name, groups, lookup=None, **values):
+    """ Resource sheet row
+
+    :param standard_name: (str) StandardName
+    :param groups: (str) Groups column (i.e. 'Property,Listing')
+    :param lookup: (str) Lookup column (None: not a lookup field)
+    :param values: other columns
+    :return: (dict) column: value
+    """
+    row = {'StandardName': standard_name, 'Definition': 'Definition of ' + standard_name, 'Groups': groups,
+           'SimpleDataType': 'String List, Single' if lookup else 'String', 'SugMaxLength': 25,
+           'LookupStatus': 'Open' if lookup else None, 'Lookup': lookup, 'Property Types': 'RESI,RLSE, RINC',
+           'StatusChangeDate': '20180101', 'AddedInVersion': '1.7.0', 'ModificationTimestamp': '20180202T1015',
+           'References': 'Media,Member'}
+    row.update(values)
+    return row
+
+
+def lookup_row(lookup_value, lookup_field, **values):
+    """ Lookup sheet row
+
+    :param lookup_value: (str) LookupValue
+    :param lookup_field: (str) LookupField
+    :param values: other columns
+    :return: (dict) column: value
+    """
+    row = {'LookupValue': lookup_value, 'LookupField': lookup_field, 'Definition': 'Definition of ' + lookup_value,
+           'References': 'RESI,RLSE', 'StatusChangeDate': '20180101', 'AddedInVersion': '1.7.0'}
+    row.update(values)
+    return row
+
+
+def sample_resource_rows(count=12):
+    """ Rows of every resource sheet. Group 'Structure' has no fields of its own, only sub Group 'Foo': joined Groups
+    .. 'Property,Structure Bar' sort before 'Property,Structure,Foo', Groups paths do not
+
+    :param count: (int) rows of the Property sheet
+    :return: (dict) sheet tab name: rows
+    """
+    property_groups = ['Property', 'Property,Listing', 'Property,Listing,Price', 'Property,Structure Bar',
+                       'Property,Structure,Foo']
+    rules_groups = ['Rules', 'Rules,Definition']
+    return {
+        'PropertyCol': [resource_row('ListPrice' if idx == 5 else 'FldPr{:03d}'.format(idx),
+                                     property_groups[idx % len(property_groups)],
+                                     lookup=['Appliances', 'Basement', 'Zeta'][idx % 3] if idx % 2 == 0 else None,
+                                     Collection='SocialMedia' if idx == 7 else None)
+                        for idx in range(count)],
+        'Rules Tab': [resource_row('FldRu{:03d}'.format(idx), rules_groups[idx % len(rules_groups)])
+                      for idx in range(4)],
+        'SocialMedia': [resource_row('FldSo{:03d}'.format(idx), 'SocialMedia') for idx in range(3)]}
+
+
+def sample_lookup_rows(count=12):
+    """ Rows of the lookup sheet
+
+    :param count: (int) lookup values
+    :return: (list) rows
+    """
+    return [lookup_row('Bar Fridge' if idx == 4 else 'Val {}'.format(idx), ['Appliances', 'Basement', 'Zeta'][idx % 3])
+            for idx in range(count)]
+
+
+def write_workbook(xlsx_filepath, resource_rows=None, lookup_rows=None, sheet_order=None):
+    """ Write xlsx with resource sheets and the lookup sheet
+
+    :param xlsx_filepath: (str) xlsx file
+    :param resource_rows: (dict) sheet tab name: rows (None: sample_resource_rows())
+    :param lookup_rows: (list) lookup sheet rows (None: sample_lookup_rows())
+    :param sheet_order: (list) sheet tab names in workbook order (None: resource sheets then 'Lookups')
+    :return: None
+    """
+    resource_rows = sample_resource_rows() if resource_rows is None else resource_rows
+    lookup_rows = sample_lookup_rows() if lookup_rows is None else lookup_rows
+    sheets = dict((sheet_tab_name, (RESOURCE_COLUMNS, resource_rows.get(sheet_tab_name, [])))
+                  for sheet_tab_name in RESOURCE_SHEETS)
+    sheets['Lookups'] = (LOOKUP_COLUMNS, lookup_rows)
+    wb = openpyxl.Workbook()
+    wb.remove(wb.active)
+    for sheet_tab_name in sheet_order or list(sheets):
+        columns, rows = sheets[sheet_tab_name]
+        ws = wb.create_sheet(sheet_tab_name)
+        ws.append(columns)
+        for row in rows:
+            ws.append([row.get(column) for column in columns])
+    wb.save(xlsx_filepath)
+
+
+def make_home(home_folder, config_sub_folders=('current',), **workbook_args):
+    """ Home folder with config sub folders (copies of files/config/current), xlsx, max id file and export
+
+    :param home_folder: (str) folder created
+    :param config_sub_folders: (tuple) config sub folders
+    :param workbook_args: write_workbook() arguments
+    :return: (FilesAndFolders) of the first config sub folder
+    """
+    for config_sub_folder in config_sub_folders:
+        shutil.copytree(CONFIG_FOLDER, os.path.join(home_folder, 'files', 'config', config_sub_folder))
+    faf = FilesAndFolders(str(home_folder), config_sub_folders[0])
+    os.makedirs(faf.input_folder)
+    write_workbook(os.path.join(faf.input_folder, XLSX_FILENAME), **workbook_args)
+    with open(os.path.join(faf.input_folder, MAX_ID_FILENAME), 'w') as max_id_file:
+        max_id_file.write(MAX_ID_TEXT)
+    with open(os.path.join(faf.input_folder, EXPORT_FILENAME), 'w') as export_file:
+        export_file.write(EXPORT_XML)
+    return faf
+
+
+def converter_args(faf, result_xml_filepath, **kwargs):
+    """ Arguments shared by DictToXML and its subclasses (run clock pinned: byte comparable output)
+
+    :param faf: (FilesAndFolders) home folder
+    :param result_xml_filepath: (str) output file
+    :param kwargs: other arguments
+    :return: (dict) arguments
+    """
+    args = dict(files_and_folders=faf, result_xml_filepath=result_xml_filepath,
+                max_id_filepath=os.path.join(faf.input_folder, MAX_ID_FILENAME),
+                ddwiki_exported_filepath=os.path.join(faf.input_folder, EXPORT_FILENAME),
+                xlsx_date=RUN_CLOCK, pinned_datetime=RUN_CLOCK)
+    args.update(kwargs)
+    return args
+
+
+def new_reader(faf, xlsx_filename=XLSX_FILENAME):
+    """ ResoXLSXtoDict of the config of faf (no workbook cache)
+
+    :param faf: (FilesAndFolders) home folder
+    :param xlsx_filename: (str) xlsx in the input folder
+    :return: (ResoXLSXtoDict)
+    """
+    from applic.IOI_Import import ResoXLSXtoDict
+    return ResoXLSXtoDict(config_file_path=faf.config_file,
+                          xlsx_filepath=os.path.join(faf.input_folder, xlsx_filename))
+
+
+def convert(faf, result_xml_filepath, xlsx_filename=XLSX_FILENAME, **kwargs):
+    """ Default (in memory) conversion
+
+    :return: (bytes) output xml
+    """
+    from applic.dicttoxml import DictToXML
+    xlsx_to_dict = new_reader(faf, xlsx_filename)
+    xlsx_to_dict.read_xlsx_file()
+    DictToXML(spreadsheet_dict=xlsx_to_dict.spreadsheet_info, program_config_data=xlsx_to_dict.config,
+              **converter_args(faf, result_xml_filepath, **kwargs))
+    return read_bytes(result_xml_filepath)
+
+
+def convert_low_memory(faf, result_xml_filepath, xlsx_filename=XLSX_FILENAME, **kwargs):
+    """ --low_memory conversion
+
+    :return: (bytes) output xml
+    """
+    from applic.streamxml import StreamingDictToXML
+    xlsx_to_dict = new_reader(faf, xlsx_filename)
+    StreamingDictToXML(xlsx_to_dict=xlsx_to_dict, program_config_data=xlsx_to_dict.config,
+                       **converter_args(faf, result_xml_filepath, **kwargs))
+    return read_bytes(result_xml_filepath)
+
+
+def convert_pipelined(faf, result_xml_filepath, xlsx_filename=XLSX_FILENAME, xlsx_to_dict=None, **kwargs):
+    """ --pipelined conversion
+
+    :return: (bytes) output xml
+    """
+    from applic.pipeline import PipelinedDictToXML
+    xlsx_to_dict = new_reader(faf, xlsx_filename) if xlsx_to_dict is None else xlsx_to_dict
+    PipelinedDictToXML(xlsx_to_dict=xlsx_to_dict, program_config_data=xlsx_to_dict.config,
+                       **converter_args(faf, result_xml_filepath, **kwargs))
+    return read_bytes(result_xml_filepath)
+
+
+def read_bytes(filepath):
+    with open(filepath, 'rb') as result_file:
+        return result_file.read()
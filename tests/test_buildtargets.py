@@ -0,0 +1,61 @@
+from lxml import etree
+
+import sample_home
+from applic.buildtargets import BuildTargets
+
+
+def page_ids(xml):
+    """ Page title: Record_Identifier/LookupID (None: no id) of every output page """
+    root = etree.fromstring(xml)
+    return dict((page.get('Page_Title'), page.findtext('Record_Identifier') or page.findtext('LookupID'))
+                for page in root.iter('Group', 'Item') if page.get('Page_Title') is not None)
+
+
+def test_selected_paths():
+    build_targets = BuildTargets(resources=['Rules Tab'], groups=['Property, Listing'], lookup_fields=['Basement'],
+                                 letters=['Z'])
+    assert not build_targets.is_empty() and BuildTargets().is_empty()
+    assert build_targets.has_resource_targets('PropertyCol', 'Property')
+    assert build_targets.has_resource_targets('Rules Tab', 'Rules')
+    assert not build_targets.has_resource_targets('SocialMedia', 'SocialMedia')
+    assert build_targets.path_selected('Rules Tab', ('Rules', 'Definition'))
+    assert build_targets.path_selected('PropertyCol', ('Property', 'Listing', 'Price'))
+    assert not build_targets.path_selected('PropertyCol', ('Property',))
+    assert build_targets.path_on_route('PropertyCol', ('Property',))
+    assert not build_targets.path_on_route('PropertyCol', ('Property', 'Structure'))
+    assert build_targets.lookup_field_selected('Basement') and build_targets.lookup_field_selected('Zeta')
+    assert not build_targets.lookup_field_selected('Appliances')
+    assert build_targets.letter_on_route('B') and build_targets.letter_on_route('Z')
+    assert not build_targets.letter_on_route('A')
+    assert str(build_targets) == 'Rules Tab, Property,Listing, Basement, Z - Lookup Fields'
+
+
+def test_group_and_lookup_field_targets_keep_full_build_ids(tmp_path):
+    faf = sample_home.make_home(str(tmp_path / 'home'))
+    full_ids = page_ids(sample_home.convert(faf, str(tmp_path / 'full.xml')))
+    targeted_ids = page_ids(sample_home.convert(faf, str(tmp_path / 'targeted.xml'), build_targets=BuildTargets(
+        groups=['Property,Listing'], lookup_fields=['Basement'])))
+    # Selected group with its sub group, parent pages of selected pages
+    assert list(targeted_ids) == ['Property Resource', 'Listing Group', 'FldPr001 Field', 'FldPr006 Field',
+                                  'FldPr011 Field', 'Price Group', 'FldPr002 Field', 'FldPr007 Field',
+                                  'Lookup Fields and Values', 'B - Lookup Fields', 'Basement Lookups', 'Val 1',
+                                  'Bar Fridge', 'Val 7', 'Val 10']
+    assert all(targeted_ids[page_title] == full_ids[page_title] for page_title in targeted_ids)
+
+
+def test_resource_and_letter_targets(tmp_path):
+    faf = sample_home.make_home(str(tmp_path / 'home'))
+    full_ids = page_ids(sample_home.convert(faf, str(tmp_path / 'full.xml')))
+    targeted_ids = page_ids(sample_home.convert(faf, str(tmp_path / 'targeted.xml'), build_targets=BuildTargets(
+        resources=['Rules Tab'], letters=['Z'])))
+    assert list(targeted_ids) == ['Rules Resource', 'FldRu000 Field', 'FldRu002 Field', 'Definition Group',
+                                  'FldRu001 Field', 'FldRu003 Field', 'Lookup Fields and Values',
+                                  'Z - Lookup Fields', 'Zeta Lookups', 'Val 2', 'Val 5', 'Val 8', 'Val 11']
+    assert all(targeted_ids[page_title] == full_ids[page_title] for page_title in targeted_ids)
+
+
+def test_no_lookup_targets_skip_lookup_pages(tmp_path):
+    faf = sample_home.make_home(str(tmp_path / 'home'))
+    targeted_ids = page_ids(sample_home.convert(faf, str(tmp_path / 'targeted.xml'),
+                                                build_targets=BuildTargets(resources=['SocialMedia'])))
+    assert list(targeted_ids) == ['SocialMedia Collection', 'FldSo000 Field', 'FldSo001 Field', 'FldSo002 Field']
@@ -0,0 +1,55 @@
+import gzip
+import lzma
+
+import pytest
+
+import sample_home
+from applic.compressedio import open_file, split_ext
+from applic.dicttoxml import DictToXML, DXMLGeneratedError
+from applic.exportindex import ExportIndex, ExportIndexGeneratedError
+
+EXPORT_BYTES = sample_home.EXPORT_XML.encode()
+MAX_ID_BYTES = sample_home.MAX_ID_TEXT.encode()
+
+
+def corrupt_files(tmp_path, data, name):
+    """ Files holding data that cannot be decompressed: truncated gzip, not gzip, not xz
+
+    :return: (list) file paths
+    """
+    files = {name + '.gz': gzip.compress(data * 20)[:60], 'bad_' + name + '.gz': b'not a gzip file' * 10,
+             name + '.xz': b'not an xz file' * 10}
+    for filename, file_data in files.items():
+        (tmp_path / filename).write_bytes(file_data)
+    return [str(tmp_path / filename) for filename in files]
+
+
+@pytest.mark.parametrize('comp_ext', ['.gz', '.xz'])
+def test_compressed_round_trip(tmp_path, comp_ext):
+    filepath = str(tmp_path / ('export.xml' + comp_ext))
+    with open_file(filepath, 'wb') as out_file:
+        out_file.write(EXPORT_BYTES)
+    with open_file(filepath, 'rb') as in_file:
+        assert in_file.read() == EXPORT_BYTES
+    assert split_ext(filepath) == (str(tmp_path / 'export'), '.xml', comp_ext)
+
+
+def test_corrupt_max_id_file(tmp_path):
+    for max_id_filepath in corrupt_files(tmp_path, MAX_ID_BYTES, 'stat_warning_log.txt'):
+        with pytest.raises(DXMLGeneratedError) as error:
+            DictToXML.__new__(DictToXML)._read_max_ids(max_id_filepath)
+        assert error.value.value.startswith('[DXM-48]'), max_id_filepath
+
+
+def test_corrupt_export(tmp_path):
+    for export_filepath in corrupt_files(tmp_path, EXPORT_BYTES, 'export.xml'):
+        with pytest.raises(DXMLGeneratedError) as error:
+            DictToXML.__new__(DictToXML)._load_page_titles_from_ddwiki_export(export_filepath)
+        assert error.value.value.startswith('[DXM-31]'), export_filepath
+        export_index = ExportIndex(str(tmp_path / 'export_index.sqlite'))
+        try:
+            with pytest.raises(ExportIndexGeneratedError) as error:
+                export_index.update(export_filepath)
+            assert error.value.value.startswith('[EXI-02]'), export_filepath
+        finally:
+            export_index.close()
@@ -0,0 +1,101 @@
+import csv
+import gzip
+import io
+import os
+import zipfile
+
+import pytest
+
+import sample_home
+from applic.csvinput import CSVWorkbook, is_csv_input
+from applic.IOI_Import import IOIGeneratedError, ResoXLSXtoDict
+
+
+def sheet_text(columns, rows, delimiter=','):
+    text_file = io.StringIO()
+    csv_writer = csv.writer(text_file, delimiter=delimiter, lineterminator='\n')
+    csv_writer.writerow(columns)
+    for row in rows:
+        csv_writer.writerow(['' if row.get(column) is None else row.get(column) for column in columns])
+    return text_file.getvalue()
+
+
+def sample_sheet_files():
+    """ File name: text of the sample workbook sheets (a .csv, a .tsv with BOM and a gzip compressed .csv) """
+    resource_rows = sample_home.sample_resource_rows()
+    return {'PropertyCol.csv': sheet_text(sample_home.RESOURCE_COLUMNS, resource_rows['PropertyCol']),
+            'Rules Tab.tsv': '\ufeff' + sheet_text(sample_home.RESOURCE_COLUMNS, resource_rows['Rules Tab'], '\t'),
+            'SocialMedia.csv': sheet_text(sample_home.RESOURCE_COLUMNS, resource_rows['SocialMedia']),
+            'Lookups.csv.gz': sheet_text(sample_home.LOOKUP_COLUMNS, sample_home.sample_lookup_rows())}
+
+
+def write_sheet_folder(folder):
+    os.makedirs(folder)
+    for file_name, text in sample_sheet_files().items():
+        open_function = gzip.open if file_name.endswith('.gz') else open
+        with open_function(os.path.join(folder, file_name), 'wt', encoding='utf-8', newline='') as sheet_file:
+            sheet_file.write(text)
+
+
+def write_sheet_zip(zip_filepath):
+    with zipfile.ZipFile(zip_filepath, 'w') as zip_file:
+        for file_name, text in sample_sheet_files().items():
+            zip_file.writestr('sheets/' + file_name.replace('.gz', ''), text.encode('utf-8'))
+
+
+@pytest.fixture
+def faf(tmp_path):
+    faf = sample_home.make_home(str(tmp_path / 'home'))
+    write_sheet_folder(os.path.join(faf.input_folder, 'sheets'))
+    write_sheet_zip(os.path.join(faf.input_folder, 'sheets.zip'))
+    return faf
+
+
+def test_csv_workbook(faf):
+    folder = os.path.join(faf.input_folder, 'sheets')
+    with open(os.path.join(folder, 'Rules Tab.csv'), 'w') as ignored_file:  # Same sheet: 1st file name wins
+        ignored_file.write('StandardName\nIgnored\n')
+    with open(os.path.join(folder, 'notes.txt'), 'w') as text_file:
+        text_file.write('not a sheet')
+    assert is_csv_input(folder) and is_csv_input(os.path.join(faf.input_folder, 'sheets.zip'))
+    assert not is_csv_input(os.path.join(faf.input_folder, sample_home.XLSX_FILENAME))
+    workbook = CSVWorkbook(folder)
+    assert workbook.sheetnames == ['Lookups', 'PropertyCol', 'Rules Tab', 'SocialMedia']
+    assert workbook.source_files() == [os.path.join(folder, file_name) for file_name in
+                                       ['Lookups.csv.gz', 'PropertyCol.csv', 'Rules Tab.csv', 'SocialMedia.csv']]
+    lookup_rows = list(workbook['Lookups'].iter_rows())
+    assert lookup_rows[0] == tuple(sample_home.LOOKUP_COLUMNS)
+    assert lookup_rows[1][:4] == ('Val 0', 'Appliances', 'Definition of Val 0', None)
+    zip_workbook = CSVWorkbook(os.path.join(faf.input_folder, 'sheets.zip'))
+    try:
+        assert zip_workbook.sheetnames == ['Lookups', 'PropertyCol', 'Rules Tab', 'SocialMedia']
+        assert zip_workbook.source_files() == [os.path.join(faf.input_folder, 'sheets.zip')]
+        # BOM of the .tsv file is not part of the 1st column header
+        assert next(zip_workbook.get_sheet_by_name('Rules Tab').iter_rows())[0] == 'StandardName'
+        assert list(zip_workbook['Lookups'].iter_rows()) == lookup_rows
+    finally:
+        zip_workbook.close()
+
+
+@pytest.mark.parametrize('csv_input', ['sheets', 'sheets.zip'])
+def test_csv_output_same_as_xlsx(faf, tmp_path, csv_input):
+    xlsx_xml = sample_home.convert(faf, str(tmp_path / 'xlsx.xml'))
+    assert sample_home.convert(faf, str(tmp_path / 'csv.xml'), xlsx_filename=csv_input) == xlsx_xml
+    assert sample_home.convert_low_memory(faf, str(tmp_path / 'csv_low_memory.xml'), xlsx_filename=csv_input) == \
+        xlsx_xml
+    assert sample_home.convert_pipelined(faf, str(tmp_path / 'csv_pipelined.xml'), xlsx_filename=csv_input) == \
+        xlsx_xml
+
+
+def test_csv_input_errors(faf):
+    def read(input_name):
+        with pytest.raises(IOIGeneratedError) as exc_info:
+            ResoXLSXtoDict(config_file_path=faf.config_file,
+                           xlsx_filepath=os.path.join(faf.input_folder, input_name)).read_xlsx_file()
+        return exc_info.value.value
+    assert read('missing.zip').startswith('[IOI-07] CSV input folder/file')
+    with open(os.path.join(faf.input_folder, 'broken.zip'), 'wb') as zip_file:
+        zip_file.write(b'not a zip file')
+    assert read('broken.zip').startswith('[IOI-16] Cannot read CSV input')
+    os.remove(os.path.join(faf.input_folder, 'sheets', 'SocialMedia.csv'))
+    assert read('sheets') == "[IOI-11] Resource Sheet name 'SocialMedia' does not exist in .xlsx file"
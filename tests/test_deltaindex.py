@@ -0,0 +1,66 @@
+import datetime
+import os
+import shutil
+
+import pytest
+from lxml import etree as xml_tree
+
+import sample_home
+from applic.deltaindex import ExportPageIndex
+from applic.dicttoxml import DictToXML
+
+RUN_CLOCK = ExportPageIndex.RUN_CLOCK_ATTRIBUTE
+
+
+@pytest.fixture
+def faf(tmp_path):
+    """ Home folder whose DD Wiki export is the output of the sample workbook. The workbook then gets a changed field
+    .. (FldPr001 Definition) and a new field (FldPrZZZ)
+    """
+    faf = sample_home.make_home(str(tmp_path / 'home'))
+    sample_home.convert(faf, str(tmp_path / 'full.xml'))
+    shutil.copy(str(tmp_path / 'full.xml'), os.path.join(faf.input_folder, sample_home.EXPORT_FILENAME))
+    resource_rows = sample_home.sample_resource_rows()
+    resource_rows['PropertyCol'][1]['Definition'] = 'Changed definition'
+    resource_rows['PropertyCol'].append(sample_home.resource_row('FldPrZZZ', 'Property,Structure Bar'))
+    sample_home.write_workbook(os.path.join(faf.input_folder, sample_home.XLSX_FILENAME), resource_rows=resource_rows)
+    return faf
+
+
+def page_tree(xml_root):
+    return [(len(list(page.iterancestors())), page.get('Page_Title')) for page in xml_root.iter()
+            if 'Page_Title' in page.attrib]
+
+
+def test_delta_keeps_new_and_changed_pages_with_parent_groups(faf, tmp_path):
+    # Run a day later: values set from the run clock (ModificationTimestamp) differ but are not compared
+    delta_xml = sample_home.convert(faf, str(tmp_path / 'delta.xml'), delta_only=True,
+                                    pinned_datetime=sample_home.RUN_CLOCK + datetime.timedelta(days=1))
+    xml_root = xml_tree.fromstring(delta_xml)
+    assert page_tree(xml_root) == [(1, 'Property Resource'),
+                                   (2, 'Listing Group'), (3, 'FldPr001 Field'),
+                                   (2, 'Structure Bar Group'), (3, 'FldPrZZZ Field')]
+    changed_page = xml_root.find(".//*[@Page_Title='FldPr001 Field']")
+    assert 'Changed definition' in xml_tree.tostring(changed_page, encoding='unicode')
+    full_xml = sample_home.convert(faf, str(tmp_path / 'full.xml'))
+    assert b'Page_Title="FldPr000 Field"' in full_xml and b'Page_Title="FldPr000 Field"' not in delta_xml
+
+
+def test_run_clock_attribute_only_with_delta(faf, tmp_path, monkeypatch):
+    marked_nodes = []
+    prune_unchanged = ExportPageIndex.prune_unchanged
+
+    def count_marked_and_prune(export_page_index, xml_root):
+        marked_nodes.extend(node.tag for node in xml_root.iter() if RUN_CLOCK in node.attrib)
+        return prune_unchanged(export_page_index, xml_root)
+
+    monkeypatch.setattr(ExportPageIndex, 'prune_unchanged', count_marked_and_prune)
+    xlsx_to_dict = sample_home.new_reader(faf)
+    xlsx_to_dict.read_xlsx_file()
+    dict_to_xml = DictToXML(spreadsheet_dict=xlsx_to_dict.spreadsheet_info, program_config_data=xlsx_to_dict.config,
+                            **sample_home.converter_args(faf, str(tmp_path / 'full.xml')))
+    assert not any(RUN_CLOCK in node.attrib for node in dict_to_xml.xml_root.iter())
+    assert marked_nodes == []
+    delta_xml = sample_home.convert(faf, str(tmp_path / 'delta.xml'), delta_only=True)
+    assert len(marked_nodes) > 0
+    assert RUN_CLOCK.encode() not in delta_xml
@@ -0,0 +1,157 @@
+import os
+from collections import Counter
+
+import pytest
+
+import sample_home
+from applic.dicttoxml import DictToXML
+from applic.exportindex import ExportIndex
+from applic.idblocks import IDBlockAllocator
+from applic.IOI_Import import open_export_index
+
+RULES_EXPORT_FILEPATH = os.path.join(sample_home.REPO_FOLDER, 'files', 'xml', 'DDWiki_1_7_Rules v7 test.xml')
+
+# Property and Appliances hold ids in a 2nd block (extension blocks)
+OVERFLOW_EXPORT_XML = b"""<export>
+<Group Page_Title="Property Resource">
+  <Item Page_Title="FldA Field"><Field_Name_Standard_Name>FldA</Field_Name_Standard_Name>
+    <Groupings><Group Link="Property Resource">Property Resource</Group></Groupings>
+    <Record_Identifier>101998</Record_Identifier></Item>
+  <Item Page_Title="FldB Field"><Field_Name_Standard_Name>FldB</Field_Name_Standard_Name>
+    <Groupings><Group Link="Property Resource">Property Resource</Group></Groupings>
+    <Record_Identifier>448001</Record_Identifier></Item>
+</Group>
+<Group Page_Title="Appliances Lookups"><Lookup_FieldID>446000</Lookup_FieldID>
+  <Item Page_Title="Val 1"><Lookup_Value>Val 1</Lookup_Value>
+    <Lookup_Field Link="Appliances Lookups">Appliances Lookups</Lookup_Field>
+    <Lookup_FieldID>446000</Lookup_FieldID><LookupID>446997</LookupID></Item>
+  <Item Page_Title="Val 2"><Lookup_Value>Val 2</Lookup_Value>
+    <Lookup_Field Link="Appliances Lookups">Appliances Lookups</Lookup_Field>
+    <Lookup_FieldID>446000</Lookup_FieldID><LookupID>449055</LookupID></Item>
+</Group>
+<Group Page_Title="Basement Lookups"><Lookup_FieldID>447000</Lookup_FieldID>
+  <Item Page_Title="Crawl"><Lookup_Value>Crawl</Lookup_Value>
+    <Lookup_Field Link="Basement Lookups">Basement Lookups</Lookup_Field>
+    <Lookup_FieldID>447000</Lookup_FieldID><LookupID>447003</LookupID></Item>
+</Group>
+</export>"""
+
+
+@pytest.fixture
+def faf(tmp_path):
+    return sample_home.make_home(str(tmp_path / 'home'))
+
+
+@pytest.fixture
+def rules_index(faf, tmp_path):
+    """ Index of the Rules export of files/xml with the page title config of files/config/current """
+    export_index = open_export_index(faf, str(tmp_path / 'index' / ExportIndex.INDEX_FILENAME),
+                                     RULES_EXPORT_FILEPATH)
+    yield export_index
+    export_index.close()
+
+
+def new_index(tmp_path, resource_title_template='[[Name]] Resource'):
+    return ExportIndex(str(tmp_path / 'index' / ExportIndex.INDEX_FILENAME),
+                       resource_title_template=resource_title_template, lookup_field_title_template='[[Name]] Lookups')
+
+
+def parse_max_id_report(report):
+    """ Max ids and ID blocks read back as from a max id file """
+    dict_to_xml = DictToXML.__new__(DictToXML)
+    dict_to_xml.max_lookupids = {}
+    dict_to_xml.max_recordids = {}
+    dict_to_xml.max_id = -1
+    dict_to_xml.max_id_blocks = {}
+    dict_to_xml._parse_max_id_lines(report.splitlines(True), 'report')
+    return dict_to_xml.max_recordids, dict_to_xml.max_lookupids, dict_to_xml.max_id_blocks
+
+
+def test_index_entries(rules_index):
+    kinds = Counter(kind for kind, in rules_index.connection.execute("SELECT kind FROM entries"))
+    assert kinds == {ExportIndex.FIELD: 42, ExportIndex.PAGE: 8, ExportIndex.LOOKUP_VALUE: 4,
+                     ExportIndex.RESOURCE: 3, ExportIndex.LOOKUP_FIELD: 1}
+    assert rules_index.query('RuleAction') == [{'kind': ExportIndex.FIELD, 'name': 'RuleAction', 'scope': 'Rules',
+                                                'id': 446011, 'lookup_field_id': None,
+                                                'page_title': 'RuleAction Field'}]
+    assert rules_index.query('REBR') == [{'kind': ExportIndex.LOOKUP_VALUE, 'name': 'REBR', 'scope': 'RuleFormat',
+                                          'id': 447001, 'lookup_field_id': 447000, 'page_title': 'REBR'}]
+    # Field page title qualified as a duplicate: resource from Groupings
+    assert rules_index.query('GreenBuildingVerification')[0]['scope'] == 'Property'
+
+
+def test_update_skipped_while_export_and_config_unchanged(tmp_path):
+    export_filepath = str(tmp_path / 'export.xml')
+    with open(export_filepath, 'wb') as export_file:
+        export_file.write(OVERFLOW_EXPORT_XML)
+    export_index = new_index(tmp_path)
+    try:
+        assert export_index.update(export_filepath)
+        assert not export_index.update(export_filepath)
+        export_stat = os.stat(export_filepath)
+        os.utime(export_filepath, ns=(export_stat.st_atime_ns, export_stat.st_mtime_ns + 10 ** 9))
+        assert export_index.update(export_filepath)
+        assert not export_index.update(export_filepath)
+    finally:
+        export_index.close()
+    # Same index file read with another page title config: indexed again
+    export_index = new_index(tmp_path, resource_title_template='[[Name]] Collection')
+    try:
+        assert export_index.update(export_filepath)
+        assert export_index.query('FldA')[0]['scope'] == ''
+    finally:
+        export_index.close()
+    export_index = new_index(tmp_path)
+    try:
+        assert export_index.update(export_filepath)
+        assert not export_index.update(export_filepath)
+        assert export_index.query('FldA')[0]['scope'] == 'Property'
+    finally:
+        export_index.close()
+
+
+def test_query_match_modes(rules_index):
+    assert [entry['name'] for entry in rules_index.query('ruleaction', ExportIndex.EXACT)] == ['RuleAction']
+    assert rules_index.query('RuleAct', ExportIndex.EXACT) == []
+    prefix_names = [entry['name'] for entry in rules_index.query('RuleAct', ExportIndex.PREFIX)]
+    assert prefix_names == ['RuleAction']
+    assert all(entry['name'].casefold().startswith('rule') for entry in rules_index.query('rule', ExportIndex.PREFIX))
+    substring_entries = rules_index.query('greenver', ExportIndex.SUBSTRING)
+    assert [(entry['kind'], entry['name']) for entry in substring_entries] == [(ExportIndex.PAGE,
+                                                                                'GreenVerification Group')]
+    # A number matches ids
+    assert [entry['name'] for entry in rules_index.query('446011')] == ['RuleAction']
+
+
+def test_max_ids(rules_index):
+    assert rules_index.max_ids() == ({'Property': 101016, 'Rules': 446027, 'SocialMedia': 444020},
+                                     {'RuleFormat': 447004})
+    assert rules_index.id_blocks() == ({}, {})
+
+
+def test_max_id_report_read_back_as_max_id_file(rules_index):
+    max_recordids, max_lookupids, max_id_blocks = parse_max_id_report(rules_index.max_id_report())
+    assert (max_recordids, max_lookupids) == rules_index.max_ids()
+    assert max_id_blocks == {}
+
+
+def test_max_id_report_with_id_blocks_read_back_as_max_id_file(tmp_path):
+    export_filepath = str(tmp_path / 'export.xml')
+    with open(export_filepath, 'wb') as export_file:
+        export_file.write(OVERFLOW_EXPORT_XML)
+    export_index = new_index(tmp_path)
+    try:
+        export_index.update(export_filepath)
+        report = export_index.max_id_report()
+        recordid_blocks, lookupid_blocks = export_index.id_blocks()
+        max_ids = export_index.max_ids()
+    finally:
+        export_index.close()
+    assert '** ID Blocks\nProperty Fields blocks: 101000+1000 448000+1000\n' in report
+    assert recordid_blocks == {'Property': [(101000, 1000), (448000, 1000)]}
+    assert lookupid_blocks == {'Appliances': [(446000, 1000), (449000, 1000)]}
+    max_recordids, max_lookupids, max_id_blocks = parse_max_id_report(report)
+    assert (max_recordids, max_lookupids) == max_ids == ({'Property': 448001}, {'Appliances': 449055,
+                                                                                 'Basement': 447003})
+    assert max_id_blocks == {(IDBlockAllocator.RECORDID, 'Property'): recordid_blocks['Property'],
+                             (IDBlockAllocator.LOOKUPID, 'Appliances'): lookupid_blocks['Appliances']}
@@ -0,0 +1,33 @@
+import random
+
+from applic.extsort import ExternalSorter
+
+
+def test_sorted_through_run_files(tmp_path):
+    random.seed(7)
+    keys = [(random.randrange(50), 'name {}'.format(idx)) for idx in range(500)]
+    sorter = ExternalSorter(memory_budget_bytes=200, temp_folder=str(tmp_path))
+    for idx, key in enumerate(keys):
+        sorter.add(key, {'row': idx, 'key': key})
+    assert len(sorter.runs) > 10
+    assert sorter.record_count == 500
+    assert [record['key'] for key, record in sorter] == sorted(keys)
+    assert sorter.runs == []
+
+
+def test_equal_keys_keep_added_order():
+    sorter = ExternalSorter(memory_budget_bytes=30)
+    for idx in range(40):
+        sorter.add((idx % 3,), idx)
+    assert len(sorter.runs) > 1
+    assert [record for key, record in sorter] == \
+        [idx for idx in range(40) if idx % 3 == 0] + [idx for idx in range(40) if idx % 3 == 1] + \
+        [idx for idx in range(40) if idx % 3 == 2]
+
+
+def test_in_memory_when_budget_not_exceeded():
+    sorter = ExternalSorter(memory_budget_bytes=1024 * 1024)
+    for name in ['c', 'a', 'b']:
+        sorter.add((name,), name.upper())
+    assert sorter.runs == []
+    assert list(sorter) == [(('a',), 'A'), (('b',), 'B'), (('c',), 'C')]
@@ -0,0 +1,226 @@
+import logging
+
+import pytest
+
+from applic.dicttoxml import DictToXML, DXMLGeneratedError
+from applic.idblocks import IDBlockAllocator
+from applic.idledger import IDLedger
+
+LOOKUPID = IDBlockAllocator.LOOKUPID
+RECORDID = IDBlockAllocator.RECORDID
+
+EXPORT_XML = b"""<export>
+<Group Page_Title="Property Resource">
+  <Item Page_Title="FldA Field"><Field_Name_Standard_Name>FldA</Field_Name_Standard_Name>
+    <Groupings><Group Link="Property Resource">Property Resource</Group></Groupings>
+    <Record_Identifier>101998</Record_Identifier></Item>
+  <Item Page_Title="FldB Field"><Field_Name_Standard_Name>FldB</Field_Name_Standard_Name>
+    <Groupings><Group Link="Property Resource">Property Resource</Group></Groupings>
+    <Record_Identifier>448001</Record_Identifier></Item>
+</Group>
+<Group Page_Title="Appliances Lookups"><Lookup_FieldID>446000</Lookup_FieldID>
+  <Item Page_Title="Val 1"><Lookup_Value>Val 1</Lookup_Value>
+    <Lookup_Field Link="Appliances Lookups">Appliances Lookups</Lookup_Field>
+    <Lookup_FieldID>446000</Lookup_FieldID><LookupID>446997</LookupID></Item>
+  <Item Page_Title="Val 2"><Lookup_Value>Val 2</Lookup_Value>
+    <Lookup_Field Link="Appliances Lookups">Appliances Lookups</Lookup_Field>
+    <Lookup_FieldID>446000</Lookup_FieldID><LookupID>449055</LookupID></Item>
+</Group>
+</export>"""
+
+
+@pytest.fixture
+def export_filepath(tmp_path):
+    export_filepath = tmp_path / 'export.xml'
+    export_filepath.write_bytes(EXPORT_XML)
+    return str(export_filepath)
+
+
+def new_dict_to_xml(max_recordids=None, max_lookupids=None, id_ledger=None, index_filepath=None):
+    """ DictToXML with only the state used for IDs (DictToXML converts in __init__) """
+    dict_to_xml = DictToXML.__new__(DictToXML)
+    dict_to_xml.export_index_filepath = index_filepath
+    dict_to_xml.logger = logging.getLogger('test')
+    dict_to_xml.max_recordids = dict(max_recordids or {})
+    dict_to_xml.max_lookupids = dict(max_lookupids or {})
+    dict_to_xml.max_id = max(list(dict_to_xml.max_recordids.values()) + list(dict_to_xml.max_lookupids.values()) +
+                             [-1])
+    dict_to_xml.max_id_blocks = {}
+    dict_to_xml.export_id_blocks = {}
+    dict_to_xml.id_ledger = id_ledger
+    dict_to_xml.page_links = {}
+    dict_to_xml.xml_config_data = {'Resource': {'Attributes': {'Page_Title': '[[Name]] Resource'}},
+                                   'LookupIndexField': {'Attributes': {'Page_Title': '[[Name]] Lookups'}}}
+    return dict_to_xml
+
+
+def test_ids_continue_in_home_block():
+    id_blocks = IDBlockAllocator(1000, 446010)
+    id_blocks.add_scope(LOOKUPID, 'Appliances', 446010, [(446000, 1000)])
+    assert id_blocks.base(LOOKUPID, 'Appliances') == 446000
+    assert id_blocks.next_id(LOOKUPID, 'Appliances', 446010) == 446011
+
+
+def test_full_block_overflows_into_extension_block():
+    id_blocks = IDBlockAllocator(1000, 447003)
+    id_blocks.add_scope(LOOKUPID, 'Appliances', 446997, [(446000, 1000)])
+    id_blocks.add_scope(LOOKUPID, 'Basement', 447003, [(447000, 1000)])
+    assert id_blocks.next_id(LOOKUPID, 'Appliances', 446997) == 446998  # 446999 is not handed out
+    assert id_blocks.next_id(LOOKUPID, 'Appliances', 446998) == 448001
+    assert id_blocks.block_list(LOOKUPID, 'Appliances') == [(446000, 1000), (448000, 1000)]
+    assert id_blocks.base(LOOKUPID, 'Appliances') == 446000
+
+
+def test_resource_ids_use_last_id_of_block():
+    id_blocks = IDBlockAllocator(1000, 101998)
+    id_blocks.add_scope(RECORDID, 'Property', 101998, [(101000, 1000)])
+    assert id_blocks.next_id(RECORDID, 'Property', 101998) == 101999
+    assert id_blocks.next_id(RECORDID, 'Property', 101999) == 102001
+
+
+def test_listed_extension_block_is_used_before_a_new_one():
+    id_blocks = IDBlockAllocator(1000, 451022)
+    id_blocks.add_scope(LOOKUPID, 'Appliances', 451022, [(446000, 1000), (451000, 1000)])
+    assert id_blocks.base(LOOKUPID, 'Appliances') == 446000
+    assert id_blocks.next_id(LOOKUPID, 'Appliances', 451022) == 451023
+
+
+def test_new_scope_block_size():
+    id_blocks = IDBlockAllocator(10000, 451022)
+    assert id_blocks.new_scope(LOOKUPID, 'Look00') == 452000
+    assert id_blocks.block_list(LOOKUPID, 'Look00') == [(452000, 10000)]
+    assert id_blocks.new_scope(RECORDID, 'Rules') == 462000
+
+
+def test_ledger_allocation_shares_blocks(tmp_path):
+    ledger_filepath = str(tmp_path / 'id_ledger.sqlite')
+    ledgers = [IDLedger(ledger_filepath, reserve_block_size=4) for _ in range(2)]
+    try:
+        allocators = [IDBlockAllocator(1000, 446997, ledger) for ledger in ledgers]
+        for id_blocks in allocators:
+            id_blocks.add_scope(LOOKUPID, 'Appliances', 446997, [(446000, 1000)])
+        first_ids = [id_blocks.next_id(LOOKUPID, 'Appliances', 446997, 'Val A' + str(index))
+                     for index, id_blocks in enumerate(allocators)]
+        assert first_ids == [446998, 447001]  # The 2nd conversion finds the home block reserved
+        assert allocators[0].next_id(LOOKUPID, 'Appliances', 446997, 'Val B') == 447005  # 447001-447004 reserved
+        assert allocators[0].block_list(LOOKUPID, 'Appliances') == allocators[1].block_list(LOOKUPID, 'Appliances')
+        assert allocators[0].new_scope(RECORDID, 'Rules') == allocators[1].new_scope(RECORDID, 'Rules')
+    finally:
+        for ledger in ledgers:
+            ledger.close()
+
+
+def test_ledger_allocation_returns_owned_id(tmp_path):
+    ledger = IDLedger(str(tmp_path / 'id_ledger.sqlite'))
+    try:
+        id_blocks = IDBlockAllocator(1000, 446010, ledger)
+        id_blocks.add_scope(LOOKUPID, 'Appliances', 446010, [(446000, 1000)])
+        assert id_blocks.next_id(LOOKUPID, 'Appliances', 446010, 'Val 1') == 446011
+        ledger.commit()
+        id_blocks = IDBlockAllocator(1000, 446010, ledger)
+        id_blocks.add_scope(LOOKUPID, 'Appliances', 446010, [(446000, 1000)])
+        assert id_blocks.next_id(LOOKUPID, 'Appliances', 446010, 'Val 2') == 446012
+        assert id_blocks.next_id(LOOKUPID, 'Appliances', 446010, 'Val 1') == 446011
+    finally:
+        ledger.close()
+
+
+def test_parse_id_blocks_section():
+    dict_to_xml = new_dict_to_xml()
+    dict_to_xml._parse_max_id_lines(['** Max RecordID per Resource Report\n',
+                                     'Property Fields max id: 448038\n',
+                                     '** Max LookupID per Lookup Field\n',
+                                     'Appliances Lookup max id: 451022\n',
+                                     '** ID Blocks\n',
+                                     'Property Fields blocks: 101000+1000 448000+1000\n',
+                                     'Appliances Lookup blocks: 446000+1000 451000+10000\n',
+                                     '\n'], 'stat.txt')
+    assert dict_to_xml.max_recordids == {'Property': 448038}
+    assert dict_to_xml.max_lookupids == {'Appliances': 451022}
+    assert dict_to_xml.max_id == 451022
+    assert dict_to_xml.max_id_blocks == {(RECORDID, 'Property'): [(101000, 1000), (448000, 1000)],
+                                         (LOOKUPID, 'Appliances'): [(446000, 1000), (451000, 10000)]}
+
+
+@pytest.mark.parametrize('line', ['Appliances Lookup blocks:',
+                                  'Appliances Values blocks: 446000+1000',
+                                  'Appliances Lookup 446000+1000 451000+1000',
+                                  'Appliances Lookup blocks: 446000',
+                                  'Appliances Lookup blocks: 446000+x',
+                                  'Appliances Lookup blocks: 446500+1000',
+                                  'Appliances Lookup blocks: 446000+1500',
+                                  'Appliances Lookup blocks: 446000+0'])
+def test_parse_id_blocks_errors(line):
+    dict_to_xml = new_dict_to_xml()
+    with pytest.raises(DXMLGeneratedError) as error:
+        dict_to_xml._parse_max_id_lines(['** ID Blocks\n', line + '\n'], 'stat.txt')
+    assert error.value.value.startswith('[DXM-56]')
+    assert 'stat.txt' in error.value.value
+
+
+def test_export_id_blocks(tmp_path, export_filepath):
+    dict_to_xml = new_dict_to_xml(index_filepath=str(tmp_path / 'index' / 'export_index.sqlite'))
+    export_id_blocks = dict_to_xml._read_export_id_blocks(export_filepath)
+    assert export_id_blocks == {(RECORDID, 'Property'): [(101000, 1000), (448000, 1000)],
+                                (LOOKUPID, 'Appliances'): [(446000, 1000), (449000, 1000)]}
+    # Resource pages titled '[[Name]] Collection': Property fields are no longer found in a resource
+    dict_to_xml.xml_config_data['Resource']['Attributes']['Page_Title'] = '[[Name]] Collection'
+    assert dict_to_xml._read_export_id_blocks(export_filepath) == {
+        (LOOKUPID, 'Appliances'): [(446000, 1000), (449000, 1000)]}
+    dict_to_xml.page_links = {'Property': 'Property Resource'}
+    assert dict_to_xml._read_export_id_blocks(export_filepath) == export_id_blocks
+
+
+def test_home_block_from_export_after_overflow(tmp_path, export_filepath):
+    dict_to_xml = new_dict_to_xml(max_recordids={'Property': 448038}, max_lookupids={'Appliances': 449055},
+                                  index_filepath=str(tmp_path / 'export_index.sqlite'))
+    dict_to_xml.export_id_blocks = dict_to_xml._read_export_id_blocks(export_filepath)
+    dict_to_xml.id_blocks = dict_to_xml._id_block_allocator(1000)
+    assert dict_to_xml._compute_lookup_fieldid('Appliances') == 446000
+    assert dict_to_xml._compute_lookupid('Appliances', 'Val 3') == 449056
+    assert dict_to_xml._compute_recordid('Property', 'FldC') == 448039
+
+
+def test_max_id_block_added_to_export_blocks():
+    dict_to_xml = new_dict_to_xml(max_lookupids={'Appliances': 452003})
+    dict_to_xml.export_id_blocks = {(LOOKUPID, 'Appliances'): [(446000, 1000)]}
+    dict_to_xml.id_blocks = dict_to_xml._id_block_allocator(1000)
+    assert dict_to_xml.id_blocks.block_list(LOOKUPID, 'Appliances') == [(446000, 1000), (452000, 1000)]
+    assert dict_to_xml._compute_lookupid('Appliances') == 452004
+
+
+def test_id_blocks_section_before_export():
+    dict_to_xml = new_dict_to_xml(max_lookupids={'Appliances': 451022})
+    dict_to_xml.max_id_blocks = {(LOOKUPID, 'Appliances'): [(446000, 1000), (451000, 1000)]}
+    dict_to_xml.export_id_blocks = {(LOOKUPID, 'Appliances'): [(451000, 1000)]}
+    dict_to_xml.id_blocks = dict_to_xml._id_block_allocator(1000)
+    assert dict_to_xml._compute_lookup_fieldid('Appliances') == 446000
+
+
+def test_scope_missing_from_export_keeps_block_of_max_id(caplog):
+    dict_to_xml = new_dict_to_xml(max_recordids={'Property': 101500}, max_lookupids={'Appliances': 446010})
+    dict_to_xml.export_id_blocks = {(RECORDID, 'Property'): [(101000, 1000)]}
+    dict_to_xml.id_blocks = dict_to_xml._id_block_allocator(1000)
+    with caplog.at_level(logging.WARNING):
+        assert dict_to_xml._compute_recordid('Property') == 101501
+        assert not caplog.records
+        assert dict_to_xml._compute_lookup_fieldid('Appliances') == 446000
+        assert dict_to_xml._compute_lookupid('Appliances') == 446011
+    assert [record.getMessage()[:10] for record in caplog.records] == ['[DXM-59] N']  # Warned once
+
+
+def test_legacy_block():
+    assert IDBlockAllocator.legacy_block(LOOKUPID, 446998) == (446000, 1000)
+    assert IDBlockAllocator.legacy_block(LOOKUPID, 446999) is None
+    assert IDBlockAllocator.legacy_block(RECORDID, 101999) == (101000, 1000)
+
+
+def test_scope_past_block_of_max_id_raises():
+    dict_to_xml = new_dict_to_xml(max_recordids={'Property': 101500}, max_lookupids={'Appliances': 446999})
+    dict_to_xml.id_blocks = dict_to_xml._id_block_allocator(1000)
+    assert dict_to_xml._compute_recordid('Property') == 101501  # Other scopes are not affected
+    for compute in (dict_to_xml._compute_lookup_fieldid, dict_to_xml._compute_lookupid):
+        with pytest.raises(DXMLGeneratedError) as error:
+            compute('Appliances')
+        assert error.value.value.startswith("[DXM-57]")
+    assert dict_to_xml.max_lookupids == {'Appliances': 446999}
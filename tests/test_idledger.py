@@ -0,0 +1,120 @@
+import logging
+import sqlite3
+
+import pytest
+
+from applic.idledger import IDLedger
+
+LOOKUPID = IDLedger.LOOKUPID
+RECORDID = IDLedger.RECORDID
+
+
+@pytest.fixture
+def ledger_filepath(tmp_path):
+    return str(tmp_path / 'ledger' / 'id_ledger.sqlite')
+
+
+@pytest.fixture
+def open_ledgers():
+    ledgers = []
+    yield ledgers
+    for ledger in ledgers:
+        ledger.close()
+
+
+def open_ledger(open_ledgers, ledger_filepath, reserve_block_size=16):
+    ledger = IDLedger(ledger_filepath, reserve_block_size)
+    open_ledgers.append(ledger)
+    return ledger
+
+
+def test_reservations_of_two_ledgers_never_overlap(open_ledgers, ledger_filepath):
+    ledgers = [open_ledger(open_ledgers, ledger_filepath, reserve_block_size=4) for _ in range(2)]
+    ids = [[], []]
+    for index in range(10):
+        for ledger_index, ledger in enumerate(ledgers):
+            ids[ledger_index].append(ledger.allocate(LOOKUPID, 'Appliances', 'Val {}-{}'.format(ledger_index, index),
+                                                     446010, 446998))
+    assert not set(ids[0]) & set(ids[1])
+    assert min(ids[0] + ids[1]) == 446011
+    assert all(len(set(ledger_ids)) == 10 for ledger_ids in ids)
+
+
+def test_scope_full_returns_minus_one(open_ledgers, ledger_filepath):
+    ledger = open_ledger(open_ledgers, ledger_filepath)
+    assert ledger.allocate(LOOKUPID, 'Appliances', 'Val 1', 446997, 446998) == 446998
+    assert ledger.allocate(LOOKUPID, 'Appliances', 'Val 2', 446997, 446998) == -1
+
+
+def test_discard_hands_back_unused_ids(open_ledgers, ledger_filepath):
+    ledger = open_ledger(open_ledgers, ledger_filepath)
+    assert [ledger.allocate(RECORDID, 'Property', 'Fld{}'.format(index), 101500, 101999)
+            for index in range(3)] == [101501, 101502, 101503]
+    ledger.discard()
+    other_ledger = open_ledger(open_ledgers, ledger_filepath)
+    assert other_ledger.allocate(RECORDID, 'Property', 'FldX', 101500, 101999) == 101504
+    assert ledger.allocate(RECORDID, 'Property', 'Fld0', 101500, 101999) == 101520  # Not recorded by discard()
+
+
+def test_unused_ids_stay_reserved_after_a_later_reservation(open_ledgers, ledger_filepath):
+    ledgers = [open_ledger(open_ledgers, ledger_filepath, reserve_block_size=4) for _ in range(2)]
+    assert ledgers[0].allocate(RECORDID, 'Property', 'Fld0', 101500, 101999) == 101501
+    assert ledgers[1].allocate(RECORDID, 'Property', 'Fld1', 101500, 101999) == 101505
+    ledgers[0].commit()  # 101502-101504 not handed back: another conversion reserved after
+    assert open_ledger(open_ledgers, ledger_filepath).allocate(RECORDID, 'Property', 'Fld2', 101500,
+                                                               101999) == 101509
+
+
+def test_rerun_gets_back_owned_ids(open_ledgers, ledger_filepath):
+    ledger = open_ledger(open_ledgers, ledger_filepath)
+    first_ids = {name: ledger.allocate(LOOKUPID, 'Appliances', name, 446010, 446998) for name in ('Val 1', 'Val 2')}
+    ledger.commit()
+    rerun_ledger = open_ledger(open_ledgers, ledger_filepath)
+    assert rerun_ledger.allocate(LOOKUPID, 'Appliances', 'Val 3', 446010, 446998) == 446013
+    assert rerun_ledger.allocate(LOOKUPID, 'Appliances', 'Val 2', 446010, 446998) == first_ids['Val 2']
+    assert rerun_ledger.allocate(LOOKUPID, 'Appliances', 'Val 1', 446010, 446998) == first_ids['Val 1']
+    assert rerun_ledger.allocate(LOOKUPID, 'Appliances', 'Val 1', 446010, 446998) == 446014  # Duplicate page key
+
+
+def test_ids_of_a_discarded_run_are_not_owned(open_ledgers, ledger_filepath):
+    ledger = open_ledger(open_ledgers, ledger_filepath)
+    assert ledger.allocate(LOOKUPID, 'Appliances', 'Val 1', 446010, 446998) == 446011
+    ledger.discard()
+    assert ledger.allocate(LOOKUPID, 'Appliances', 'Val 1', 446010, 446998) == 446012
+
+
+def test_scope_blocks_shared_by_ledgers(open_ledgers, ledger_filepath):
+    ledgers = [open_ledger(open_ledgers, ledger_filepath) for _ in range(2)]
+    assert ledgers[0].scope_block(LOOKUPID, 'Look00', 0, 451022) == (452000, 1000)
+    assert ledgers[1].scope_block(RECORDID, 'Rules', 0, 451022, 10000) == (453000, 10000)
+    assert ledgers[1].scope_block(LOOKUPID, 'Look00', 0, 470000) == (452000, 1000)
+    assert ledgers[0].scope_block(LOOKUPID, 'Look00', 1, 451022) == (463000, 1000)
+    assert ledgers[1].scope_block(LOOKUPID, 'Look00', 1, 451022) == (463000, 1000)
+
+
+def test_legacy_scope_base_is_home_block(open_ledgers, ledger_filepath):
+    open_ledger(open_ledgers, ledger_filepath).close()
+    connection = sqlite3.connect(ledger_filepath)
+    with connection:  # Ledger written before scope_blocks: scope bases only
+        connection.execute("INSERT INTO scope_base VALUES (?, ?, ?)", (LOOKUPID, 'Look00', 452000))
+    connection.close()
+    ledger = open_ledger(open_ledgers, ledger_filepath)
+    assert ledger.scope_block(LOOKUPID, 'Look00', 0, 451022, 10000) == (452000, 1000)
+    assert ledger.scope_block(LOOKUPID, 'Look01', 0, 451022) == (453000, 1000)  # Above the legacy base block
+    assert ledger.scope_block(LOOKUPID, 'Look00', 1, 451022) == (454000, 1000)
+
+
+def test_page_recorded_first_by_another_conversion_is_reported(open_ledgers, ledger_filepath, caplog):
+    ledgers = [open_ledger(open_ledgers, ledger_filepath, reserve_block_size=4) for _ in range(2)]
+    page_ids = [ledger.allocate(LOOKUPID, 'Appliances', 'Bar Fridge', 446010, 446998) for ledger in ledgers]
+    assert page_ids == [446011, 446015]
+    ledgers[1].allocate(LOOKUPID, 'Appliances', 'Wine Fridge', 446010, 446998)
+    ledgers[0].commit()
+    caplog.set_level(logging.WARNING)
+    ledgers[1].commit()
+    assert [record.getMessage() for record in caplog.records] == [
+        "[IDL-04] Lookup value 'Bar Fridge' of 'Appliances' written with LookupID 446015, but another conversion "
+        "recorded it in the ID ledger with 446011. Later runs use 446011"]
+    assert open_ledger(open_ledgers, ledger_filepath).allocate(LOOKUPID, 'Appliances', 'Bar Fridge',
+                                                               446010, 446998) == 446011
+
@@ -0,0 +1,89 @@
+import argparse
+import multiprocessing
+import os
+
+import pytest
+
+import sample_home
+from applic.compressedio import open_file
+from applic.IOI_Import import ResoXLSXtoDict, _matrix_jobs, convert_config_matrix
+
+
+def matrix_home(tmp_path):
+    """ Home with config sub folders 'current', 'alt' (same sheet mapping) and 'norules' (no 'Rules Tab' sheet) """
+    faf = sample_home.make_home(str(tmp_path / 'home'), config_sub_folders=('current', 'alt', 'norules'))
+    norules_config_file = os.path.join(os.path.dirname(faf.config_folder), 'norules', 'config.ini')
+    with open(norules_config_file, encoding='utf-8') as config_file:
+        config_text = config_file.read()
+    with open(norules_config_file, 'w', encoding='utf-8') as config_file:
+        config_file.write(config_text.replace('Rules Tab=Rules\n', '', 1))
+    return faf
+
+
+def run_matrix(faf, tmp_path, config_sub_folders, matrix_workers=1, result_xml_filename='book.xml.gz'):
+    args = argparse.Namespace(config_sub_folder=list(config_sub_folders), matrix_workers=matrix_workers)
+    dicttoxml_args = sample_home.converter_args(faf, None)
+    del dicttoxml_args['files_and_folders'], dicttoxml_args['result_xml_filepath']
+    return convert_config_matrix(args, faf.home_folder, os.path.join(faf.input_folder, sample_home.XLSX_FILENAME),
+                                 str(tmp_path / result_xml_filename), None, dicttoxml_args)
+
+
+@pytest.fixture
+def opened_workbooks(monkeypatch):
+    """ xlsx files opened (parsed) by ResoXLSXtoDict """
+    opened = []
+    open_workbook = ResoXLSXtoDict.open_workbook
+
+    def counting_open_workbook(self):
+        opened.append(self.xlsx_filepath)
+        return open_workbook(self)
+    monkeypatch.setattr(ResoXLSXtoDict, 'open_workbook', counting_open_workbook)
+    return opened
+
+
+def test_workbook_parsed_once_and_shared_by_same_sheet_mapping(tmp_path, opened_workbooks):
+    faf = matrix_home(tmp_path)
+    assert run_matrix(faf, tmp_path, ['current', 'alt', 'norules'])
+    assert len(opened_workbooks) == 1
+    readers = dict((config_sub_folder, xlsx_to_dict) for config_sub_folder, job_faf, xlsx_to_dict, job_xml_filepath
+                   in _matrix_jobs)
+    assert readers['alt'].spreadsheet_info is readers['current'].spreadsheet_info
+    assert readers['norules'].spreadsheet_info is not readers['current'].spreadsheet_info
+    assert 'Rules Tab' in readers['current'].spreadsheet_info['Resources']
+    assert 'Rules Tab' not in readers['norules'].spreadsheet_info['Resources']
+
+
+def test_output_per_config(tmp_path):
+    faf = matrix_home(tmp_path)
+    assert run_matrix(faf, tmp_path, ['current', 'alt', 'norules'])
+    assert sorted(os.listdir(str(tmp_path))) == ['book_alt.xml.gz', 'book_current.xml.gz', 'book_norules.xml.gz',
+                                                 'home']
+    # Same as a single config conversion
+    single_xml = sample_home.convert(faf, str(tmp_path / 'single.xml'))
+    assert sample_home.read_bytes(str(tmp_path / 'book_current.xml.gz'))[:2] == b'\x1f\x8b'
+    for config_sub_folder in ('current', 'alt'):
+        with open_file(str(tmp_path / 'book_{}.xml.gz'.format(config_sub_folder))) as result_file:
+            assert result_file.read() == single_xml
+    with open_file(str(tmp_path / 'book_norules.xml.gz')) as result_file:
+        norules_xml = result_file.read()
+    assert b'Page_Title="Rules Resource"' in single_xml and b'Page_Title="Rules Resource"' not in norules_xml
+
+
+def test_failing_config_does_not_stop_other_configs(tmp_path, caplog):
+    faf = matrix_home(tmp_path)
+    with open(os.path.join(os.path.dirname(faf.config_folder), 'alt', 'DDWikiImportConfig.xml'), 'w') as config_file:
+        config_file.write('<DDWikiImportConfig><Form')
+    assert not run_matrix(faf, tmp_path, ['alt', 'current'], result_xml_filename='book.xml')
+    assert os.path.exists(str(tmp_path / 'book_current.xml'))
+    assert not os.path.exists(str(tmp_path / 'book_alt.xml'))
+    assert "Config 'alt': Error creating XML File: [DXM-10]" in caplog.text
+
+
+@pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(), reason='needs forked worker processes')
+def test_worker_processes_output_same_as_in_process(tmp_path):
+    faf = matrix_home(tmp_path)
+    assert run_matrix(faf, tmp_path, ['current', 'norules'], result_xml_filename='inproc.xml')
+    assert run_matrix(faf, tmp_path, ['current', 'norules'], matrix_workers=2, result_xml_filename='forked.xml')
+    for config_sub_folder in ('current', 'norules'):
+        assert sample_home.read_bytes(str(tmp_path / 'forked_{}.xml'.format(config_sub_folder))) == \
+            sample_home.read_bytes(str(tmp_path / 'inproc_{}.xml'.format(config_sub_folder)))
@@ -0,0 +1,79 @@
+import logging
+import os
+
+import sample_home
+from applic.neardup import NearDuplicateIndex, normalize_title
+
+NAMES = ['ListPrice', 'ListPriceLow', 'OriginalListPrice', 'ClosePrice', 'PropertySubType', 'PropertyType',
+         'PropertyCondition', 'BathroomsFull', 'BathroomsHalf', 'BathroomsTotalInteger', 'BedroomsTotal',
+         'StreetName', 'StreetNumber', 'StreetSuffix', 'City', 'CityRegion', 'Cooling', 'CoolingYN', 'Heating',
+         'HeatingYN', 'LotSizeAcres', 'LotSizeArea', 'LotSizeSquareFeet', 'Bar Fridge', 'Bar Fridges', 'Freezer']
+
+
+def jaccard_matches(index, title):
+    """ similar() by comparing title with every indexed title """
+    ngrams = index._ngrams(normalize_title(title))
+    matches = []
+    for other_title, other_ngrams in zip(index.titles, index.title_ngrams):
+        if other_title == title:
+            continue
+        if normalize_title(other_title) == normalize_title(title):
+            score = 1.0
+        else:
+            score = len(ngrams & other_ngrams) / float(len(ngrams | other_ngrams))
+        if score >= index.threshold:
+            matches.append((other_title, round(score, 3)))
+    return sorted(matches, key=lambda match: (-match[1], match[0]))
+
+
+def test_normalize_title():
+    assert normalize_title('Property SubType') == normalize_title('PropertySubtype') == 'propertysubtype'
+    assert normalize_title('Bar-Fridge_ (2)') == 'barfridge2'
+
+
+def test_similar():
+    index = NearDuplicateIndex(threshold=0.7)
+    for name in NAMES:
+        index.add(name)
+    index.add('ListPrice')
+    assert len(index) == len(NAMES)
+    assert index.similar('Property Subtype') == [('PropertySubType', 1.0)]
+    assert index.similar('ListPrices') == [('ListPrice', 0.727)]
+    assert index.similar('ListPrice') == []  # Indexed title itself not reported
+    assert index.similar('Garage') == []
+
+
+def test_similar_same_as_comparing_every_title():
+    for threshold in (0.5, 0.6, 0.75, 0.85, 1.0):
+        index = NearDuplicateIndex(threshold=threshold)
+        for name in NAMES:
+            index.add(name)
+        for title in NAMES + ['ListPrices', 'Bathrooms Total', 'Street Num', 'LotSize', 'Cooling Y/N', 'Fridge']:
+            assert index.similar(title) == jaccard_matches(index, title), (threshold, title)
+
+
+def test_near_duplicates_reported_by_conversion(tmp_path, caplog):
+    resource_rows = sample_home.sample_resource_rows()
+    resource_rows['PropertyCol'] += [sample_home.resource_row('ListPrices', 'Property'),
+                                     sample_home.resource_row('CoolingYN', 'Property'),
+                                     sample_home.resource_row('Cooling_YN', 'Property')]
+    lookup_rows = sample_home.sample_lookup_rows() + [sample_home.lookup_row('Bar-Fridge', 'Basement')]
+    faf = sample_home.make_home(str(tmp_path / 'home'), resource_rows=resource_rows, lookup_rows=lookup_rows)
+    # Names of the DD Wiki export are read from its StandardName/LookupValue nodes
+    with open(os.path.join(faf.input_folder, sample_home.EXPORT_FILENAME), 'w') as export_file:
+        export_file.write(sample_home.EXPORT_XML.replace('</export>', '<Names><StandardName>ListPrice</StandardName>'
+                                                         '<LookupValue>Bar Fridge</LookupValue></Names></export>'))
+    caplog.set_level(logging.INFO)
+    result_xml = sample_home.convert(faf, str(tmp_path / 'near_dup.xml'), near_dup_threshold=0.7)
+    near_dup_messages = [record.getMessage() for record in caplog.records if '[DXM-53]' in record.getMessage()]
+    assert near_dup_messages == [
+        "[DXM-53] Near duplicate name 'Cooling_YN' (page 'Cooling_YN Field') ~ 'CoolingYN' in xlsx (similarity 1.0)",
+        "[DXM-53] Near duplicate name 'ListPrices' (page 'ListPrices Field') ~ 'ListPrice' in DD Wiki export "
+        "(similarity 0.727)",
+        "[DXM-53] Near duplicate name 'Bar-Fridge' (page 'Bar-Fridge') ~ 'Bar Fridge' in DD Wiki export "
+        "(similarity 1.0)"]
+    assert "[DXM-54] Near duplicate check: 3 suspected name collisions (similarity >= 0.7)" in caplog.text
+    # Warnings only: same output as without the check
+    caplog.clear()
+    assert sample_home.convert(faf, str(tmp_path / 'no_check.xml')) == result_xml
+    assert '[DXM-53]' not in caplog.text
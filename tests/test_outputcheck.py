@@ -0,0 +1,72 @@
+import logging
+import os
+
+import pytest
+from lxml import etree as xml_tree
+
+import sample_home
+from applic.dicttoxml import DictToXML
+from applic.IOI_Import import validate_xml_file
+from applic.outputcheck import OutputValidator, cached_rules
+
+
+@pytest.fixture
+def faf(tmp_path):
+    """ Home folder with the config of files/config/current and the output of the sample workbook (book.xml) """
+    faf = sample_home.make_home(str(tmp_path / 'home'))
+    sample_home.convert(faf, str(tmp_path / 'book.xml'))
+    return faf
+
+
+def violations(caplog):
+    return [record.getMessage() for record in caplog.records if record.levelno == logging.WARNING and
+            record.getMessage().startswith('[VAL-')]
+
+
+def test_current_config_accepts_sample_output(faf, tmp_path, caplog):
+    caplog.set_level(logging.INFO)
+    assert validate_xml_file(faf, str(tmp_path / 'book.xml')) == 0
+    assert violations(caplog) == []
+    # Same rules checking pages while they are written
+    sample_home.convert(faf, str(tmp_path / 'checked.xml'), validate_output=True)
+    assert violations(caplog) == []
+    assert any(record.getMessage().startswith('[VAL-12]') and record.getMessage().endswith(' 0 violations found')
+               for record in caplog.records)
+
+
+def test_missing_field_reported_with_page_title(faf, tmp_path, caplog):
+    xml_root = xml_tree.parse(str(tmp_path / 'book.xml')).getroot()
+    page_node = xml_root.find(".//*[@Page_Title='FldPr001 Field']")
+    page_node.remove(page_node.find('Definition'))
+    validator = OutputValidator(DictToXML.output_rules(DictToXML._read_xml_config_file(faf)))
+    caplog.set_level(logging.WARNING)
+    validator.check_tree(xml_root)
+    assert violations(caplog) == ["[VAL-04] Missing field 'Definition' on page 'FldPr001 Field'"]
+    assert validator.violation_count == 1
+
+
+def test_rules_compiled_again_when_config_xml_changes(faf, tmp_path, caplog):
+    config_xml_filepath = os.path.join(faf.config_folder, DictToXML.CONFIG_XML_FILENAME)
+    compiled = []
+
+    def compile_rules():
+        compiled.append(config_xml_filepath)
+        return DictToXML.output_rules(DictToXML._read_xml_config_file(faf))
+
+    rules = cached_rules(config_xml_filepath, compile_rules)
+    assert cached_rules(config_xml_filepath, compile_rules) is rules
+    assert len(compiled) == 1
+    assert validate_xml_file(faf, str(tmp_path / 'book.xml')) == 0
+    # Drop the BEDES field from the property field Form
+    with open(config_xml_filepath) as config_file:
+        config_lines = config_file.readlines()
+    with open(config_xml_filepath, 'w') as config_file:
+        config_file.writelines(line for line in config_lines if 'XMLName = "BEDES"' not in line or
+                               'Sequence = "80"' not in line)
+    config_stat = os.stat(config_xml_filepath)
+    os.utime(config_xml_filepath, ns=(config_stat.st_atime_ns, config_stat.st_mtime_ns + 10 ** 9))
+    assert cached_rules(config_xml_filepath, compile_rules) is not rules
+    assert len(compiled) == 2
+    caplog.set_level(logging.WARNING)
+    assert validate_xml_file(faf, str(tmp_path / 'book.xml')) > 0
+    assert "[VAL-05] Unexpected field 'BEDES' on page 'FldPr000 Field'" in violations(caplog)
@@ -0,0 +1,93 @@
+import csv
+import json
+
+from lxml import etree
+
+import sample_home
+from applic.compressedio import open_file
+from applic.pagesinks import PageSinkSet, page_record
+
+PAGES_XML = b"""<wikiimport>
+  <Group Page_Template="ResourceTemplate" Page_Title="Property Resource">
+    <Resource_Description>Listings</Resource_Description>
+    <Labels><Label>page_resource</Label><Label>page_dynamic</Label></Labels>
+    <Item Page_Template="PropResourceTemplate" Page_Title="ListPrice Field">
+      <Field_Name_Standard_Name>ListPrice</Field_Name_Standard_Name>
+      <Groupings><Group Link="Property Resource">Property Resource</Group></Groupings>
+      <Lookup Link="Appliances Lookups">Appliances Lookups</Lookup>
+      <Synonyms/>
+      <Labels><Label>page_item</Label></Labels>
+    </Item>
+  </Group>
+  <Group Page_Template="LookupTemplate" Page_Title="Lookup Fields and Values"/>
+</wikiimport>"""
+
+
+def page_titles(xml):
+    return [page.get('Page_Title') for page in etree.fromstring(xml).iter('Group', 'Item')
+            if page.get('Page_Title') is not None]
+
+
+def test_output_filepath():
+    assert PageSinkSet.output_filepath('out/book.xml', PageSinkSet.NDJSON) == 'out/book.ndjson'
+    assert PageSinkSet.output_filepath('out/book.xml.gz', PageSinkSet.JSON) == 'out/book.json.gz'
+    assert PageSinkSet.output_filepath('out/book.xml.zst', PageSinkSet.MANIFEST) == 'out/book_pages.csv'
+
+
+def test_page_record():
+    resource_page = etree.fromstring(PAGES_XML)[0]
+    assert page_record(resource_page) == {
+        'title': 'Property Resource', 'template': 'ResourceTemplate', 'type': 'Group', 'parent': None,
+        'fields': {'Resource_Description': 'Listings'}, 'links': [], 'labels': ['page_resource', 'page_dynamic']}
+    assert page_record(resource_page[2], 'Property Resource') == {
+        'title': 'ListPrice Field', 'template': 'PropResourceTemplate', 'type': 'Item', 'parent': 'Property Resource',
+        'fields': {'Field_Name_Standard_Name': 'ListPrice', 'Groupings': ['Property Resource'],
+                   'Lookup': 'Appliances Lookups', 'Synonyms': ''},
+        'links': [{'field': 'Groupings', 'target': 'Property Resource'},
+                  {'field': 'Lookup', 'target': 'Appliances Lookups'}],
+        'labels': ['page_item']}
+
+
+def test_pages_added_in_document_order(tmp_path):
+    result_xml_filepath = str(tmp_path / 'book.xml.gz')
+    page_sinks = PageSinkSet(PageSinkSet.FORMATS, result_xml_filepath)
+    page_sinks.add_tree(etree.fromstring(PAGES_XML))
+    page_sinks.close()
+    with open_file(str(tmp_path / 'book.ndjson.gz'), 'r') as ndjson_file:
+        ndjson_records = [json.loads(line) for line in ndjson_file]
+    with open_file(str(tmp_path / 'book.json.gz'), 'r') as json_file:
+        assert json.load(json_file) == ndjson_records
+    assert [(record['title'], record['parent']) for record in ndjson_records] == [
+        ('Property Resource', None), ('ListPrice Field', 'Property Resource'), ('Lookup Fields and Values', None)]
+    with open(str(tmp_path / 'book_pages.csv'), newline='') as csv_file:
+        assert list(csv.reader(csv_file)) == [
+            ['Sequence', 'Page_Title', 'Page_Template', 'Node_Type', 'Parent_Title', 'Depth', 'Fields', 'Links',
+             'Labels'],
+            ['1', 'Property Resource', 'ResourceTemplate', 'Group', '', '0', '1', '0', '2'],
+            ['2', 'ListPrice Field', 'PropResourceTemplate', 'Item', 'Property Resource', '1', '4', '2', '1'],
+            ['3', 'Lookup Fields and Values', 'LookupTemplate', 'Group', '', '0', '0', '0', '0']]
+
+
+def test_empty_json_page_file(tmp_path):
+    page_sinks = PageSinkSet([PageSinkSet.JSON], str(tmp_path / 'book.xml'))
+    page_sinks.close()
+    with open(str(tmp_path / 'book.json')) as json_file:
+        assert json.load(json_file) == []
+
+
+def test_page_outputs_of_conversion(tmp_path):
+    faf = sample_home.make_home(str(tmp_path / 'home'))
+    page_formats = [PageSinkSet.NDJSON, PageSinkSet.MANIFEST]
+    default_xml = sample_home.convert(faf, str(tmp_path / 'default.xml'), page_formats=page_formats)
+    with open(str(tmp_path / 'default.ndjson')) as ndjson_file:
+        default_records = [json.loads(line) for line in ndjson_file]
+    assert [record['title'] for record in default_records] == page_titles(default_xml)
+    assert default_records[1]['fields']['Record_Identifier'] == '101501'
+    with open(str(tmp_path / 'default_pages.csv'), newline='') as csv_file:
+        assert [row['Page_Title'] for row in csv.DictReader(csv_file)] == page_titles(default_xml)
+    # Pages fed while written (low memory) are the same
+    sample_home.convert_low_memory(faf, str(tmp_path / 'low_memory.xml'), page_formats=page_formats)
+    with open(str(tmp_path / 'low_memory.ndjson')) as ndjson_file:
+        assert [json.loads(line) for line in ndjson_file] == default_records
+    assert sample_home.read_bytes(str(tmp_path / 'low_memory_pages.csv')) == \
+        sample_home.read_bytes(str(tmp_path / 'default_pages.csv'))
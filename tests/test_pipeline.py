@@ -0,0 +1,44 @@
+import logging
+import threading
+
+import pytest
+
+import sample_home
+from applic.IOI_Import import IOIGeneratedError
+
+
+def test_pipelined_output_same_as_default(tmp_path):
+    faf = sample_home.make_home(str(tmp_path / 'home'))
+    default_xml = sample_home.convert(faf, str(tmp_path / 'default.xml'))
+    assert sample_home.convert_pipelined(faf, str(tmp_path / 'pipelined.xml')) == default_xml
+
+
+def lookup_warnings(caplog):
+    return sorted(record.getMessage() for record in caplog.records if '[DXM-50]' in record.getMessage())
+
+
+def test_lookup_references_checked_once_lookup_sheet_is_read(tmp_path, caplog):
+    resource_rows = sample_home.sample_resource_rows()
+    resource_rows['Rules Tab'].append(sample_home.resource_row('FldRuMissing', 'Rules', lookup='Missing'))
+    resource_rows['SocialMedia'].append(sample_home.resource_row('FldSoZeta', 'SocialMedia', lookup='Zeta'))
+    # Lookup sheet first in the workbook: still read after the resource sheets
+    faf = sample_home.make_home(str(tmp_path / 'home'), resource_rows=resource_rows,
+                                sheet_order=['Lookups'] + sample_home.RESOURCE_SHEETS)
+    caplog.set_level(logging.WARNING)
+    default_xml = sample_home.convert(faf, str(tmp_path / 'default.xml'))
+    default_warnings = lookup_warnings(caplog)
+    caplog.clear()
+    pipelined_xml = sample_home.convert_pipelined(faf, str(tmp_path / 'pipelined.xml'))
+    assert default_warnings == ["[DXM-50] Lookup 'Missing' on page 'FldRuMissing Field' not found in lookup sheet "
+                                "or DD Wiki export"]
+    assert lookup_warnings(caplog) == default_warnings
+    assert pipelined_xml == default_xml
+
+
+def test_reader_error_raised_on_main_thread(tmp_path):
+    # No lookup values: the reader thread fails after the resource sheets are read
+    faf = sample_home.make_home(str(tmp_path / 'home'), lookup_rows=[])
+    with pytest.raises(IOIGeneratedError) as error:
+        sample_home.convert_pipelined(faf, str(tmp_path / 'pipelined.xml'))
+    assert error.value.value.startswith('[W202]')
+    assert [thread.name for thread in threading.enumerate() if thread.name == 'xml-writer'] == []
@@ -0,0 +1,87 @@
+import logging
+
+import pytest
+
+from applic.runlog import MessageCodeAggregator, RunLog
+
+
+class ListHandler(logging.Handler):
+    """ Keep formatted messages """
+
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(self.format(record))
+
+
+@pytest.fixture
+def logger(request):
+    logger = logging.getLogger('test_runlog.' + request.node.name)
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    yield logger
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+
+
+def record(msg, level=logging.WARNING):
+    return logging.LogRecord('test_runlog', level, __file__, 1, msg, None, None)
+
+
+def test_aggregator_passes_first_examples_of_each_code():
+    aggregator = MessageCodeAggregator(max_examples=2)
+    passed = [aggregator.filter(record('[DXM-41] Field {}'.format(idx))) for idx in range(4)]
+    assert passed == [True, True, False, False]
+    assert aggregator.filter(record('[DXM-41] Field 4', logging.ERROR))  # Errors never held back
+    assert all(aggregator.filter(record('No code')) for idx in range(4))
+    assert aggregator.filter(record('[W202] No lookups'))
+    assert aggregator.filter(record('[DXM-33] Note', logging.INFO))
+    # The same record seen by a 2nd handler is counted once
+    same_record = record('[DXM-41] Field 5')
+    assert aggregator.filter(same_record) == aggregator.filter(same_record) is False
+    assert aggregator.counts['DXM-41'][1] == 6
+    assert aggregator.summary_lines() == [
+        "  DXM-41   WARNING        6         4  [DXM-41] Field 0",
+        "  W202     WARNING        1         0  [W202] No lookups"]  # Info logged once: not in summary
+    aggregator.reset()
+    assert aggregator.filter(record('[DXM-41] Field 6')) and aggregator.summary_lines() == [
+        "  DXM-41   WARNING        1         0  [DXM-41] Field 6"]
+
+
+def test_aggregator_passes_all_with_zero_examples():
+    aggregator = MessageCodeAggregator(max_examples=0)
+    assert all(aggregator.filter(record('[DXM-41] Field {}'.format(idx))) for idx in range(10))
+    assert aggregator.summary_lines() == ["  DXM-41   WARNING       10         0  [DXM-41] Field 0"]
+
+
+def test_run_log_summary_per_conversion(logger):
+    list_handler = ListHandler()
+    run_log = RunLog(logger, [list_handler], max_examples=1)
+    assert run_log.queue_handler in logger.handlers and list_handler not in logger.handlers
+    for conversion in range(2):
+        for idx in range(3):
+            logger.warning("[DXM-51] Dangling link %s", idx)
+        run_log.end_conversion()
+    logger.info("Done")
+    run_log.close()
+    run_log.close()
+    assert run_log.queue_handler not in logger.handlers and run_log.listener._thread is None
+    summary = ("Message summary:\n  Code     Level      Count Not shown  First message\n"
+               "  DXM-51   WARNING        3         2  [DXM-51] Dangling link 0")
+    assert list_handler.messages == ['[DXM-51] Dangling link 0', summary, '[DXM-51] Dangling link 0', summary, 'Done']
+
+
+def test_run_log_handlers_attached_in_forked_child(logger):
+    list_handler = ListHandler()
+    run_log = RunLog(logger, [list_handler], max_examples=1)
+    try:
+        run_log._after_fork_in_child()  # No listener thread in a forked child
+        assert list_handler in logger.handlers and run_log.queue_handler not in logger.handlers
+        logger.warning("[DXM-51] Dangling link %s", 0)
+        logger.warning("[DXM-51] Dangling link %s", 1)
+        assert list_handler.messages == ['[DXM-51] Dangling link 0']
+        run_log.close()  # Queue handler removed: nothing to stop
+    finally:
+        run_log.listener.stop()
@@ -0,0 +1,27 @@
+import logging
+import re
+
+import sample_home
+
+
+def test_low_memory_output_same_as_default(tmp_path):
+    faf = sample_home.make_home(str(tmp_path / 'home'))
+    default_xml = sample_home.convert(faf, str(tmp_path / 'default.xml'))
+    low_memory_xml = sample_home.convert_low_memory(faf, str(tmp_path / 'low_memory.xml'))
+    assert low_memory_xml == default_xml
+    # Groups path order: sub Group 'Structure,Foo' before 'Structure Bar' (joined string order is the reverse)
+    assert default_xml.index(b'Page_Title="Structure Group"') < default_xml.index(b'Page_Title="Foo Group"') < \
+        default_xml.index(b'Page_Title="Structure Bar Group"')
+
+
+def test_low_memory_output_same_as_default_with_run_files(tmp_path, caplog):
+    faf = sample_home.make_home(str(tmp_path / 'home'), resource_rows=sample_home.sample_resource_rows(count=60),
+                                lookup_rows=sample_home.sample_lookup_rows(count=60))
+    default_xml = sample_home.convert(faf, str(tmp_path / 'default.xml'))
+    caplog.set_level(logging.INFO)
+    # 4kB budget: a few rows per run file
+    low_memory_xml = sample_home.convert_low_memory(faf, str(tmp_path / 'low_memory.xml'), memory_budget_bytes=4096)
+    run_files = [int(re.search(r'using (\d+) temporary run files', record.getMessage()).group(1))
+                 for record in caplog.records if 'temporary run files' in record.getMessage()]
+    assert run_files[0] > 10
+    assert low_memory_xml == default_xml
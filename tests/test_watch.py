@@ -0,0 +1,133 @@
+import argparse
+import logging
+import os
+import threading
+
+import sample_home
+from applic.dicttoxml import DictToXML
+from applic.inputcache import InputCache, file_signature
+from applic.IOI_Import import ResoXLSXtoDict, watch_and_convert
+from applic.watch import InputWatcher
+
+
+def write_text(filepath, text):
+    """ Write file with a modification time 1 second later than before (signature changes on any file system) """
+    old_signature = file_signature(filepath)
+    with open(filepath, 'w') as text_file:
+        text_file.write(text)
+    if old_signature is not None:
+        os.utime(filepath, ns=(old_signature[0] + 10 ** 9, old_signature[0] + 10 ** 9))
+
+
+def test_input_cache_reloads_changed_file(tmp_path):
+    filepath = str(tmp_path / 'input.txt')
+    write_text(filepath, 'one')
+    loads = []
+
+    def load():
+        with open(filepath) as text_file:
+            loads.append(text_file.read())
+        return loads[-1]
+    input_cache = InputCache()
+    assert input_cache.get(('text', filepath), filepath, load) == 'one'
+    assert input_cache.get(('text', filepath), filepath, load) == 'one'
+    assert input_cache.get(('other', filepath), filepath, load) == 'one'
+    assert loads == ['one', 'one']
+    write_text(filepath, 'two')
+    assert input_cache.get(('text', filepath), filepath, load) == 'two'
+    assert loads == ['one', 'one', 'two']
+    # Missing file: not reused
+    missing_filepath = str(tmp_path / 'missing.txt')
+    assert input_cache.get(('missing', missing_filepath), missing_filepath, lambda: 'none') == 'none'
+    assert input_cache.get(('missing', missing_filepath), missing_filepath, lambda: 'again') == 'again'
+
+
+def test_watcher_reports_settled_change(tmp_path):
+    filepaths = [str(tmp_path / 'a.txt'), str(tmp_path / 'b.txt')]
+    write_text(filepaths[0], 'a')
+    watcher = InputWatcher(filepaths, poll_seconds=0.01)
+    signatures = watcher.wait_for_change(None)  # No conversion yet: right away
+    assert signatures == {filepaths[0]: file_signature(filepaths[0]), filepaths[1]: None}
+    assert watcher.changed_files(None, signatures) == filepaths
+    writer = threading.Timer(0.05, write_text, (filepaths[1], 'b'))
+    writer.start()
+    new_signatures = watcher.wait_for_change(signatures)
+    writer.join()
+    assert watcher.changed_files(signatures, new_signatures) == [filepaths[1]]
+
+
+def test_cached_inputs_output_same_as_without_cache(tmp_path):
+    faf = sample_home.make_home(str(tmp_path / 'home'))
+    uncached_xml = sample_home.convert(faf, str(tmp_path / 'uncached.xml'))
+    input_cache = InputCache()
+    # Max ids and exported page titles updated by the 1st conversion are not kept in the cache
+    assert sample_home.convert(faf, str(tmp_path / 'cached1.xml'), input_cache=input_cache) == uncached_xml
+    assert sample_home.convert(faf, str(tmp_path / 'cached2.xml'), input_cache=input_cache) == uncached_xml
+
+
+def watch_args(**kwargs):
+    args = argparse.Namespace(watch_interval=0.01, xlsx_date=sample_home.RUN_CLOCK, reproducible=True, shard_by=None,
+                              shard_max_pages=None, shard_max_kb=None, delta=False, near_dup_threshold=None,
+                              page_output=None, no_validate=True, id_block_size=1000)
+    vars(args).update(kwargs)
+    return args
+
+
+def test_watch_reuses_unchanged_inputs(tmp_path, monkeypatch, caplog):
+    faf = sample_home.make_home(str(tmp_path / 'home'))
+    faf.xml_filepath = str(tmp_path / 'book.xml')
+    xlsx_filepath = os.path.join(faf.input_folder, sample_home.XLSX_FILENAME)
+    max_id_filepath = os.path.join(faf.input_folder, sample_home.MAX_ID_FILENAME)
+    config_xml_filepath = os.path.join(faf.config_folder, DictToXML.CONFIG_XML_FILENAME)
+    with open(config_xml_filepath) as config_file:
+        config_xml = config_file.read()
+    outputs = []
+    calls = []
+    read_xlsx_file = ResoXLSXtoDict.read_xlsx_file
+    read_xml_config_file = DictToXML._read_xml_config_file.__func__
+
+    def counting_read_xlsx_file(self):
+        calls.append('xlsx')
+        return read_xlsx_file(self)
+
+    def counting_read_xml_config_file(cls, files_and_folders):
+        calls.append('config xml')
+        return read_xml_config_file(cls, files_and_folders)
+
+    def output_written():
+        outputs.append(sample_home.read_bytes(faf.xml_filepath) if os.path.exists(faf.xml_filepath) else None)
+        if os.path.exists(faf.xml_filepath):
+            os.remove(faf.xml_filepath)
+        calls.append('|')
+
+    def change_xlsx():
+        sample_home.write_workbook(xlsx_filepath, resource_rows=sample_home.sample_resource_rows(count=13))
+        os.utime(xlsx_filepath, ns=(file_signature(xlsx_filepath)[0] + 10 ** 9,) * 2)
+    steps = [lambda: None,
+             lambda: write_text(max_id_filepath, sample_home.MAX_ID_TEXT.replace('101500', '101600')),
+             change_xlsx,
+             lambda: write_text(config_xml_filepath, '<DDWikiImportConfig><Form'),
+             lambda: write_text(config_xml_filepath, config_xml)]
+
+    def scripted_wait_for_change(self, converted_signatures):
+        if converted_signatures is not None:
+            output_written()
+        if len(steps) == 0:
+            raise KeyboardInterrupt
+        steps.pop(0)()
+        return self.signatures()
+    caplog.set_level(logging.INFO)
+    monkeypatch.setattr(InputWatcher, 'wait_for_change', scripted_wait_for_change)
+    monkeypatch.setattr(ResoXLSXtoDict, 'read_xlsx_file', counting_read_xlsx_file)
+    monkeypatch.setattr(DictToXML, '_read_xml_config_file', classmethod(counting_read_xml_config_file))
+    watch_and_convert(watch_args(), faf, xlsx_filepath, max_id_filepath,
+                      os.path.join(faf.input_folder, sample_home.EXPORT_FILENAME), None, None)
+    # xlsx read again only when changed. Config xml read again only when changed (failed conversion: not cached)
+    assert calls == ['xlsx', 'config xml', '|', '|', 'xlsx', '|', 'config xml', '|', 'config xml', '|']
+    assert b'<Record_Identifier>101501</Record_Identifier>' in outputs[0]
+    assert b'<Record_Identifier>101601</Record_Identifier>' in outputs[1]
+    assert b'FldPr012 Field' in outputs[2] and b'FldPr012 Field' not in outputs[1]
+    assert outputs[3] is None
+    assert "Conversion failed: [DXM-10]" in caplog.text
+    assert outputs[4] == outputs[2]
+    assert "Watch stopped" in caplog.text
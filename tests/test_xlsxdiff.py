@@ -0,0 +1,74 @@
+import json
+import os
+
+import sample_home
+from applic.IOI_Import import diff_workbooks
+from applic.xlsxdiff import WorkbookDiff, row_fingerprint
+
+OLD_ROWS = [('Resources', 'PropertyCol', {'StandardName': 'ListPrice', 'Definition': 'Price', 'SugMaxLength': 14}),
+            ('Resources', 'PropertyCol', {'StandardName': 'City', 'Definition': 'City'}),
+            ('Resources', 'PropertyCol', {'StandardName': 'City', 'Definition': 'Town'}),
+            ('Resources', 'Rules Tab', {'StandardName': 'RuleAction', 'Definition': 'Action'}),
+            ('Lookups', 'Appliances', {'LookupValue': 'Bar Fridge', 'Definition': 'Fridge'})]
+NEW_ROWS = [('Resources', 'PropertyCol', {'StandardName': 'ListPrice', 'Definition': 'List price',
+                                          'SugMaxLength': 14, 'Notes': 'new'}),
+            ('Resources', 'PropertyCol', {'StandardName': 'City', 'Definition': 'City'}),
+            ('Resources', 'PropertyCol', {'StandardName': 'City', 'Definition': 'Town'}),
+            ('Resources', 'PropertyCol', {'StandardName': 'City', 'Definition': 'Village'}),
+            ('Lookups', 'Appliances', {'LookupValue': 'Bar Fridge', 'Definition': 'Fridge'}),
+            ('Lookups', 'Basement', {'LookupValue': 'Crawl', 'Definition': 'Crawl space'})]
+
+
+def test_row_fingerprint():
+    assert row_fingerprint({'a': 1, 'b': 'x'}) == row_fingerprint({'b': 'x', 'a': 1})
+    assert row_fingerprint({'a': 1}) != row_fingerprint({'a': '1'})
+    assert row_fingerprint({'a': 1}) != row_fingerprint({'a': 1, 'b': None})
+
+
+def test_changed_rows():
+    workbook_diff = WorkbookDiff(OLD_ROWS, NEW_ROWS, old_name='v1.xlsx', new_name='v2.xlsx')
+    assert workbook_diff.summary() == {'added': 2, 'removed': 1, 'modified': 1, 'unchanged': 3}
+    assert [(change['change'], change['sheet'], change['key']) for change in workbook_diff.changes] == [
+        ('modified', 'PropertyCol', 'ListPrice'), ('added', 'PropertyCol', 'City #3'), ('added', 'Basement', 'Crawl'),
+        ('removed', 'Rules Tab', 'RuleAction')]
+    assert workbook_diff.changes[0]['columns'] == {'Definition': ('Price', 'List price'), 'Notes': (None, 'new')}
+    assert workbook_diff.changes[0]['fingerprint'] == row_fingerprint(NEW_ROWS[0][2])
+    # Removed rows have no page to build
+    build_targets = workbook_diff.changed_build_targets()
+    assert (build_targets.resources, build_targets.lookup_fields) == ({'PropertyCol'}, {'Basement'})
+
+
+def test_reports():
+    workbook_diff = WorkbookDiff(OLD_ROWS, NEW_ROWS, old_name='v1.xlsx', new_name='v2.xlsx')
+    assert workbook_diff.to_text() == """Workbook diff: v1.xlsx -> v2.xlsx
+2 added, 1 removed, 1 modified, 3 unchanged rows
+~ Resources 'PropertyCol': ListPrice
+    Definition: 'Price' -> 'List price'
+    Notes: None -> 'new'
++ Resources 'PropertyCol': City #3
++ Lookups 'Basement': Crawl
+- Resources 'Rules Tab': RuleAction
+"""
+    report = json.loads(workbook_diff.to_json())
+    assert (report['old'], report['new']) == ('v1.xlsx', 'v2.xlsx')
+    assert report['summary'] == workbook_diff.summary()
+    assert report['changes'][0]['columns'] == {'Definition': {'old': 'Price', 'new': 'List price'},
+                                               'Notes': {'old': None, 'new': 'new'}}
+
+
+def test_diff_workbooks(tmp_path):
+    faf = sample_home.make_home(str(tmp_path / 'home'))
+    resource_rows = sample_home.sample_resource_rows()
+    resource_rows['PropertyCol'][3]['Definition'] = 'Changed definition'
+    del resource_rows['Rules Tab'][1]
+    lookup_rows = sample_home.sample_lookup_rows() + [sample_home.lookup_row('Crawl', 'Basement')]
+    new_xlsx_filepath = os.path.join(faf.input_folder, 'new.xlsx')
+    sample_home.write_workbook(new_xlsx_filepath, resource_rows=resource_rows, lookup_rows=lookup_rows)
+    workbook_diff = diff_workbooks(faf, os.path.join(faf.input_folder, sample_home.XLSX_FILENAME), new_xlsx_filepath)
+    assert (workbook_diff.old_name, workbook_diff.new_name) == (sample_home.XLSX_FILENAME, 'new.xlsx')
+    assert workbook_diff.summary() == {'added': 1, 'removed': 1, 'modified': 1, 'unchanged': 11 + 3 + 3 + 12}
+    assert [(change['change'], change['sheet'], change['key'], change['columns']) for change in
+            workbook_diff.changes] == [
+        ('modified', 'PropertyCol', 'FldPr003', {'Definition': ('Definition of FldPr003', 'Changed definition')}),
+        ('added', 'Basement', 'Crawl', {}), ('removed', 'Rules Tab', 'FldRu001', {})]
+    assert str(workbook_diff.changed_build_targets()) == 'PropertyCol, Basement'
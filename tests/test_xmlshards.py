@@ -0,0 +1,111 @@
+import gzip
+import os
+
+import pytest
+from lxml import etree as xml_tree
+
+import sample_home
+from applic.compressedio import open_file
+from applic.xmlshards import XMLShardWriter
+
+PAGE_TITLE = XMLShardWriter.PAGE_ATTRIBUTE
+
+
+@pytest.fixture(scope='module')
+def xml_root(tmp_path_factory):
+    """ Unsharded output of the sample workbook (60 fields, 60 lookup values) as built in memory """
+    tmp_path = tmp_path_factory.mktemp('shards')
+    faf = sample_home.make_home(str(tmp_path / 'home'), resource_rows=sample_home.sample_resource_rows(count=60),
+                                lookup_rows=sample_home.sample_lookup_rows(count=60))
+    xml_bytes = sample_home.convert(faf, str(tmp_path / 'book.xml'))
+    return xml_tree.fromstring(xml_bytes, xml_tree.XMLParser(remove_blank_text=True))
+
+
+def new_shard_writer(xml_root, shard_by, max_pages=None, max_bytes=None):
+    lookup_top_page = next(page for page in xml_root if page.get(PAGE_TITLE) == 'Lookup Fields and Values')
+    return XMLShardWriter(shard_by, max_pages=max_pages, max_bytes=max_bytes,
+                          split_templates=[lookup_top_page.get('Page_Template')])
+
+
+def page_titles(node):
+    return [ele.get(PAGE_TITLE) for ele in node.iter() if PAGE_TITLE in ele.attrib]
+
+
+def read_manifest(manifest_filepath):
+    with open_file(manifest_filepath, 'rb') as manifest_file:
+        return xml_tree.parse(manifest_file).getroot()
+
+
+def write_shards(xml_root, tmp_path, shard_by, max_pages=None, max_bytes=None, result_filename='book.xml'):
+    result_xml_filepath = str(tmp_path / result_filename)
+    shard_filepaths = new_shard_writer(xml_root, shard_by, max_pages, max_bytes).write(xml_root, result_xml_filepath)
+    shard_roots = []
+    for shard_filepath in shard_filepaths:
+        with open_file(shard_filepath, 'rb') as shard_file:
+            shard_roots.append(xml_tree.parse(shard_file).getroot())
+    return shard_filepaths, shard_roots, read_manifest(XMLShardWriter.manifest_filepath(result_xml_filepath))
+
+
+@pytest.mark.parametrize('shard_by, max_pages, max_bytes', [('resource', None, None), ('letter', None, None),
+                                                             ('size', 8, None), ('size', None, 6000),
+                                                             ('resource', 20, None)])
+def test_shards_are_wikiimport_files_holding_every_page_once(xml_root, tmp_path, shard_by, max_pages, max_bytes):
+    shard_filepaths, shard_roots, manifest = write_shards(xml_root, tmp_path, shard_by, max_pages, max_bytes)
+    assert len(shard_roots) > 1
+    written_titles = []
+    for shard_root in shard_roots:
+        assert shard_root.tag == xml_root.tag
+        assert dict(shard_root.attrib) == dict(xml_root.attrib)
+        titles = page_titles(shard_root)
+        assert len(titles) == len(set(titles))
+        written_titles.extend(title for title in titles if title not in written_titles)
+    # Pages first written in document order: a page is imported after its parent
+    assert written_titles == page_titles(xml_root)
+
+
+@pytest.mark.parametrize('shard_by, max_pages, max_bytes', [('size', 8, None), ('size', None, 6000),
+                                                             ('resource', 20, None), ('letter', 10, 12000)])
+def test_max_pages_and_max_bytes_honored(xml_root, tmp_path, shard_by, max_pages, max_bytes):
+    shard_filepaths, shard_roots, manifest = write_shards(xml_root, tmp_path, shard_by, max_pages, max_bytes)
+    for shard_filepath, shard_root, shard in zip(shard_filepaths, shard_roots, manifest):
+        assert int(shard.get('Pages')) == len(page_titles(shard_root))
+        assert int(shard.get('Bytes')) == os.path.getsize(shard_filepath)
+        if max_pages is not None:
+            assert int(shard.get('Pages')) <= max_pages
+        if max_bytes is not None:
+            assert int(shard.get('Bytes')) <= max_bytes
+
+
+def test_manifest_lists_shards_in_import_order(xml_root, tmp_path):
+    shard_filepaths, shard_roots, manifest = write_shards(xml_root, tmp_path, 'letter')
+    assert manifest.tag == XMLShardWriter.MANIFEST_ROOT_TAG
+    assert manifest.get('Shard_By') == 'letter'
+    assert [shard.get('Sequence') for shard in manifest] == [str(idx) for idx in range(1, len(shard_filepaths) + 1)]
+    assert [shard.get('File') for shard in manifest] == ['book_{:03d}.xml'.format(idx)
+                                                         for idx in range(1, len(shard_filepaths) + 1)]
+    assert [shard.get('First_Page') for shard in manifest] == [
+        'Property Resource', 'Rules Resource', 'SocialMedia Collection', 'Lookup Fields and Values',
+        'A - Lookup Fields', 'B - Lookup Fields', 'Z - Lookup Fields']
+    # Letter pages are placed under the lookup top page: imported in a later stage
+    assert [shard.get('Stage') for shard in manifest] == ['1', '1', '1', '1', '2', '2', '2']
+
+
+def test_compressed_shards_and_manifest(xml_root, tmp_path):
+    assert XMLShardWriter.manifest_filepath('out/book.xml.gz') == 'out/book_manifest.xml.gz'
+    shard_filepaths, shard_roots, manifest = write_shards(xml_root, tmp_path, 'letter', result_filename='book.xml.gz')
+    assert shard_filepaths[0] == str(tmp_path / 'book_001.xml.gz')
+    with gzip.open(str(tmp_path / 'book_manifest.xml.gz')) as manifest_file:
+        assert xml_tree.parse(manifest_file).getroot().get('Shard_By') == 'letter'
+    assert manifest[0].get('File') == 'book_001.xml.gz'
+
+
+def test_measured_sizes_match_written_sizes(xml_root):
+    shard_writer = new_shard_writer(xml_root, 'size', max_pages=8)
+    shard_writer._measure(xml_root)
+    for node in xml_root.iter():
+        pages, size = shard_writer._placed_size(node, 0)
+        assert size == len(xml_tree.tostring(node, pretty_print=True))
+        assert pages == len(page_titles(node))
+        if PAGE_TITLE in node.attrib and node is not xml_root:
+            shell_size = shard_writer._placed_size(node, 0, is_shell=True)[1]
+            assert shell_size == len(xml_tree.tostring(shard_writer._shell(node), pretty_print=True))
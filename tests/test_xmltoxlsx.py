@@ -0,0 +1,92 @@
+import gzip
+import os
+
+import openpyxl
+import pytest
+
+import sample_home
+from applic.exportindex import ExportIndex
+from applic.IOI_Import import export_xml_to_xlsx
+from applic.xmltoxlsx import XLSXExportGeneratedError
+
+RULES_EXPORT_FILEPATH = os.path.join(sample_home.REPO_FOLDER, 'files', 'xml', 'DDWiki_1_7_Rules v7 test.xml')
+
+
+@pytest.fixture
+def faf(tmp_path):
+    return sample_home.make_home(str(tmp_path / 'home'))
+
+
+def sheet_rows(xlsx_filepath):
+    """ Rows of each sheet as dicts keyed by the header row """
+    wb = openpyxl.load_workbook(xlsx_filepath, read_only=True)
+    sheets = {}
+    for ws in wb.worksheets:
+        rows = list(ws.iter_rows(values_only=True))
+        sheets[ws.title] = [dict(zip(rows[0], row)) for row in rows[1:]]
+    wb.close()
+    return sheets
+
+
+def test_output_converted_back_to_same_output(faf, tmp_path):
+    result_xml_filepath = str(tmp_path / 'book.xml')
+    result_xml = sample_home.convert(faf, result_xml_filepath)
+    row_counts = export_xml_to_xlsx(faf, result_xml_filepath, os.path.join(faf.input_folder, 'reverse.xlsx'))
+    assert row_counts == {'PropertyCol': 12, 'Rules Tab': 4, 'SocialMedia': 3, 'Lookups': 12}
+    reverse_rows = sheet_rows(os.path.join(faf.input_folder, 'reverse.xlsx'))
+    assert list(reverse_rows) == ['PropertyCol', 'Rules Tab', 'SocialMedia', 'Lookups']
+    assert reverse_rows['PropertyCol'][0]['StandardName'] == 'FldPr000'
+    assert (reverse_rows['PropertyCol'][0]['RecordID'], reverse_rows['PropertyCol'][0]['Lookup'],
+            reverse_rows['PropertyCol'][0]['Property Types'], reverse_rows['PropertyCol'][0]['RevisedDate']) == \
+        ('101501', 'Appliances', 'RESI,RLSE,RINC', '20180420')
+    # Max ids as after the output was imported: ids and LookupFieldIDs (always computed) are the same
+    export_index = ExportIndex(str(tmp_path / 'index.sqlite'), resource_title_template='[[Name]] Resource',
+                               lookup_field_title_template='[[Name]] Lookups')
+    try:
+        export_index.update(result_xml_filepath)
+        max_id_text = export_index.max_id_report()
+    finally:
+        export_index.close()
+    with open(str(tmp_path / 'imported_max_ids.txt'), 'w') as max_id_file:
+        max_id_file.write(max_id_text)
+    assert sample_home.convert(faf, str(tmp_path / 'reverse.xml'), xlsx_filename='reverse.xlsx',
+                               max_id_filepath=str(tmp_path / 'imported_max_ids.txt')) == result_xml
+
+
+def test_compressed_xml(faf, tmp_path):
+    result_xml = sample_home.convert(faf, str(tmp_path / 'book.xml'))
+    with gzip.open(str(tmp_path / 'book.xml.gz'), 'wb') as gz_file:
+        gz_file.write(result_xml)
+    export_xml_to_xlsx(faf, str(tmp_path / 'book.xml'), str(tmp_path / 'plain.xlsx'))
+    export_xml_to_xlsx(faf, str(tmp_path / 'book.xml.gz'), str(tmp_path / 'gz.xlsx'))
+    assert sheet_rows(str(tmp_path / 'gz.xlsx')) == sheet_rows(str(tmp_path / 'plain.xlsx'))
+    # Truncated compressed file
+    with open(str(tmp_path / 'truncated.xml.gz'), 'wb') as gz_file:
+        gz_file.write(sample_home.read_bytes(str(tmp_path / 'book.xml.gz'))[:200])
+    with pytest.raises(XLSXExportGeneratedError) as exc_info:
+        export_xml_to_xlsx(faf, str(tmp_path / 'truncated.xml.gz'), str(tmp_path / 'truncated.xlsx'))
+    assert exc_info.value.value.startswith('[XLX-01] Cannot read xml file')
+
+
+def test_errors(faf, tmp_path):
+    with open(str(tmp_path / 'broken.xml'), 'w') as xml_file:
+        xml_file.write('<wikiimport><Group Page_Title="Property Resource">')
+    with pytest.raises(XLSXExportGeneratedError) as exc_info:
+        export_xml_to_xlsx(faf, str(tmp_path / 'broken.xml'), str(tmp_path / 'broken.xlsx'))
+    assert exc_info.value.value.startswith('[XLX-01] Cannot parse xml file')
+    sample_home.convert(faf, str(tmp_path / 'book.xml'))
+    with pytest.raises(XLSXExportGeneratedError) as exc_info:
+        export_xml_to_xlsx(faf, str(tmp_path / 'book.xml'), str(tmp_path / 'missing' / 'book.xlsx'))
+    assert exc_info.value.value.startswith('[XLX-04] Cannot write xlsx file')
+
+
+def test_ddwiki_export(faf, tmp_path):
+    xlsx_filepath = str(tmp_path / 'export.xlsx')
+    assert export_xml_to_xlsx(faf, RULES_EXPORT_FILEPATH, xlsx_filepath) == {
+        'PropertyCol': 5, 'Rules Tab': 27, 'SocialMedia': 10, 'Lookups': 4}
+    export_rows = sheet_rows(xlsx_filepath)
+    rule_action = [row for row in export_rows['Rules Tab'] if row['StandardName'] == 'RuleAction']
+    assert len(rule_action) == 1 and rule_action[0]['RecordID'] == '446011'
+    assert rule_action[0]['Groups'].split(',')[0] == 'Rules'
+    assert sorted((row['LookupValue'], row['LookupField'], row['LookupID']) for row in export_rows['Lookups'])[:2] == \
+        [('$filter', 'RuleFormat', '447003'), ('JavaScript', 'RuleFormat', '447002')]